@@ -0,0 +1,166 @@
+"""Time Bob's per-invocation overhead on synthetic projects of growing size.
+
+For every size a project is generated with benchmarks.synthetic_project, then each phase of a build is timed:
+  - ip_config        : loading ip_config.yaml and building the dependency graph
+  - discover_tasks   : finding and reading every task_config.yaml
+  - parse            : TaskConfigParser.parse_all_tasks_in_task_configs()
+  - schedule         : schedule_all_tasks() with every task dirty, also reported per task
+  - build            : a full build with the chosen payload, also reported per task
+  - filter_to_rebuild: filter_tasks_to_rebuild() with every task up to date
+  - noop_rebuild     : execute_tasks() with every task up to date
+Phases are repeated --rounds times, except the full build which runs once, and min/median/mean are reported.
+With --json the results are written along with the commit they were measured at, such that runs of two commits
+can be compared with --compare.
+
+Usage (from the project root):
+    python -m benchmarks.bench_scaling [--sizes 10 100 1000 10000] [--files 4] [--shape chain] [--payload noop]
+                                       [--rounds 5] [--json out.json] [--compare baseline.json]
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_project import PAYLOADS, SHAPES, write_synthetic_project
+from bob.Bob import Bob
+
+PHASES = ("ip_config", "discover_tasks", "parse", "schedule", "build", "filter_to_rebuild", "noop_rebuild")
+
+
+def _stats(samples: list[float]) -> dict[str, float]:
+    return {"min_s": min(samples), "median_s": statistics.median(samples), "mean_s": statistics.fmean(samples), "rounds": len(samples)}
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _logger() -> logging.Logger:
+    logger = logging.getLogger("bench_scaling")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    return logger
+
+
+def setup_bob(samples: dict[str, list[float]]) -> Bob:
+    """Configure a Bob for the project in the current directory like main_cli.setup_bob(), timing its phases into samples"""
+    os.environ["PROJ_ROOT"] = os.getcwd()
+    bob = Bob(_logger())
+    bob.instantiate_and_associate_tool_config_parser()
+    bob.set_build_variant(None)
+
+    def load_ip_config():
+        bob.instantiate_and_associate_ip_config_parser()
+        bob.setup_with_ip_config_parser()
+    samples["ip_config"].append(_time(load_ip_config))
+    samples["discover_tasks"].append(_time(bob.discover_tasks))
+    bob.setup_build_dirs()
+    bob.create_all_task_env()
+    bob.ensure_dotbob_dir_at_proj_root()
+
+    def parse():
+        bob.instantiate_and_associate_task_config_parser()
+        bob.task_config_parser.inherit_task_configs(bob.task_configs)
+        bob.task_config_parser.parse_all_tasks_in_task_configs()
+    samples["parse"].append(_time(parse))
+    return bob
+
+
+def run_size(num_tasks: int, files_per_task: int, shape: str, payload: str, rounds: int) -> dict[str, dict]:
+    samples: dict[str, list[float]] = {phase: [] for phase in PHASES}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bob_bench_") as tmp_dir:
+        root = write_synthetic_project(Path(tmp_dir) / "project", num_tasks, files_per_task, shape, payload)
+        os.chdir(root)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(rounds):
+                    bob = setup_bob(samples)
+                    # A plain dict and queue stand in for the Manager proxies of execute_tasks()
+                    samples["schedule"].append(_time(lambda: bob.schedule_all_tasks({}, queue.Queue())))
+
+                samples["build"].append(_time(lambda: bob.execute_tasks(True, [])))
+                for _ in range(rounds):
+                    samples["filter_to_rebuild"].append(_time(lambda: bob.filter_tasks_to_rebuild(bob.dependency_graph)))
+                for _ in range(rounds):
+                    samples["noop_rebuild"].append(_time(lambda: bob.execute_tasks(True, [])))
+        finally:
+            os.chdir(cwd)
+
+    results = {phase: _stats(phase_samples) for phase, phase_samples in samples.items()}
+    for phase in ("schedule", "build"):
+        results[phase]["per_task_s"] = results[phase]["median_s"] / num_tasks
+    return results
+
+
+def run(sizes: list[int], files_per_task: int, shape: str, payload: str, rounds: int) -> dict:
+    return {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "shape": shape,
+        "files_per_task": files_per_task,
+        "payload": payload,
+        "rounds": rounds,
+        "sizes": {str(num_tasks): run_size(num_tasks, files_per_task, shape, payload, rounds) for num_tasks in sizes},
+    }
+
+
+def print_results(results: dict, baseline: dict | None = None) -> None:
+    print(f"\n{results['shape']} DAG, {results['files_per_task']} file(s) per task, {results['payload']} payload, commit {results['commit'] or 'unknown'}")
+    if baseline:
+        print(f"Compared against commit {baseline.get('commit') or 'unknown'} (VS BASE = median / baseline median)")
+    print(f"{'TASKS':>6} {'PHASE':<18} {'MIN(ms)':>10} {'MEDIAN(ms)':>11} {'PER TASK(us)':>13} {'VS BASE':>8}")
+    print("-" * 71)
+    for size, phases in results["sizes"].items():
+        for phase, r in phases.items():
+            per_task = f"{r['per_task_s'] * 1e6:.1f}" if "per_task_s" in r else "-"
+            base = (baseline or {}).get("sizes", {}).get(size, {}).get(phase)
+            vs_base = f"{r['median_s'] / base['median_s']:.2f}x" if base and base["median_s"] else "-"
+            print(f"{size:>6} {phase:<18} {r['min_s'] * 1e3:>10.2f} {r['median_s'] * 1e3:>11.2f} {per_task:>13} {vs_base:>8}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Bob's planning and scheduling overhead on synthetic projects")
+    parser.add_argument("--sizes",   type=int, nargs="+", default=[10, 100, 1000, 10_000], help="Task counts of the generated projects")
+    parser.add_argument("--files",   type=int, default=4, help="Source files per task")
+    parser.add_argument("--shape",   choices=SHAPES, default="chain")
+    parser.add_argument("--payload", choices=PAYLOADS, default="noop")
+    parser.add_argument("--rounds",  type=int, default=5, help="Repetitions of each phase but the full build")
+    parser.add_argument("--json",    default=None, help="Also write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="JSON results of an earlier run to compare medians against")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.files, args.shape, args.payload, args.rounds)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
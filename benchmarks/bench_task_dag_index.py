@@ -0,0 +1,111 @@
+"""Compare TaskDagIndex against the plain networkx path used by Bob for DAG queries.
+
+Measures the operations Bob performs on the dependency graph:
+  - get_dependencies_for_task : ancestors of one task, in topological order
+  - schedule_selected_tasks   : union of ancestors of several tasks + subgraph extraction
+  - visualise order           : topological order of a filtered subgraph
+
+Usage:
+    python -m benchmarks.bench_task_dag_index [--tasks 10000] [--fan-in 4] [--queries 100]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+from networkx import DiGraph, ancestors, topological_sort
+
+from bob.TaskDagIndex import TaskDagIndex
+
+
+def build_random_dag(num_tasks: int, fan_in: int, seed: int = 0) -> DiGraph:
+    """Each task depends on up to 'fan_in' randomly chosen tasks created before it"""
+    rng = random.Random(seed)
+    graph = DiGraph()
+    for i in range(num_tasks):
+        name = f"task_{i}"
+        graph.add_node(name)
+        for dep in rng.sample(range(i), min(i, rng.randint(0, fan_in))):
+            graph.add_edge(f"task_{dep}", name)
+    return graph
+
+
+def _time(fn, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(num_tasks: int, fan_in: int, num_queries: int, num_selected: int) -> dict[str, dict[str, float]]:
+    graph = build_random_dag(num_tasks, fan_in)
+    rng = random.Random(1)
+    query_tasks = rng.sample(list(graph.nodes), min(num_queries, num_tasks))
+    selected_tasks = rng.sample(list(graph.nodes), min(num_selected, num_tasks))
+
+    # networkx path, as Bob implemented it before TaskDagIndex
+    def nx_get_dependencies():
+        for task in query_tasks:
+            deps = ancestors(graph, task)
+            topo_sorted = list(topological_sort(graph))
+            [t for t in topo_sorted if t in deps]
+
+    def nx_schedule_selected():
+        tasks_to_include = set()
+        for task in selected_tasks:
+            tasks_to_include.add(task)
+            tasks_to_include.update(ancestors(graph, task))
+        subgraph = graph.subgraph(tasks_to_include).copy()
+        list(topological_sort(subgraph))
+
+    build_start = time.perf_counter()
+    index = TaskDagIndex(graph)
+    build_s = time.perf_counter() - build_start
+
+    def index_get_dependencies():
+        for task in query_tasks:
+            index.ancestors(task)
+
+    def index_schedule_selected():
+        subgraph = index.subgraph(index.closure_mask(selected_tasks))
+        index.order_tasks(subgraph.nodes)
+
+    return {
+        "get_dependencies_for_task": {
+            "networkx_s": _time(nx_get_dependencies) / len(query_tasks),
+            "index_s":    _time(index_get_dependencies) / len(query_tasks),
+        },
+        "schedule_selected_tasks": {
+            "networkx_s": _time(nx_schedule_selected),
+            "index_s":    _time(index_schedule_selected),
+        },
+        "index_build": {
+            "networkx_s": 0.0,
+            "index_s":    build_s,
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark TaskDagIndex against networkx")
+    parser.add_argument("--tasks",    type=int, default=10_000)
+    parser.add_argument("--fan-in",   type=int, default=4)
+    parser.add_argument("--queries",  type=int, default=100, help="Tasks queried for get_dependencies_for_task")
+    parser.add_argument("--selected", type=int, default=50,  help="Tasks selected for schedule_selected_tasks")
+    args = parser.parse_args(argv)
+
+    results = run(args.tasks, args.fan_in, args.queries, args.selected)
+    print(f"\n{args.tasks} tasks, fan-in <= {args.fan_in}")
+    print(f"{'OPERATION':<28} {'NETWORKX(ms)':>14} {'INDEX(ms)':>12} {'SPEEDUP':>9}")
+    print("-" * 66)
+    for op, r in results.items():
+        nx_ms, idx_ms = r["networkx_s"] * 1e3, r["index_s"] * 1e3
+        speedup = f"{nx_ms / idx_ms:.1f}x" if nx_ms and idx_ms else "-"
+        print(f"{op:<28} {nx_ms:>14.3f} {idx_ms:>12.3f} {speedup:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Compare the compile cost of cpp_compile static-lib tasks built file-by-file and as unity builds.
+
+For every selected task, each .cpp file is compiled on its own, then the same files are amalgamated with
+Bob.generate_unity_sources() and the unity translation units are compiled. Both use the g++ command and
+include dirs Bob would use. CPU time (user + sys) of the compiler is taken from os.wait4(), so it includes
+cc1plus and as. Objects go to a temporary directory, the project's build/ is not touched.
+
+Usage (from the project root):
+    python -m benchmarks.bench_unity_build [--tasks simulation_utils verification_lib] [--batch-size N] [--json out.json]
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def compile_cpu_time(cmd: list[str], cwd: str) -> tuple[float, float]:
+    """Run one compile command, returning (cpu_s, wall_s) of the compiler and all of its children"""
+    start = time.perf_counter()
+    process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall_s = time.perf_counter() - start
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"Compilation failed: {' '.join(cmd)}\n{process.stderr.read().decode(errors='replace')}")
+    process.stderr.close()
+    return rusage.ru_utime + rusage.ru_stime, wall_s
+
+
+def compile_all(gpp_cmd_prefix: list[str], src_files: list[str], include_header_dirs: list[str], obj_dir: str) -> tuple[float, float]:
+    cpu_s = wall_s = 0.0
+    for idx, src in enumerate(src_files):
+        cmd = gpp_cmd_prefix + ["-c", src, "-o", os.path.join(obj_dir, f"{idx}.o")]
+        for inc_dir in include_header_dirs:
+            cmd.extend(["-I", inc_dir])
+        cpu, wall = compile_cpu_time(cmd, obj_dir)
+        cpu_s += cpu
+        wall_s += wall
+    return cpu_s, wall_s
+
+
+def setup_bob():
+    """Configure a Bob for the project in the current directory, silencing its console output"""
+    from main_cli import setup_bob as main_cli_setup_bob
+    logger = logging.getLogger("bench_unity_build")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        return main_cli_setup_bob(logger)
+
+
+def run(task_names: list[str] | None, batch_size: int | None) -> dict[str, dict]:
+    bob = setup_bob()
+    gpp_cmd_prefix = bob.tool_config_parser.get_command("g++")
+    results = {}
+    for task_name, task_config in bob.task_configs.items():
+        task_config_dict = task_config.get("task_config_dict", {})
+        if task_names:
+            if task_name not in task_names:
+                continue
+        elif task_config_dict.get("task_type") != "cpp_compile" or task_config_dict.get("lib_type") != "static":
+            continue
+        src_files = sum((task_config.get(key, []) for key in ["internal_src_files", "external_src_files", "output_src_files"]), [])
+        cpp_src_files = [str(src) for src in src_files if str(src).endswith(".cpp")]
+        if not cpp_src_files:
+            continue
+        include_header_dirs = task_config.get("include_header_dirs", [])
+
+        with tempfile.TemporaryDirectory() as obj_dir:
+            try:
+                separate_cpu_s, separate_wall_s = compile_all(gpp_cmd_prefix, cpp_src_files, include_header_dirs, obj_dir)
+                unity_src_files = bob.generate_unity_sources(task_name, cpp_src_files, Path(obj_dir), batch_size)
+                unity_cpu_s, unity_wall_s = compile_all(gpp_cmd_prefix, unity_src_files, include_header_dirs, obj_dir)
+            except RuntimeError as rte:
+                results[task_name] = {"cpp_files": len(cpp_src_files), "error": str(rte).splitlines()[0]}
+                continue
+
+        results[task_name] = {
+            "cpp_files": len(cpp_src_files),
+            "unity_units": len(unity_src_files),
+            "separate_cpu_s": separate_cpu_s,
+            "separate_wall_s": separate_wall_s,
+            "unity_cpu_s": unity_cpu_s,
+            "unity_wall_s": unity_wall_s,
+        }
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark unity builds of cpp_compile tasks against file-by-file compilation")
+    parser.add_argument("--tasks",      nargs="+", default=None, help="Tasks to benchmark (default: every cpp_compile static-lib task)")
+    parser.add_argument("--batch-size", type=int,  default=None, help="unity_batch_size (default: a single unity translation unit per task)")
+    parser.add_argument("--json",       default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.getcwd())
+    results = run(args.tasks, args.batch_size)
+    print(f"{'TASK':<28} {'FILES':>5} {'UNITS':>5} {'SEPARATE CPU(s)':>16} {'UNITY CPU(s)':>13} {'SPEEDUP':>8}")
+    print("-" * 80)
+    for task_name, r in results.items():
+        if "error" in r:
+            print(f"{task_name:<28} {r['cpp_files']:>5} {'-':>5} skipped: {r['error']}")
+            continue
+        speedup = f"{r['separate_cpu_s'] / r['unity_cpu_s']:.2f}x" if r["unity_cpu_s"] else "-"
+        print(f"{task_name:<28} {r['cpp_files']:>5} {r['unity_units']:>5} {r['separate_cpu_s']:>16.2f} {r['unity_cpu_s']:>13.2f} {speedup:>8}")
+    total_separate = sum(r.get("separate_cpu_s", 0.0) for r in results.values())
+    total_unity = sum(r.get("unity_cpu_s", 0.0) for r in results.values())
+    print("-" * 80)
+    print(f"{'TOTAL':<40} {total_separate:>16.2f} {total_unity:>13.2f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
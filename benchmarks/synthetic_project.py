@@ -0,0 +1,120 @@
+"""Generate synthetic Bob projects for benchmarking: N c_compile tasks of M trivial .c files each, wired into a chosen DAG shape.
+
+Shapes:
+  - chain   : task_i depends on task_(i-1)
+  - fan_in  : every task but the last is independent, the last one depends on all of them
+  - diamond : a lattice of rows 'width' tasks wide, each task depends on the two tasks above it
+
+Payloads:
+  - c_compile : gcc from PATH compiles every .c file
+  - noop      : a fake gcc which only creates the object file named after '-o', isolating Bob's own overhead
+
+Usage:
+    python -m benchmarks.synthetic_project OUT_DIR [--tasks 1000] [--files 4] [--shape chain|fan_in|diamond] [--payload c_compile|noop]
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import shutil
+import stat
+import sys
+from pathlib import Path
+
+import yaml
+
+SHAPES = ("chain", "fan_in", "diamond")
+PAYLOADS = ("c_compile", "noop")
+
+FAKE_GCC = """#!/bin/sh
+# Stands in for gcc: create the file following '-o' and nothing else
+while [ $# -gt 0 ]; do
+    if [ "$1" = "-o" ]; then
+        : > "$2"
+        shift
+    fi
+    shift
+done
+"""
+
+
+def task_name(idx: int) -> str:
+    return f"task_{idx:05d}"
+
+
+def dag_dependencies(num_tasks: int, shape: str, width: int | None = None) -> list[list[int]]:
+    """Return the indices of the tasks each task depends on, every dependency having a lower index than its dependent"""
+    if shape == "chain":
+        return [[idx - 1] if idx else [] for idx in range(num_tasks)]
+    if shape == "fan_in":
+        return [[] for _ in range(num_tasks - 1)] + [list(range(num_tasks - 1))] if num_tasks else []
+    if shape == "diamond":
+        width = width or max(1, math.isqrt(num_tasks))
+        dependencies = []
+        for idx in range(num_tasks):
+            row, col = divmod(idx, width)
+            above = [(row - 1) * width + c for c in (col, col + 1) if row and c < width]
+            dependencies.append(above)
+        return dependencies
+    raise ValueError(f"Unknown DAG shape '{shape}'. Expected one of {list(SHAPES)}.")
+
+
+def write_synthetic_project(root: str | Path, num_tasks: int, files_per_task: int, shape: str, payload: str = "noop", width: int | None = None) -> Path:
+    """Write a project of num_tasks tasks into root, which is emptied first, and return root"""
+    if payload not in PAYLOADS:
+        raise ValueError(f"Unknown payload '{payload}'. Expected one of {list(PAYLOADS)}.")
+    root = Path(root).resolve()
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+
+    if payload == "noop":
+        fake_gcc = root / "tools" / "fake_gcc"
+        fake_gcc.parent.mkdir()
+        fake_gcc.write_text(FAKE_GCC)
+        fake_gcc.chmod(fake_gcc.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        gcc_path = str(fake_gcc)
+    else:
+        gcc_path = shutil.which("gcc") or "/usr/bin/gcc"
+    with open(root / "tool_config.yaml", "w") as f:
+        yaml.safe_dump({"gcc": {"path": gcc_path, "default_flags": {"common": []}}}, f)
+
+    dependencies = dag_dependencies(num_tasks, shape, width)
+    ip_config = {
+        "project": {"name": f"synthetic_{shape}_{num_tasks}"},
+        "directories": {"root_dir": "${PROJ_ROOT}", "build_dir": "${directories.root_dir}/build"},
+        # Listed dependencies first, which is the order Bob visits tasks in
+        "tasks": {task_name(idx): {"depends_on": [task_name(dep) for dep in deps]} for idx, deps in enumerate(dependencies)},
+    }
+    with open(root / "ip_config.yaml", "w") as f:
+        yaml.safe_dump(ip_config, f, sort_keys=False)
+
+    tasks_dir = root / "tasks"
+    for idx in range(num_tasks):
+        task_dir = tasks_dir / task_name(idx)
+        task_dir.mkdir(parents=True)
+        src_files = [f"{task_name(idx)}_{file_idx}.c" for file_idx in range(files_per_task)]
+        for file_idx, src_file in enumerate(src_files):
+            (task_dir / src_file).write_text(f"int {task_name(idx)}_{file_idx}(void) {{ return {file_idx}; }}\n")
+        with open(task_dir / "task_config.yaml", "w") as f:
+            yaml.safe_dump({"task_name": task_name(idx), "task_type": "c_compile", "src_files": src_files}, f, sort_keys=False)
+    return root
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic Bob project")
+    parser.add_argument("out_dir")
+    parser.add_argument("--tasks",   type=int, default=1000)
+    parser.add_argument("--files",   type=int, default=4, help="Source files per task")
+    parser.add_argument("--shape",   choices=SHAPES, default="chain")
+    parser.add_argument("--width",   type=int, default=None, help="Row width of the diamond lattice (default: sqrt of --tasks)")
+    parser.add_argument("--payload", choices=PAYLOADS, default="noop")
+    args = parser.parse_args(argv)
+
+    root = write_synthetic_project(args.out_dir, args.tasks, args.files, args.shape, args.payload, args.width)
+    print(f"Wrote {args.tasks} {args.shape} task(s) of {args.files} file(s) each to {root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,57 @@
-from io import TextIOWrapper
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 from networkx import DiGraph, topological_sort, is_directed_acyclic_graph, ancestors
 from toolConfigParser.ToolConfigParser import ToolConfigParser
 from ipConfigParser.IpConfigParser import IpConfigParser
 from taskConfigParser.TaskConfigParser import TaskConfigParser
+from bob.TaskDagIndex import TaskDagIndex, TaskReadySet
+from bob.BuildEvents import BuildEventLog, read_build_events, rusage_to_dict, merge_rusage
+from bob.BuildPlan import estimate_task_durations, critical_path, simulate_schedule, format_duration
+from bob.PrecompiledHeader import pch_stub_path, pch_gch_path, pch_fingerprint_path, pch_fingerprint, write_pch_stub, save_pch_fingerprint, load_pch_fingerprint, pch_fingerprint_mismatch
+from bob.VerilatedModel import model_fingerprint, model_key, model_dir, is_model_built, save_model_fingerprint, touch_model, prune_models
+from bob.ProfileGuidedOptimisation import PGO_SUBDIR, pgo_fingerprint, pgo_key, pgo_profile_id, write_training_plan, find_gcov_data_dirs, save_pgo_profile, load_pgo_profile
+from bob.OutputManifest import build_output_manifest, write_output_manifest, load_output_manifest, manifest_entries, scan_output_dir, verilator_output_files
+from bob.VerilatorTuning import default_thread_candidates, resolve_build_jobs, read_sim_rate, pick_best_threads, load_tuning, save_tuning, DEFAULT_TUNING_MAX_TIME_PS
+from bob.TaskLog import TaskLogWriter, TaskLogReader, resolve_log_compression, log_generation_path, find_log_generation, rotate_task_logs
+from bob.FsSnapshot import FsSnapshot
+from bob.FileHash import DEFAULT_HASH_ALGORITHM, hash_factory, file_digest
+from bob.Trash import move_to_trash, empty_trash_in_background
+from bob.ProcessGroup import start_process_group, become_child_subreaper, signal_process_group, wait_process_groups
+from bob.Profiler import NULL_PROFILER
+from bob.RemoteExecution import make_remote_backend, remote_job_resources, remote_job_spec, wait_remote_job, read_remote_exit_status, raise_remote_job_interrupted, RemoteJobInterrupted, REMOTE_LOG
+import io
 import os
 import sys
 import re
 import yaml
 import subprocess
 import multiprocessing
+import multiprocessing.connection
 import logging
 import shutil
-import hashlib
+import shlex
+import signal
 import json
 import datetime
+import time
 
 class Bob:
+    BUILD_VARIANTS = ("debug", "asan", "profile", "release") # Selectable with 'build --variant', see build_scripts/verilator.mk
+    LOG_CAPTURE_CHUNK_SIZE = 1 << 16   # Bytes read from a task subprocess pipe per read()
+    LOG_FILE_BUFFER_SIZE   = 1 << 20   # Bytes buffered in memory before a task log is written to disk
+    LTO_FLAGS = ("-flto=auto",)        # Compile and link flags of 'lto' cpp_compile tasks, LTO_BUILD of build_scripts/verilator.mk
+    THIN_ARCHIVE_MAGIC = b"!<thin>\n"
+    TERMINATE_GRACE_PERIOD_S = 5.0     # Between SIGTERM and SIGKILL of the process group of each running task when a build is aborted
+    DEFAULT_REMOTE_SLOTS = 16          # Concurrent remote tasks, on top of the local workers. Their processes only wait on the backend
+    # Tools of each task type, whose commands (path and default flags) and versions, from ToolConfigParser.describe(), are recorded by a successful build and compared by the next one
+    TASK_TYPE_TOOLS = {
+        "c_compile": ("gcc",),
+        "cpp_compile": ("g++", "ar"),
+        "verilator_verilate": ("verilator",),
+        "verilator_tb_compile": ("verilator",),
+    }
+    LTO_TOOLS = ("gcc-ar",)            # Tools of 'lto' and 'lto_link' cpp_compile tasks only, on top of TASK_TYPE_TOOLS
+
     def __init__(self, logger: logging.Logger) -> None:
         self.name = "bob"
         self.logger = logger
@@ -31,11 +65,58 @@ class Bob:
         self.build_scripts_dir: Path = self.bob_root / "build_scripts"
         self.dotbob_dir: Path = Path(self.proj_root) / ".bob"
         self.dotbob_checksum_file: Path = self.dotbob_dir / "checksum.json"
+        self.dotbob_events_file: Path = self.dotbob_dir / "events.jsonl"
+        self.dotbob_tuning_file: Path = self.dotbob_dir / "verilator_tuning.json"
+        self.dotbob_pgo_dir: Path = self.dotbob_dir / "pgo" # Trained PGO profiles, one dir per task and build variant
+        self.dotbob_trash_dir: Path = self.dotbob_dir / "trash" # Dirs removed by 'clean', deleted in the background
+        self.event_log: BuildEventLog | None = None # Set for the duration of execute_tasks()
+        self.last_subprocess_returncode: int | None = None
+        self.last_subprocess_rusage: dict | None = None
+        self.task_rusage: dict | None = None # rusage accumulated over the subprocesses of the task being executed
         self.dependency_graph = None
+        self.dependency_index = None
+        self.raw_task_logs: bool = False # Pass subprocess output straight to the task log, without timestamps
+        self.task_log_compression: str = "none" # 'none', 'gzip' or 'zstd'
+        self.task_log_generations: int = 1 # Number of log generations kept per task, including the current one
+        self.build_variant: str | None = None # None builds into build/<task>, a variant into build/<variant>/<task>
+        self.pgo_train: bool = False # Set by 'bob pgo', tasks with a 'pgo' field train a new profile before being built with it
+        self.task_outputs: list[Path] | None = None # Output files recorded by the executing task for its output manifest, None to list its whole output dir
+        self.fingerprint_hash: str = DEFAULT_HASH_ALGORITHM # Hash of task input fingerprints, 'project: fingerprint_hash' of ip_config.yaml
+        self.fs_snapshot: FsSnapshot = FsSnapshot() # Existence and stat queries of this build invocation, shared with the TaskConfigParser
+        self.profiler = NULL_PROFILER # A Profiler with 'main_cli.py --profile', timing the phases of a build
+        self.remote_backend: str | None = None # 'local' or 'slurm' with 'build --remote-backend', running the commands of 'remote: true' tasks as campaign jobs
+        self.remote_slots: int = self.DEFAULT_REMOTE_SLOTS
+        self.remote_job_backend = None # JobBackend of this task process, created by its first remote command
+        self.remote_command_count: int = 0
 
     def get_proj_root(self) -> Path:
         return Path(self.proj_root)
 
+    def get_build_root(self) -> Path:
+        """Return the dir holding the task output dirs of the selected build variant"""
+        build_root = Path(self.proj_root) / "build"
+        return build_root / self.build_variant if self.build_variant else build_root
+
+    def set_build_variant(self, build_variant: str | None) -> None:
+        """Select the build variant, which must happen before discover_tasks() assigns the output dirs.
+        Each variant has its own output dirs and checksum file, such that switching variants never reuses another variant's outputs."""
+        if build_variant is not None and build_variant not in self.BUILD_VARIANTS:
+            raise ValueError(f"Unknown build variant '{build_variant}'. Expected one of {list(self.BUILD_VARIANTS)}.")
+        self.build_variant = build_variant
+        self.dotbob_checksum_file = self.dotbob_dir / (f"checksum.{build_variant}.json" if build_variant else "checksum.json")
+        if self.tool_config_parser is not None:
+            self.tool_config_parser.set_build_variant(build_variant)
+
+    def set_fingerprint_hash(self, algorithm: str) -> None:
+        """Select the hash of task input fingerprints, falling back to sha256 if its package is not installed.
+        Each checksum.json entry records the hash it was computed with, such that switching hash rebuilds every task once."""
+        try:
+            hash_factory(algorithm)
+        except ImportError:
+            self.logger.warning(f"Fingerprint hash '{algorithm}' is unavailable, install its Python package to use it. Using '{DEFAULT_HASH_ALGORITHM}' instead.")
+            algorithm = DEFAULT_HASH_ALGORITHM
+        self.fingerprint_hash = algorithm
+
     def associate_tool_config_parser(self, tool_config_parser: ToolConfigParser) -> None:
         """Associate a ToolConfigParser object to its 'tool_config_parser' attribute"""
         try:
@@ -99,7 +180,7 @@ class Bob:
     def instantiate_and_associate_task_config_parser(self) -> None:
         """Instantiate a TaskConfigParser and associate it to its 'task_config_parser' attribute"""
         try:
-            task_config_parser = TaskConfigParser(self.logger, self.proj_root)
+            task_config_parser = TaskConfigParser(self.logger, self.proj_root, self.fs_snapshot)
             self.associate_task_config_parser(task_config_parser)
 
         except Exception as e:
@@ -119,10 +200,18 @@ class Bob:
 
             # Build unfiltered dependency graph and associate it to self.dependency_graph
             self.dependency_graph = self.ip_config_parser.build_task_dependency_graph()
+            # Precompute topological order and reachability once for scheduling and clean operations
+            self.dependency_index = TaskDagIndex(self.dependency_graph) if self.dependency_graph is not None else None
+
+            project_config = (self.ip_config_parser.ip_config or {}).get("project") or {}
+            self.set_fingerprint_hash(project_config.get("fingerprint_hash", DEFAULT_HASH_ALGORITHM))
 
         except AttributeError as ae:
             self.logger.error(f"AttributeError: {ae}")
 
+        except ValueError as ve:
+            self.logger.error(f"ValueError: {ve}")
+
         except Exception as e:
             self.logger.critical(f"Unexpected error during setup_with_ip_config_parser(): {e}", exc_info=True)
 
@@ -199,7 +288,7 @@ class Bob:
                 self.task_configs[task_name] = {}
                 self.task_configs[task_name]["task_config_file_path"] = task_config_file_path
                 self.task_configs[task_name]["task_dir"] = task_dir
-                build_root = Path(self.proj_root) / "build"
+                build_root = self.get_build_root()
                 task_outdir = build_root / task_name
                 self.task_configs[task_name]["output_dir"] = task_outdir
         except ValueError as e:
@@ -228,10 +317,13 @@ class Bob:
                 print(f"No matched tasks with regex task name patterns: {regex_task_names}.")
 
     def setup_build_dirs(self) -> None:
-        """Create a dedicated build directory for each task under proj_root/build/."""
+        """Create a dedicated build directory for each task under proj_root/build/ or proj_root/build/<variant>/."""
         try:
-            build_root = Path(self.proj_root) / "build"
-            build_root.mkdir(exist_ok=True)
+            build_root = self.get_build_root()
+            if self.build_variant:
+                build_root.mkdir(parents=True, exist_ok=True)
+            else:
+                build_root.mkdir(exist_ok=True)
             if len(self.task_configs) == 0:
                 raise LookupError(f"No tasks defined in self.task_configs. Please ensure task configs are present.")
             for task_name in self.task_configs:
@@ -284,11 +376,11 @@ class Bob:
         return matched_tasks
 
 
-    def remove_task_output_dir(self, task_name:str) -> bool:
-        """Remove a single task output dir and mark the task as dirty, return whether the task's output dir has been removed"""
-        deleted_count = 0
+    def remove_task_output_dir(self, task_name:str, batch: bool = False) -> bool:
+        """Move a single task output dir into the trash and mark the task as dirty, return whether the task's output dir has been removed.
+        In batch mode, marking the task as dirty and emptying the trash are left to the caller."""
         try:
-            build_dir = Path(self.proj_root) / "build"
+            build_dir = self.get_build_root()
             if not build_dir.is_dir():
                 self.logger.info(f"Build directory does not exist, hence the output dir of {task_name} does not exist too.")
                 return False
@@ -300,41 +392,64 @@ class Bob:
                 if not task_output_dir.is_dir():
                     self.logger.info(f"{task_output_dir} does not exist, hence it has been deleted already.")
                     return False
-                shutil.rmtree(task_output_dir)
+                self.move_to_trash(task_output_dir)
                 self.logger.info(f"Deleted {task_output_dir} for task {task_name}.")
-                self.mark_task_as_dirty_in_dotbob_checksum_file(task_name)
+                if not batch:
+                    self.mark_task_as_dirty_in_dotbob_checksum_file(task_name)
+                    self.empty_trash()
                 return True
 
         except Exception as e:
             self.logger.critical(f"Unexpected error during remove_task_build_dir(): {e}", exc_info=True)
 
     def remove_task_output_dirs(self, task_names: list[str]) -> int:
-        """Remove multiple task output dirs and mark the tasks as dirty, return the number of output dir removed"""
-        deleted_count = 0
-        build_root = Path(self.proj_root) / "build"
+        """Move multiple task output dirs into the trash and mark the tasks as dirty in one checksum.json write, return the number of output dir removed"""
         invalid_tasks = [task for task in task_names if task not in self.task_configs]
         if invalid_tasks:
             self.logger.warning(f"The following tasks do no exist in task_configs and will not be deleted: {invalid_tasks}")
-        for task_name in task_names:
-            if self.remove_task_output_dir(task_name):
-                deleted_count+=1
-        return deleted_count
+        removed_tasks = [task_name for task_name in task_names if self.remove_task_output_dir(task_name, batch=True)]
+        if removed_tasks:
+            self.mark_tasks_as_dirty_in_dotbob_checksum_file(removed_tasks)
+            self.empty_trash()
+        return len(removed_tasks)
+
+    def move_to_trash(self, path: Path) -> None:
+        """Atomically rename a dir into .bob/trash, such that it disappears instantly and is deleted later by empty_trash()"""
+        if move_to_trash(path, self.dotbob_trash_dir) is None:
+            self.logger.debug(f"{path} is not on the filesystem of {self.dotbob_trash_dir}, it has been deleted in place.")
+
+    def empty_trash(self) -> None:
+        """Delete the content of .bob/trash in a detached background process"""
+        try:
+            if self.dotbob_trash_dir.is_dir():
+                empty_trash_in_background(self.dotbob_trash_dir)
+        except Exception as e:
+            self.logger.warning(f"Could not start emptying {self.dotbob_trash_dir} in the background: {e}")
 
     def remove_build_dir(self) -> bool:
-        """Remove the entire `build/` and `.bob/`, return the number of task output dirs deleted"""
+        """Remove the entire `build/` and `.bob/`, or only `build/<variant>/` and its checksum file if a build variant is selected.
+        The dirs are moved into .bob/trash, which is the only part of .bob left until it is emptied in the background."""
         try:
-            build_dir = Path(self.proj_root) / "build"
+            build_dir = self.get_build_root()
             if not build_dir.is_dir():
                 self.logger.warning(f"Build directory not found: {build_dir}")
                 return False
-            shutil.rmtree(build_dir)
+            self.move_to_trash(build_dir)
             self.logger.info(f"Deleted build directory: {build_dir}")
+            if self.build_variant:
+                self.dotbob_checksum_file.unlink(missing_ok=True)
+                self.logger.info(f"Deleted {self.dotbob_checksum_file}.")
+                self.empty_trash()
+                return True
             dotbob_dir = Path(self.dotbob_dir)
 
             if dotbob_dir.is_dir():
-                shutil.rmtree(self.dotbob_dir)
+                for entry in dotbob_dir.iterdir():
+                    if entry.name != self.dotbob_trash_dir.name:
+                        self.move_to_trash(entry)
                 self.logger.info(f"Deleted .bob directory.")
 
+            self.empty_trash()
             return True
 
         except Exception as e:
@@ -347,6 +462,9 @@ class Bob:
                 raise ValueError(f"No tasks defined within self.task_configs. Please run discover_tasks() first.")
             for task_name, task_config in self.task_configs.items():
                 task_config["task_env"] = os.environ.copy();
+                # Build scripts such as verilator.mk select their flags from the build variant
+                if self.build_variant:
+                    task_config["task_env"]["BUILD_VARIANT"] = self.build_variant
         except ValueError as e:
             self.logger.error(f"ValueError: {e}")
             sys.exit(1)
@@ -359,7 +477,7 @@ class Bob:
         try:
             env_key = env_key.upper()
             existing_val = self.task_configs[task_name]["task_env"].get(env_key)
-            if isinstance(env_val, Path) and not env_val.exists():
+            if isinstance(env_val, Path) and not self.fs_snapshot.exists(env_val):
                 raise FileNotFoundError(f"The path {env_val} does not exist, hence {env_key} is not set to that path.")
             if existing_val:
                 if isinstance(env_val, Path):
@@ -396,7 +514,7 @@ class Bob:
             if invalid_elements:
                 raise ValueError(f"For {task_name}, all elements in src_files must be Path objects. Invalid entries: {invalid_elements}")
 
-            valid_files = [path for path in src_files if path.exists()]
+            valid_files = [path for path in src_files if self.fs_snapshot.exists(path)]
             missing_files = set(src_files) - set(valid_files)
 
             if missing_files:
@@ -441,8 +559,9 @@ class Bob:
         except Exception as e:
             self.logger.critical(f"Unexpected error during create_dotbob_dir_at_proj_root() : {e}", exc_info=True)
 
-    def _compute_task_input_src_files_hash_sha256(self, task_name: str) -> str | None:
-        """Compute a SHA256 checksum from a list of input src files for a task"""
+    def _compute_task_input_src_files_hash_sha256(self, task_name: str, file_hashes: dict[str, str] | None = None) -> str | None:
+        """Compute the fingerprint of a task from the digests of its input src files, filling file_hashes with the digest of each input if given.
+        Digests use self.fingerprint_hash, despite the name of the function and of the 'hash_sha256' entries of checksum.json."""
         try:
             if task_name not in self.task_configs:
                 self.logger.error(f"Task '{task_name}' does not exist in task_configs. Please run discover_tasks() first.")
@@ -462,18 +581,22 @@ class Bob:
             # Prepare and sort the list of files for checksum calculation
             all_src_files = sorted(input_src_files + [task_config_file_path])
             self.logger.debug(f"Task '{task_name}' source files sorted: {all_src_files}")
-            print(f"Task '{task_name}' source files sorted: {all_src_files}")
 
-            hash_sha256 = hashlib.sha256()
+            factory = hash_factory(self.fingerprint_hash)
+            hash_sha256 = factory()
             for file_path in map(Path, all_src_files):
-                print(type(file_path))
-                if file_path.exists() and file_path.is_file():
-                    with file_path.open("rb") as f:
-                        while chunk := f.read(8192):
-                            hash_sha256.update(chunk)
+                if self.fs_snapshot.is_file(file_path):
+                    file_hash = file_digest(file_path, factory)
+                    hash_sha256.update(f"{file_hash}\n".encode())
+                    if file_hashes is not None:
+                        file_hashes[str(file_path)] = file_hash
+            # Outputs of upstream tasks are fingerprinted by their manifest entries, such that rebuilding an upstream task dirties this one
+            for consumed_path, entry in sorted(self.get_consumed_output_entries(task_name).items()):
+                hash_sha256.update(f"{consumed_path}:{entry.get('hash')}".encode())
+                if file_hashes is not None:
+                    file_hashes[consumed_path] = entry.get("hash")
             computed_hash = hash_sha256.hexdigest()
             self.logger.debug(f"Computed hash_sha256 for task '{task_name}': {computed_hash}")
-            print(f"Computed hash_sha256 for task '{task_name}': {computed_hash}")
             return computed_hash
 
         except Exception as e:
@@ -551,8 +674,75 @@ class Bob:
         except Exception as e:
             self.logger.critical(f"Unexpected error during _save_dotbob_checksum_file(): {e}", exc_info=True)
 
-    def should_rebuild_task(self, task_name: str) -> bool | None:
-        """Determine whether a task needs to be rebuilt based on dirty flag and whether its hash_sha256 has changed"""
+    def get_task_tool_commands(self, task_name: str) -> dict[str, dict]:
+        """Return the command, i.e. path and default flags, and the version of each tool a task is built with"""
+        if self.tool_config_parser is None:
+            return {}
+        task_type = self.task_configs[task_name].get("task_config_dict", {}).get("task_type", None)
+        tools = list(self.TASK_TYPE_TOOLS.get(task_type, ()))
+        if task_type == "cpp_compile" and (self.task_configs[task_name].get("lto", False) or self.task_configs[task_name].get("lto_link", False)):
+            tools.extend(self.LTO_TOOLS)
+        return {tool: {"command": [str(arg) for arg in entry["command"]], "version": entry["version"]}
+                for tool, entry in self.tool_config_parser.describe(tools).items()}
+
+    def get_tool_identity(self, tool_name: str, probes: tuple[str, ...] = ()) -> dict:
+        """Return the resolved path, version and the given probed fields of a tool, from ToolConfigParser.describe(), for the fingerprints of its outputs"""
+        description = self.tool_config_parser.describe([tool_name], probes)
+        if tool_name not in description:
+            raise FileNotFoundError(f"Tool '{tool_name}' is not found, check its path in tool_config.yaml.")
+        entry = description[tool_name]
+        return {"path": entry["path"], "version": entry["version"], **{field: entry[field] for field in probes}}
+
+    def explain_rebuild(self, task_name: str, input_hashes: dict[str, str] | None = None, current_hash_sha256: str | None = None) -> list[str]:
+        """Return why a task needs to be rebuilt on its own, comparing with the inputs and tools recorded by its last successful build.
+
+        input_hashes and current_hash_sha256, as computed by _compute_task_input_src_files_hash_sha256(), are reused rather than computed again if given.
+        """
+        dotbob_checksum_file_dict = self._load_dotbob_checksum_file() or {}
+        previous_task_checksum_entry = dotbob_checksum_file_dict.get(task_name, {})
+        if not previous_task_checksum_entry.get("hash_sha256"):
+            return ["never built"]
+
+        reasons = []
+        if previous_task_checksum_entry.get("dirty", True):
+            reasons.append("dirty flag, its last build did not complete")
+        previous_hash_algorithm = previous_task_checksum_entry.get("hash_algorithm")
+        if previous_hash_algorithm != self.fingerprint_hash:
+            # File digests of another hash cannot be compared
+            return reasons + [f"changed fingerprint hash: {previous_hash_algorithm or 'legacy'} -> {self.fingerprint_hash}"]
+        previous_tools = previous_task_checksum_entry.get("tools", None)
+        current_tools = self.get_task_tool_commands(task_name)
+        if previous_tools is not None:
+            changed_tools = sorted(tool for tool in set(previous_tools) | set(current_tools) if previous_tools.get(tool) != current_tools.get(tool))
+            changed_versions = [tool for tool in changed_tools if isinstance(previous_tools.get(tool), dict) and tool in current_tools
+                                and previous_tools[tool].get("version") != current_tools[tool].get("version")]
+            if changed_versions:
+                reasons.append(f"changed tool version: {', '.join(changed_versions)}")
+            changed_flags = [tool for tool in changed_tools if tool not in changed_versions]
+            if changed_flags:
+                reasons.append(f"changed tool flags: {', '.join(changed_flags)}")
+
+        if input_hashes is None:
+            input_hashes = {}
+            current_hash_sha256 = self._compute_task_input_src_files_hash_sha256(task_name, input_hashes)
+        previous_inputs = previous_task_checksum_entry.get("inputs", None)
+        if previous_inputs is None:
+            if current_hash_sha256 != previous_task_checksum_entry.get("hash_sha256"):
+                reasons.append("changed file")
+        else:
+            for path in sorted(set(previous_inputs) | set(input_hashes)):
+                if previous_inputs.get(path) == input_hashes.get(path):
+                    continue
+                kind = "upstream output" if self.get_output_producer(path) is not None else "file"
+                change = "added" if path not in previous_inputs else "removed" if path not in input_hashes else "changed"
+                reasons.append(f"{change} {kind}: {os.path.relpath(path, self.proj_root) if Path(path).is_absolute() else path}")
+        return reasons
+
+    def should_rebuild_task(self, task_name: str, reasons: list[str] | None = None) -> bool | None:
+        """Determine whether a task needs to be rebuilt based on dirty flag and whether its hash_sha256 has changed.
+
+        If reasons is given, why the task needs to be rebuilt is appended to it, explained from the same input hashes.
+        """
         try:
             if task_name not in self.task_configs:
                 raise ValueError(f"Task {task_name} not found in task_configs. Please ensure discover_tasks() have been executed first.")
@@ -569,7 +759,8 @@ class Bob:
                 self.logger.error(f"No internal source files defined for task {task_name}. Skipping build for this task.")
                 return False
 
-            current_hash_sha256 = self._compute_task_input_src_files_hash_sha256(task_name)
+            input_hashes = {} if reasons is not None else None
+            current_hash_sha256 = self._compute_task_input_src_files_hash_sha256(task_name, input_hashes)
 
             if current_hash_sha256 is None:
                 raise RuntimeError(f"_compute_task_src_files_checksum() returned None, hence current checksum cannot be computed for task {task_name}.")
@@ -583,12 +774,24 @@ class Bob:
             self.logger.debug(f"    previous_hash_sha256 = {previous_hash_sha256}")
             self.logger.debug(f"    current_hash_sha256  = {current_hash_sha256}")
 
-            if previous_hash_sha256 == current_hash_sha256 and not hash_sha256_is_dirty:
+            # Tool commands are only compared once recorded, tasks built before they were are not rebuilt for it
+            previous_tools = previous_task_checksum_entry.get("tools", None)
+            if previous_task_checksum_entry.get("hash_algorithm") != self.fingerprint_hash:
+                self.logger.info(f"For task {task_name}, the fingerprint hash has changed to '{self.fingerprint_hash}', triggering rebuild.")
+                rebuild = True
+            elif previous_tools is not None and previous_tools != self.get_task_tool_commands(task_name):
+                self.logger.info(f"For task {task_name}, tool commands have changed, triggering rebuild.")
+                rebuild = True
+            elif previous_hash_sha256 == current_hash_sha256 and not hash_sha256_is_dirty:
                 self.logger.info(f"For task {task_name}, hash_sha256 unchanged. Will skip this build if all its dependencies also can be skipped.")
-                return False
+                rebuild = False
+            else:
+                self.logger.info(f"For task {task_name}, hash_sha256 has changed, triggering rebuild.")
+                rebuild = True
 
-            self.logger.info(f"For task {task_name}, hash_sha256 has changed, triggering rebuild.")
-            return True
+            if rebuild and reasons is not None:
+                reasons.extend(self.explain_rebuild(task_name, input_hashes, current_hash_sha256))
+            return rebuild
 
         except RuntimeError as re:
             self.logger.error(f"RuntimeError: {re}")
@@ -630,6 +833,23 @@ class Bob:
             self.logger.critical(f"Unexpected error during mark_task_as_dirty_in_dotbob_checksum_file(): {e}", exc_info=True)
             return None
 
+    def mark_tasks_as_dirty_in_dotbob_checksum_file(self, task_names: list[str]) -> None:
+        """Mark several tasks as dirty with a single rewrite of checksum.json, skipping tasks it does not hold"""
+        try:
+            dotbob_checksum_file_dict = self._load_dotbob_checksum_file()
+            if not dotbob_checksum_file_dict:
+                return None
+            marked_tasks = [task_name for task_name in task_names if task_name in dotbob_checksum_file_dict]
+            for task_name in marked_tasks:
+                dotbob_checksum_file_dict[task_name]["dirty"] = True
+            if marked_tasks:
+                self._save_dotbob_checksum_file(dotbob_checksum_file_dict)
+            self.logger.debug(f"Marked tasks {marked_tasks} as dirty.")
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during mark_tasks_as_dirty_in_dotbob_checksum_file(): {e}", exc_info=True)
+            return None
+
     def mark_task_as_clean_in_dotbob_checksum_file(self, task_name: str) -> None:
         """Mark a task as clean and compute the updated hash_sha256 after a successful build"""
         try:
@@ -643,7 +863,12 @@ class Bob:
 
             dotbob_checksum_file_dict[task_name]["dirty"] = False
 
-            updated_hash_sha256 = self._compute_task_input_src_files_hash_sha256(task_name)
+            input_hashes = {}
+            updated_hash_sha256 = self._compute_task_input_src_files_hash_sha256(task_name, input_hashes)
+            # Per-file hashes and tool commands are recorded such that 'build --plan' can tell why a task would be rebuilt
+            dotbob_checksum_file_dict[task_name]["inputs"] = input_hashes
+            dotbob_checksum_file_dict[task_name]["tools"] = self.get_task_tool_commands(task_name)
+            dotbob_checksum_file_dict[task_name]["hash_algorithm"] = self.fingerprint_hash
             self.logger.debug(f"Marking task '{task_name}' as clean after successful build.")
             self.logger.debug(f"Previous hash_sha256={dotbob_checksum_file_dict[task_name]["hash_sha256"]}")
             self.logger.debug(f"Updated hash_sha256={updated_hash_sha256}")
@@ -668,17 +893,62 @@ class Bob:
             self.logger.critical(f"Unexpected error during mark_task_as_clean_in_dotbob_checksum_file(): {e}", exc_info=True)
             return None
 
+    def get_output_src_refs(self, task_name: str) -> list[str]:
+        """Return the output_src_files of a task as parsed, i.e. the output dirs and files of upstream tasks before resolution"""
+        return self.task_configs[task_name].setdefault("output_src_refs", list(self.task_configs[task_name].get("output_src_files", [])))
+
+    def get_output_producer(self, path: str | Path) -> str | None:
+        """Return the task whose output dir contains path, the most nested one if output dirs are nested"""
+        path = Path(path)
+        producer, producer_depth = None, -1
+        for task_name, task_config in self.task_configs.items():
+            output_dir = task_config.get("output_dir", None)
+            if output_dir is None:
+                continue
+            output_dir = Path(output_dir)
+            if (path == output_dir or output_dir in path.parents) and len(output_dir.parts) > producer_depth:
+                producer, producer_depth = task_name, len(output_dir.parts)
+        return producer
+
+    def get_output_manifest_entries(self, path: str | Path) -> dict[str, dict] | None:
+        """Return the manifest entries of the upstream outputs under path, or None if no task has written a manifest for it"""
+        producer = self.get_output_producer(path)
+        if producer is None:
+            return None
+        output_dir = self.task_configs[producer]["output_dir"]
+        manifest = load_output_manifest(output_dir)
+        if manifest is None:
+            return None
+        return manifest_entries(output_dir, manifest, Path(path))
+
+    def get_consumed_output_entries(self, task_name: str) -> dict[str, dict]:
+        """Return the manifest entries of every upstream output a task consumes: output_src_files, external_objects and a precompiled header"""
+        task_config = self.task_configs[task_name]
+        consumed_paths = self.get_output_src_refs(task_name) + list(task_config.get("external_objects", []))
+        consumed_precompiled_header = task_config.get("consumed_precompiled_header", None)
+        if consumed_precompiled_header:
+            consumed_paths += [consumed_precompiled_header, str(pch_gch_path(Path(consumed_precompiled_header)))]
+        consumed_entries = {}
+        for consumed_path in consumed_paths:
+            consumed_entries.update(self.get_output_manifest_entries(consumed_path) or {})
+        return consumed_entries
+
     def resolve_task_configs_output_src_files(self, task_name: str) -> list[str]:
-        """Resolves output source files for a given task by replacing directories with their contained files."""
+        """Resolves output source files for a given task into the files listed by the output manifests of the upstream tasks."""
         try:
             if task_name not in self.task_configs:
                 raise ValueError(f"Task '{task_name}' not found in task_configs.")
-            output_src_files = self.task_configs[task_name].get("output_src_files", [])
             resolved_output_src_files = []
 
-            for path in output_src_files:
-                if os.path.isdir(path):
-                    # List all files in the directory recursively
+            for path in self.get_output_src_refs(task_name):
+                entries = self.get_output_manifest_entries(path)
+                if entries is not None:
+                    if not entries:
+                        raise ValueError(f"For task '{task_name}', the output_src_files path '{path}' has not been produced by task '{self.get_output_producer(path)}' according to its output manifest.")
+                    resolved_output_src_files.extend(sorted(entries))
+                elif os.path.isdir(path):
+                    # Outputs built before output manifests were written, list all files in the directory recursively
+                    self.logger.warning(f"For task '{task_name}', the output_src_files dir '{path}' has no output manifest. Listing every file within it, rebuild its task to write one.")
                     for root, _, files in os.walk(path):
                         for file in files:
                             resolved_output_src_files.append(os.path.join(root, file))
@@ -686,7 +956,7 @@ class Bob:
                     resolved_output_src_files.append(path)
                 else:
                     raise ValueError(f"For task '{task_name}', the output_src_files path '{path}' does not exists or it is not a valid file/directory.")
-            # Update the task_configs[task_name]["output_src_files"]
+            # Update the task_configs[task_name]["output_src_files"], the parsed references are kept in 'output_src_refs'
             self.task_configs[task_name]["output_src_files"] = resolved_output_src_files
 
             return resolved_output_src_files
@@ -696,6 +966,33 @@ class Bob:
         except Exception as e:
             self.logger.critical(f"Unexpected error during resolve_task_configs_output_src_files(): {e}", exc_info=True)
 
+    def record_task_outputs(self, output_files: list[str | Path]) -> None:
+        """Record files produced by the executing task, listed by its output manifest"""
+        if self.task_outputs is None:
+            self.task_outputs = []
+        self.task_outputs.extend(Path(f) for f in output_files)
+
+    def write_task_output_manifest(self, task_name: str) -> bool:
+        """Write the output manifest of a task which succeeded, listing the outputs it recorded or every file of its output dir but its logs"""
+        try:
+            output_dir = self.task_configs[task_name]["output_dir"]
+            output_files = self.task_outputs
+            if output_files is None:
+                output_files = scan_output_dir(output_dir, (f"{task_name}.log",))
+            manifest = build_output_manifest(output_dir, output_files, load_output_manifest(output_dir), self.fingerprint_hash)
+            manifest["task"] = task_name
+            write_output_manifest(output_dir, manifest)
+            self.logger.debug(f"Task '{task_name}' output manifest lists {len(manifest['files'])} file(s).")
+            return True
+
+        except OSError as oe:
+            self.logger.error(f"OSError: Output manifest of task '{task_name}' cannot be written: {oe}")
+            return False
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during write_task_output_manifest(): {e}", exc_info=True)
+            return False
+
     def update_task_env(self, task_name: str, env_key: str, env_val: str | list[str], override_env_val: bool = False) -> None:
         """Updates the environment variables for a given task in self.task_configs."""
         try:
@@ -752,7 +1049,7 @@ class Bob:
 
             for key in ["internal_src_files", "external_src_files", "output_src_files"]:
                 for file_path in task_config.get(key, []):
-                    if not os.path.isfile(file_path):
+                    if not self.fs_snapshot.is_file(file_path):
                         missing_files.append(file_path)
 
             if missing_files:
@@ -767,8 +1064,8 @@ class Bob:
             self.logger.critical(f"Unexpected error during update_task_env() for task_name = '{task_name}' : {e}", exc_info=True)
             return False
 
-    def run_subprocess(self, task_name, cmd, env, log_file, cwd = None) -> bool:
-        """Executes a command as a subprocess and logs output line-by-line."""
+    def run_subprocess(self, task_name, cmd, env, log_file, cwd = None, raw: bool | None = None) -> bool:
+        """Executes a command as a subprocess and logs its output, timestamping each line unless in raw mode."""
         try:
             if cmd is None:
                 raise ValueError(f"Mandatory argument 'cmd' for run_subprocess() of task '{task_name}' has not been defined.")
@@ -776,12 +1073,30 @@ class Bob:
             if cwd is None or not Path(cwd).is_dir():
                 raise ValueError("Mandatory argument 'cwd' for run_subprocess() of task '{task_name}' has not been defined or the cwd doesn't exist.")
 
-            with subprocess.Popen(cmd, env=env, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as process:
-                for line in process.stdout:
-                    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    log_file.write(f"[{timestamp}] {line.strip()}\n")
-
-                process.wait()
+            if self.is_remote_task(task_name):
+                return self.run_remote_subprocess(task_name, cmd, env, log_file, cwd)
+
+            if raw is None:
+                raw = self.raw_task_logs
+
+            if raw:
+                try:
+                    log_fd = log_file.fileno()
+                except io.UnsupportedOperation:
+                    self.logger.warning(f"Raw task logs are not supported with compressed logs, timestamping the output of task '{task_name}' instead.")
+                    raw = False
+
+            if raw:
+                # The child writes directly into the log file descriptor, Python never touches the output
+                log_file.flush()
+                with subprocess.Popen(cmd, env=env, cwd=cwd, stdout=log_fd, stderr=subprocess.STDOUT) as process:
+                    self.wait_subprocess(process)
+                    return process.returncode == 0
+
+            with subprocess.Popen(cmd, env=env, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=0) as process:
+                self.capture_subprocess_output(process.stdout, log_file)
+                self.wait_subprocess(process)
+                log_file.flush()
                 return process.returncode == 0
 
         except ValueError as ve:
@@ -792,6 +1107,124 @@ class Bob:
             self.logger.critical(f"Unexpected error during run_subprocess() for task_name = '{task_name}' : {e}", exc_info=True)
             return False
 
+    def is_remote_task(self, task_name: str) -> bool:
+        """Whether the commands of a task are run by the remote backend, i.e. it has 'remote: true' and the build has a remote backend"""
+        return self.remote_backend is not None and bool(self.task_configs.get(task_name, {}).get("remote", False))
+
+    def run_remote_subprocess(self, task_name, cmd, env, log_file, cwd) -> bool:
+        """Run a command of a remote task as a job of the remote backend, wait for it, then copy its output into the task log.
+
+        The command runs in cwd with env on whichever node the backend picks, hence the project must be on storage shared with the nodes.
+        The job is cancelled if the build is aborted, i.e. this task process is sent SIGTERM, while waiting for it.
+        """
+        run_dir = None
+        pending_job_id = None
+        previous_sigterm_handler = signal.signal(signal.SIGTERM, raise_remote_job_interrupted)
+        interrupted = False
+        try:
+            if self.remote_job_backend is None:
+                self.remote_job_backend = make_remote_backend(self.remote_backend)
+            output_dir = self.task_configs[task_name]["output_dir"]
+            resources = remote_job_resources(cmd, self.task_configs[task_name].get("remote_resources", None))
+            spec = remote_job_spec(task_name, self.remote_command_count, cmd, env, cwd, output_dir, resources)
+            self.remote_command_count += 1
+            run_dir = spec.output_dir
+            self.logger.info(f"Submitting command of task '{task_name}' to the {self.remote_backend} remote backend as job '{spec.job_id}' with {resources}: {cmd}")
+            self.emit_event("remote_job_submit", task=task_name, job_id=spec.job_id, backend=self.remote_backend)
+            self.remote_job_backend.submit(spec)
+            pending_job_id = spec.job_id
+            status = wait_remote_job(self.remote_job_backend, spec.job_id)
+            pending_job_id = None
+
+            exit_status = read_remote_exit_status(run_dir)
+            self.last_subprocess_returncode = exit_status if exit_status is not None else (0 if status.is_success else 1)
+            self.last_subprocess_rusage = None # Spent on another node
+            self.emit_event("remote_job_end", task=task_name, job_id=spec.job_id, status=status.value, exit_status=self.last_subprocess_returncode)
+            remote_log = run_dir / REMOTE_LOG
+            if remote_log.is_file():
+                with open(remote_log, "rb") as f:
+                    self.capture_subprocess_output(f, log_file)
+                log_file.flush()
+            return status.is_success and self.last_subprocess_returncode == 0
+
+        except RemoteJobInterrupted:
+            interrupted = True
+            self.logger.error(f"Task '{task_name}' was terminated while waiting for remote job '{pending_job_id}'.")
+            return False
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during run_remote_subprocess() for task_name = '{task_name}' : {e}", exc_info=True)
+            return False
+
+        finally:
+            if pending_job_id is not None:
+                # Aborted or failed while the job was queued or running, it must not keep running on its node
+                try:
+                    self.remote_job_backend.cancel([pending_job_id])
+                    self.logger.info(f"Cancelled remote job '{pending_job_id}' of task '{task_name}'")
+                except Exception as e:
+                    self.logger.error(f"Failed to cancel remote job '{pending_job_id}' of task '{task_name}' : {e}")
+            if run_dir is not None:
+                shutil.rmtree(run_dir, ignore_errors=True)
+                try:
+                    run_dir.parent.rmdir()
+                except OSError:
+                    pass
+            signal.signal(signal.SIGTERM, previous_sigterm_handler)
+            if interrupted:
+                # Terminate as the SIGTERM would have, now that the job is cancelled
+                signal.raise_signal(signal.SIGTERM)
+
+    def wait_subprocess(self, process: subprocess.Popen) -> int:
+        """Reap a subprocess with os.wait4() to record its exit status and resource usage, accumulated into self.task_rusage."""
+        try:
+            _, status, rusage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            self.last_subprocess_rusage = rusage_to_dict(rusage)
+        except (ChildProcessError, TypeError):
+            # Already reaped, or not a real child process
+            process.wait()
+            self.last_subprocess_rusage = None
+        self.last_subprocess_returncode = process.returncode
+        self.task_rusage = merge_rusage(self.task_rusage, self.last_subprocess_rusage)
+        return process.returncode
+
+    def emit_event(self, event: str, **fields) -> None:
+        """Append an event to .bob/events.jsonl while a build is running, a no-op otherwise."""
+        if self.event_log is None:
+            return
+        try:
+            self.event_log.emit(event, **fields)
+        except OSError as oe:
+            self.logger.warning(f"Failed to record build event '{event}' in {self.event_log.path}: {oe}")
+
+    def capture_subprocess_output(self, stream, log_file) -> None:
+        """Copy a subprocess output stream into a binary log file in large chunks, prefixing every line with a timestamp."""
+        cached_second = None
+        prefix = b""
+        at_line_start = True
+        while True:
+            chunk = stream.read(self.LOG_CAPTURE_CHUNK_SIZE)
+            if not chunk:
+                break
+            # The timestamp has a one second resolution, so only format it again once the second changes
+            now = int(time.time())
+            if now != cached_second:
+                cached_second = now
+                prefix = time.strftime("[%Y-%m-%d %H:%M:%S] ", time.localtime(now)).encode()
+            # Prefix each line within the chunk in a single bytes.replace(), carrying partial lines over to the next chunk
+            ends_with_newline = chunk.endswith(b"\n")
+            body = chunk[:-1] if ends_with_newline else chunk
+            data = body.replace(b"\n", b"\n" + prefix)
+            if at_line_start:
+                data = prefix + data
+            if ends_with_newline:
+                data += b"\n"
+            log_file.write(data)
+            at_line_start = ends_with_newline
+        if not at_line_start:
+            log_file.write(b"\n")
+
     def execute_c_compile(self, task_name: str) -> bool:
         """Execute a C compile with gcc, using attributes within env var"""
         try:
@@ -869,7 +1302,11 @@ class Bob:
                         cmd_compile.extend(["-I", inc_dir])
                 self.logger.info(f"Executing c_compile command: {cmd_compile}")
                 print(f"Executing c_compile command: {cmd_compile}")
+                self.emit_event("compile_unit_start", task=task_name, src=src, obj=obj_file)
+                unit_start = time.monotonic()
                 success = self.run_subprocess(task_name, cmd_compile, task_env, log_file, output_dir)
+                self.emit_event("compile_unit_end", task=task_name, src=src, obj=obj_file, success=success, exit_status=self.last_subprocess_returncode,
+                                duration_s=round(time.monotonic() - unit_start, 6), rusage=self.last_subprocess_rusage)
 
                 if not success:
                     self.logger.error(f"GCC compilation failed for file '{src}'. Check log: {log_file_path}")
@@ -880,6 +1317,7 @@ class Bob:
 
             self.logger.info(f"GCC compilation succeeded for task '{task_name}'. Output: {object_files}")
             print(f"GCC compilation succeeded for task '{task_name}'. Output: {object_files}")
+            self.record_task_outputs(object_files)
 
             # If 'executable_name' exists within task_config.yaml, then link object files into an executable
             # Link all .o files, including external ones) to create the final executable
@@ -887,7 +1325,11 @@ class Bob:
                 cmd_link = gcc_cmd_prefix + object_files + external_objects + ["-o", executable_path]
                 self.logger.info(f"Executing c_link command: {cmd_link}")
                 print(f"Executing c_link command: {cmd_link}")
+                self.emit_event("link_start", task=task_name, kind="executable", output=executable_path)
+                link_start = time.monotonic()
                 success = self.run_subprocess(task_name, cmd_link, task_env, log_file, output_dir)
+                self.emit_event("link_end", task=task_name, kind="executable", output=executable_path, success=success, exit_status=self.last_subprocess_returncode,
+                                duration_s=round(time.monotonic() - link_start, 6), rusage=self.last_subprocess_rusage)
 
                 if not success:
                     self.logger.error(f"GCC compilation failed for task '{task_name}'. Check log: {log_file_path}")
@@ -896,6 +1338,7 @@ class Bob:
 
                 self.logger.info(f"GCC link succeeded for task '{task_name}'. Output: {executable_path}")
                 print(f"GCC link succeeded for task '{task_name}'. Output: {executable_path}")
+                self.record_task_outputs([executable_path])
             return True
 
         except ValueError as ve:
@@ -977,23 +1420,47 @@ class Bob:
             gpp_cmd_prefix = self.tool_config_parser.get_command("g++")
             self.logger.debug(f"gpp_cmd_prefix={gpp_cmd_prefix}")
 
+            # Build this task's precompiled header first, or use the one of another task if it is compatible
+            precompiled_headers = self.task_configs[task_name].get("precompiled_headers", [])
+            if precompiled_headers:
+                if not self.build_precompiled_header(task_name, precompiled_headers, gpp_cmd_prefix, include_header_dirs, task_env, log_file, output_dir):
+                    self.logger.error(f"Precompiled header compilation failed for task '{task_name}'. Check log: {log_file_path}")
+                    return False
+                stub_path = pch_stub_path(output_dir, task_name)
+                self.record_task_outputs([stub_path, pch_gch_path(stub_path), pch_fingerprint_path(stub_path)])
+            pch_flags = self.get_consumed_precompiled_header_flags(task_name, gpp_cmd_prefix)
+            # Objects of an 'lto' task, or of a task linking the library of one, carry bytecode for the link-time optimiser
+            lto_flags = list(self.LTO_FLAGS) if self.task_configs[task_name].get("lto", False) or self.task_configs[task_name].get("lto_link", False) else []
+
+            # In a unity build, the .cpp files are amalgamated into a few translation units which are compiled instead
+            compile_src_files = src_files
+            if self.task_configs[task_name].get("unity_build", False):
+                cpp_src_files = [src for src in src_files if src.endswith(".cpp")]
+                compile_src_files = self.generate_unity_sources(task_name, cpp_src_files, output_dir, self.task_configs[task_name].get("unity_batch_size", None))
+                if compile_src_files is None:
+                    return False
+
             # Execute g++ compile
             # Compile each .cpp file to .o file
             object_files = []
-            for src in src_files:
+            for src in compile_src_files:
                 # Only operate on .cpp files
                 if not src.endswith(".cpp"):
                     self.logger.debug(f"Skipping compilation into .o for non .cpp source file: {src}")
                     continue
 
                 obj_file = os.path.join(output_dir, os.path.basename(src).replace(".cpp", ".o"))
-                cmd_compile = gpp_cmd_prefix + ["-c", src, "-o", obj_file]
+                cmd_compile = gpp_cmd_prefix + pch_flags + lto_flags + ["-c", src, "-o", obj_file]
                 if include_header_dirs:
                     for inc_dir in include_header_dirs:
                         cmd_compile.extend(["-I", inc_dir])
                 self.logger.info(f"Executing cpp_compile command: {cmd_compile}")
                 print(f"Executing cpp_compile command: {cmd_compile}")
+                self.emit_event("compile_unit_start", task=task_name, src=src, obj=obj_file)
+                unit_start = time.monotonic()
                 success = self.run_subprocess(task_name, cmd_compile, task_env, log_file, output_dir)
+                self.emit_event("compile_unit_end", task=task_name, src=src, obj=obj_file, success=success, exit_status=self.last_subprocess_returncode,
+                                duration_s=round(time.monotonic() - unit_start, 6), rusage=self.last_subprocess_rusage)
 
                 if not success:
                     self.logger.error(f"G++ compilation failed for file '{src}'. Check log: {log_file_path}")
@@ -1004,14 +1471,19 @@ class Bob:
 
             self.logger.info(f"G++ compilation succeeded for task '{task_name}'. Output: {object_files}")
             print(f"G++ compilation succeeded for task '{task_name}'. Output: {object_files}")
+            self.record_task_outputs(object_files)
 
             # If 'executable_name' exists within task_config.yaml, then link object files into an executable
             # Link all .o files, including external ones to create the final executable
             if generate_executable:
-                cmd_link = gpp_cmd_prefix + object_files + external_objects + ["-o", executable_path]
+                cmd_link = gpp_cmd_prefix + lto_flags + object_files + external_objects + ["-o", executable_path]
                 self.logger.info(f"Executing cpp_link command: {cmd_link}")
                 print(f"Executing cpp_link command: {cmd_link}")
+                self.emit_event("link_start", task=task_name, kind="executable", output=executable_path)
+                link_start = time.monotonic()
                 success = self.run_subprocess(task_name, cmd_link, task_env, log_file, output_dir)
+                self.emit_event("link_end", task=task_name, kind="executable", output=executable_path, success=success, exit_status=self.last_subprocess_returncode,
+                                duration_s=round(time.monotonic() - link_start, 6), rusage=self.last_subprocess_rusage)
 
                 if not success:
                     self.logger.error(f"G++ compilation failed for task '{task_name}'. Check log: {log_file_path}")
@@ -1020,16 +1492,30 @@ class Bob:
 
                 self.logger.info(f"G++ link succeeded for task '{task_name}'. Output: {executable_path}")
                 print(f"G++ link succeeded for task '{task_name}'. Output: {executable_path}")
+                self.record_task_outputs([executable_path])
             # If 'lib_type' exists, then generate static or dynamic library
             elif generate_static_lib:
-                # Extract the path of ar, including default flags
-                ar_cmd_prefix = self.tool_config_parser.get_command("ar")
+                # Extract the path of ar, including default flags. gcc-ar loads the LTO plugin such that the symbol index covers LTO objects
+                archiver = "gcc-ar" if lto_flags else "ar"
+                if not self.tool_config_parser.has_tool(archiver):
+                    raise ValueError(f"Task '{task_name}' needs '{archiver}' to archive its objects, but it is not found. Check its path in tool_config.yaml.")
+                ar_cmd_prefix = self.tool_config_parser.get_command(archiver)
                 self.logger.debug(f"ar_cmd_prefix={ar_cmd_prefix}")
 
-                cmd_archive = ar_cmd_prefix +  ["rcs"] + [static_lib_name] + object_files + external_objects
+                # A thin archive only references its objects, such that re-archiving after an incremental compile copies nothing.
+                # ar cannot convert an existing archive between the regular and thin formats, hence a stale one is removed first
+                thin_archive = self.task_configs[task_name].get("thin_archive", False)
+                static_lib_path = Path(output_dir) / static_lib_name
+                if static_lib_path.is_file() and self.is_thin_archive(static_lib_path) != thin_archive:
+                    static_lib_path.unlink()
+                cmd_archive = ar_cmd_prefix +  ["rcsT" if thin_archive else "rcs"] + [static_lib_name] + object_files + external_objects
                 self.logger.info(f"Executing cmd_archive command : {cmd_archive}")
                 print(f"Executing cmd_archive command : {cmd_archive}")
+                self.emit_event("link_start", task=task_name, kind="static_lib", output=static_lib_name)
+                link_start = time.monotonic()
                 success = self.run_subprocess(task_name, cmd_archive, task_env, log_file, output_dir)
+                self.emit_event("link_end", task=task_name, kind="static_lib", output=static_lib_name, success=success, exit_status=self.last_subprocess_returncode,
+                                duration_s=round(time.monotonic() - link_start, 6), rusage=self.last_subprocess_rusage)
 
                 if not success:
                     self.logger.error(f"G++ compilation failed for task '{task_name}'. Static lib '{static_lib_name}' has not been generated. Check log: {log_file_path}")
@@ -1038,6 +1524,7 @@ class Bob:
 
                 self.logger.info(f"G++ compilation succeeded for task '{task_name}'. Generated static lib '{static_lib_name}'. Output: {str(Path(output_dir) / static_lib_name)}")
                 print(f"G++ compilation succeeded for task '{task_name}'. Generated static lib '{static_lib_name}'. Output: {str(Path(output_dir) / static_lib_name)}")
+                self.record_task_outputs([static_lib_path])
 
             return True
 
@@ -1049,6 +1536,351 @@ class Bob:
             self.logger.critical(f"Unexpected error during execute_cpp_compile(): {e}", exc_info=True)
             return False
 
+    def is_thin_archive(self, archive_path: Path) -> bool:
+        """Return True if archive_path is a thin archive, which references its members instead of containing them"""
+        with open(archive_path, "rb") as f:
+            return f.read(len(self.THIN_ARCHIVE_MAGIC)) == self.THIN_ARCHIVE_MAGIC
+
+    def generate_unity_sources(self, task_name: str, cpp_src_files: list[str], output_dir: Path, batch_size: int | None = None) -> list[str] | None:
+        """Write unity translation units, each #including up to 'batch_size' .cpp files (all of them if None), into output_dir/unity.
+
+        Files are only rewritten when their content changes. Sources relying on file-local names (static functions,
+        anonymous namespaces) which clash with another source of the same batch cannot be built this way.
+        """
+        try:
+            unity_dir = Path(output_dir) / "unity"
+            unity_dir.mkdir(parents=True, exist_ok=True)
+            batch_size = batch_size or max(1, len(cpp_src_files))
+            batches = [cpp_src_files[i:i + batch_size] for i in range(0, len(cpp_src_files), batch_size)]
+
+            unity_src_files = []
+            for batch_idx, batch in enumerate(batches):
+                unity_src = unity_dir / f"{task_name}_unity_{batch_idx}.cpp"
+                content = f"// Unity translation unit generated by bob for task '{task_name}', do not edit.\n"
+                content += "".join(f'#include "{os.path.abspath(src)}"\n' for src in batch)
+                if not unity_src.is_file() or unity_src.read_text() != content:
+                    unity_src.write_text(content)
+                unity_src_files.append(str(unity_src))
+
+            # Remove stale unity sources left over from a larger number of batches
+            for stale_unity_src in unity_dir.glob(f"{task_name}_unity_*.cpp"):
+                if str(stale_unity_src) not in unity_src_files:
+                    stale_unity_src.unlink()
+
+            self.logger.debug(f"Task '{task_name}' amalgamated {len(cpp_src_files)} .cpp files into {len(unity_src_files)} unity translation unit(s): {unity_src_files}")
+            return unity_src_files
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during generate_unity_sources() for task_name = '{task_name}' : {e}", exc_info=True)
+            return None
+
+    def build_precompiled_header(self, task_name: str, headers: list[str], compiler_cmd_prefix: list[str], include_header_dirs: list[str], task_env, log_file, output_dir: Path) -> bool:
+        """Precompile 'headers' into '<task>_pch.h.gch' within output_dir, recording the fingerprint (compiler identity and flags) it was built with"""
+        try:
+            stub_path = pch_stub_path(output_dir, task_name)
+            write_pch_stub(stub_path, headers)
+            compiler_cmd = compiler_cmd_prefix + self.task_configs[task_name].get("precompiled_header_flags", [])
+            cmd_pch = compiler_cmd + ["-x", "c++-header", str(stub_path), "-o", str(pch_gch_path(stub_path))]
+            for inc_dir in include_header_dirs:
+                cmd_pch.extend(["-I", inc_dir])
+
+            self.logger.info(f"Executing precompiled header command: {cmd_pch}")
+            print(f"Executing precompiled header command: {cmd_pch}")
+            self.emit_event("compile_unit_start", task=task_name, src=str(stub_path), obj=str(pch_gch_path(stub_path)))
+            unit_start = time.monotonic()
+            success = self.run_subprocess(task_name, cmd_pch, task_env, log_file, output_dir)
+            self.emit_event("compile_unit_end", task=task_name, src=str(stub_path), obj=str(pch_gch_path(stub_path)), success=success, exit_status=self.last_subprocess_returncode,
+                            duration_s=round(time.monotonic() - unit_start, 6), rusage=self.last_subprocess_rusage)
+            if not success:
+                return False
+
+            save_pch_fingerprint(stub_path, pch_fingerprint(self.get_tool_identity("g++", ("machine",)), compiler_cmd))
+            self.logger.info(f"Precompiled header for task '{task_name}' generated: {pch_gch_path(stub_path)}")
+            return True
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during build_precompiled_header() for task_name = '{task_name}' : {e}", exc_info=True)
+            return False
+
+    def get_consumed_precompiled_header_flags(self, task_name: str, compiler_cmd: list[str]) -> list[str]:
+        """Return the flags to use the precompiled header consumed by a task, or [] if there is none or it was built with an incompatible compiler or flags"""
+        try:
+            stub = self.task_configs[task_name].get("consumed_precompiled_header", None)
+            if not stub:
+                return []
+            stub_path = Path(stub)
+            produced_fingerprint = load_pch_fingerprint(stub_path)
+            if not pch_gch_path(stub_path).is_file() or produced_fingerprint is None:
+                self.logger.warning(f"Task '{task_name}' consumes precompiled header '{stub_path}' which has not been built. Compiling without it.")
+                return []
+            differences = pch_fingerprint_mismatch(produced_fingerprint, pch_fingerprint(self.get_tool_identity("g++", ("machine",)), compiler_cmd))
+            if differences:
+                self.logger.warning(f"Precompiled header '{pch_gch_path(stub_path)}' is incompatible with task '{task_name}', compiling without it: {'; '.join(differences)}")
+                return []
+            self.logger.debug(f"Task '{task_name}' uses precompiled header '{pch_gch_path(stub_path)}'.")
+            return ["-include", str(stub_path)]
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during get_consumed_precompiled_header_flags() for task_name = '{task_name}' : {e}", exc_info=True)
+            return []
+
+    def query_verilator_mk_config(self, task_name: str, task_env, output_dir: Path, target: str, prefix: str) -> list[str] | None:
+        """Run a print target of verilator.mk with the task env, returning the shell words of its line starting with 'prefix'"""
+        try:
+            verilator_mk_path = self.build_scripts_dir / "verilator.mk"
+            completed = subprocess.run(["make", "-s", "--no-print-directory", "-C", str(output_dir), "-f", str(verilator_mk_path), target],
+                                       env=task_env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=False)
+            for line in completed.stdout.splitlines():
+                if line.startswith(prefix):
+                    return shlex.split(line[len(prefix):])
+            raise ValueError(f"verilator.mk target '{target}' did not report '{prefix}' for task '{task_name}'.")
+
+        except ValueError as ve:
+            self.logger.error(f"ValueError: {ve}")
+            return None
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during query_verilator_mk_config() for task_name = '{task_name}' : {e}", exc_info=True)
+            return None
+
+    def query_verilator_mk_cxx_config(self, task_name: str, task_env, output_dir: Path) -> list[str] | None:
+        """Return the compiler command (CXX followed by CXXFLAGS) verilator.mk uses for tb sources of a task"""
+        return self.query_verilator_mk_config(task_name, task_env, output_dir, "print-cxx-config", "BOB_CXX_CONFIG=")
+
+    def get_verilated_model_src_files(self, model_task: str) -> list[str]:
+        """Return the RTL src files of a verilator_verilate task, which key its verilated model"""
+        return sum((self.task_configs[model_task].get(key, []) for key in ["internal_src_files", "external_src_files", "output_src_files"]), [])
+
+    def get_verilated_model_dir(self, task_name: str, model_task: str, task_env, output_dir: Path) -> Path | None:
+        """Return the keyed dir of the model built by 'model_task' for the RTL and the verilator.mk flags of 'task_name',
+        or None if it cannot be computed or the RTL sources of 'task_name' are not the ones of the model"""
+        try:
+            model_src_files = self.get_verilated_model_src_files(model_task)
+            # The model is keyed on the RTL of its own task, a tb listing other RTL sources must verilate them itself
+            tb_rtl_src_files = task_env.get("RTL_SRC_FILES", "").split()
+            if sorted(set(map(os.path.realpath, tb_rtl_src_files))) != sorted(set(map(os.path.realpath, model_src_files))):
+                self.logger.warning(f"Task '{task_name}' has RTL sources {tb_rtl_src_files} which differ from the ones of its verilated_model '{model_task}': {model_src_files}.")
+                return None
+            model_config = self.query_verilator_mk_config(task_name, task_env, output_dir, "print-model-config", "BOB_MODEL_CONFIG=")
+            if model_config is None:
+                return None
+            top_module = self.task_configs[model_task]["task_config_dict"]["top_module"]
+            verilator = self.get_tool_identity("verilator")
+            fingerprint = model_fingerprint(model_src_files, top_module, verilator, model_config)
+            return model_dir(self.task_configs[model_task]["output_dir"], model_key(fingerprint))
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during get_verilated_model_dir() for task_name = '{task_name}' : {e}", exc_info=True)
+            return None
+
+    def set_verilator_parallelism_env(self, task_name: str, verilator_threads: int | None) -> int | None:
+        """Pass the model threads and the build jobs of a task to verilator.mk, returning the build jobs"""
+        build_jobs = resolve_build_jobs(self.task_configs[task_name].get("build_jobs", None))
+        self.task_config_parser.update_task_env(task_name, "VERILATOR_THREADS", str(verilator_threads) if verilator_threads else "", True)
+        self.task_config_parser.update_task_env(task_name, "VERILATOR_BUILD_JOBS", str(build_jobs) if build_jobs else "", True)
+        return build_jobs
+
+    def tune_verilator_threads(self, task_name: str, task_env, log_file, output_dir: Path, build_jobs: int | None = None) -> int | None:
+        """Build the tb at each candidate thread count, benchmark it and return the count with the highest simulation rate.
+
+        The rate is ts_sim_ps / ts_wall_us of the last progress.jsonl event of a short run. The result is persisted in
+        .bob/verilator_tuning.json keyed on the RTL, verilator and the tuning settings, such that later builds reuse it.
+        Returns None if no candidate could be measured, the caller then keeps verilator's default.
+        """
+        try:
+            settings = self.task_configs[task_name].get("verilator_threads_tuning", None) or {}
+            candidates = settings.get("candidates", None) or default_thread_candidates()
+            max_time_ps = settings.get("max_time_ps", None) or DEFAULT_TUNING_MAX_TIME_PS
+            tuning_args = settings.get("args", [])
+            rtl_src_files = task_env.get("RTL_SRC_FILES", "").split()
+            verilator = self.get_tool_identity("verilator")
+            key = model_key(model_fingerprint(rtl_src_files, task_env.get("TOP_MODULE", ""), verilator, [*map(str, candidates), str(max_time_ps), *tuning_args]))
+
+            tuning_name = f"{task_name}@{self.build_variant}" if self.build_variant else task_name
+            tuning = load_tuning(self.dotbob_tuning_file, tuning_name, key)
+            if tuning is not None:
+                self.logger.info(f"Task '{task_name}' reuses tuned verilator_threads={tuning['verilator_threads']} from {self.dotbob_tuning_file}")
+                return tuning["verilator_threads"]
+
+            verilator_mk_path = self.build_scripts_dir / "verilator.mk"
+            tune_root = Path(output_dir) / "tune"
+            rates: dict[int, float | None] = {}
+            for threads in candidates:
+                tune_dir = tune_root / f"threads_{threads}"
+                tune_dir.mkdir(parents=True, exist_ok=True)
+                tune_env = dict(task_env, TASK_OUTDIR=str(tune_dir), VERILATOR_THREADS=str(threads))
+                cmd_build = ["make", *(["-j", str(build_jobs)] if build_jobs else []), "-C", str(tune_dir), "-f", str(verilator_mk_path)]
+                print(f"Tuning task '{task_name}': building with verilator_threads={threads}")
+                if not self.run_subprocess(task_name, cmd_build, tune_env, log_file, tune_dir):
+                    self.logger.warning(f"Tuning task '{task_name}': build with verilator_threads={threads} failed. Skipping this candidate.")
+                    rates[threads] = None
+                    continue
+                run_dir = tune_dir / "run"
+                shutil.rmtree(run_dir, ignore_errors=True)
+                cmd_run = [str(tune_dir / task_env["OUTPUT_EXECUTABLE"]), "--seed=1", f"--max-time={max_time_ps}", f"--output-dir={run_dir}", *tuning_args]
+                success = self.run_subprocess(task_name, cmd_run, task_env, log_file, tune_dir)
+                rates[threads] = read_sim_rate(run_dir / "progress.jsonl") if success else None
+                self.logger.info(f"Tuning task '{task_name}': verilator_threads={threads} simulates {rates[threads]} ps per wall-clock us")
+                print(f"Tuning task '{task_name}': verilator_threads={threads} simulates {rates[threads]} ps per wall-clock us")
+
+            best_threads = pick_best_threads(rates)
+            self.emit_event("verilator_tuning", task=task_name, rates={str(threads): rate for threads, rate in rates.items()}, best=best_threads)
+            if best_threads is None:
+                self.logger.warning(f"Tuning task '{task_name}': no candidate reported ts_sim_ps and ts_wall_us in progress.jsonl. Using verilator's default threads.")
+                return None
+            save_tuning(self.dotbob_tuning_file, tuning_name, {"key": key, "verilator_threads": best_threads, "rates": {str(threads): rate for threads, rate in rates.items()}})
+            shutil.rmtree(tune_root, ignore_errors=True)
+            return best_threads
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during tune_verilator_threads() for task_name = '{task_name}' : {e}", exc_info=True)
+            return None
+
+    def get_pgo_profile_store_dir(self, task_name: str) -> Path:
+        """Return the dir holding the trained PGO profile of a task for the selected build variant"""
+        return self.dotbob_pgo_dir / (f"{task_name}@{self.build_variant}" if self.build_variant else task_name)
+
+    def get_pgo_fingerprint(self, task_name: str, task_env, output_dir: Path) -> dict | None:
+        """Return the fingerprint keying the PGO profile of a tb: its RTL, tb sources and headers, plus the verilator/C++ flags without PGO"""
+        try:
+            build_config = self.query_verilator_mk_config(task_name, dict(task_env, PGO_MODE=""), output_dir, "print-model-config", "BOB_MODEL_CONFIG=")
+            if build_config is None:
+                return None
+            src_files = [src for key in ["RTL_SRC_FILES", "TB_CPP_SRC_FILES", "TB_HEADER_SRC_FILES"] for src in task_env.get(key, "").split()]
+            # Headers within include dirs, as found by verilator.mk
+            for include_dir in task_env.get("INCLUDE_DIRS", "").split():
+                src_files.extend(str(header) for pattern in ["*.h", "*.hpp"] for header in Path(include_dir).glob(pattern))
+            return pgo_fingerprint(src_files, build_config)
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during get_pgo_fingerprint() for task_name = '{task_name}' : {e}", exc_info=True)
+            return None
+
+    def get_fresh_pgo_profile_dir(self, task_name: str, fingerprint: dict) -> Path | None:
+        """Return the dir of the trained PGO profile of a task if it matches the fingerprint, or None if there is none or it is stale"""
+        store_dir = self.get_pgo_profile_store_dir(task_name)
+        profile = load_pgo_profile(store_dir)
+        if profile is None:
+            self.logger.info(f"Task '{task_name}' has no PGO profile. Run 'pgo -t {task_name}' to train one.")
+            return None
+        if profile.get("key") != pgo_key(fingerprint):
+            self.logger.warning(f"PGO profile {store_dir} of task '{task_name}' is stale, its RTL, tb sources or flags have changed since training. Building without it, run 'pgo -t {task_name}' to train it again.")
+            print(f"PGO profile {store_dir} of task '{task_name}' is stale. Building without it, run 'pgo -t {task_name}' to train it again.")
+            return None
+        self.logger.info(f"Task '{task_name}' is optimised with PGO profile {store_dir}")
+        return store_dir
+
+    def train_pgo_profile(self, task_name: str, task_env, log_file, output_dir: Path, build_jobs: int | None, fingerprint: dict) -> bool:
+        """Train the PGO profile of a tb: build it instrumented with -fprofile-generate, run its training plan with the campaign runner,
+        merge the .gcda files of every run with gcov-tool and store the result in .bob/pgo/, keyed on the fingerprint"""
+        try:
+            verilator_mk_path = self.build_scripts_dir / "verilator.mk"
+            pgo_root = Path(output_dir) / PGO_SUBDIR
+            shutil.rmtree(pgo_root, ignore_errors=True)
+            instrumented_dir = pgo_root / "instrumented"
+            profile_dir = pgo_root / "profile"
+            runs_dir = pgo_root / "runs"
+            instrumented_dir.mkdir(parents=True)
+            # gcov-tool is optional in tool_config.yaml, check it before the instrumented build and training campaign rather than after them
+            if not self.tool_config_parser.has_tool("gcov-tool"):
+                raise RuntimeError(f"PGO of task '{task_name}' needs 'gcov-tool' to merge its profiles, but it is not found. Check its path in tool_config.yaml.")
+
+            # 1. Instrumented build, always verilating the RTL within the tb build such that the model is profiled too
+            instrumented_env = dict(task_env, TASK_OUTDIR=str(instrumented_dir), MODEL_DIR="", PGO_MODE="generate", PGO_PROFILE_DIR=str(profile_dir))
+            cmd_build = ["make", *(["-j", str(build_jobs)] if build_jobs else []), "-C", str(instrumented_dir), "-f", str(verilator_mk_path)]
+            print(f"PGO of task '{task_name}': building instrumented tb in {instrumented_dir}")
+            if not self.run_subprocess(task_name, cmd_build, instrumented_env, log_file, instrumented_dir):
+                raise RuntimeError(f"Instrumented build of task '{task_name}' failed.")
+
+            # 2. Training campaign, each run writing its .gcda files within its own run dir
+            training_plan = self.task_configs[task_name]["pgo"]["training_plan"]
+            training_plan_copy = pgo_root / "training_plan.yaml"
+            if not write_training_plan(training_plan, task_env["OUTPUT_EXECUTABLE"], instrumented_dir / task_env["OUTPUT_EXECUTABLE"], profile_dir, runs_dir, training_plan_copy):
+                raise ValueError(f"Training plan '{training_plan}' of task '{task_name}' has no binary named '{task_env['OUTPUT_EXECUTABLE']}'.")
+            campaign_env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(self.bob_root), os.environ.get("PYTHONPATH", "")])))
+            cmd_campaign = [sys.executable, "-m", "campaign.campaign_runner", "--plan", str(training_plan_copy), "--no-tui"]
+            print(f"PGO of task '{task_name}': running training plan {training_plan}")
+            if not self.run_subprocess(task_name, cmd_campaign, campaign_env, log_file, self.proj_root):
+                raise RuntimeError(f"Training campaign of task '{task_name}' failed, see {runs_dir}.")
+
+            # 3. Merge the profiles of every run
+            gcov_data_dirs = find_gcov_data_dirs(runs_dir)
+            if not gcov_data_dirs:
+                raise RuntimeError(f"Training campaign of task '{task_name}' wrote no .gcda files under {runs_dir}.")
+            gcov_tool = self.tool_config_parser.get_command("gcov-tool")
+            merged_dir = gcov_data_dirs[0]
+            for idx, gcov_data_dir in enumerate(gcov_data_dirs[1:]):
+                next_merged_dir = pgo_root / f"merged_{idx % 2}"
+                shutil.rmtree(next_merged_dir, ignore_errors=True)
+                if not self.run_subprocess(task_name, [*gcov_tool, "merge", str(merged_dir), str(gcov_data_dir), "-o", str(next_merged_dir)], task_env, log_file, pgo_root):
+                    raise RuntimeError(f"gcov-tool failed to merge {gcov_data_dir} into the profile of task '{task_name}'.")
+                merged_dir = next_merged_dir
+
+            # 4. Store the merged profile, used by this and later builds while the fingerprint matches
+            store_dir = self.get_pgo_profile_store_dir(task_name)
+            save_pgo_profile(store_dir, merged_dir, {"key": pgo_key(fingerprint), "fingerprint": fingerprint, "training_plan": str(training_plan), "runs": len(gcov_data_dirs),
+                                                     "trained_at": datetime.datetime.now(datetime.timezone.utc).isoformat()})
+            self.emit_event("pgo_profile", task=task_name, key=pgo_key(fingerprint), runs=len(gcov_data_dirs), profile=str(store_dir))
+            self.logger.info(f"PGO of task '{task_name}': merged the profiles of {len(gcov_data_dirs)} run(s) into {store_dir}")
+            print(f"PGO of task '{task_name}': merged the profiles of {len(gcov_data_dirs)} run(s) into {store_dir}")
+            shutil.rmtree(pgo_root, ignore_errors=True)
+            return True
+
+        except RuntimeError as re:
+            self.logger.error(f"RuntimeError: {re}")
+            return False
+
+        except ValueError as ve:
+            self.logger.error(f"ValueError: {ve}")
+            return False
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during train_pgo_profile() for task_name = '{task_name}' : {e}", exc_info=True)
+            return False
+
+    def build_verilated_model(self, task_name: str, src_files: list[str], top_module: str, task_env, log_file, output_dir: Path) -> bool:
+        """Verilate and compile src_files into static archives within a dir keyed on the RTL hash plus verilator and C++ flags, reusing it if already built"""
+        try:
+            verilator_mk_path = self.build_scripts_dir / "verilator.mk"
+            self.task_config_parser.update_task_env(task_name, "VERILATOR_BIN_PATH", self.tool_config_parser.get_command("verilator"), True, " ")
+            self.task_config_parser.update_task_env(task_name, "RTL_SRC_FILES", [str(src) for src in src_files], True, " ")
+            self.task_config_parser.update_task_env(task_name, "TOP_MODULE", str(top_module), True)
+            self.set_verilator_parallelism_env(task_name, self.task_configs[task_name].get("verilator_threads", None))
+
+            model_config = self.query_verilator_mk_config(task_name, task_env, output_dir, "print-model-config", "BOB_MODEL_CONFIG=")
+            if model_config is None:
+                return False
+            verilator = self.get_tool_identity("verilator")
+            fingerprint = model_fingerprint(src_files, top_module, verilator, model_config)
+            model_dir_path = model_dir(output_dir, model_key(fingerprint))
+
+            if is_model_built(model_dir_path, top_module):
+                self.logger.info(f"Verilated model of task '{task_name}' is up to date, reusing {model_dir_path}")
+                print(f"Verilated model of task '{task_name}' is up to date, reusing {model_dir_path}")
+                touch_model(model_dir_path)
+                return True
+
+            self.task_config_parser.update_task_env(task_name, "TASK_OUTDIR", str(model_dir_path), True)
+            cmd_model = ["make", "-C", str(output_dir), "-f", str(verilator_mk_path), "model"]
+            self.logger.info(f"Executing verilated model command: {cmd_model}")
+            print(f"Executing verilated model command: {cmd_model}")
+            self.emit_event("link_start", task=task_name, kind="verilated_model", output=str(model_dir_path))
+            link_start = time.monotonic()
+            success = self.run_subprocess(task_name, cmd_model, task_env, log_file, output_dir)
+            self.emit_event("link_end", task=task_name, kind="verilated_model", output=str(model_dir_path), success=success, exit_status=self.last_subprocess_returncode,
+                            duration_s=round(time.monotonic() - link_start, 6), rusage=self.last_subprocess_rusage)
+            if not success:
+                return False
+
+            save_model_fingerprint(model_dir_path, fingerprint)
+            for removed in prune_models(output_dir):
+                self.logger.info(f"Removed least recently used verilated model {removed}")
+            return True
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during build_verilated_model() for task_name = '{task_name}' : {e}", exc_info=True)
+            return False
+
     def execute_verilator_verilate(self, task_name:str) -> bool:
         """Execute verilation into C++ model with verilator"""
         try:
@@ -1091,6 +1923,17 @@ class Bob:
                 self.logger.debug(f"Using top_module = '{top_module}' for task '{task_name}'.")
                 self.update_task_env(task_name, "VERILATOR_VERILATE_TOP_MODULE", top_module)
 
+            # Compile the verilated model into archives testbenches can link, instead of only generating its C++
+            if self.task_configs[task_name].get("build_model", False):
+                success = self.build_verilated_model(task_name, src_files, top_module, task_env, log_file, output_dir)
+                if not success:
+                    self.logger.error(f"Building verilated model failed for task '{task_name}'. Check log: {log_file_path}")
+                    print(f"Building verilated model failed for task '{task_name}'. Check log: {log_file_path}")
+                    return False
+                self.logger.info(f"Verilated model built for task '{task_name}'. Output_dir: {output_dir}")
+                print(f"Verilated model built for task '{task_name}'. Output_dir: {output_dir}")
+                return True
+
             # Extract the path of verilator, including default flags
             verilator_path = self.tool_config_parser.get_command("verilator")
             self.logger.debug(f"gpp_path={verilator_path}")
@@ -1111,6 +1954,9 @@ class Bob:
 
             self.logger.info(f"Verilator verilation succeeded for task '{task_name}'. Output_dir: {output_dir}")
             print(f"Verilator verilation succeeded for task '{task_name}'. Output_dir: {output_dir}")
+            # Verilator lists the files it generated, older ones left within output_dir are not outputs of this verilation
+            for ver_files_dat in Path(output_dir).glob(f"V{top_module or '*'}__verFiles.dat"):
+                self.record_task_outputs(verilator_output_files(ver_files_dat))
             return True
 
         except ValueError as ve:
@@ -1164,8 +2010,55 @@ class Bob:
             if not verilator_mk_path.is_file():
                 raise FileNotFoundError(f"Task '{task_name}' is a 'verilator_tb_compile' task type, hence it requires '{verilator_mk_path}' to exist.")
 
+            # Pass the consumed precompiled header to verilator.mk if it matches the compiler and flags used for tb sources
+            if self.task_configs[task_name].get("consumed_precompiled_header", None):
+                cxx_cmd = self.query_verilator_mk_cxx_config(task_name, task_env, output_dir)
+                pch_flags = self.get_consumed_precompiled_header_flags(task_name, cxx_cmd) if cxx_cmd else []
+                self.task_config_parser.update_task_env(task_name, "PCH_FLAGS", " ".join(pch_flags), True)
+                self.task_config_parser.update_task_env(task_name, "PCH_GCH", str(pch_gch_path(Path(pch_flags[1]))) if pch_flags else "", True)
+
+            # Link the prebuilt model of the RTL if one matches the RTL and the verilator.mk flags of this task, else verilate the RTL as part of the tb build
+            model_task = self.task_configs[task_name].get("verilated_model", None)
+            if model_task:
+                # The model key includes its threads, which are set on the model's task
+                build_jobs = self.set_verilator_parallelism_env(task_name, self.task_configs[model_task].get("verilator_threads", None))
+                model_dir_path = self.get_verilated_model_dir(task_name, model_task, task_env, output_dir)
+                if model_dir_path is not None and is_model_built(model_dir_path, task_config_dict["top_module"]):
+                    self.logger.info(f"Task '{task_name}' links verilated model {model_dir_path}")
+                    touch_model(model_dir_path)
+                else:
+                    self.logger.warning(f"Task '{task_name}' has no verilated model of task '{model_task}' built with matching RTL and flags. Verilating the RTL within the tb build.")
+                    model_dir_path = None
+                self.task_config_parser.update_task_env(task_name, "MODEL_DIR", str(model_dir_path) if model_dir_path else "", True)
+            else:
+                verilator_threads = self.task_configs[task_name].get("verilator_threads", None)
+                if verilator_threads == "auto":
+                    build_jobs = self.set_verilator_parallelism_env(task_name, None)
+                    verilator_threads = self.tune_verilator_threads(task_name, task_env, log_file, output_dir, build_jobs)
+                build_jobs = self.set_verilator_parallelism_env(task_name, verilator_threads)
+
+            # Profile-guided optimisation: 'pgo' trains a profile, builds use it while the RTL, tb sources and flags match the ones it was trained with
+            pgo_profile_dir = None
+            if self.task_configs[task_name].get("pgo", None):
+                fingerprint = self.get_pgo_fingerprint(task_name, task_env, output_dir)
+                if fingerprint is None:
+                    raise ValueError(f"The PGO profile key of task '{task_name}' cannot be computed.")
+                if self.pgo_train and not self.train_pgo_profile(task_name, task_env, log_file, output_dir, build_jobs, fingerprint):
+                    self.logger.error(f"PGO training failed for task '{task_name}'. Check log: {log_file_path}")
+                    print(f"PGO training failed for task '{task_name}'. Check log: {log_file_path}")
+                    return False
+                pgo_profile_dir = self.get_fresh_pgo_profile_dir(task_name, fingerprint)
+                if pgo_profile_dir is not None and model_task:
+                    # A prebuilt model is not profile-optimised, the RTL is verilated within the tb build instead
+                    self.task_config_parser.update_task_env(task_name, "MODEL_DIR", "", True)
+            self.task_config_parser.update_task_env(task_name, "PGO_MODE", "use" if pgo_profile_dir else "", True)
+            self.task_config_parser.update_task_env(task_name, "PGO_PROFILE_DIR", str(pgo_profile_dir) if pgo_profile_dir else "", True)
+            # A retrained profile keeps its dir, its id makes verilator.mk recompile with it
+            self.task_config_parser.update_task_env(task_name, "PGO_PROFILE_ID", pgo_profile_id(load_pgo_profile(pgo_profile_dir) or {}) if pgo_profile_dir else "", True)
+
             cmd_verilate_tb_compile_make = [
                 "make",
+                *(["-j", str(build_jobs)] if build_jobs else []),
                 "-C", str(output_dir),
                 "-f", str(verilator_mk_path)
             ]
@@ -1182,6 +2075,7 @@ class Bob:
 
             self.logger.info(f"Verilator tb compilation succeeded for task '{task_name}'. Output_dir: {output_dir}")
             print(f"Verilator tb compilation succeeded for task '{task_name}'. Output_dir: {output_dir}")
+            self.record_task_outputs([Path(output_dir) / task_env["OUTPUT_EXECUTABLE"]])
             return True
 
         except KeyError as ke:
@@ -1200,8 +2094,30 @@ class Bob:
             self.logger.critical(f"Unexpected error during execute_verilator_tb_compile() : {e}", exc_info=True)
             return False
 
-    def filter_tasks_to_rebuild(self, dependency_graph: DiGraph) -> DiGraph:
-        """Returns a filtered dependency graph with only tasks that need to be rebuilt."""
+    def execute_pgo_tasks(self, build_all_tasks: bool, selected_tasks: list[str]) -> None:
+        """Train the PGO profile of the selected tasks with a 'pgo' field, then build them with it. Their dependencies are built as needed"""
+        try:
+            task_names = set(self.task_configs) if build_all_tasks else self.get_task_names_by_regex(selected_tasks)
+            pgo_tasks = sorted(task_name for task_name in task_names if self.task_configs[task_name].get("pgo", None))
+            if not pgo_tasks:
+                raise ValueError(f"None of the selected tasks {sorted(task_names)} has a 'pgo' field.")
+            # Training happens while a task is executed, hence it must not be skipped as up to date
+            for task_name in pgo_tasks:
+                self.mark_task_as_dirty_in_dotbob_checksum_file(task_name)
+            self.pgo_train = True
+            self.execute_tasks(False, pgo_tasks)
+
+        except ValueError as ve:
+            self.logger.error(f"ValueError: {ve}")
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during execute_pgo_tasks(): {e}", exc_info=True)
+
+        finally:
+            self.pgo_train = False
+
+    def filter_tasks_to_rebuild(self, dependency_graph: DiGraph, reasons: dict[str, list[str]] | None = None) -> DiGraph:
+        """Returns a filtered dependency graph with only tasks that need to be rebuilt, filling reasons with why each of them is if given."""
         # A task must be rebuilt if:
         # - It explicitly needs rebuilding (should_rebuild_task is True)
         # - Any of its prerequisite tasks require rebuilding
@@ -1218,8 +2134,11 @@ class Bob:
 
                 checked_tasks.add(task)
 
-                if self.should_rebuild_task(task):  # Task itself requires rebuild
+                task_reasons = [] if reasons is not None else None
+                if self.should_rebuild_task(task, task_reasons):  # Task itself requires rebuild
                     tasks_to_rebuild.add(task)
+                    if reasons is not None:
+                        reasons[task] = task_reasons
                     return True
 
                 # If any dependency needs a rebuild, this task must also rebuild
@@ -1234,6 +2153,15 @@ class Bob:
             for task in dependency_graph.nodes:
                 should_rebuild_recursive(task)
 
+            for task in checked_tasks - tasks_to_rebuild:
+                self.emit_event("cache_hit", task=task)
+
+            if reasons is not None:
+                for task in tasks_to_rebuild:
+                    upstream_tasks = sorted(dependency for dependency in dependency_graph.predecessors(task) if dependency in tasks_to_rebuild)
+                    if upstream_tasks:
+                        reasons.setdefault(task, []).append(f"upstream change: {', '.join(upstream_tasks)}")
+
             # Construct the rebuild graph with only required tasks
             for task in tasks_to_rebuild:
                 rebuild_graph.add_node(task)
@@ -1248,45 +2176,115 @@ class Bob:
             self.logger.critical(f"Unexpected error in filter_tasks_to_rebuild(): {e}", exc_info=True)
             return DiGraph()  # Return empty graph on failure
 
-    def schedule_all_tasks(self, dependency_count, ready_queue):
-        """Filter dependency_graph based on whether tasks need to be rebuilt. Schedules tasks dynamically while respecting dependencies"""
+    def plan_build(self, build_all_tasks: bool, selected_tasks: list[str]) -> dict | None:
+        """Work out what execute_tasks() would build without executing, marking or scheduling anything.
+
+        Returns the tasks to run in build order, each with why it runs and its duration estimated from .bob/events.jsonl,
+        the critical path of the rebuild and the estimated wall-clock time with the worker count execute_tasks() would use.
+        """
+        try:
+            if self.dependency_graph is None:
+                raise ValueError(f"self.dependency_graph = None. Please ensure build_task_dependency_graph of self.ip_config_parser is run, and Bob's attribute has been updated.")
+
+            if build_all_tasks:
+                dependency_graph = self.dependency_graph
+            else:
+                dependency_graph = self.select_task_subgraph(self.get_task_names_by_regex(selected_tasks)) or DiGraph()
+            reasons = {}
+            with self.profiler.phase("rebuild analysis"):
+                rebuild_graph = self.filter_tasks_to_rebuild(dependency_graph, reasons)
+            durations = estimate_task_durations(read_build_events(self.dotbob_events_file), self.build_variant)
+
+            build_order = list(topological_sort(rebuild_graph))
+            num_workers = min(multiprocessing.cpu_count(), len(build_order))
+            path, path_duration_s = critical_path(rebuild_graph, durations)
+            return {
+                "tasks": [{"task": task, "reasons": reasons.get(task, []), "estimate_s": durations.get(task)} for task in build_order],
+                "critical_path": path,
+                "critical_path_s": path_duration_s,
+                "num_workers": num_workers,
+                "wall_clock_s": simulate_schedule(rebuild_graph, durations, num_workers) if build_order else 0.0,
+                "tasks_without_history": [task for task in build_order if task not in durations],
+            }
+
+        except ValueError as ve:
+            self.logger.error(f"ValueError: {ve}")
+            return None
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during plan_build(): {e}", exc_info=True)
+            return None
+
+    def print_build_plan(self, plan: dict) -> None:
+        """Print a plan returned by plan_build()"""
+        if not plan["tasks"]:
+            print("Build plan: every task is up to date, nothing would run.")
+            return
+        print(f"Build plan: {len(plan['tasks'])} task(s) would run{f' (variant {self.build_variant})' if self.build_variant else ''}")
+        task_width = max(len(entry["task"]) for entry in plan["tasks"])
+        for entry in plan["tasks"]:
+            reasons = entry["reasons"] or ["unknown"]
+            print(f"  {entry['task']:<{task_width}}  {format_duration(entry['estimate_s']):>7}  {reasons[0]}")
+            for reason in reasons[1:]:
+                print(f"  {'':<{task_width}}  {'':>7}  {reason}")
+        print(f"Critical path: {' -> '.join(plan['critical_path'])} ({format_duration(plan['critical_path_s'])})")
+        print(f"Estimated wall-clock with {plan['num_workers']} worker(s): {format_duration(plan['wall_clock_s'])}")
+        if plan["tasks_without_history"]:
+            print(f"No recorded history for {len(plan['tasks_without_history'])} task(s), counted as 0s: {', '.join(plan['tasks_without_history'])}")
+
+    def schedule_all_tasks(self) -> TaskReadySet | None:
+        """Filter dependency_graph based on whether tasks need to be rebuilt, returning the ready set of the tasks to build"""
         try:
             if self.dependency_graph is None:
                 raise ValueError(f"self.dependency_graph = None. Please ensure build_task_dependency_graph of self.ip_config_parser is run, and Bob's attribute has been updated.")
 
             # Filter from self.dependency_graph to configure out what needs to be rebuilt
-            filtered_dependency_graph = self.filter_tasks_to_rebuild(self.dependency_graph)
+            with self.profiler.phase("rebuild analysis"):
+                filtered_dependency_graph = self.filter_tasks_to_rebuild(self.dependency_graph)
             self.logger.debug(f"Filtered tasks to rebuild. filtered_dependency_graph = {filtered_dependency_graph}")
-            self.dependency_graph = filtered_dependency_graph
+            # self.dependency_graph is kept unfiltered, such that a resident Bob (watch mode) can schedule again later
 
             # Show visualisation of the filtered dependency graph if there are tasks to be built
-            if self.dependency_graph.number_of_nodes():
-                self.visualise_dependency_graph(self.dependency_graph)
-
-            # Track number of dependencies (indegree) for each task
-            for task in self.dependency_graph.nodes:
-                dependency_count[task] = self.dependency_graph.in_degree(task)
+            if filtered_dependency_graph.number_of_nodes():
+                self.visualise_dependency_graph(filtered_dependency_graph)
 
-            # Populate queue with initial tasks (indegree = 0)
-            for task, count in dependency_count.items():
-                if count == 0:
-                    ready_queue.put(task)
-            self.logger.debug(f"Initial ready queue: {ready_queue.qsize()}")
-            return dependency_count, ready_queue
+            return self.make_ready_set(filtered_dependency_graph)
 
         except Exception as e:
             self.logger.critical(f"Unexpected error during schedule_all_tasks(): {e}", exc_info=True)
 
-    def schedule_selected_tasks(self, task_names: set[str], dependency_count, ready_queue):
+    def select_task_subgraph(self, task_names: set[str]) -> DiGraph | None:
+        """Return the subgraph of self.dependency_graph made of the given tasks and all their dependencies, or None if none of them is a task"""
+        # Gather all tasks, target + their ancestors (dependencies), as a single bitset union over the precomputed index
+        dependency_index = self.get_dependency_index()
+        if dependency_index is not None:
+            tasks_to_include_mask = dependency_index.closure_mask(task_names)
+            if not tasks_to_include_mask:
+                return None
+            # Extract the relevent subgraph
+            subgraph = dependency_index.subgraph(tasks_to_include_mask)
+        else:
+            tasks_to_include = set()
+            for task in task_names:
+                if task in self.dependency_graph:
+                    tasks_to_include.add(task)
+                    tasks_to_include.update(ancestors(self.dependency_graph, task))
+
+            if not tasks_to_include:
+                return None
+
+            # Extract the relevent subgraph
+            subgraph = self.dependency_graph.subgraph(tasks_to_include).copy()
+        return subgraph
+
+    def schedule_selected_tasks(self, task_names: set[str]) -> TaskReadySet | None:
         """Schedule only the given tasks and all their dependencies.
 
         Args:
-            dependency_count : Show the number of dependencies for each selected tasks in a dict
-            ready_queue : A queue object to store initial tasks to build
             task_names: A list of tasks to be built
 
         Returns:
-            A (dependency_count, ready_queue) tuple
+            The ready set of the tasks to build
 
         Raises:
             ValueError: If self.dependency_graph is not initialised, throw ValueError.
@@ -1300,41 +2298,33 @@ class Bob:
             if missing:
                 self.logger.warning(f"Some requested tasks not found in dependency_graph: {missing}")
 
-            # Gather all tasks, target + their ancestors (dependencies)
-            tasks_to_include = set()
-            for task in task_names:
-                if task in self.dependency_graph:
-                    tasks_to_include.add(task)
-                    tasks_to_include.update(ancestors(self.dependency_graph, task))
-
-            if not tasks_to_include:
+            subgraph = self.select_task_subgraph(task_names)
+            if subgraph is None:
                 self.logger.info("No valid tasks found to schedule.")
-                return dependency_count, ready_queue
-
-            # Extract the relevent subgraph
-            subgraph = self.dependency_graph.subgraph(tasks_to_include).copy()
+                return self.make_ready_set(DiGraph())
 
             # Filter out tasks that don't have to be rebuilt
-            filtered_dependency_subgraph = self.filter_tasks_to_rebuild(subgraph)
+            with self.profiler.phase("rebuild analysis"):
+                filtered_dependency_subgraph = self.filter_tasks_to_rebuild(subgraph)
             self.logger.debug(f"Scheduling subgraph with {len(filtered_dependency_subgraph)} tasks.")
 
             if filtered_dependency_subgraph.number_of_nodes():
                 self.visualise_dependency_graph(filtered_dependency_subgraph)
 
-            # Track number of dependencies (indegree) for each task
-            for task in filtered_dependency_subgraph.nodes:
-                dependency_count[task] = filtered_dependency_subgraph.in_degree(task)
-
-            # Populate queue with initial tasks (indegree = 0)
-            for task, count in dependency_count.items():
-                if count == 0:
-                    ready_queue.put(task)
-            self.logger.debug(f"Initial ready queue: {ready_queue.qsize()}")
-            return dependency_count, ready_queue
+            return self.make_ready_set(filtered_dependency_subgraph)
 
         except Exception as e:
             self.logger.critical(f"Unexpected error during schedule_selected_tasks(): {e}", exc_info=True)
 
+    def make_ready_set(self, rebuild_graph: DiGraph) -> TaskReadySet:
+        """Return the ready set of the tasks of rebuild_graph, an induced subgraph of self.dependency_graph, emitting the initially ready ones"""
+        dependency_index = self.get_dependency_index()
+        ready_set = dependency_index.ready_set(dependency_index.mask_of(rebuild_graph.nodes))
+        for task in ready_set.ready:
+            self.emit_event("task_ready", task=task)
+        self.logger.debug(f"Initially ready tasks: {ready_set.ready}")
+        return ready_set
+
 
 
     def visualise_dependency_graph(self, dependency_graph: DiGraph) -> None:
@@ -1343,11 +2333,18 @@ class Bob:
             if not isinstance(dependency_graph, DiGraph):
                 raise TypeError(f"Dependency graph must be a directed graph (nx.DiGraph).")
 
-            if not is_directed_acyclic_graph(dependency_graph):
-                raise ValueError(f"Dependency graph must be a Directed Acyclic Graph (DAG).")
+            # Reuse the precomputed topological order when every edge of dependency_graph agrees with it,
+            # which holds for any filtered subgraph of self.dependency_graph
+            dependency_index = self.dependency_index
+            if dependency_index is not None and all(node in dependency_index for node in dependency_graph.nodes) \
+                    and all(dependency_index.ids[u] < dependency_index.ids[v] for u, v in dependency_graph.edges):
+                execution_order = dependency_index.order_tasks(dependency_graph.nodes)
+            else:
+                if not is_directed_acyclic_graph(dependency_graph):
+                    raise ValueError(f"Dependency graph must be a Directed Acyclic Graph (DAG).")
 
-            # Perform a topological sort to determine execution order
-            execution_order = list(topological_sort(dependency_graph))
+                # Perform a topological sort to determine execution order
+                execution_order = list(topological_sort(dependency_graph))
 
             # Build adjacency list for easier traversal
             adjacency_list = {node: list(dependency_graph.successors(node)) for node in execution_order}
@@ -1400,6 +2397,24 @@ class Bob:
             self.logger.critical(f"Unexpected error during visualise_dependency_graph(): {e}")
             return None
 
+    def get_dependency_index(self) -> TaskDagIndex | None:
+        """Return the TaskDagIndex of self.dependency_graph, only rebuilding it when the graph has been replaced or modified"""
+        try:
+            if self.dependency_graph is None:
+                raise ValueError(f"self.dependency_graph = None. Please ensure build_task_dependency_graph of self.ip_config_parser is run, and Bob's attribute has been updated.")
+            if self.dependency_index is None or self.dependency_index.is_stale_for(self.dependency_graph):
+                self.logger.debug(f"Building TaskDagIndex for dependency graph with {self.dependency_graph.number_of_nodes()} task(s).")
+                self.dependency_index = TaskDagIndex(self.dependency_graph)
+            return self.dependency_index
+
+        except ValueError as ve:
+            self.logger.error(f"ValueError: {ve}")
+            return None
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during get_dependency_index(): {e}", exc_info=True)
+            return None
+
     def get_dependencies_for_task(self, task_name:str) -> list[str]:
         """Given a task_name, obtain all nodes having a path to that task, i.e. all dependencies for that task"""
         try:
@@ -1411,10 +2426,12 @@ class Bob:
             if task_name not in self.dependency_graph:
                 self.logger.warning(f"Task {task_name} does not exist in dependency_graph so its output dir and its dependencies cannot be deleted.")
                 return []
-            # Get all the ancestor nodes (dependencies) of the task
-            dependencies = ancestors(self.dependency_graph, task_name)
+            # Get all the ancestor nodes (dependencies) of the task, already in topological order for proper execution sequence
+            dependency_index = self.get_dependency_index()
+            if dependency_index is not None:
+                return dependency_index.ancestors(task_name)
 
-            # Return in topological order for proper execution sequence
+            dependencies = ancestors(self.dependency_graph, task_name)
             topo_sorted = list(topological_sort(self.dependency_graph))
             ordered_dependencies = [task for task in topo_sorted if task in dependencies]
 
@@ -1443,85 +2460,179 @@ class Bob:
         except Exception as e:
             self.logger.critical(f"Unexpected error during remove_task_output_dir_until(): {e}")
 
-    def setup_task_logger(self, log_file_path: Path) -> TextIOWrapper| None:
-        """Open a per-task log file; console stdout is preserved for tee output."""
+    def setup_task_logger(self, log_file_path: Path) -> TaskLogWriter | None:
+        """Rotate the previous logs of a task and open a new, optionally compressed and indexed, binary log file."""
         log_file_path.parent.mkdir(parents=True, exist_ok=True)
-        log_file = open(log_file_path, "w", buffering=1)
+        compression = resolve_log_compression(self.task_log_compression)
+        if compression != self.task_log_compression:
+            self.logger.warning(f"Log compression '{self.task_log_compression}' is unavailable, using '{compression}' instead.")
+        rotate_task_logs(log_file_path, self.task_log_generations)
+        log_file = TaskLogWriter(log_generation_path(log_file_path, compression), compression, frame_size=self.LOG_FILE_BUFFER_SIZE)
         return log_file
 
-    def execute_tasks(self, build_all_tasks: bool, selected_tasks: list[str]):
-        """Executes tasks with dynamic scheduling and parallel execution"""
+    def show_task_log(self, task_name: str, errors_only: bool = False, since: float | None = None, generation: int = 0) -> bool:
+        """Print a task log, or only its error lines or the part written since a given time, using the log index"""
+        try:
+            if task_name not in self.task_configs:
+                raise ValueError(f"Task '{task_name}' not found in task_configs.")
+            output_dir = self.task_configs[task_name].get("output_dir", self.get_build_root() / task_name)
+            log_path = find_log_generation(Path(output_dir) / f"{task_name}.log", generation)
+            if log_path is None:
+                raise FileNotFoundError(f"No log generation {generation} found for task '{task_name}' in {output_dir}.")
+
+            reader = TaskLogReader(log_path)
+            if errors_only:
+                data = b"".join(line + b"\n" for line in reader.error_lines(since))
+            else:
+                data = reader.read_since(since)
+            sys.stdout.write(data.decode(errors="replace"))
+            sys.stdout.flush()
+            return True
+
+        except (ValueError, FileNotFoundError) as e:
+            self.logger.error(f"{type(e).__name__}: {e}")
+            return False
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during show_task_log() for task_name = '{task_name}' : {e}", exc_info=True)
+            return False
+
+    def execute_tasks(self, build_all_tasks: bool, selected_tasks: list[str], on_task_done: Callable[[str], None] | None = None):
+        """Executes tasks with dynamic scheduling and parallel execution.
+
+        on_task_done, if given, is called in this process with the name of each task once it is up to date: right after scheduling for the
+        selected tasks which do not need to be rebuilt, and as soon as its process has exited successfully for every task which is built.
+        """
+        process_pool = [] # Store active process handles
+        build_start = time.monotonic()
         try:
             if self.tool_config_parser is None:
                 raise AttributeError(f"A ToolConfigParser object has not been associated to self.tool_config_parser.")
 
+            self.dotbob_dir.mkdir(parents=True, exist_ok=True)
+            # Before any task worker is spawned: subprocesses outliving their worker are reparented to Bob rather than init,
+            # such that terminate_task_processes() reaps them
+            become_child_subreaper()
+            self.event_log = BuildEventLog(self.dotbob_events_file)
+            self.emit_event("build_start", build_all_tasks=build_all_tasks, selected_tasks=list(selected_tasks), variant=self.build_variant)
+
             with multiprocessing.Manager() as manager:
-                dependency_count = manager.dict()
-                ready_queue = manager.Queue()
                 lock = manager.Lock()
                 failure_event = manager.Event()
                 failure_info = manager.dict()
 
+                # Dependencies are tracked in this process only: a task's dependents are released once its process has exited successfully
                 if build_all_tasks:
-                    dependency_count, ready_queue = self.schedule_all_tasks(dependency_count, ready_queue)
+                    ready_set = self.schedule_all_tasks()
                 else:
                     # selected_tasks allow regex patterns, resolve actual task names first
                     selected_tasks = self.get_task_names_by_regex(selected_tasks)
-                    dependency_graph, ready_queue = self.schedule_selected_tasks(set(selected_tasks), dependency_count, ready_queue)
-                self.logger.debug(f"dependency_count={dependency_count}")
-                tasks_to_be_built = dependency_count.keys()
+                    ready_set = self.schedule_selected_tasks(set(selected_tasks))
+                if ready_set is None:
+                    raise RuntimeError("Tasks could not be scheduled.")
+                tasks_to_be_built = ready_set.task_names()
+                self.logger.debug(f"tasks_to_be_built={tasks_to_be_built}")
+                if on_task_done is not None:
+                    for task in (self.dependency_graph.nodes if build_all_tasks else selected_tasks):
+                        if task not in ready_set.pending:
+                            on_task_done(task)
                 number_of_tasks_to_be_built = len(tasks_to_be_built)
                 self.logger.debug(f"Number of tasks to be built = {number_of_tasks_to_be_built}")
 
-                process_pool = [] # Store active process handles
                 # Prevent spawning too many process all at once and spending too much time in context switching
                 # Tasks are dispached in controlled batches
                 # I.e. If num_workers = 8, only 8 tasks are dispached in a batch
-                num_workers = min(multiprocessing.cpu_count(), len(dependency_count))
+                num_workers = min(multiprocessing.cpu_count(), number_of_tasks_to_be_built)
                 self.logger.debug(f"num_workers = {num_workers}")
-                self.logger.debug(f"ready_queue = {ready_queue}")
+                # Remote tasks run in slots of their own, on top of the local workers
+                slots = {False: num_workers, True: self.remote_slots}
+                waiting_tasks = ready_set.pop_ready() # Ready tasks waiting for a slot of their kind
 
-                while not ready_queue.empty() or process_pool:
+                while process_pool or waiting_tasks:
                     # Launch all available tasks in parallel
-                    while not ready_queue.empty() and len(process_pool) < num_workers:
-                        try:
-                            task = ready_queue.get(timeout=1) # Prevent blocking indefinitely
-                        except Empty:
-                            break
-
-                        process = multiprocessing.Process(target=self.execute_task, args=(task, self.dependency_graph, dependency_count, ready_queue, lock, failure_event, failure_info))
-                        process.start()
+                    for task in list(waiting_tasks):
+                        remote = self.is_remote_task(task)
+                        if sum(1 for t, _ in process_pool if self.is_remote_task(t) == remote) >= slots[remote]:
+                            continue
+                        waiting_tasks.remove(task)
+
+                        # Each task runs in its own process group, which its gcc, make and verilator subprocesses belong to
+                        process = start_process_group(self.profiler.worker(self.execute_task), (task, lock, failure_event, failure_info))
                         process_pool.append((task, process))
 
+                    # Sleep until a task process exits, rather than polling them in a busy loop
+                    multiprocessing.connection.wait([p.sentinel for _, p in process_pool], timeout=1)
+
                     # Check for failure and terminate all tasks if there is a failure
                     if failure_event.is_set():
-                        for _, proc in process_pool:
-                            if proc.is_alive():
-                                proc.terminate()
+                        self.terminate_task_processes(process_pool)
                         break
 
-                    # Clean up completed processes from process_pool
-                    process_pool = [(t, p) for t, p in process_pool if p.is_alive()]
+                    # Clean up completed processes from process_pool, releasing the dependents of the successful ones
+                    running_pool = []
+                    for t, p in process_pool:
+                        if p.is_alive():
+                            running_pool.append((t, p))
+                        elif p.exitcode == 0 and failure_info.get("task_name") != t:
+                            for dependent in ready_set.complete(t):
+                                self.emit_event("task_ready", task=dependent)
+                            if on_task_done is not None:
+                                on_task_done(t)
+                    process_pool = running_pool
+                    waiting_tasks.extend(ready_set.pop_ready())
 
                 if failure_event.is_set():
                     failed_task = failure_info.get("task_name", "Unknown Task")
                     log_path = failure_info.get("log_file_path", "Unknown Log Path")
                     self.logger.error(f"Build failed at task '{failed_task}'. Check log: {log_path}")
+                    self.emit_event("build_end", success=False, failed_task=failed_task, tasks=number_of_tasks_to_be_built, duration_s=round(time.monotonic() - build_start, 6))
                 else:
                     self.logger.info(f"Successfully built {number_of_tasks_to_be_built} task(s).")
                     self.logger.info(f"Built tasks:\n  " + "\n  ".join(tasks_to_be_built))
+                    self.emit_event("build_end", success=True, tasks=number_of_tasks_to_be_built, duration_s=round(time.monotonic() - build_start, 6))
 
-                self.logger.debug(f"At the end of execute_tasks(): dependency_count={dependency_count}")
-                self.logger.debug(f"At the end of execute_tasks(): ready_queue.qsize()={ready_queue.qsize()}")
+                self.logger.debug(f"At the end of execute_tasks(): pending dependencies={ready_set.pending}")
+
+        except KeyboardInterrupt:
+            self.logger.error(f"Build interrupted, terminating running tasks.")
+            self.terminate_task_processes(process_pool)
+            self.emit_event("build_end", success=False, interrupted=True, duration_s=round(time.monotonic() - build_start, 6))
+            raise
 
         except AttributeError as ae:
             self.logger.error(f"AttributeError: {ae}")
 
         except Exception as e:
             self.logger.critical(f"Unexpected error during execute_task(): {e}", exc_info=True)
+            self.terminate_task_processes(process_pool)
+
+        finally:
+            self.event_log = None
+
+    def terminate_task_processes(self, process_pool: list[tuple[str, multiprocessing.Process]]) -> bool:
+        """SIGTERM the process group of each running task, SIGKILL the groups still alive after TERMINATE_GRACE_PERIOD_S, and reap every process.
+
+        Orphaned subprocesses are only reaped if Bob became their subreaper before spawning the workers, as execute_tasks() does.
+        """
+        if not process_pool:
+            return True
+        workers = [proc for _, proc in process_pool]
+        task_names = {proc.pid: task for task, proc in process_pool}
+        for proc in workers:
+            signal_process_group(proc.pid, signal.SIGTERM)
+        remaining = wait_process_groups(workers, self.TERMINATE_GRACE_PERIOD_S)
+        if remaining:
+            self.logger.warning(f"Killing task(s) still running {self.TERMINATE_GRACE_PERIOD_S}s after SIGTERM: {[task_names[proc.pid] for proc in remaining]}")
+            for proc in remaining:
+                signal_process_group(proc.pid, signal.SIGKILL)
+            remaining = wait_process_groups(remaining, self.TERMINATE_GRACE_PERIOD_S)
+        if remaining:
+            self.logger.error(f"Processes of task(s) {[task_names[proc.pid] for proc in remaining]} could not be reaped.")
+            return False
+        return True
 
-    def execute_task(self, task_name:str, dependency_graph: DiGraph, dependency_count: dict[str, int], ready_queue: multiprocessing.Queue, lock: multiprocessing.Lock, failure_event: multiprocessing.Event, failure_info):
-        """Executes a single task in a separate process"""
+    def execute_task(self, task_name:str, lock: multiprocessing.Lock, failure_event: multiprocessing.Event, failure_info):
+        """Executes a single task in a separate process, whose successful exit releases its dependents in execute_tasks()"""
         try:
             task_config = self.task_configs.get(task_name, {})
             if not task_config:
@@ -1533,9 +2644,16 @@ class Bob:
                 raise KeyError(f"task_configs[{task_name}] does not have 'task_config_dict' attribute.")
 
             task_type = task_config_dict.get("task_type", "")
+            self.task_rusage = None
+            self.task_outputs = None
+            self.last_subprocess_returncode = None
+            # The outputs of upstream tasks have been written by other processes since the snapshot was taken
+            self.fs_snapshot.invalidate(self.get_build_root())
+            task_start = time.monotonic()
+            self.emit_event("task_start", task=task_name, task_type=task_type)
 
             # Obtain lock before reading checksum.json, and marking task as dirty
-            with lock:
+            with lock, self.profiler.phase("checksum updates"):
                 self.mark_task_as_dirty_in_dotbob_checksum_file(task_name)
 
             if task_type == "c_compile":
@@ -1553,19 +2671,19 @@ class Bob:
             else:
                 self.logger.error(f"Undefined 'task_type' in task_configs[{task_name}]['task_config_dict'].")
                 success = False
+            if task_config.get("output_dir"):
+                self.fs_snapshot.invalidate(task_config["output_dir"])
+            if success:
+                success = self.write_task_output_manifest(task_name)
 
             self.logger.debug(f"execute_task() for task '{task_name}' completed with success={success}.")
+            self.emit_event("task_end", task=task_name, task_type=task_type, success=success, exit_status=self.last_subprocess_returncode,
+                            duration_s=round(time.monotonic() - task_start, 6), rusage=self.task_rusage)
 
             if success:
-                with lock:
-                    # Mark task as clean and update hash_sha256 if it runs successfully
+                # Mark task as clean and update hash_sha256 if it runs successfully
+                with lock, self.profiler.phase("checksum updates"):
                     self.mark_task_as_clean_in_dotbob_checksum_file(task_name)
-                    for dependent in dependency_graph.successors(task_name):
-                        # Only decrement the dependency_count if the parent task needs to be built, indicated by being in the dict
-                        if dependent in dependency_count:
-                            dependency_count[dependent] -= 1
-                            if dependency_count[dependent] == 0:
-                                ready_queue.put(dependent)
             else:
                 failure_info["task_name"] = task_name
                 failure_info["log_file_path"] = str(task_config.get("output_dir") / f"{task_name}.log")
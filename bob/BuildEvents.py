@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from pathlib import Path
+import json
+import os
+import resource
+import time
+import uuid
+
+
+def rusage_to_dict(rusage: resource.struct_rusage | None) -> dict | None:
+    """Return the CPU times (seconds) and peak resident set size (KiB on Linux) of a struct_rusage"""
+    if rusage is None:
+        return None
+    return {"user_s": round(rusage.ru_utime, 6), "sys_s": round(rusage.ru_stime, 6), "max_rss_kb": rusage.ru_maxrss}
+
+
+def merge_rusage(total: dict | None, rusage: dict | None) -> dict | None:
+    """Accumulate the rusage of several child processes: CPU times add up, peak RSS is the maximum"""
+    if rusage is None:
+        return total
+    if total is None:
+        return dict(rusage)
+    return {
+        "user_s": round(total["user_s"] + rusage["user_s"], 6),
+        "sys_s": round(total["sys_s"] + rusage["sys_s"], 6),
+        "max_rss_kb": max(total["max_rss_kb"], rusage["max_rss_kb"]),
+    }
+
+
+class BuildEventLog:
+    """Append-only, machine-readable stream of build events, one JSON object per line.
+
+    Every event carries 'event', 'ts' (epoch seconds), 'build_id' and 'pid'. Task worker processes share
+    the same file: each event is written with a single write() on an O_APPEND descriptor, so lines
+    from concurrent processes never interleave and no lock is needed.
+    """
+
+    def __init__(self, path: Path, build_id: str | None = None) -> None:
+        self.path = Path(path)
+        self.build_id = build_id or uuid.uuid4().hex[:12]
+
+    def emit(self, event: str, **fields) -> dict:
+        record = {"event": event, "ts": round(time.time(), 6), "build_id": self.build_id, "pid": os.getpid(), **fields}
+        line = (json.dumps(record, default=str) + "\n").encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        return record
+
+
+def read_build_events(path: Path, build_id: str | None = None) -> list[dict]:
+    """Load the events of an events.jsonl file, optionally only those of one build, skipping corrupt lines"""
+    events = []
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if build_id is None or event.get("build_id") == build_id:
+                    events.append(event)
+    except FileNotFoundError:
+        pass
+    return events
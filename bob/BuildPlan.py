@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from networkx import DiGraph, topological_sort
+import statistics
+
+HISTORY_SAMPLES = 5 # Most recent successful runs of a task its duration estimate is the median of
+
+
+def estimate_task_durations(events: list[dict], variant: str | None = None) -> dict[str, float]:
+    """Return the estimated duration (s) of each task with history: the median of its latest successful runs.
+
+    Runs of builds with the same variant are preferred, runs of other variants are only used for tasks without any.
+    """
+    build_variants = {event.get("build_id"): event.get("variant") for event in events if event.get("event") == "build_start"}
+    same_variant, any_variant = {}, {}
+    for event in events:
+        if event.get("event") != "task_end" or not event.get("success") or event.get("duration_s") is None:
+            continue
+        any_variant.setdefault(event["task"], []).append(event["duration_s"])
+        if build_variants.get(event.get("build_id")) == variant:
+            same_variant.setdefault(event["task"], []).append(event["duration_s"])
+    durations = {task: statistics.median(samples[-HISTORY_SAMPLES:]) for task, samples in any_variant.items()}
+    durations.update({task: statistics.median(samples[-HISTORY_SAMPLES:]) for task, samples in same_variant.items()})
+    return durations
+
+
+def critical_path(graph: DiGraph, durations: dict[str, float]) -> tuple[list[str], float]:
+    """Return the chain of dependent tasks with the longest total estimated duration, tasks without an estimate counting as 0 s.
+
+    Ties are broken by the number of tasks in the chain.
+    """
+    finish, previous = {}, {}
+    for task in topological_sort(graph):
+        previous[task] = max(graph.predecessors(task), key=finish.get, default=None)
+        start = finish[previous[task]] if previous[task] is not None else (0.0, 0)
+        finish[task] = (start[0] + durations.get(task, 0.0), start[1] + 1)
+    if not finish:
+        return [], 0.0
+    task = max(finish, key=finish.get)
+    path = [task]
+    while previous.get(task) is not None:
+        task = previous[task]
+        path.append(task)
+    return path[::-1], finish[path[0]][0]
+
+
+def simulate_schedule(graph: DiGraph, durations: dict[str, float], num_workers: int) -> float:
+    """Return the estimated wall-clock time (s) of building graph with num_workers, dispatching ready tasks in order like execute_tasks()"""
+    num_workers = max(1, num_workers)
+    remaining = {task: graph.in_degree(task) for task in graph.nodes}
+    ready = [task for task in topological_sort(graph) if remaining[task] == 0]
+    running: list[tuple[float, str]] = []
+    now = 0.0
+    while ready or running:
+        while ready and len(running) < num_workers:
+            task = ready.pop(0)
+            running.append((now + durations.get(task, 0.0), task))
+        running.sort()
+        now, task = running.pop(0)
+        for dependent in graph.successors(task):
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    return now
+
+
+def format_duration(duration_s: float | None) -> str:
+    if duration_s is None:
+        return "n/a"
+    if duration_s < 60:
+        return f"{duration_s:.1f}s"
+    minutes, seconds = divmod(round(duration_s), 60)
+    return f"{minutes}m{seconds:02d}s"
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+import ctypes
+import ctypes.util
+import logging
+import os
+import re
+import select
+import sys
+import time
+
+from bob.FileHash import file_digest, hash_factory
+
+# Files whose change invalidates the parsed configuration rather than a single task's inputs
+CONFIG_FILE_NAMES = {"ip_config.yaml", "tool_config.yaml", "task_config.yaml"}
+
+
+class InotifyWaiter:
+    """Block until something changes in a set of directories, using Linux inotify through libc.
+
+    Only used as a wake-up signal: BuildWatcher always re-stats its watched files and re-lists its
+    watched task directories to work out what actually changed, so events do not need to be decoded.
+    IN_CREATE and IN_MOVED_TO wake it up for files added to a task directory.
+    """
+
+    IN_MODIFY      = 0x00000002
+    IN_ATTRIB      = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM  = 0x00000040
+    IN_MOVED_TO    = 0x00000080
+    IN_CREATE      = 0x00000100
+    IN_DELETE      = 0x00000200
+    WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, directories: set[str]) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux.")
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc could not be located.")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1() failed")
+        for directory in directories:
+            if self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK) < 0:
+                err = ctypes.get_errno()
+                self.close()
+                raise OSError(err, f"inotify_add_watch() failed for '{directory}'")
+
+    def wait(self, timeout: float) -> bool:
+        """Return True if at least one event arrived within 'timeout' seconds, draining all pending events"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWaiter:
+    """Fallback waiter which simply sleeps, letting BuildWatcher re-stat its watched files and re-list its watched task directories periodically"""
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(timeout)
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class BuildWatcher:
+    """Keep a configured Bob resident and rebuild only the tasks affected by source file changes.
+
+    Parsed task_configs, the dependency graph and resolved tools stay in memory between rebuilds.
+    Each rebuild goes through Bob.execute_tasks(), so the usual executors and checksum handling apply.
+    A change to ip_config.yaml, tool_config.yaml or any task_config.yaml triggers 'reconfigure' instead,
+    as it can change the set of tasks or their source files. So does a file added to the directory of a
+    watched task, which its task_config.yaml may pick up as a new source file.
+    """
+
+    def __init__(self, bob, logger: logging.Logger, build_all_tasks: bool, selected_tasks: list[str],
+                 reconfigure: Callable[[], object] | None = None, poll_interval: float = 0.5,
+                 debounce_s: float = 0.2, use_inotify: bool = True) -> None:
+        self.bob = bob
+        self.logger = logger
+        self.build_all_tasks = build_all_tasks
+        self.selected_tasks = selected_tasks
+        self.reconfigure = reconfigure
+        self.poll_interval = poll_interval
+        self.debounce_s = debounce_s
+        self.use_inotify = use_inotify
+        self.watched_tasks: list[str] = []
+        self.file_owners: dict[str, set[str]] = {}
+        self.snapshot: dict[str, tuple[int, int] | None] = {}
+        self.content_hashes: dict[str, str | None] = {} # Last content hash of each watched file, None if it does not exist
+        self.dir_listings: dict[str, frozenset[str]] = {} # Last entries of each watched task directory
+        self.waiter = None
+
+    def resolve_watched_tasks(self) -> list[str]:
+        """Return the watched tasks (selected tasks plus their dependencies) in topological order"""
+        dependency_index = self.bob.get_dependency_index()
+        if self.build_all_tasks:
+            return dependency_index.topological_order() if dependency_index is not None else list(self.bob.task_configs)
+        task_names = self.bob.get_task_names_by_regex(self.selected_tasks)
+        if dependency_index is None:
+            return sorted(task_names)
+        return dependency_index.names_of(dependency_index.closure_mask(task_names))
+
+    def collect_watched_files(self, task_names: list[str]) -> dict[str, set[str]]:
+        """Map every input src file and task_config.yaml of the given tasks to the tasks consuming it.
+
+        Files within task output dirs are left out: they are written by the rebuilds themselves, and a rebuilt upstream task already rebuilds its consumers.
+        """
+        output_dir_prefixes = tuple(os.path.abspath(str(task_config["output_dir"])).rstrip(os.sep) + os.sep
+                                    for task_config in self.bob.task_configs.values() if task_config.get("output_dir"))
+        file_owners: dict[str, set[str]] = {}
+        for task_name in task_names:
+            task_config = self.bob.task_configs.get(task_name, {})
+            paths = list(task_config.get("input_src_files", []))
+            if task_config.get("task_config_file_path"):
+                paths.append(task_config["task_config_file_path"])
+            for path in paths:
+                path = os.path.abspath(str(path))
+                if not path.startswith(output_dir_prefixes):
+                    file_owners.setdefault(path, set()).add(task_name)
+        proj_root = Path(self.bob.proj_root)
+        for config_file in ("ip_config.yaml", "tool_config.yaml"):
+            file_owners.setdefault(str((proj_root / config_file).absolute()), set())
+        return file_owners
+
+    def collect_watched_dirs(self, task_names: list[str]) -> set[str]:
+        """Return the directories of the given tasks, i.e. the ones holding their task_config.yaml, leaving out task output dirs"""
+        output_dirs = {os.path.abspath(str(task_config["output_dir"])) for task_config in self.bob.task_configs.values() if task_config.get("output_dir")}
+        directories = set()
+        for task_name in task_names:
+            task_config = self.bob.task_configs.get(task_name, {})
+            task_dir = task_config.get("task_dir") or (os.path.dirname(str(task_config["task_config_file_path"])) if task_config.get("task_config_file_path") else None)
+            if task_dir and os.path.abspath(str(task_dir)) not in output_dirs:
+                directories.add(os.path.abspath(str(task_dir)))
+        return directories
+
+    @staticmethod
+    def list_dirs(directories) -> dict[str, frozenset[str]]:
+        """Return the entry names of each directory, empty if it cannot be listed"""
+        listings = {}
+        for directory in directories:
+            try:
+                listings[directory] = frozenset(os.listdir(directory))
+            except OSError:
+                listings[directory] = frozenset()
+        return listings
+
+    def detect_new_files(self) -> set[str]:
+        """Re-list the watched task directories, update the in-memory listings and return the paths of the entries added since.
+
+        Hidden files and backups ('~' suffix), e.g. editor swap files, are not new files.
+        """
+        current = self.list_dirs(self.dir_listings)
+        new_files = set()
+        for directory, names in current.items():
+            for name in names - self.dir_listings.get(directory, frozenset()):
+                if not name.startswith(".") and not name.endswith("~"):
+                    new_files.add(os.path.join(directory, name))
+        self.dir_listings = current
+        return new_files
+
+    @staticmethod
+    def stat_files(paths) -> dict[str, tuple[int, int] | None]:
+        """Return (mtime_ns, size) for each path, or None if it does not exist"""
+        snapshot = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+                snapshot[path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                snapshot[path] = None
+        return snapshot
+
+    def hash_file(self, path: str) -> str | None:
+        """Return the content hash of path with Bob's fingerprint hash, or None if it cannot be read"""
+        try:
+            return file_digest(path, hash_factory(self.bob.fingerprint_hash))
+        except OSError:
+            return None
+
+    def detect_changes(self) -> set[str]:
+        """Re-stat the watched files, update the in-memory snapshot and return the paths whose content changed.
+
+        Only files whose (mtime_ns, size) changed are re-hashed, a file touched or rewritten with the same content is not a change.
+        """
+        current = self.stat_files(self.file_owners)
+        changed = set()
+        for path, sig in current.items():
+            if self.snapshot.get(path) == sig:
+                continue
+            content_hash = self.hash_file(path) if sig is not None else None
+            if content_hash != self.content_hashes.get(path):
+                self.content_hashes[path] = content_hash
+                changed.add(path)
+        self.snapshot = current
+        return changed
+
+    def affected_tasks(self, changed_paths: set[str]) -> list[str]:
+        """Return the tasks owning a changed file, plus every watched task downstream of them, in topological order"""
+        owners = set()
+        for path in changed_paths:
+            owners.update(self.file_owners.get(path, ()))
+        if not owners:
+            return []
+        dependency_index = self.bob.get_dependency_index()
+        if dependency_index is None:
+            return sorted(owners)
+        affected_mask = 0
+        for owner in owners:
+            if owner in dependency_index:
+                affected_mask |= dependency_index.descendants_bits[dependency_index.ids[owner]] | (1 << dependency_index.ids[owner])
+        watched_mask = dependency_index.mask_of(self.watched_tasks)
+        return dependency_index.names_of(affected_mask & watched_mask)
+
+    def rebuild(self, task_names: list[str]) -> None:
+        """Rebuild exactly the given tasks through Bob.execute_tasks()"""
+        self.logger.info(f"Rebuilding {len(task_names)} affected task(s): {task_names}")
+        start = time.monotonic()
+        # Each rebuild is a new build invocation, which must not be served the metadata of the files that have just changed
+        self.bob.fs_snapshot.clear()
+        # Anchor each task name so that e.g. 'task_1' does not also match 'task_10' as a regex
+        self.bob.execute_tasks(False, [f"^{re.escape(task_name)}$" for task_name in task_names])
+        self.logger.info(f"Rebuild finished in {time.monotonic() - start:.2f}s. Watching for changes...")
+
+    def _setup_watch(self) -> None:
+        """(Re)compute the watched files and snapshot, and (re)create the waiter"""
+        self.watched_tasks = self.resolve_watched_tasks()
+        self.file_owners = self.collect_watched_files(self.watched_tasks)
+        self.snapshot = self.stat_files(self.file_owners)
+        self.content_hashes = {path: self.hash_file(path) if sig is not None else None for path, sig in self.snapshot.items()}
+        self.dir_listings = self.list_dirs(self.collect_watched_dirs(self.watched_tasks))
+        if self.waiter is not None:
+            self.waiter.close()
+        self.waiter = PollingWaiter()
+        if self.use_inotify:
+            directories = {os.path.dirname(path) for path in self.file_owners if os.path.isdir(os.path.dirname(path))}
+            directories.update(directory for directory in self.dir_listings if os.path.isdir(directory))
+            try:
+                self.waiter = InotifyWaiter(directories)
+            except OSError as oe:
+                self.logger.info(f"inotify unavailable ({oe}), falling back to polling every {self.poll_interval}s.")
+        self.logger.info(f"Watching {len(self.file_owners)} file(s) and {len(self.dir_listings)} task directories for {len(self.watched_tasks)} task(s) with {type(self.waiter).__name__}.")
+
+    def run(self, max_cycles: int | None = None) -> int:
+        """Watch for changes until interrupted (or 'max_cycles' wake-ups have been processed)"""
+        try:
+            self._setup_watch()
+            cycles = 0
+            while max_cycles is None or cycles < max_cycles:
+                cycles += 1
+                if not self.waiter.wait(self.poll_interval):
+                    continue
+                changed = self.detect_changes()
+                new_files = self.detect_new_files()
+                if not changed and not new_files:
+                    continue
+                # Editors and code generators often write several files in a burst, let it settle first
+                time.sleep(self.debounce_s)
+                changed |= self.detect_changes()
+                # Only the new files still there once the burst settled count, e.g. not the temporary files an editor writes and removes
+                new_files = {path for path in new_files | self.detect_new_files() if os.path.exists(path)}
+                if not changed and not new_files:
+                    continue
+                if changed:
+                    self.logger.info(f"Detected changes in: {sorted(changed)}")
+                if new_files:
+                    self.logger.info(f"Detected new files in task directories: {sorted(new_files)}")
+
+                if new_files or any(os.path.basename(path) in CONFIG_FILE_NAMES for path in changed):
+                    if self.reconfigure is None:
+                        self.logger.warning(f"Configuration files changed or new files were added but no reconfigure callback is available. Please restart watch mode.")
+                        continue
+                    self.logger.info(f"Configuration files changed or new files were added, reconfiguring.")
+                    self.bob = self.reconfigure()
+                    self._setup_watch()
+                    self.bob.execute_tasks(self.build_all_tasks, self.selected_tasks)
+                    continue
+
+                task_names = self.affected_tasks(changed)
+                if task_names:
+                    self.rebuild(task_names)
+            return 0
+
+        except KeyboardInterrupt:
+            self.logger.info(f"Watch mode interrupted, exiting.")
+            return 0
+
+        finally:
+            if self.waiter is not None:
+                self.waiter.close()
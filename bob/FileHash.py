@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+import hashlib
+import mmap
+import os
+
+DEFAULT_HASH_ALGORITHM = "sha256"
+MMAP_THRESHOLD = 16 << 20 # Files at least this large are hashed from a memory map, without copying them through a read buffer
+
+
+def _xxh3() -> Callable:
+    import xxhash
+    return xxhash.xxh3_128
+
+
+def _blake3() -> Callable:
+    from blake3 import blake3
+    return blake3
+
+
+# Constructors of the fingerprint hash objects, xxh3 and blake3 need the optional 'xxhash' and 'blake3' packages
+HASH_ALGORITHMS: dict[str, Callable[[], Callable]] = {
+    "sha256": lambda: hashlib.sha256,
+    "blake2b": lambda: hashlib.blake2b,
+    "xxh3": _xxh3,
+    "blake3": _blake3,
+}
+
+
+def hash_factory(algorithm: str) -> Callable:
+    """Return the constructor of algorithm's hash objects, raising ValueError if it is unknown and ImportError if it is unavailable"""
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unknown fingerprint hash '{algorithm}'. Expected one of {list(HASH_ALGORITHMS)}.")
+    return HASH_ALGORITHMS[algorithm]()
+
+
+def available_hash_algorithms() -> list[str]:
+    available = []
+    for algorithm in HASH_ALGORITHMS:
+        try:
+            hash_factory(algorithm)
+        except ImportError:
+            continue
+        available.append(algorithm)
+    return available
+
+
+def file_digest(path: str | Path, factory: Callable) -> str:
+    """Return the hex digest of a file, with hashlib.file_digest() or from a memory map for large files"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+            digest = factory()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+            return digest.hexdigest()
+        return hashlib.file_digest(f, factory).hexdigest()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from pathlib import Path
+import os
+
+
+class FsSnapshot:
+    """Existence, type and stat queries served from one os.scandir() per directory.
+
+    A snapshot lives for one build invocation. Dirs written during it, i.e. task output dirs, must be invalidated before being queried again.
+    """
+    def __init__(self) -> None:
+        self._dirs: dict[str, dict[str, os.DirEntry] | None] = {} # None for a dir which does not exist or cannot be listed
+        self._realpaths: dict[str, str] = {}
+        self.scandir_count = 0
+
+    def _entries(self, dir_path: str) -> dict[str, os.DirEntry] | None:
+        if dir_path not in self._dirs:
+            self.scandir_count += 1
+            try:
+                with os.scandir(dir_path) as it:
+                    self._dirs[dir_path] = {entry.name: entry for entry in it}
+            except OSError:
+                self._dirs[dir_path] = None
+        return self._dirs[dir_path]
+
+    def _entry(self, path: str | Path) -> os.DirEntry | None:
+        dir_path, name = os.path.split(os.path.abspath(path))
+        if not name:
+            return None
+        entries = self._entries(dir_path)
+        return entries.get(name) if entries else None
+
+    def exists(self, path: str | Path) -> bool:
+        if not os.path.split(os.path.abspath(path))[1]:
+            return True
+        return self.stat(path) is not None
+
+    def is_file(self, path: str | Path) -> bool:
+        entry = self._entry(path)
+        try:
+            return entry is not None and entry.is_file()
+        except OSError:
+            return False
+
+    def is_dir(self, path: str | Path) -> bool:
+        if not os.path.split(os.path.abspath(path))[1]:
+            return True
+        entry = self._entry(path)
+        try:
+            return entry is not None and entry.is_dir()
+        except OSError:
+            return False
+
+    def stat(self, path: str | Path) -> os.stat_result | None:
+        """Return the stat of path following symlinks, cached by its DirEntry, or None if path does not exist"""
+        entry = self._entry(path)
+        try:
+            return entry.stat() if entry is not None else None
+        except OSError:
+            # Dangling symlink
+            return None
+
+    def listdir(self, path: str | Path) -> list[str]:
+        """Return the names within dir path, in the order of os.scandir()"""
+        entries = self._entries(os.path.abspath(path))
+        return list(entries) if entries else []
+
+    def resolve(self, path: str | Path) -> Path:
+        """Return the absolute path with symlinks resolved, like Path.resolve()"""
+        path = os.path.abspath(path)
+        if path not in self._realpaths:
+            self._realpaths[path] = os.path.realpath(path)
+        return Path(self._realpaths[path])
+
+    def clear(self) -> None:
+        """Forget everything, starting the snapshot of a new build invocation"""
+        self._dirs.clear()
+        self._realpaths.clear()
+
+    def invalidate(self, path: str | Path) -> None:
+        """Forget path, and everything below it if it is a dir, such that the next queries see the filesystem again"""
+        path = os.path.abspath(path)
+        prefix = path.rstrip(os.sep) + os.sep
+        self._dirs.pop(os.path.dirname(path), None)
+        for cache in (self._dirs, self._realpaths):
+            for cached_path in [p for p in cache if p == path or p.startswith(prefix)]:
+                del cache[cached_path]
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from pathlib import Path
+import json
+import os
+import re
+
+from bob.FileHash import DEFAULT_HASH_ALGORITHM, file_digest, hash_factory
+
+OUTPUT_MANIFEST_FILE = ".bob_output_manifest.json" # Within the output dir of each task, written once the task succeeds
+_VERILATOR_TARGET_LINE = re.compile(r'^T\s.*"(?P<path>[^"]+)"\s*$')
+
+
+def build_output_manifest(output_dir: Path, output_files: list[Path], previous: dict | None = None, hash_algorithm: str = DEFAULT_HASH_ALGORITHM) -> dict:
+    """Return the manifest of output_files within output_dir, each with its size and hash, recording the hash algorithm.
+
+    The hash of a file whose size and mtime match the previous manifest is reused rather than recomputed, if hashed with the same algorithm.
+    """
+    output_dir = Path(output_dir)
+    factory = hash_factory(hash_algorithm)
+    previous_files = (previous or {}).get("files", {}) if (previous or {}).get("hash_algorithm") == hash_algorithm else {}
+    files = {}
+    for output_file in sorted(set(Path(f) for f in output_files)):
+        relpath = os.path.relpath(output_file, output_dir)
+        if relpath.startswith(os.pardir) or relpath == OUTPUT_MANIFEST_FILE or not output_file.is_file():
+            continue
+        stat = output_file.stat()
+        entry = previous_files.get(relpath, {})
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("hash"):
+            file_hash = entry["hash"]
+        else:
+            file_hash = file_digest(output_file, factory)
+        files[relpath] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": file_hash}
+    return {"hash_algorithm": hash_algorithm, "files": files}
+
+
+def write_output_manifest(output_dir: Path, manifest: dict) -> Path:
+    manifest_path = Path(output_dir) / OUTPUT_MANIFEST_FILE
+    tmp_path = manifest_path.with_name(f"{manifest_path.name}.tmp.{os.getpid()}")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest_path
+
+
+def load_output_manifest(output_dir: Path) -> dict | None:
+    """Return the manifest of a task's output dir, or None if the task has not written one"""
+    try:
+        with open(Path(output_dir) / OUTPUT_MANIFEST_FILE, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) and isinstance(manifest.get("files"), dict) else None
+
+
+def manifest_entries(output_dir: Path, manifest: dict, path: Path) -> dict[str, dict]:
+    """Return the manifest entries under path, which is either output_dir itself, a subdir or a single file, keyed by absolute path"""
+    output_dir = Path(output_dir)
+    relpath = os.path.relpath(path, output_dir)
+    return {str(output_dir / name): entry for name, entry in manifest["files"].items()
+            if relpath == os.curdir or name == relpath or name.startswith(relpath + os.sep)}
+
+
+def scan_output_dir(output_dir: Path, exclude_prefixes: tuple[str, ...] = ()) -> list[Path]:
+    """Return every file under output_dir, except the manifest and files whose name starts with one of exclude_prefixes"""
+    output_files = []
+    for root, _, files in os.walk(output_dir):
+        for name in files:
+            if name == OUTPUT_MANIFEST_FILE or name.startswith(exclude_prefixes):
+                continue
+            output_files.append(Path(root) / name)
+    return output_files
+
+
+def verilator_output_files(ver_files_dat: Path) -> list[Path]:
+    """Return the files verilator generated, from the target lines of its V<top>__verFiles.dat, plus the .dat file itself"""
+    ver_files_dat = Path(ver_files_dat)
+    output_files = [ver_files_dat]
+    with open(ver_files_dat, "r") as f:
+        for line in f:
+            match = _VERILATOR_TARGET_LINE.match(line.rstrip("\n"))
+            if match:
+                output_files.append(ver_files_dat.parent / match.group("path"))
+    return output_files
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from pathlib import Path
+import json
+import os
+
+# Flags which change the meaning of a precompiled header. Warning, include dir and output flags do not.
+_RELEVANT_FLAG_PREFIXES = ("-std", "-O", "-f", "-m", "-D", "-U", "-p", "-g", "-ansi", "-nostd")
+
+
+def pch_stub_path(output_dir: Path, task_name: str) -> Path:
+    """Return the header a producing task precompiles; its '.gch' sits next to it"""
+    return Path(output_dir) / f"{task_name}_pch.h"
+
+
+def pch_gch_path(stub_path: Path) -> Path:
+    return Path(f"{stub_path}.gch")
+
+
+def pch_fingerprint_path(stub_path: Path) -> Path:
+    return Path(f"{stub_path}.json")
+
+
+def relevant_pch_flags(flags: list[str]) -> list[str]:
+    """Return the sorted, de-duplicated flags which must match between producing and consuming a precompiled header"""
+    return sorted({str(flag) for flag in flags if str(flag).startswith(_RELEVANT_FLAG_PREFIXES)})
+
+
+def pch_fingerprint(compiler: dict, compiler_cmd: list[str]) -> dict:
+    """Fingerprint of a compiler command: compiler identity (path, version and machine) plus the flags relevant to precompiled headers"""
+    return {"compiler": compiler, "flags": relevant_pch_flags(compiler_cmd[1:])}
+
+
+def write_pch_stub(stub_path: Path, headers: list[str]) -> None:
+    """Write the header including every header to precompile, only rewriting it when its content changes"""
+    content = "// Precompiled header generated by bob, do not edit.\n" + "".join(f'#include "{os.path.abspath(header)}"\n' for header in headers)
+    if not stub_path.is_file() or stub_path.read_text() != content:
+        stub_path.write_text(content)
+
+
+def save_pch_fingerprint(stub_path: Path, fingerprint: dict) -> None:
+    with open(pch_fingerprint_path(stub_path), "w") as f:
+        json.dump(fingerprint, f, indent=2)
+
+
+def load_pch_fingerprint(stub_path: Path) -> dict | None:
+    try:
+        with open(pch_fingerprint_path(stub_path), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def pch_fingerprint_mismatch(produced: dict, consumed: dict) -> list[str]:
+    """Return human readable differences between the producer's and a consumer's fingerprint, empty if compatible"""
+    differences = []
+    for key in ("path", "version", "machine"):
+        if produced.get("compiler", {}).get(key) != consumed.get("compiler", {}).get(key):
+            differences.append(f"compiler {key}: {produced.get('compiler', {}).get(key)} != {consumed.get('compiler', {}).get(key)}")
+    produced_flags, consumed_flags = set(produced.get("flags", [])), set(consumed.get("flags", []))
+    if produced_flags != consumed_flags:
+        differences.append(f"flags only in producer: {sorted(produced_flags - consumed_flags)}, only in consumer: {sorted(consumed_flags - produced_flags)}")
+    return differences
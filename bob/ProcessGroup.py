@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import Callable
+import ctypes
+import multiprocessing
+import os
+import time
+
+PR_SET_CHILD_SUBREAPER = 36 # From <linux/prctl.h>
+
+
+def run_in_new_process_group(target: Callable, *args):
+    """Process target: lead a new process group, which every subprocess spawned by target then belongs to, and run target(*args)"""
+    os.setpgid(0, 0)
+    return target(*args)
+
+
+def start_process_group(target: Callable, args: tuple) -> multiprocessing.Process:
+    """Start a process running target(*args) as the leader of a new process group, whose id is the process's pid"""
+    process = multiprocessing.Process(target=run_in_new_process_group, args=(target, *args))
+    process.start()
+    # Set by both the parent and the child, such that the group exists whichever runs first
+    try:
+        os.setpgid(process.pid, process.pid)
+    except OSError:
+        pass
+    return process
+
+
+def become_child_subreaper() -> bool:
+    """Adopt orphaned descendants (Linux only), such that this process can reap them rather than init"""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def signal_process_group(pgid: int, sig: int) -> bool:
+    """Send sig to every process of group pgid, return False if the group no longer exists"""
+    try:
+        os.killpg(pgid, sig)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def reap_process_group(pgid: int) -> bool:
+    """Reap the exited children of this process within group pgid, return True once the group has no process left"""
+    while True:
+        try:
+            pid, _ = os.waitpid(-pgid, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            break
+    return not signal_process_group(pgid, 0)
+
+
+def wait_process_groups(leaders: list[multiprocessing.Process], timeout_s: float, poll_interval_s: float = 0.05) -> list[multiprocessing.Process]:
+    """Wait until each group leader has exited and every process of its group has been reaped.
+
+    Return the leaders whose group is still alive after timeout_s.
+    """
+    deadline = time.monotonic() + timeout_s
+    while True:
+        # The leader is reaped by is_alive() before the rest of its group, multiprocessing would not notice otherwise
+        remaining = [leader for leader in leaders if leader.is_alive() or not reap_process_group(leader.pid)]
+        if not remaining or time.monotonic() >= deadline:
+            return remaining
+        time.sleep(poll_interval_s)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+
+import yaml
+
+PGO_SUBDIR = "pgo"
+PGO_PROFILE_FILE = "profile.json"
+GCOV_DATA_SUBDIR = "gcda" # Within each training run dir, holding the .gcda files written by that run
+
+
+def pgo_fingerprint(src_files: list[str], build_config: list[str]) -> dict:
+    """Fingerprint of a PGO profile: content hash of the RTL and tb sources, plus the verilator/C++ flags of the build"""
+    src_hash = hashlib.sha256()
+    for src in sorted(set(str(src) for src in src_files)):
+        src_hash.update(src.encode())
+        with open(src, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                src_hash.update(chunk)
+    return {"src_sha256": src_hash.hexdigest(), "config": list(build_config)}
+
+
+def pgo_key(fingerprint: dict) -> str:
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def pgo_profile_id(metadata: dict) -> str:
+    """Identity of a stored profile, passed to verilator.mk: unlike its key, it changes whenever the profile is trained again"""
+    return hashlib.sha256(json.dumps(metadata, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def gcov_prefix_strip(profile_dir: Path) -> int:
+    """Return GCOV_PREFIX_STRIP relocating .gcda files compiled for profile_dir under GCOV_PREFIX"""
+    return len(Path(profile_dir).parts) - 1
+
+
+def write_training_plan(plan_path: Path, output_executable: str, instrumented_executable: Path, profile_dir: Path, runs_dir: Path, out_path: Path) -> int:
+    """Write a copy of a campaign plan running the instrumented executable in place of 'output_executable'.
+
+    Binaries of other tasks are dropped. Each run writes its .gcda files to its own run dir, such that concurrent
+    runs never share a profile. Returns the number of binary entries kept.
+    """
+    with open(plan_path, "r") as f:
+        plan = yaml.safe_load(f) or {}
+    binaries = []
+    for entry in plan.get("binaries", None) or []:
+        if Path(str(entry.get("binary", ""))).name != output_executable:
+            continue
+        entry = dict(entry, binary=str(instrumented_executable), coverage=False)
+        entry.pop("reproduce_binary", None)
+        entry["env"] = dict(entry.get("env", None) or {}, GCOV_PREFIX=f"{{run_dir}}/{GCOV_DATA_SUBDIR}", GCOV_PREFIX_STRIP=str(gcov_prefix_strip(profile_dir)))
+        binaries.append(entry)
+    plan["binaries"] = binaries
+    plan["output_dir"] = str(runs_dir)
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as f:
+        yaml.safe_dump(plan, f, sort_keys=False)
+    return len(binaries)
+
+
+def find_gcov_data_dirs(runs_dir: Path) -> list[Path]:
+    """Return the .gcda dirs of the training runs under runs_dir which wrote a profile"""
+    return sorted(path for path in Path(runs_dir).glob(f"*/*/{GCOV_DATA_SUBDIR}") if path.is_dir() and any(path.rglob("*.gcda")))
+
+
+def save_pgo_profile(profile_store_dir: Path, merged_dir: Path, metadata: dict) -> None:
+    """Replace the stored profile of a task with the merged .gcda files and their metadata"""
+    profile_store_dir = Path(profile_store_dir)
+    staging_dir = profile_store_dir.with_name(f"{profile_store_dir.name}.tmp.{os.getpid()}")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    shutil.copytree(merged_dir, staging_dir)
+    with open(staging_dir / PGO_PROFILE_FILE, "w") as f:
+        json.dump(metadata, f, indent=2)
+    shutil.rmtree(profile_store_dir, ignore_errors=True)
+    os.replace(staging_dir, profile_store_dir)
+
+
+def load_pgo_profile(profile_store_dir: Path) -> dict | None:
+    """Return the metadata of the stored profile of a task, or None if there is none"""
+    try:
+        with open(Path(profile_store_dir) / PGO_PROFILE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
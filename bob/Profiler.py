@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import pstats
+import shutil
+import time
+
+PROFILE_MODES = ("cprofile", "wall")
+WORKER_PHASE = "task workers" # Phases recorded within task worker processes are nested under this one, summed over the workers
+
+
+class NullProfiler:
+    """Stands in for a Profiler when profiling is disabled, such that instrumented code does no timing at all"""
+    enabled = False
+    _NULL_PHASE = contextlib.nullcontext()
+
+    def phase(self, name: str) -> contextlib.AbstractContextManager:
+        return self._NULL_PHASE
+
+    def worker(self, target: Callable) -> Callable:
+        return target
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    """Wall-clock time of each build phase and, in 'cprofile' mode, cProfile stats of this process and of every task worker process.
+
+    Everything is written to output_dir by stop(): phases.json, and parent.prof, worker_<pid>.prof and their merge combined.prof for 'cprofile'.
+    """
+    enabled = True
+
+    def __init__(self, mode: str, output_dir: Path) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}'. Expected one of {list(PROFILE_MODES)}.")
+        self.mode = mode
+        self.output_dir = Path(output_dir)
+        self.phase_times: dict[str, float] = {} # Keyed by the '/' joined names of the enclosing phases
+        self._stack: list[str] = []
+        self._profile: cProfile.Profile | None = None
+        self._start: float | None = None
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        self._stack.append(name)
+        key = "/".join(self._stack)
+        self.phase_times.setdefault(key, 0.0) # On entry, such that phases are listed before the phases nested in them
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[key] += time.perf_counter() - start
+            self._stack.pop()
+
+    def start(self) -> None:
+        """Start profiling, removing the output of a previous run"""
+        if self.output_dir.exists():
+            shutil.rmtree(self.output_dir)
+        self.output_dir.mkdir(parents=True)
+        self._start = time.perf_counter()
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def worker(self, target: Callable) -> Callable:
+        """Wrap the target of a task worker process, such that its phases and cProfile stats are dumped to output_dir when it returns"""
+        return functools.partial(self._run_worker, target)
+
+    def _run_worker(self, target: Callable, *args):
+        # The parent's state is inherited by fork, only what happens within this process is recorded
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile = cProfile.Profile()
+        self.phase_times = {}
+        self._stack = []
+        try:
+            with self.phase(WORKER_PHASE):
+                if self._profile is None:
+                    return target(*args)
+                return self._profile.runcall(target, *args)
+        finally:
+            if self._profile is not None:
+                self._profile.dump_stats(self.output_dir / f"worker_{os.getpid()}.prof")
+            with open(self.output_dir / f"worker_{os.getpid()}.json", "w") as f:
+                json.dump(self.phase_times, f)
+
+    def stop(self) -> dict:
+        """Stop profiling, merge the worker dumps and write them to output_dir, return the summary written to phases.json"""
+        total_s = time.perf_counter() - self._start if self._start is not None else 0.0
+        worker_files = sorted(self.output_dir.glob("worker_*.json"))
+        worker_phase_times: dict[str, float] = {}
+        for worker_file in worker_files:
+            try:
+                with open(worker_file) as f:
+                    for key, duration_s in json.load(f).items():
+                        worker_phase_times[key] = worker_phase_times.get(key, 0.0) + duration_s
+            except (OSError, ValueError):
+                # A worker killed before it could write its phases
+                continue
+        summary = {"mode": self.mode, "total_s": total_s, "phases": self.phase_times, "workers": len(worker_files), "worker_phases": worker_phase_times}
+
+        if self._profile is not None:
+            self._profile.disable()
+            parent_dump = self.output_dir / "parent.prof"
+            self._profile.dump_stats(parent_dump)
+            self._profile = None
+            stats = pstats.Stats(str(parent_dump))
+            for worker_dump in sorted(self.output_dir.glob("worker_*.prof")):
+                stats.add(str(worker_dump))
+            stats.dump_stats(self.output_dir / "combined.prof")
+            summary["combined_profile"] = str(self.output_dir / "combined.prof")
+
+        with open(self.output_dir / "phases.json", "w") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def format_phase_table(summary: dict) -> str:
+    """Return the wall-clock table of a summary returned by Profiler.stop(), nested phases indented below their parent"""
+    lines = [f"{'PHASE':<40} {'WALL(s)':>9} {'%':>6}", "-" * 57]
+    total_s = summary["total_s"] or 1.0
+
+    def rows(phase_times: dict[str, float], suffix: str = ""):
+        for key, duration_s in phase_times.items():
+            depth = key.count("/")
+            name = "  " * depth + key.rsplit("/", 1)[-1] + (suffix if not depth else "")
+            lines.append(f"{name:<40} {duration_s:>9.3f} {100 * duration_s / total_s:>5.1f}%")
+
+    rows(summary["phases"])
+    if summary["worker_phases"]:
+        rows(summary["worker_phases"], f" ({summary['workers']} summed)")
+    lines.append("-" * 57)
+    lines.append(f"{'total':<40} {summary['total_s']:>9.3f}")
+    return "\n".join(lines)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from pathlib import Path
+import shutil
+import time
+
+from campaign.backends.base import JobBackend
+from campaign.backends.local import LocalBackend
+from campaign.backends.slurm import SlurmBackend
+from campaign.job_spec import JobSpec, JobStatus
+
+REMOTE_BACKENDS = ("local", "slurm")
+REMOTE_SUBDIR = ".remote" # Within the output dir of a remote task, one run dir per command, on the storage shared with the compute nodes
+REMOTE_LOG = "command.log"
+REMOTE_POLL_INTERVAL_S = 1.0
+REMOTE_RESOURCE_KEYS = ("cpus", "mem_mb", "time_limit_min")
+REMOTE_DEFAULT_MEM_MB_PER_CPU = 2048
+REMOTE_DEFAULT_TIME_LIMIT_MIN = 60
+
+# Runs the command in its cwd, capturing its output and exit status within the run dir, since JobBackends neither take a cwd nor keep output
+REMOTE_WRAPPER = 'log="$1"; cwd="$2"; shift 2; cd "$cwd" || exit 1; "$@" >"$log" 2>&1; status=$?; echo "$status" >"$log.status"; exit "$status"'
+
+
+class RemoteJobInterrupted(Exception):
+    """Raised within a task process waiting for its remote job when the build is aborted"""
+
+
+def raise_remote_job_interrupted(signum, frame) -> None:
+    """SIGTERM handler of a task process waiting for its remote job, such that the job is cancelled before the process exits"""
+    raise RemoteJobInterrupted(f"Interrupted by signal {signum}")
+
+
+def make_jobs_of(cmd: list[str]) -> int | None:
+    """Return the parallel jobs of a make command, e.g. 8 for 'make -j 8' / 'make -j8' / 'make --jobs=8', or None"""
+    if not cmd or Path(str(cmd[0])).name != "make":
+        return None
+    args = [str(arg) for arg in cmd[1:]]
+    for idx, arg in enumerate(args):
+        value = None
+        if arg in ("-j", "--jobs") and idx + 1 < len(args):
+            value = args[idx + 1]
+        elif arg.startswith("--jobs="):
+            value = arg.split("=", 1)[1]
+        elif arg.startswith("-j") and arg[2:]:
+            value = arg[2:]
+        if value is not None and value.isdigit() and int(value) > 0:
+            return int(value)
+    return None
+
+
+def remote_job_resources(cmd: list[str], remote_resources: dict | None = None) -> dict[str, int]:
+    """Return the resources of the job running a command: the task's 'remote_resources', by default one CPU per make job,
+    REMOTE_DEFAULT_MEM_MB_PER_CPU per CPU and REMOTE_DEFAULT_TIME_LIMIT_MIN"""
+    resources = dict(remote_resources or {})
+    resources.setdefault("cpus", make_jobs_of(cmd) or 1)
+    resources.setdefault("mem_mb", resources["cpus"] * REMOTE_DEFAULT_MEM_MB_PER_CPU)
+    resources.setdefault("time_limit_min", REMOTE_DEFAULT_TIME_LIMIT_MIN)
+    return resources
+
+
+def make_remote_backend(name: str) -> JobBackend:
+    """Return the JobBackend running the commands of remote tasks: 'local' runs them on this machine, standing in for compute nodes"""
+    if name == "slurm":
+        return SlurmBackend()
+    if name == "local":
+        return LocalBackend(max_workers=1)
+    raise ValueError(f"Unknown remote backend '{name}'. Expected one of {list(REMOTE_BACKENDS)}.")
+
+
+def remote_job_spec(task_name: str, index: int, cmd: list[str], env: dict[str, str], cwd: str | Path, output_dir: Path, resources: dict[str, int] | None = None) -> JobSpec:
+    """Return the JobSpec of the index-th command of a task, whose run dir under output_dir is emptied first.
+
+    The job is killed after the time_limit_min of its resources, see remote_job_resources().
+    """
+    resources = remote_job_resources(cmd) if resources is None else resources
+    run_dir = Path(output_dir) / REMOTE_SUBDIR / f"{index:03d}"
+    shutil.rmtree(run_dir, ignore_errors=True)
+    run_dir.mkdir(parents=True)
+    log_path = run_dir / REMOTE_LOG
+    args = ["/bin/sh", "-c", REMOTE_WRAPPER, "sh", str(log_path), str(cwd), *(str(arg) for arg in cmd)]
+    return JobSpec(job_id=f"bob_{task_name}_{index:03d}_{time.time_ns():x}", binary=Path(args[0]), args=args, output_dir=run_dir,
+                   test_name=None, seed=0, resources=resources, job_wall_timeout_s=resources["time_limit_min"] * 60,
+                   env={key: str(val) for key, val in env.items()}, wrapper=True)
+
+
+def wait_remote_job(backend: JobBackend, job_id: str, poll_interval_s: float = REMOTE_POLL_INTERVAL_S) -> JobStatus:
+    """Block until the job is terminal, return its status"""
+    while True:
+        status = backend.poll([job_id])[job_id]
+        if status.is_terminal:
+            return status
+        if hasattr(backend, "wait_for_change"):
+            backend.wait_for_change(timeout=poll_interval_s)
+        else:
+            time.sleep(poll_interval_s)
+
+
+def read_remote_exit_status(run_dir: Path) -> int | None:
+    """Return the exit status of the command run within run_dir, or None if it did not run to completion"""
+    try:
+        return int((Path(run_dir) / f"{REMOTE_LOG}.status").read_text().strip())
+    except (OSError, ValueError):
+        return None
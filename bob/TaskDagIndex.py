@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from networkx import DiGraph, topological_sort, NetworkXUnfeasible
+
+
+class TaskDagIndex:
+    """Compact, integer-indexed view of a task dependency DAG.
+
+    Built once from the networkx DiGraph produced by IpConfigParser.build_task_dependency_graph().
+    Every task is assigned an integer id equal to its position in a precomputed topological order,
+    so "sort in execution order" is simply "sort by id". Ancestor and descendant sets are stored as
+    Python int bitsets (bit i set <=> task i is reachable), which makes reachability queries and set
+    unions over thousands of tasks a handful of big-int operations instead of repeated graph walks.
+    """
+
+    def __init__(self, graph: DiGraph) -> None:
+        if not isinstance(graph, DiGraph):
+            raise TypeError(f"TaskDagIndex expects a networkx DiGraph, got {type(graph)}.")
+        try:
+            order = list(topological_sort(graph))
+        except NetworkXUnfeasible:
+            raise ValueError("Cyclic dependency detected, cannot build TaskDagIndex.")
+
+        self.source_graph: DiGraph = graph
+        self._source_nodes: frozenset[str] = frozenset(graph.nodes)
+        self._source_edges: frozenset[tuple[str, str]] = frozenset(graph.edges)
+        self.names: list[str] = order
+        self.ids: dict[str, int] = {name: i for i, name in enumerate(order)}
+
+        # Successor/predecessor arrays, stored as tuples of ids sorted in topological order
+        self.successors: list[tuple[int, ...]] = [
+            tuple(sorted(self.ids[s] for s in graph.successors(name))) for name in order
+        ]
+        self.predecessors: list[tuple[int, ...]] = [
+            tuple(sorted(self.ids[p] for p in graph.predecessors(name))) for name in order
+        ]
+
+        # Reachability bitsets. Predecessors always have a smaller id, so a single forward pass
+        # computes ancestors and a single backward pass computes descendants.
+        n = len(order)
+        ancestors_bits = [0] * n
+        for i in range(n):
+            bits = 0
+            for p in self.predecessors[i]:
+                bits |= ancestors_bits[p] | (1 << p)
+            ancestors_bits[i] = bits
+        descendants_bits = [0] * n
+        for i in range(n - 1, -1, -1):
+            bits = 0
+            for s in self.successors[i]:
+                bits |= descendants_bits[s] | (1 << s)
+            descendants_bits[i] = bits
+        self.ancestors_bits: list[int] = ancestors_bits
+        self.descendants_bits: list[int] = descendants_bits
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, task_name: object) -> bool:
+        return task_name in self.ids
+
+    def is_stale_for(self, graph: DiGraph | None) -> bool:
+        """Return True if this index was not built from 'graph' or 'graph' has been mutated since"""
+        if graph is not self.source_graph:
+            return True
+        # Compare the node and edge sets themselves: a mutation may keep their sizes, e.g. an edge rewired to another task
+        return frozenset(graph.nodes) != self._source_nodes or frozenset(graph.edges) != self._source_edges
+
+    def mask_of(self, task_names: Iterable[str]) -> int:
+        """Return the bitset of the given task names, ignoring names not in the index"""
+        mask = 0
+        for name in task_names:
+            i = self.ids.get(name)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def names_of(self, mask: int) -> list[str]:
+        """Return the task names within a bitset, in topological order"""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.names[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+    def topological_order(self) -> list[str]:
+        """Return all tasks in the precomputed topological order"""
+        return list(self.names)
+
+    def order_tasks(self, task_names: Iterable[str]) -> list[str]:
+        """Return the given tasks sorted into topological order"""
+        return self.names_of(self.mask_of(task_names))
+
+    def ancestors(self, task_name: str) -> list[str]:
+        """Return all tasks having a path to 'task_name', in topological order"""
+        return self.names_of(self.ancestors_bits[self.ids[task_name]])
+
+    def descendants(self, task_name: str) -> list[str]:
+        """Return all tasks reachable from 'task_name', in topological order"""
+        return self.names_of(self.descendants_bits[self.ids[task_name]])
+
+    def closure_mask(self, task_names: Iterable[str]) -> int:
+        """Return the bitset of the given tasks plus all of their ancestors"""
+        mask = 0
+        for name in task_names:
+            i = self.ids.get(name)
+            if i is not None:
+                mask |= self.ancestors_bits[i] | (1 << i)
+        return mask
+
+    def subgraph(self, mask: int) -> DiGraph:
+        """Build a standalone DiGraph containing only the tasks in 'mask' and the edges between them"""
+        graph = DiGraph()
+        members = []
+        while mask:
+            low = mask & -mask
+            members.append(low.bit_length() - 1)
+            mask ^= low
+        graph.add_nodes_from(self.names[i] for i in members)
+        member_set = set(members)
+        graph.add_edges_from(
+            (self.names[i], self.names[s]) for i in members for s in self.successors[i] if s in member_set
+        )
+        return graph
+
+    def dependency_counts(self, mask: int) -> dict[str, int]:
+        """Return, for each task in 'mask', the number of its direct dependencies also within 'mask'"""
+        counts = {}
+        remaining = mask
+        while remaining:
+            low = remaining & -remaining
+            i = low.bit_length() - 1
+            counts[self.names[i]] = sum(1 for p in self.predecessors[i] if (mask >> p) & 1)
+            remaining ^= low
+        return counts
+
+    def ready_set(self, mask: int) -> "TaskReadySet":
+        """Return a ready-set tracker restricted to the tasks in 'mask'"""
+        return TaskReadySet(self, mask)
+
+
+class TaskReadySet:
+    """Track which tasks within a TaskDagIndex subset have all of their dependencies completed"""
+
+    def __init__(self, index: TaskDagIndex, mask: int) -> None:
+        self.index = index
+        self.mask = mask
+        self.pending: dict[str, int] = index.dependency_counts(mask)
+        self.ready: list[str] = [name for name, count in self.pending.items() if count == 0]
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def task_names(self) -> list[str]:
+        """Return all tasks of the subset, in topological order"""
+        return self.index.names_of(self.mask)
+
+    def pop_ready(self) -> list[str]:
+        """Return and clear the tasks that are currently ready, in topological order"""
+        ready, self.ready = self.ready, []
+        return ready
+
+    def complete(self, task_name: str) -> list[str]:
+        """Mark 'task_name' as completed and return the tasks that became ready as a result"""
+        newly_ready = []
+        for s in self.index.successors[self.index.ids[task_name]]:
+            if not (self.mask >> s) & 1:
+                continue
+            name = self.index.names[s]
+            self.pending[name] -= 1
+            if self.pending[name] == 0:
+                newly_ready.append(name)
+        self.ready.extend(newly_ready)
+        return newly_ready
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+import gzip
+import io
+import json
+import os
+import re
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# File extension of a task log for each supported compression
+LOG_COMPRESSION_EXTENSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# Lines reported by 'bob log --errors'. '-Werror' style flags do not match as 'error' is not a separate word there.
+ERROR_LINE_PATTERN = re.compile(rb"^.*\b(?:error|fatal)\b.*$", re.IGNORECASE | re.MULTILINE)
+
+# Timestamp prefix added to each line by Bob.capture_subprocess_output()
+LINE_TIMESTAMP_PATTERN = re.compile(rb"\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] ")
+
+INDEX_SUFFIX = ".idx"
+
+
+def resolve_log_compression(compression: str | None) -> str:
+    """Return the compression to actually use, falling back from zstd to gzip when zstandard is not installed"""
+    compression = compression or "none"
+    if compression not in LOG_COMPRESSION_EXTENSIONS:
+        raise ValueError(f"Unknown log compression '{compression}', expected one of {list(LOG_COMPRESSION_EXTENSIONS)}.")
+    if compression == "zstd" and zstandard is None:
+        return "gzip"
+    return compression
+
+
+def parse_since(since: str, now: float | None = None) -> float:
+    """Parse a '--since' value into an epoch time: a relative age ('90s', '15m', '2h', '1d') or a local 'YYYY-MM-DD HH:MM:SS' / 'HH:MM:SS' time"""
+    now = time.time() if now is None else now
+    since = since.strip()
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if since and since[-1] in units and since[:-1].replace(".", "", 1).isdigit():
+        return now - float(since[:-1]) * units[since[-1]]
+    for time_format in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(since, time_format))
+        except ValueError:
+            pass
+    try:
+        clock = time.strptime(since, "%H:%M:%S")
+    except ValueError:
+        raise ValueError(f"Cannot parse --since value '{since}'. Use e.g. '15m', '2h', 'HH:MM:SS' or 'YYYY-MM-DD HH:MM:SS'.")
+    today = time.localtime(now)
+    return time.mktime((today.tm_year, today.tm_mon, today.tm_mday, clock.tm_hour, clock.tm_min, clock.tm_sec, 0, 0, -1))
+
+
+def log_generation_path(log_file_path: Path, compression: str, generation: int = 0) -> Path:
+    """Return the path of a log generation, e.g. 'task.log.gz' for generation 0 and 'task.log.2.gz' for generation 2"""
+    generation_suffix = f".{generation}" if generation else ""
+    return log_file_path.with_name(f"{log_file_path.name}{generation_suffix}{LOG_COMPRESSION_EXTENSIONS[compression]}")
+
+
+def index_path_of(log_path: Path) -> Path:
+    """Return the path of the sidecar index of a log file"""
+    return log_path.with_name(log_path.name + INDEX_SUFFIX)
+
+
+def find_log_generation(log_file_path: Path, generation: int = 0) -> Path | None:
+    """Return the existing log file of a generation, whatever compression it was written with"""
+    for compression in LOG_COMPRESSION_EXTENSIONS:
+        path = log_generation_path(log_file_path, compression, generation)
+        if path.is_file():
+            return path
+    return None
+
+
+def rotate_task_logs(log_file_path: Path, generations: int) -> None:
+    """Shift existing generations of a log up by one, keeping at most 'generations' - 1 of them, so that a new generation 0 can be written"""
+    generations = max(1, generations)
+    for generation in range(generations - 1, -1, -1):
+        for compression in LOG_COMPRESSION_EXTENSIONS:
+            path = log_generation_path(log_file_path, compression, generation)
+            if not path.exists():
+                continue
+            index_path = index_path_of(path)
+            if generation + 1 >= generations:
+                path.unlink()
+                index_path.unlink(missing_ok=True)
+            else:
+                next_path = log_generation_path(log_file_path, compression, generation + 1)
+                os.replace(path, next_path)
+                if index_path.exists():
+                    os.replace(index_path, index_path_of(next_path))
+                else:
+                    index_path_of(next_path).unlink(missing_ok=True)
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+class TaskLogWriter:
+    """Binary, buffered per-task log writer producing independently decompressible frames.
+
+    Written data is buffered and emitted as frames of about 'frame_size' bytes, cut at a line boundary.
+    With gzip or zstd each frame is a complete gzip member / zstd frame, so the file as a whole is a
+    regular .gz/.zst file while any single frame can also be decompressed on its own. A sidecar index
+    ('<log>.idx', JSON) records, for every frame, its byte offset in the file, its offset in the
+    uncompressed stream, the wall-clock time span it covers and the offsets of error lines within it.
+    """
+
+    def __init__(self, path: Path, compression: str = "none", frame_size: int = 1 << 20) -> None:
+        self.path = Path(path)
+        self.compression = compression
+        self.frame_size = frame_size
+        self.index_path = index_path_of(self.path)
+        self._file = open(self.path, "wb")
+        self._buffer = bytearray()
+        self._buffer_ts: float | None = None
+        self._raw_offset = 0
+        self._raw_ts: float | None = None
+        self.frames: list[dict] = []
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def write(self, data: bytes) -> int:
+        if not data:
+            return 0
+        if self._buffer_ts is None:
+            self._buffer_ts = time.time()
+        self._buffer += data
+        while len(self._buffer) >= self.frame_size:
+            self._emit_frame(final=False)
+        return len(data)
+
+    def fileno(self) -> int:
+        """Return the underlying file descriptor, only possible for uncompressed logs"""
+        if self.compression != "none":
+            raise io.UnsupportedOperation(f"A {self.compression} compressed task log has no file descriptor to write raw output to.")
+        if self._raw_ts is None:
+            self._raw_ts = time.time()
+        return self._file.fileno()
+
+    def _index_raw_region(self) -> None:
+        """Index the output written straight into the file descriptor (raw mode) since the last frame as a frame of its own"""
+        if self.compression != "none":
+            return
+        self._file.flush()
+        end = self._file.tell()
+        if end <= self._raw_offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._raw_offset)
+            data = f.read(end - self._raw_offset)
+        now = time.time()
+        self.frames.append({
+            "offset": self._raw_offset,
+            "size": len(data),
+            "raw_offset": self._raw_offset,
+            "raw_size": len(data),
+            "ts_start": self._raw_ts if self._raw_ts is not None else now,
+            "ts_end": now,
+            "errors": [match.start() for match in ERROR_LINE_PATTERN.finditer(data)],
+        })
+        self._raw_offset = end
+        self._raw_ts = None
+
+    def _emit_frame(self, final: bool) -> None:
+        """Compress and write up to 'frame_size' buffered bytes as one frame, ending on a line boundary unless 'final'"""
+        if not self._buffer:
+            return
+        cut = len(self._buffer)
+        if not final:
+            newline = self._buffer.rfind(b"\n", 0, self.frame_size)
+            if newline < 0:
+                # A single line longer than a frame, keep it whole
+                newline = self._buffer.find(b"\n", self.frame_size)
+            if newline >= 0:
+                cut = newline + 1
+        data = bytes(self._buffer[:cut])
+        del self._buffer[:cut]
+
+        self._index_raw_region()
+        offset = self._file.tell()
+        payload = _compress(data, self.compression)
+        self._file.write(payload)
+        self.frames.append({
+            "offset": offset,
+            "size": len(payload),
+            "raw_offset": self._raw_offset,
+            "raw_size": len(data),
+            "ts_start": self._buffer_ts,
+            "ts_end": time.time(),
+            "errors": [match.start() for match in ERROR_LINE_PATTERN.finditer(data)],
+        })
+        self._raw_offset += len(data)
+        self._buffer_ts = time.time() if self._buffer else None
+
+    def write_index(self) -> None:
+        index = {"compression": self.compression, "frames": self.frames}
+        with open(self.index_path, "w") as f:
+            json.dump(index, f)
+
+    def flush(self) -> None:
+        while len(self._buffer) >= self.frame_size:
+            self._emit_frame(final=False)
+        self._emit_frame(final=True)
+        self._index_raw_region()
+        self._file.flush()
+        self.write_index()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> "TaskLogWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TaskLogReader:
+    """Read a task log written by TaskLogWriter, using its sidecar index to decompress only the relevant frames.
+
+    Logs without an index (e.g. written by an older Bob), or whose index has no frames although the log
+    has content (raw output of an older Bob), are read in full and treated as a single frame.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.compression = next((c for c, ext in LOG_COMPRESSION_EXTENSIONS.items() if ext and self.path.name.endswith(ext)), "none")
+        self.frames: list[dict] | None = None
+        index_path = index_path_of(self.path)
+        if index_path.is_file():
+            try:
+                with open(index_path, "r") as f:
+                    self.frames = json.load(f).get("frames", [])
+            except (OSError, ValueError):
+                self.frames = None
+        if self.frames == [] and self.path.is_file() and self.path.stat().st_size > 0:
+            self.frames = None
+
+    def read_frame(self, frame: dict) -> bytes:
+        with open(self.path, "rb") as f:
+            f.seek(frame["offset"])
+            return _decompress(f.read(frame["size"]), self.compression)
+
+    def _read_all(self) -> bytes:
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if self.compression == "gzip":
+            return gzip.decompress(data)
+        if self.compression == "zstd":
+            if zstandard is None:
+                raise RuntimeError(f"zstandard is required to read '{self.path}'.")
+            return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True).read()
+        return data
+
+    def iter_frames_since(self, since: float | None = None) -> Iterator[bytes]:
+        """Yield the decompressed frames holding output written at or after the 'since' epoch time"""
+        if self.frames is None:
+            yield self._read_all()
+            return
+        for frame in self.frames:
+            if since is not None and frame["ts_end"] is not None and frame["ts_end"] < since:
+                continue
+            yield self.read_frame(frame)
+
+    def read_since(self, since: float | None = None) -> bytes:
+        """Return the log from the first line written at or after the 'since' epoch time"""
+        data = b"".join(self.iter_frames_since(since))
+        if since is None:
+            return data
+        # Frames are selected by time span, drop the leading lines of the first one that are still too old.
+        # Untimestamped output (e.g. raw mode) can only be selected by the frame's own time span.
+        if not LINE_TIMESTAMP_PATTERN.match(data):
+            return data
+        position = 0
+        while position < len(data):
+            match = LINE_TIMESTAMP_PATTERN.match(data, position)
+            if match and time.mktime(time.strptime(match.group(1).decode(), "%Y-%m-%d %H:%M:%S")) >= since:
+                break
+            next_newline = data.find(b"\n", position)
+            if next_newline < 0:
+                return b""
+            position = next_newline + 1
+        return data[position:]
+
+    def error_lines(self, since: float | None = None) -> list[bytes]:
+        """Return the error lines of the log (in frames ending at or after 'since'), decompressing only the frames that contain one"""
+        if self.frames is None:
+            return [match.group(0) for match in ERROR_LINE_PATTERN.finditer(self._read_all())]
+        lines = []
+        for frame in self.frames:
+            if not frame["errors"]:
+                continue
+            if since is not None and frame["ts_end"] is not None and frame["ts_end"] < since:
+                continue
+            data = self.read_frame(frame)
+            for start in frame["errors"]:
+                end = data.find(b"\n", start)
+                lines.append(data[start:end if end >= 0 else len(data)])
+        return lines
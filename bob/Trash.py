@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import errno
+import os
+import shutil
+import subprocess
+import sys
+import uuid
+
+TRASH_WORKERS = 16 # Deleting over NFS is bound by the latency of each unlink, not by bandwidth
+
+
+def move_to_trash(path: Path, trash_dir: Path) -> Path | None:
+    """Atomically rename path into trash_dir, return its path within the trash.
+
+    Return None if trash_dir is on another filesystem, in which case path is deleted in place.
+    """
+    path, trash_dir = Path(path), Path(trash_dir)
+    trash_dir.mkdir(parents=True, exist_ok=True)
+    trashed_path = trash_dir / f"{path.name}.{uuid.uuid4().hex[:12]}"
+    try:
+        os.rename(path, trashed_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.rmtree(path)
+        return None
+    return trashed_path
+
+
+def _remove(path: Path) -> None:
+    try:
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _list_dir(path: Path) -> list[Path]:
+    try:
+        return list(path.iterdir()) if path.is_dir() and not path.is_symlink() else []
+    except OSError:
+        # Emptied concurrently by another trash pass
+        return []
+
+
+def empty_trash(trash_dir: Path, max_workers: int = TRASH_WORKERS) -> None:
+    """Delete everything in trash_dir, the children of each trashed dir in parallel, then trash_dir itself if it is left empty"""
+    trash_dir = Path(trash_dir)
+    entries = _list_dir(trash_dir)
+    children = [child for entry in entries for child in _list_dir(entry)]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(_remove, children))
+    for entry in entries:
+        _remove(entry)
+    try:
+        trash_dir.rmdir()
+    except OSError:
+        pass
+
+
+def empty_trash_in_background(trash_dir: Path) -> subprocess.Popen:
+    """Start a detached process running empty_trash(trash_dir), which outlives the calling process"""
+    # This module only depends on the standard library, hence it runs as a script without bob being importable
+    return subprocess.Popen([sys.executable, str(Path(__file__).resolve()), str(trash_dir)], stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+if __name__ == "__main__":
+    empty_trash(Path(sys.argv[1]))
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+
+MODEL_SUBDIR = "model"
+MODEL_FINGERPRINT_FILE = "model.json"
+MODEL_CACHE_ENTRIES = 4 # Keyed model builds kept per verilate task, least recently used ones are removed
+
+
+def model_fingerprint(rtl_src_files: list[str], top_module: str, verilator: dict, model_config: list[str]) -> dict:
+    """Fingerprint of a verilated model: content hash of the RTL, top module, verilator identity and the verilator/C++ flags"""
+    rtl_hash = hashlib.sha256()
+    for src in sorted(str(src) for src in rtl_src_files):
+        rtl_hash.update(src.encode())
+        with open(src, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                rtl_hash.update(chunk)
+    return {"rtl_sha256": rtl_hash.hexdigest(), "top_module": str(top_module), "verilator": verilator, "config": list(model_config)}
+
+
+def model_key(fingerprint: dict) -> str:
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def model_dir(output_dir: Path, key: str) -> Path:
+    """Return the directory holding the verilated model built for a key, within the output dir of a verilate task"""
+    return Path(output_dir) / MODEL_SUBDIR / key
+
+
+def model_archives(model_dir_path: Path, top_module: str) -> list[Path]:
+    """Return the archives a testbench links: the model itself and the verilated runtime it was built with"""
+    return [Path(model_dir_path) / f"V{top_module}__ALL.a", Path(model_dir_path) / "libverilated.a"]
+
+
+def is_model_built(model_dir_path: Path, top_module: str) -> bool:
+    return load_model_fingerprint(model_dir_path) is not None and all(archive.is_file() for archive in model_archives(model_dir_path, top_module))
+
+
+def save_model_fingerprint(model_dir_path: Path, fingerprint: dict) -> None:
+    with open(Path(model_dir_path) / MODEL_FINGERPRINT_FILE, "w") as f:
+        json.dump(fingerprint, f, indent=2)
+
+
+def load_model_fingerprint(model_dir_path: Path) -> dict | None:
+    try:
+        with open(Path(model_dir_path) / MODEL_FINGERPRINT_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def touch_model(model_dir_path: Path) -> None:
+    """Mark a model as recently used, such that prune_models() keeps it"""
+    os.utime(Path(model_dir_path) / MODEL_FINGERPRINT_FILE)
+
+
+def prune_models(output_dir: Path, keep: int = MODEL_CACHE_ENTRIES) -> list[Path]:
+    """Remove all but the 'keep' most recently used model builds of a verilate task, returning the removed dirs"""
+    models_root = Path(output_dir) / MODEL_SUBDIR
+    if not models_root.is_dir():
+        return []
+    def last_used(path: Path) -> int:
+        try:
+            return (path / MODEL_FINGERPRINT_FILE).stat().st_mtime_ns
+        except OSError:
+            return 0
+    entries = sorted((path for path in models_root.iterdir() if path.is_dir()), key=last_used, reverse=True)
+    removed = entries[keep:]
+    for path in removed:
+        shutil.rmtree(path, ignore_errors=True)
+    return removed
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from pathlib import Path
+import fcntl
+import json
+import os
+
+DEFAULT_TUNING_MAX_TIME_PS = 1_000_000_000 # 1 ms of simulated time per benchmark run
+MAX_DEFAULT_THREAD_CANDIDATE = 16
+
+
+def default_thread_candidates(cpu_count: int | None = None) -> list[int]:
+    """Return the thread counts benchmarked by default: powers of two up to the CPU count"""
+    cpu_count = max(1, cpu_count or os.cpu_count() or 1)
+    candidates = [1]
+    while candidates[-1] * 2 <= min(cpu_count, MAX_DEFAULT_THREAD_CANDIDATE):
+        candidates.append(candidates[-1] * 2)
+    return candidates
+
+
+def resolve_build_jobs(build_jobs: int | str | None, cpu_count: int | None = None) -> int | None:
+    """Return the number of parallel jobs for compiling verilated C++, 'auto' being the CPU count"""
+    if build_jobs == "auto":
+        return max(1, cpu_count or os.cpu_count() or 1)
+    return build_jobs
+
+
+def read_sim_rate(progress_path: Path) -> float | None:
+    """Return simulated ps per wall-clock us of a run, from the last progress.jsonl event with both timestamps"""
+    rate = None
+    try:
+        with open(progress_path, "r") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                ts_sim_ps, ts_wall_us = event.get("ts_sim_ps"), event.get("ts_wall_us")
+                if ts_sim_ps and ts_wall_us:
+                    rate = ts_sim_ps / ts_wall_us
+    except OSError:
+        return None
+    return rate
+
+
+def pick_best_threads(rates: dict[int, float | None]) -> int | None:
+    """Return the thread count with the highest simulation rate, the fewest threads winning a tie"""
+    measured = {threads: rate for threads, rate in rates.items() if rate is not None}
+    if not measured:
+        return None
+    return max(sorted(measured), key=lambda threads: measured[threads])
+
+
+def load_tuning(tuning_file: Path, task_name: str, key: str) -> dict | None:
+    """Return the persisted tuning of a task, or None if there is none for this key"""
+    try:
+        with open(tuning_file, "r") as f:
+            entry = json.load(f).get(task_name, None)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("key") != key:
+        return None
+    return entry
+
+
+def save_tuning(tuning_file: Path, task_name: str, entry: dict) -> None:
+    """Persist the tuning of a task, keeping the entries of other tasks which may be tuned concurrently"""
+    Path(tuning_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(f"{tuning_file}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            with open(tuning_file, "r") as f:
+                tuning = json.load(f)
+        except (OSError, ValueError):
+            tuning = {}
+        tuning[task_name] = entry
+        tmp_file = Path(f"{tuning_file}.tmp.{os.getpid()}")
+        with open(tmp_file, "w") as f:
+            json.dump(tuning, f, indent=2)
+        os.replace(tmp_file, tuning_file)
@@ -8,9 +8,41 @@ BUILD_SCRIPTS_DIR := $(dir $(abspath $(lastword $(MAKEFILE_LIST))))
 # Detect the Operating System
 UNAME_S := $(shell uname -s)
 
+# BUILD_VARIANT selects the defaults of the variables below, set by Bob with 'build --variant'.
+# Empty keeps the historical defaults: -O2 with ASan, UBSan and gprof profiling (Linux)
+#   debug   : -O0 -g, no sanitizers, no profiling
+#   asan    : -O1 -g with ASan and UBSan, no profiling. Meant for reproducing failures
+#   profile : -O2 -g with gprof profiling (-pg, --prof-cfuncs), no sanitizers
+#   release : -O3, no sanitizers, no profiling. Meant for regression throughput
+# Every variant keeps VERILATOR_TRACE_ARGS at --trace, as tbs construct VerilatedVcdC unconditionally.
+# Tracing only costs simulation time while a waveform is open (--waves)
+BUILD_VARIANT ?=
+ifeq ($(BUILD_VARIANT),debug)
+  GCC_OPT_LEVEL ?= -O0 -g
+  PROFILE_BUILD ?= 0
+  SANITIZE_BUILD ?= 0
+else ifeq ($(BUILD_VARIANT),asan)
+  GCC_OPT_LEVEL ?= -O1 -g -fno-omit-frame-pointer
+  PROFILE_BUILD ?= 0
+  SANITIZE_BUILD ?= 1
+else ifeq ($(BUILD_VARIANT),profile)
+  GCC_OPT_LEVEL ?= -O2 -g
+  PROFILE_BUILD ?= 1
+  SANITIZE_BUILD ?= 0
+else ifeq ($(BUILD_VARIANT),release)
+  GCC_OPT_LEVEL ?= -O3
+  PROFILE_BUILD ?= 0
+  SANITIZE_BUILD ?= 0
+else ifneq ($(BUILD_VARIANT),)
+  $(error [ERROR] Unknown BUILD_VARIANT '$(BUILD_VARIANT)'. Expected one of: debug asan profile release)
+endif
+
 # PROFILE_BUILD variable to enabling profiling with gprof
 PROFILE_BUILD ?= 1
 
+# SANITIZE_BUILD variable to enable ASan and UBSan
+SANITIZE_BUILD ?= 1
+
 # GCC_OPT_LEVEL variable to control the optimisation level of C++ compilation
 GCC_OPT_LEVEL ?= -O2
 
@@ -36,19 +68,62 @@ ifeq ($(UNAME_S), Darwin)
 endif
 
 ifeq ($(UNAME_S), Linux)
-    CXXFLAGS += -fsanitize=address,undefined
+    ifeq ($(SANITIZE_BUILD), 1)
+        CXXFLAGS += -fsanitize=address,undefined
+    endif
     ifeq ($(PROFILE_BUILD), 1)
         CXXFLAGS += -pg
 	  endif
 endif
 
+# Profile-guided optimisation, set by Bob for verilator_tb_compile tasks with a 'pgo' field
+#   generate : instrument the tb and the model, each run writes .gcda files for PGO_PROFILE_DIR
+#   use      : optimise with the merged .gcda files within PGO_PROFILE_DIR
+# -fprofile-prefix-path names the .gcda files relative to TASK_OUTDIR, such that a profile trained with an instrumented
+# build in another dir matches the objects of the optimised build
+PGO_MODE ?=
+PGO_PROFILE_DIR ?=
+# Identity of the profile within PGO_PROFILE_DIR, changing whenever it is trained again, such that a retrained profile is recompiled with
+PGO_PROFILE_ID ?=
+# Objects without a profile, e.g. added since training, are built without one rather than failing -Werror
+PGO_USE_WARNINGS ?= -Wno-missing-profile
+ifeq ($(PGO_MODE),generate)
+  PGO_CXXFLAGS := -fprofile-generate=$(PGO_PROFILE_DIR) -fprofile-update=atomic -fprofile-prefix-path=$(abspath $(TASK_OUTDIR))
+  PGO_LDFLAGS := -fprofile-generate
+else ifeq ($(PGO_MODE),use)
+  PGO_CXXFLAGS := -fprofile-use=$(PGO_PROFILE_DIR) -fprofile-prefix-path=$(abspath $(TASK_OUTDIR)) $(PGO_USE_WARNINGS)
+  PGO_LDFLAGS := -fprofile-use
+else ifneq ($(PGO_MODE),)
+  $(error [ERROR] Unknown PGO_MODE '$(PGO_MODE)'. Expected one of: generate use)
+endif
+CXXFLAGS += $(PGO_CXXFLAGS)
+
+# LTO_BUILD variable to run the link-time optimiser, set by Bob when EXTERNAL_OBJECTS contain a library of a cpp_compile task
+# with 'lto: true'. The tb sources are compiled with -flto too, such that library functions can be inlined into them.
+# Kept out of CXXFLAGS, as it does not change prebuilt models nor precompiled headers
+LTO_BUILD ?= 0
+LTO_FLAGS := $(if $(filter 1,$(LTO_BUILD)),-flto=auto)
+
 # Verilator trace to allow waveform to be dumped, can be --trace or --trace-fst
 VERILATOR_TRACE_ARGS ?= --trace
 # Extra args, like assigning random values to 'x' values to catch uninitialised behaviour
 # --assert to enable assertion evaluation
 VERILATOR_EXTRA_ARGS ?= --x-assign unique --x-initial unique --assert
+# Threads of the verilated model (--threads), empty keeps verilator's single-threaded default
+VERILATOR_THREADS ?=
+# Parallel jobs compiling the verilated C++ (-j of verilator --build), empty keeps it serial
+VERILATOR_BUILD_JOBS ?=
+VERILATOR_THREAD_ARGS := $(if $(VERILATOR_THREADS),--threads $(VERILATOR_THREADS))
+VERILATOR_JOBS_ARGS := $(if $(VERILATOR_BUILD_JOBS),-j $(VERILATOR_BUILD_JOBS))
 EXTERNAL_OBJECTS ?=
 INCLUDE_DIRS ?=
+# Precompiled header of another task, set by Bob as '-include <header>' once its fingerprint matches CXX and CXXFLAGS
+PCH_FLAGS ?=
+PCH_GCH ?=
+# Output dir of a verilated model archive built by a verilator_verilate task with 'build_model: true', set by Bob
+# once its key matches RTL_SRC_FILES and the flags below. The tb sources are then compiled and linked against it,
+# instead of verilating and compiling the RTL again
+MODEL_DIR ?=
 
 # Automatically find all header files in the include header directories
 INCLUDE_DIRS_HEADERS := $(foreach dir,$(INCLUDE_DIRS),$(wildcard $(dir)/*.h $(dir)/*.hpp))
@@ -59,7 +134,9 @@ TB_HEADER_SRC_FILES += $(INCLUDE_DIRS_HEADERS)
 # Conditionally append profiling options
 # Only add -pg and use asan for Linux
 ifeq ($(UNAME_S), Linux)
-    LINKERFLAGS ?= -fsanitize=address,undefined
+    ifeq ($(SANITIZE_BUILD), 1)
+        LINKERFLAGS ?= -fsanitize=address,undefined
+    endif
     ifeq ($(PROFILE_BUILD), 1)
         VERILATOR_EXTRA_ARGS += --prof-cfuncs
         LINKERFLAGS += -pg
@@ -67,14 +144,22 @@ ifeq ($(UNAME_S), Linux)
 else
     $(info Profiling: Skipping -pg and -fsanitize=address flag because $(UNAME_S) does not support them.)
 endif
+LINKERFLAGS += $(PGO_LDFLAGS) $(LTO_FLAGS)
 
+$(info $$BUILD_VARIANT is [${BUILD_VARIANT}])
 $(info $$RTL_SRC_FILES is [${RTL_SRC_FILES}])
 $(info $$TB_CPP_SRC_FILES is [${TB_CPP_SRC_FILES}])
 $(info $$TB_HEADER_SRC_FILES is [${TB_HEADER_SRC_FILES}])
 $(info $$VERILATOR_TRACE_ARGS is [${VERILATOR_TRACE_ARGS}])
 $(info $$VERILATOR_EXTRA_ARGS is [${VERILATOR_EXTRA_ARGS}])
+$(info $$VERILATOR_THREADS is [${VERILATOR_THREADS}])
+$(info $$VERILATOR_BUILD_JOBS is [${VERILATOR_BUILD_JOBS}])
 $(info $$EXTERNAL_OBJECTS is [${EXTERNAL_OBJECTS}])
 $(info $$INCLUDE_DIRS is [${INCLUDE_DIRS}])
+$(info $$PCH_FLAGS is [${PCH_FLAGS}])
+$(info $$MODEL_DIR is [${MODEL_DIR}])
+$(info $$PGO_MODE is [${PGO_MODE}])
+$(info $$LTO_BUILD is [${LTO_BUILD}])
 
 # Transform INCLUDE_DIRS into proper -I flags
 INCLUDE_FLAGS := $(foreach dir,$(INCLUDE_DIRS),-I$(dir))
@@ -83,26 +168,87 @@ INCLUDE_FLAGS := $(foreach dir,$(INCLUDE_DIRS),-I$(dir))
 $(TASK_OUTDIR):
 	mkdir -p $(TASK_OUTDIR)
 
+VERILATOR_MK_PATH := $(BUILD_SCRIPTS_DIR)verilator.mk
+VERILATOR_MAKEFLAGS := OPT_SLOW=$(OPT_SLOW) OPT_FAST=$(OPT_FAST) OPT_GLOBAL=$(OPT_GLOBAL)
+
+# Switching PGO_MODE, PGO_PROFILE_DIR, the profile used (PGO_PROFILE_ID) or LTO_BUILD must recompile every object, as make does not track flags.
+# Skipped for the print-* targets Bob queries with PGO_MODE unset
+FLAGS_STAMP := $(TASK_OUTDIR)/flags.stamp
+FLAGS_STAMP_TEXT := $(strip $(PGO_CXXFLAGS) $(if $(filter use,$(PGO_MODE)),$(PGO_PROFILE_ID)) $(LTO_FLAGS))
+ifeq ($(filter print-%,$(MAKECMDGOALS)),)
+$(shell [ "$$(cat $(FLAGS_STAMP) 2>/dev/null)" = "$(FLAGS_STAMP_TEXT)" ] || { rm -rf $(TASK_OUTDIR)/*.o $(TASK_OUTDIR)/tb_objs $(TASK_OUTDIR)/V$(TOP_MODULE); mkdir -p $(TASK_OUTDIR); echo "$(FLAGS_STAMP_TEXT)" > $(FLAGS_STAMP); })
+endif
+
+ifeq ($(MODEL_DIR),)
 # Run Verilator and build simulation executable
 # Including verilator.mk itself as a dependency ensures CFLAGS changes trigger a rebuild.
 # Including EXTERNAL_OBJECTS ensures relinking when a dependent library archive is updated.
-VERILATOR_MK_PATH := $(BUILD_SCRIPTS_DIR)verilator.mk
-$(TASK_OUTDIR)/V$(TOP_MODULE): $(RTL_SRC_FILES) $(TB_CPP_SRC_FILES) $(TB_HEADER_SRC_FILES) $(VERILATOR_MK_PATH) $(EXTERNAL_OBJECTS) | $(TASK_OUTDIR)
+$(TASK_OUTDIR)/V$(TOP_MODULE): $(RTL_SRC_FILES) $(TB_CPP_SRC_FILES) $(TB_HEADER_SRC_FILES) $(VERILATOR_MK_PATH) $(EXTERNAL_OBJECTS) $(PCH_GCH) | $(TASK_OUTDIR)
 	$(VERILATOR) --cc $(RTL_SRC_FILES) \
 		--top-module $(TOP_MODULE) \
 		--exe $(TB_CPP_SRC_FILES) \
 		--build \
+		$(VERILATOR_JOBS_ARGS) \
 		--Mdir $(TASK_OUTDIR) \
-		-MAKEFLAGS "OPT_SLOW=$(OPT_SLOW) OPT_FAST=$(OPT_FAST) OPT_GLOBAL=$(OPT_GLOBAL)" \
+		-MAKEFLAGS "$(VERILATOR_MAKEFLAGS)" \
 		$(VERILATOR_TRACE_ARGS) \
+		$(VERILATOR_THREAD_ARGS) \
 		$(VERILATOR_EXTRA_ARGS) \
-		-CFLAGS "$(CXXFLAGS) $(INCLUDE_FLAGS)" \
+		-CFLAGS "$(CXXFLAGS) $(LTO_FLAGS) $(INCLUDE_FLAGS) $(PCH_FLAGS)" \
 		-LDFLAGS "$(EXTERNAL_OBJECTS) $(LINKERFLAGS)"
+else
+# Compile the tb sources against a prebuilt verilated model and link its archives.
+# The VM_* defines must match the ones the model was compiled with, they come from its generated _classes.mk
+-include $(MODEL_DIR)/V$(TOP_MODULE)_classes.mk
+VERILATOR_ROOT_DIR := $(shell $(VERILATOR) --getenv VERILATOR_ROOT)
+MODEL_ARCHIVES := $(MODEL_DIR)/V$(TOP_MODULE)__ALL.a $(MODEL_DIR)/libverilated.a
+MODEL_CPPFLAGS := -I$(MODEL_DIR) -I$(VERILATOR_ROOT_DIR)/include -I$(VERILATOR_ROOT_DIR)/include/vltstd \
+	-DVM_COVERAGE=$(VM_COVERAGE) -DVM_SC=$(VM_SC) -DVM_TRACE=$(VM_TRACE) -DVM_TRACE_FST=$(VM_TRACE_FST) -DVM_TRACE_VCD=$(VM_TRACE_VCD)
+MODEL_LDLIBS := -pthread -latomic $(if $(filter 1,$(VM_TRACE_FST)),-lz)
+# Objects mirror the absolute path of their source, such that tb sources with the same file name do not collide.
+# They are compiled from TASK_OUTDIR with a relative path, which -fprofile-prefix-path requires to name .gcda files
+TB_OBJS := $(addprefix $(TASK_OUTDIR)/tb_objs,$(abspath $(TB_CPP_SRC_FILES:.cpp=.o)))
+# Switching to another model dir (e.g. back to an older key) must recompile, its files may be older than the objects
+MODEL_STAMP := $(TASK_OUTDIR)/tb_objs/model_dir.stamp
+$(shell mkdir -p $(TASK_OUTDIR)/tb_objs && (echo '$(MODEL_DIR)' | cmp -s - $(MODEL_STAMP) || echo '$(MODEL_DIR)' > $(MODEL_STAMP)))
+
+$(TASK_OUTDIR)/tb_objs/%.o: /%.cpp $(TB_HEADER_SRC_FILES) $(VERILATOR_MK_PATH) $(PCH_GCH) $(MODEL_STAMP) | $(TASK_OUTDIR)
+	@mkdir -p $(@D)
+	cd $(TASK_OUTDIR) && $(CXX) $(CXXFLAGS) $(LTO_FLAGS) $(INCLUDE_FLAGS) $(MODEL_CPPFLAGS) $(PCH_FLAGS) -c $< -o $(@:$(TASK_OUTDIR)/%=%)
+
+$(TASK_OUTDIR)/V$(TOP_MODULE): $(TB_OBJS) $(MODEL_ARCHIVES) $(EXTERNAL_OBJECTS) $(MODEL_STAMP) | $(TASK_OUTDIR)
+	$(CXX) $(TB_OBJS) $(MODEL_ARCHIVES) $(EXTERNAL_OBJECTS) $(LINKERFLAGS) $(MODEL_LDLIBS) -o $@
+endif
+
+# Verilate RTL_SRC_FILES and compile the model into static archives only, without any tb sources.
+# Used by verilator_verilate tasks with 'build_model: true', TASK_OUTDIR is then the keyed model dir
+.PHONY: model
+model: $(TASK_OUTDIR)/V$(TOP_MODULE)__ALL.a
+
+$(TASK_OUTDIR)/V$(TOP_MODULE)__ALL.a: $(RTL_SRC_FILES) $(VERILATOR_MK_PATH) | $(TASK_OUTDIR)
+	$(VERILATOR) --cc $(RTL_SRC_FILES) \
+		--top-module $(TOP_MODULE) \
+		--Mdir $(TASK_OUTDIR) \
+		$(VERILATOR_TRACE_ARGS) \
+		$(VERILATOR_THREAD_ARGS) \
+		$(VERILATOR_EXTRA_ARGS) \
+		-CFLAGS "$(CXXFLAGS)"
+	$(MAKE) -C $(TASK_OUTDIR) -f V$(TOP_MODULE).mk $(VERILATOR_JOBS_ARGS) CXX="$(CXX)" $(VERILATOR_MAKEFLAGS) V$(TOP_MODULE)__ALL.a libverilated.a
 
 # Optional renaming of executable
 $(TASK_OUTDIR)/$(OUTPUT_EXECUTABLE): $(TASK_OUTDIR)/V$(TOP_MODULE)
 	cp $< $@
 
+# Print the compiler and flags used for tb sources, used by Bob to check precompiled header compatibility
+.PHONY: print-cxx-config
+print-cxx-config:
+	@echo "BOB_CXX_CONFIG=$(CXX) $(CXXFLAGS)"
+
+# Print everything a verilated model depends on besides the RTL, used by Bob to key model archives
+.PHONY: print-model-config
+print-model-config:
+	@echo "BOB_MODEL_CONFIG=$(VERILATOR_TRACE_ARGS) $(VERILATOR_THREAD_ARGS) $(VERILATOR_EXTRA_ARGS) -CFLAGS '$(CXXFLAGS)' CXX=$(CXX) $(VERILATOR_MAKEFLAGS)"
+
 # Clean rule
 clean:
 	rm -rf $(TASK_OUTDIR)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import subprocess
 import threading
 import time
@@ -100,7 +101,8 @@ class LocalBackend:
         wall_timed_out = False
         job_start_mono = time.monotonic()
         with open(err_path, "w") as err_fh:
-            proc = subprocess.Popen(spec.args, stdout=err_fh, stderr=err_fh)
+            env = {**os.environ, **spec.env} if spec.env else None
+            proc = subprocess.Popen(spec.args, stdout=err_fh, stderr=err_fh, env=env)
             with self._procs_lock:
                 self._procs[spec.job_id] = proc
             try:
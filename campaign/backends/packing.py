@@ -0,0 +1,179 @@
+"""Packing backend: runs the seeds of run entries with pack > 1 N at a time per backend job.
+
+Wraps another JobBackend. Jobs with pack == 1 go straight through to it. The others are
+queued per (binary, run-entry) group and each full group of pack jobs, or the remainder
+on the next flush()/poll(), is submitted to the wrapped backend as one pack job. A pack
+job runs campaign.pack, which runs its jobs pack_workers at a time, each into its own run
+dir with its own progress.jsonl and reproduce.sh, and logs each job's status to a file
+per pack under <batch>/.pack, next to the run dir of the pack job itself. Callers keep submitting and polling the jobs of the plan: the manifest,
+TUI and summary.json stay per seed, only the wrapped backend sees pack jobs.
+
+This saves the per-job overhead of the wrapped backend, e.g. the queue latency of a
+Slurm job, for tests running for a fraction of that.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+from campaign.backends.base import JobBackend
+from campaign.job_spec import JobSpec, JobStatus
+from campaign.pack import PACK_LOG, PACK_SUBDIR, read_status_log, status_log_path
+
+PACK_GRACE_S = 10   # Per pack round, on top of job_wall_timeout_s: startup and finalising of each job
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _pack_key(spec: JobSpec) -> tuple:
+    return (str(spec.binary), spec.test_name, spec.pack, spec.pack_workers, spec.job_wall_timeout_s,
+            json.dumps(spec.resources, sort_keys=True))
+
+
+def _pack_dir(spec: JobSpec) -> Path:
+    return spec.output_dir.parent / PACK_SUBDIR
+
+
+class PackingBackend:
+    """Submits packs of jobs to the wrapped backend, reporting the status of each packed job."""
+
+    def __init__(self, inner: JobBackend) -> None:
+        self._inner = inner
+        self._queued:  dict[tuple, list[JobSpec]] = {}   # submitted but not packed yet
+        self._members: dict[str, list[JobSpec]]   = {}   # pack job id → its jobs
+        self._pack_of: dict[str, str]             = {}   # job id → pack job id
+        self._status_logs: dict[str, Path]        = {}   # pack job id → status log written by campaign.pack
+        self._done:    dict[str, JobStatus]       = {}
+
+    # ------------------------------------------------------------------
+    # Protocol methods
+    # ------------------------------------------------------------------
+
+    def submit(self, spec: JobSpec) -> str:
+        if spec.pack <= 1:
+            return self._inner.submit(spec)
+        key = _pack_key(spec)
+        group = self._queued.setdefault(key, [])
+        group.append(spec)
+        if len(group) >= spec.pack:
+            self._submit_pack(self._queued.pop(key))
+        return spec.job_id
+
+    def poll(self, job_ids: list[str]) -> dict[str, JobStatus]:
+        self.flush()
+        pack_ids = list(dict.fromkeys(self._pack_of[jid] for jid in job_ids if jid in self._pack_of and jid not in self._done))
+        direct   = [jid for jid in job_ids if jid not in self._pack_of]
+        inner_statuses = self._inner.poll(direct + pack_ids) if direct or pack_ids else {}
+
+        for pack_id in pack_ids:
+            pack_status = inner_statuses[pack_id]
+            if pack_status is JobStatus.PENDING:
+                continue
+            recorded = read_status_log(self._status_logs[pack_id])
+            for member in self._members[pack_id]:
+                if member.job_id in self._done:
+                    continue
+                status = recorded.get(member.job_id)
+                if status is None and pack_status.is_terminal:
+                    # The pack job was killed or crashed before this job recorded its status
+                    status = JobStatus.TIMEOUT if pack_status is JobStatus.TIMEOUT else JobStatus.ERROR
+                if status is not None:
+                    self._done[member.job_id] = status
+
+        # campaign.pack runs the jobs of a pack in order, pack_workers at a time: the first unfinished ones are running
+        running: set[str] = set()
+        for pack_id in pack_ids:
+            if inner_statuses[pack_id] is JobStatus.RUNNING:
+                members = self._members[pack_id]
+                unfinished = [s.job_id for s in members if s.job_id not in self._done]
+                running.update(unfinished[:members[0].pack_workers])
+
+        result: dict[str, JobStatus] = {}
+        for jid in job_ids:
+            if jid in self._done:
+                result[jid] = self._done[jid]
+            elif jid in self._pack_of:
+                result[jid] = JobStatus.RUNNING if jid in running else JobStatus.PENDING
+            else:
+                result[jid] = inner_statuses.get(jid, JobStatus.PENDING)
+        return result
+
+    def cancel(self, job_ids: list[str]) -> None:
+        cancelled = set(job_ids)
+        for key in list(self._queued):
+            self._queued[key] = [s for s in self._queued[key] if s.job_id not in cancelled]
+            if not self._queued[key]:
+                del self._queued[key]
+        pack_ids = list(dict.fromkeys(self._pack_of[jid] for jid in job_ids if jid in self._pack_of and jid not in self._done))
+        direct   = [jid for jid in job_ids if jid not in self._pack_of and jid not in self._done]
+        self._inner.cancel(direct + pack_ids)
+        for jid in job_ids:
+            self._done.setdefault(jid, JobStatus.ERROR)
+
+    # ------------------------------------------------------------------
+    # Not part of the Protocol: forwarded to the wrapped backend
+    # ------------------------------------------------------------------
+
+    def flush(self) -> None:
+        """Submit the queued jobs as packs, even if not full, and flush the wrapped backend."""
+        queued, self._queued = self._queued, {}
+        for specs in queued.values():
+            self._submit_pack(specs)
+        if hasattr(self._inner, "flush"):
+            self._inner.flush()
+
+    def wait_for_change(self, timeout: float = 5.0) -> None:
+        if hasattr(self._inner, "wait_for_change"):
+            self._inner.wait_for_change(timeout=timeout)
+        else:
+            time.sleep(timeout)
+
+    # ------------------------------------------------------------------
+    # Packs
+    # ------------------------------------------------------------------
+
+    def _submit_pack(self, specs: list[JobSpec]) -> None:
+        first    = specs[0]
+        pack_dir = _pack_dir(first)
+        pack_dir.mkdir(parents=True, exist_ok=True)
+        pack_id  = f"{first.job_id}_pack{len(specs)}"
+        manifest_path = pack_dir / f"{pack_id}.jsonl"
+        with open(manifest_path, "w") as f:
+            for spec in specs:
+                f.write(json.dumps(spec.to_dict()) + "\n")
+
+        workers = min(first.pack_workers, len(specs))
+        job_wall_timeout_s = None
+        if first.job_wall_timeout_s is not None:
+            # Backstop only: each job is killed at its own job_wall_timeout_s by campaign.pack
+            job_wall_timeout_s = math.ceil(len(specs) / workers) * (first.job_wall_timeout_s + PACK_GRACE_S)
+        resources = dict(first.resources)
+        for name in ("cpus", "mem_mb"):
+            if name in resources:
+                resources[name] *= workers
+        python_path = os.pathsep.join(p for p in (str(PROJECT_ROOT), os.environ.get("PYTHONPATH")) if p)
+
+        # The pack job has a run dir of its own, holding its log, such that the wrapped backend finalises it like any
+        # other run rather than reporting it as crashed and renaming its stderr over the crash log of the binary
+        run_dir = pack_dir / pack_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+        self._inner.submit(JobSpec(
+            job_id=pack_id,
+            binary=Path(sys.executable),
+            args=[sys.executable, "-m", "campaign.pack", str(manifest_path.resolve()), f"--workers={workers}", f"--log={(run_dir / PACK_LOG).resolve()}"],
+            output_dir=run_dir,
+            test_name=first.test_name,
+            seed=first.seed,
+            resources=resources,
+            job_wall_timeout_s=job_wall_timeout_s,
+            git_sha=first.git_sha,
+            env={"PYTHONPATH": python_path},
+            wrapper=True,
+        ))
+        self._members[pack_id] = specs
+        self._status_logs[pack_id] = status_log_path(manifest_path)
+        for spec in specs:
+            self._pack_of[spec.job_id] = pack_id
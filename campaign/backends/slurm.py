@@ -1,34 +1,240 @@
+"""Slurm backend: every (binary, run-entry) group of jobs is one sbatch --array job.
+
+submit() only queues a spec. Queued specs are grouped by binary, test, resources and wall
+timeout, and each group is submitted with one sbatch --array call per max_array_size jobs
+on the next flush(), which poll() also does. Each array task runs this module as a script
+on its compute node. The script reads its JobSpec from the group's manifest at line
+$SLURM_ARRAY_TASK_ID, runs it with its job_wall_timeout_s, finalises its run dir like
+LocalBackend and records the status. poll() queries every unfinished job with a single
+squeue call. Jobs which have left the queue without recording a status, e.g. killed at
+their --time limit, are looked up with a single sacct call.
+
+output_dir must be on NFS/GPFS visible from the compute nodes.
+"""
 from __future__ import annotations
 
+import json
+import math
+import os
+import subprocess
+import sys
+from pathlib import Path
+
 from campaign.job_spec import JobSpec, JobStatus
+from campaign.run_record import _finalise as finalise_run, read_job_status, run_job, write_job_status, write_wall_timeout_event
 
+SLURM_SUBDIR = ".slurm"   # Within a batch dir: array manifests, sbatch scripts, Slurm output and job statuses
+MAX_ARRAY_SIZE = 1000     # Below Slurm's default MaxArraySize of 1001
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
 
-class SlurmBackend:
-    """Slurm backend — not yet implemented.
-
-    When ready, implement:
-      submit  -> sbatch --parsable <script>   (one job or --array for bulk)
-      poll    -> squeue -j <ids> --format=%i,%T --noheader
-      cancel  -> scancel <ids>
-
-    Key notes for implementation:
-    - output_dir must be on NFS/GPFS visible from compute nodes.
-    - Use --array=0-N for large seed sweeps (far more efficient than N
-      individual sbatch calls).
-    - Map Slurm states: RUNNING/COMPLETING->RUNNING, COMPLETED->read JSONL,
-      FAILED/TIMEOUT/OOM->FAILED/TIMEOUT, PENDING/->PENDING.
-    - resources dict keys: cpus, mem_mb, time_limit_min map to
-      --cpus-per-task, --mem, --time respectively.
-    - job_wall_timeout_s on JobSpec should map to sbatch --time (in minutes,
-      rounded up) so Slurm enforces the limit natively rather than requiring
-      a polling-based kill loop.
+# squeue states of jobs which are still queued, any other state is running
+_QUEUED_STATES = {"PENDING", "CONFIGURING", "REQUEUED", "REQUEUE_HOLD", "REQUEUE_FED", "RESV_DEL_HOLD"}
+
+
+def _slurm_dir(spec: JobSpec) -> Path:
+    return spec.output_dir.parent / SLURM_SUBDIR
+
+
+def _status_path(spec: JobSpec) -> Path:
+    return _slurm_dir(spec) / f"{spec.job_id}.status"
+
+
+def _err_path(spec: JobSpec) -> Path:
+    return spec.output_dir.parent / f".{spec.job_id}.err"
+
+
+def _time_limit_min(spec: JobSpec) -> int:
+    """--time of a job: job_wall_timeout_s rounded up to minutes, else the time_limit_min resource.
+
+    The array task enforces job_wall_timeout_s itself, the extra minute leaves it time to
+    finalise the run before Slurm kills it.
+    """
+    if spec.job_wall_timeout_s is not None:
+        return math.ceil(spec.job_wall_timeout_s / 60) + 1
+    return int(spec.resources.get("time_limit_min", 10))
+
+
+def _run(cmd: list[str]) -> str:
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{cmd[0]} failed with exit code {proc.returncode}: {proc.stderr.strip()}")
+    return proc.stdout
+
+
+def _squeue(array_ids: list[str]) -> str:
+    """squeue output of the tasks of array_ids still in the queue.
+
+    Arrays which finished more than MinJobAge ago are purged from slurmctld, squeue then fails with
+    "Invalid job id specified" if none of array_ids is known: none of their tasks is in the queue.
     """
+    proc = subprocess.run(["squeue", "--noheader", "--array", "--format=%i|%T", f"--jobs={','.join(array_ids)}"], capture_output=True, text=True)
+    if proc.returncode != 0:
+        if "Invalid job id specified" in proc.stderr:
+            return ""
+        raise RuntimeError(f"squeue failed with exit code {proc.returncode}: {proc.stderr.strip()}")
+    return proc.stdout
+
+
+class SlurmBackend:
+    """Submits jobs as Slurm job arrays, polling all of them with one squeue call per cycle."""
+
+    def __init__(self, max_array_size: int = MAX_ARRAY_SIZE, sbatch_args: list[str] | None = None) -> None:
+        self._max_array_size = max_array_size
+        self._sbatch_args = list(sbatch_args or [])   # e.g. ["--partition=sim"]
+        self._queued:   list[JobSpec]             = []   # submitted but not sbatch'ed yet
+        self._specs:    dict[str, JobSpec]        = {}
+        self._slurm_ids: dict[str, str]           = {}   # job_id → "<array job id>_<index>"
+        self._done:     dict[str, JobStatus]      = {}
+        self._array_count = 0
+
+    # ------------------------------------------------------------------
+    # Protocol methods
+    # ------------------------------------------------------------------
 
     def submit(self, spec: JobSpec) -> str:
-        raise NotImplementedError("SlurmBackend is not yet implemented")
+        self._queued.append(spec)
+        self._specs[spec.job_id] = spec
+        return spec.job_id
 
     def poll(self, job_ids: list[str]) -> dict[str, JobStatus]:
-        raise NotImplementedError("SlurmBackend is not yet implemented")
+        self.flush()
+        active = {jid: self._slurm_ids[jid] for jid in job_ids if jid in self._slurm_ids and jid not in self._done}
+        queue_states: dict[str, str] = {}
+        if active:
+            array_ids = sorted({sid.split("_")[0] for sid in active.values()})
+            for line in _squeue(array_ids).splitlines():
+                sid, _, state = line.strip().partition("|")
+                queue_states[sid] = state.strip()
+
+        left_queue = [jid for jid, sid in active.items() if sid not in queue_states]
+        self._harvest(left_queue)
+
+        result: dict[str, JobStatus] = {}
+        for jid in job_ids:
+            if jid in self._done:
+                result[jid] = self._done[jid]
+            elif jid in active and active[jid] in queue_states:
+                queued = queue_states[active[jid]] in _QUEUED_STATES
+                result[jid] = JobStatus.PENDING if queued else JobStatus.RUNNING
+            else:
+                result[jid] = JobStatus.PENDING
+        return result
 
     def cancel(self, job_ids: list[str]) -> None:
-        raise NotImplementedError("SlurmBackend is not yet implemented")
+        cancelled = set(job_ids)
+        self._queued = [s for s in self._queued if s.job_id not in cancelled]
+        slurm_ids = [self._slurm_ids[jid] for jid in job_ids if jid in self._slurm_ids and jid not in self._done]
+        if slurm_ids:
+            try:
+                _run(["scancel", *slurm_ids])
+            except (OSError, RuntimeError):
+                pass   # best-effort
+        for jid in job_ids:
+            self._done.setdefault(jid, JobStatus.ERROR)
+
+    # ------------------------------------------------------------------
+    # Submission — not part of the Protocol; poll() calls it, callers
+    # submitting jobs over time (bob regress) call it to start them now.
+    # ------------------------------------------------------------------
+
+    def flush(self) -> None:
+        """sbatch every queued spec, one array job per group and max_array_size jobs."""
+        groups: dict[tuple, list[JobSpec]] = {}
+        for spec in self._queued:
+            key = (str(spec.binary), spec.test_name, spec.job_wall_timeout_s, json.dumps(spec.resources, sort_keys=True))
+            groups.setdefault(key, []).append(spec)
+        self._queued = []
+        for specs in groups.values():
+            for start in range(0, len(specs), self._max_array_size):
+                self._submit_array(specs[start:start + self._max_array_size])
+
+    def _submit_array(self, specs: list[JobSpec]) -> None:
+        first = specs[0]
+        slurm_dir = _slurm_dir(first)
+        slurm_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{first.binary.stem}{f'_{first.test_name}' if first.test_name else ''}_{os.getpid()}_{self._array_count}"
+        self._array_count += 1
+
+        manifest_path = slurm_dir / f"{name}.jsonl"
+        with open(manifest_path, "w") as f:
+            for spec in specs:
+                f.write(json.dumps(spec.to_dict()) + "\n")
+        script_path = slurm_dir / f"{name}.sh"
+        script_path.write_text(
+            "#!/bin/sh\n"
+            f'export PYTHONPATH="{PROJECT_ROOT}${{PYTHONPATH:+:$PYTHONPATH}}"\n'
+            f'exec "{sys.executable}" -m campaign.backends.slurm "{manifest_path.resolve()}" "$SLURM_ARRAY_TASK_ID"\n'
+        )
+        script_path.chmod(0o755)
+
+        cmd = [
+            "sbatch", "--parsable",
+            f"--array=0-{len(specs) - 1}",
+            f"--job-name={name}",
+            f"--chdir={os.getcwd()}",
+            f"--output={(slurm_dir / name).resolve()}_%a.out",
+            f"--cpus-per-task={first.resources.get('cpus', 1)}",
+            f"--mem={first.resources.get('mem_mb', 1024)}M",
+            f"--time={_time_limit_min(first)}",
+            *self._sbatch_args,
+            str(script_path.resolve()),
+        ]
+        # --parsable prints "<job id>[;<cluster>]"
+        array_job_id = _run(cmd).strip().split(";")[0]
+        for index, spec in enumerate(specs):
+            self._slurm_ids[spec.job_id] = f"{array_job_id}_{index}"
+
+    # ------------------------------------------------------------------
+    # Completion
+    # ------------------------------------------------------------------
+
+    def _harvest(self, job_ids: list[str]) -> None:
+        """Record the status of jobs which have left the queue, with one sacct call for those which did not record it."""
+        unrecorded = []
+        for jid in job_ids:
+            status = read_job_status(_status_path(self._specs[jid]))
+            if status is None:
+                unrecorded.append(jid)
+            else:
+                self._done[jid] = status
+        if not unrecorded:
+            return
+
+        states: dict[str, str] = {}
+        out = _run(["sacct", "--noheader", "--parsable2", "--allocations", "--format=JobID,State",
+                    f"--jobs={','.join(self._slurm_ids[jid] for jid in unrecorded)}"])
+        for line in out.splitlines():
+            sid, _, state = line.strip().partition("|")
+            states[sid] = state.split()[0] if state.strip() else ""
+        for jid in unrecorded:
+            state = states.get(self._slurm_ids[jid])
+            if state is None or state in ("PENDING", "RUNNING", "COMPLETING"):
+                continue   # not in the accounting database yet, or a status being written: poll again
+            spec = self._specs[jid]
+            if state == "TIMEOUT" and spec.output_dir.exists():
+                timeout_s = _time_limit_min(spec) * 60
+                write_wall_timeout_event(spec.output_dir / "progress.jsonl", timeout_s, timeout_s * 1_000_000)
+            status = finalise_run(spec, _err_path(spec))
+            if status is JobStatus.ERROR and state == "TIMEOUT":
+                status = JobStatus.TIMEOUT
+            self._done[jid] = status
+
+
+def run_array_task(manifest_path: Path, index: int) -> int:
+    """Run the index-th job of an array manifest on this node, finalise its run dir and record its status."""
+    with open(manifest_path) as f:
+        for line_index, line in enumerate(f):
+            if line_index == index:
+                spec = JobSpec.from_dict(json.loads(line))
+                break
+        else:
+            print(f"No job at index {index} of {manifest_path}", file=sys.stderr)
+            return 1
+
+    status = run_job(spec)
+    write_job_status(_status_path(spec), status)
+    return 0 if status.is_success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_array_task(Path(sys.argv[1]), int(sys.argv[2])))
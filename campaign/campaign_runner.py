@@ -23,6 +23,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from campaign.backends.local import LocalBackend
+from campaign.backends.packing import PackingBackend
 from campaign.backends.slurm import SlurmBackend
 from campaign.job_spec import JobSpec, JobStatus
 from campaign.plan import Plan, check_runtime, check_warnings, load_plan
@@ -108,11 +109,37 @@ def _expand_specs(plan: Plan, batch_run_id: str, batch_dir: Path, git_sha: str |
                     job_wall_timeout_s=job_wall_timeout_s,
                     git_sha=git_sha,
                     coverage=bin_entry.coverage,
+                    reproduce_binary=bin_entry.reproduce_binary,
+                    env={k: str(v).replace("{run_dir}", str(run_dir.resolve())) for k, v in bin_entry.env.items()},
+                    pack=entry.pack,
+                    pack_workers=entry.pack_workers,
                 ))
 
     return specs
 
 
+def _new_batch(plan: Plan) -> tuple[str, Path, list[JobSpec]]:
+    """Return the run id, directory and job specs of a new batch of plan."""
+    batch_run_id = f"{plan.batch_id}_{_utc_now_str()}"
+    batch_dir    = plan.output_dir / batch_run_id
+    return batch_run_id, batch_dir, _expand_specs(plan, batch_run_id, batch_dir, _capture_git_sha())
+
+
+def _hung_threshold_s(plan: Plan) -> float:
+    heartbeat_values = [b.heartbeat_ms for b in plan.binaries if b.heartbeat_ms is not None]
+    return max(10.0, min(heartbeat_values) / 1000 * 10) if heartbeat_values else 10.0
+
+
+def _make_backend(name: str, workers: int | None):
+    """Return the backend running the jobs of a batch. Slurm jobs are packed for run entries with pack > 1.
+
+    Local jobs are not, as starting a process costs less than running campaign.pack for a pack.
+    """
+    if name == "slurm":
+        return PackingBackend(SlurmBackend())
+    return LocalBackend(max_workers=workers)
+
+
 # ---------------------------------------------------------------------------
 # Manifest
 # ---------------------------------------------------------------------------
@@ -141,6 +168,42 @@ def _status_line(statuses: dict[str, JobStatus], total: int, elapsed: float) ->
     return f"[{sum(s.is_terminal for s in statuses.values())}/{total}]  {parts}  | {mins:02d}:{secs:02d} elapsed"
 
 
+def _wait_for_jobs(backend, specs: list[JobSpec], batch_run_id: str, poll_interval: float,
+                   no_tui: bool, hung_threshold_s: float) -> dict[str, JobStatus]:
+    """Poll backend until every job of specs is terminal, showing progress. Returns the final statuses.
+
+    KeyboardInterrupt propagates to the caller, which cancels the jobs.
+    """
+    job_ids    = [s.job_id for s in specs]
+    wall_start = time.monotonic()
+    statuses: dict[str, JobStatus] = {jid: JobStatus.PENDING for jid in job_ids}
+
+    tui: CampaignTUI | None = None
+    try:
+        with CampaignTUI(specs, batch_run_id, enabled=not no_tui,
+                         hung_threshold_s=hung_threshold_s) as tui:
+            while True:
+                statuses = backend.poll(job_ids)
+                tui.update(statuses)
+                if not tui.enabled:
+                    line = _status_line(statuses, len(specs), time.monotonic() - wall_start)
+                    print(f"\r{line}", end="", flush=True)
+
+                if all(s.is_terminal for s in statuses.values()):
+                    break
+
+                # LocalBackend: block until the next job finishes (event-driven).
+                # SlurmBackend and others: fall back to fixed-interval polling.
+                if hasattr(backend, "wait_for_change"):
+                    backend.wait_for_change(timeout=poll_interval)
+                else:
+                    time.sleep(poll_interval)
+    finally:
+        if tui is not None and not tui.enabled:
+            print()  # newline after \r progress line
+    return statuses
+
+
 # ---------------------------------------------------------------------------
 # Summary / table
 # ---------------------------------------------------------------------------
@@ -262,19 +325,10 @@ def main(argv: list[str] | None = None) -> int:
     for w in check_warnings(plan):
         print(f"  WARN  {w}", file=sys.stderr)
 
-    batch_id     = plan.batch_id
-    output_dir   = plan.output_dir
-    batch_run_id = f"{batch_id}_{_utc_now_str()}"
-    batch_dir    = output_dir / batch_run_id
-
-    heartbeat_values = [b.heartbeat_ms for b in plan.binaries if b.heartbeat_ms is not None]
-    hung_threshold_s = max(10.0, min(heartbeat_values) / 1000 * 10) if heartbeat_values else 10.0
-
-    git_sha = _capture_git_sha()
-    specs   = _expand_specs(plan, batch_run_id, batch_dir, git_sha)
+    batch_run_id, batch_dir, specs = _new_batch(plan)
 
     if args.dry_run:
-        print(f"Dry run — batch: {batch_run_id}  ({len(specs)} jobs)  git: {git_sha or 'n/a'}:")
+        print(f"Dry run — batch: {batch_run_id}  ({len(specs)} jobs)  git: {(specs[0].git_sha if specs else None) or 'n/a'}:")
         for spec in specs:
             print(f"  {spec.job_id}")
             print(f"    {' '.join(spec.args)}")
@@ -284,50 +338,21 @@ def main(argv: list[str] | None = None) -> int:
     print(f"Batch: {batch_run_id}")
     _write_manifest(batch_dir, specs)
 
-    if args.backend == "slurm":
-        backend = SlurmBackend()
-    else:
-        backend = LocalBackend(max_workers=args.workers)
-
-    all_job_ids = [s.job_id for s in specs]
+    backend = _make_backend(args.backend, args.workers)
 
     print(f"Submitting {len(specs)} jobs (backend={args.backend}) ...")
     for spec in specs:
         backend.submit(spec)
 
-    wall_start = time.monotonic()
-    statuses: dict[str, JobStatus] = {jid: JobStatus.PENDING for jid in all_job_ids}
-
-    tui: CampaignTUI | None = None
     try:
-        with CampaignTUI(specs, batch_run_id, enabled=not args.no_tui,
-                         hung_threshold_s=hung_threshold_s) as tui:
-            while True:
-                statuses = backend.poll(all_job_ids)
-                tui.update(statuses)
-                if not tui.enabled:
-                    line = _status_line(statuses, len(specs), time.monotonic() - wall_start)
-                    print(f"\r{line}", end="", flush=True)
-
-                if all(s.is_terminal for s in statuses.values()):
-                    break
-
-                # LocalBackend: block until the next job finishes (event-driven).
-                # SlurmBackend and others: fall back to fixed-interval polling.
-                if hasattr(backend, "wait_for_change"):
-                    backend.wait_for_change(timeout=args.poll_interval)
-                else:
-                    time.sleep(args.poll_interval)
+        statuses = _wait_for_jobs(backend, specs, batch_run_id, args.poll_interval,
+                                  args.no_tui, _hung_threshold_s(plan))
     except KeyboardInterrupt:
-        if tui is not None and not tui.enabled:
-            print()  # newline after \r
         print("Interrupted — cancelling ...")
-        backend.cancel(all_job_ids)
+        backend.cancel([s.job_id for s in specs])
         print("Cancelled.")
         return 130
 
-    if tui is not None and not tui.enabled:
-        print()  # newline after \r progress line
     finished_at = datetime.now(timezone.utc).isoformat()
 
     summary = _write_summary(batch_dir, specs, statuses,
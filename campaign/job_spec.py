@@ -36,6 +36,11 @@ class JobSpec:
     job_wall_timeout_s: int | None = None
     git_sha:        str | None = None  # HEAD SHA at batch start; None if not in a git repo
     coverage:       bool       = False
+    reproduce_binary: Path | None = None  # binary written to reproduce.sh; None → binary
+    env:            dict[str, str] = field(default_factory=dict)  # extra environment of the run, on top of the runner's
+    pack:           int        = 1     # runs of its run entry per backend job, see PackingBackend
+    pack_workers:   int        = 1     # runs of a pack executed in parallel
+    wrapper:        bool       = False  # runs other commands (a pack, a remote bob command): no reproduce.sh of its own
 
     @property
     def seed_hex(self) -> str:
@@ -50,4 +55,46 @@ class JobSpec:
             "seed_hex": self.seed_hex,
             "run_dir":  str(self.output_dir.resolve()),
             "coverage": self.coverage,
+            "reproduce_binary": str(self.reproduce_binary.resolve()) if self.reproduce_binary else None,
+            "env":      self.env,
         }) + "\n"
+
+    def to_dict(self) -> dict:
+        """Return every field as JSON-serialisable values, the inverse of from_dict()."""
+        return {
+            "job_id":     self.job_id,
+            "binary":     str(self.binary),
+            "args":       self.args,
+            "output_dir": str(self.output_dir),
+            "test":       self.test_name,
+            "seed":       self.seed,
+            "resources":  self.resources,
+            "job_wall_timeout_s": self.job_wall_timeout_s,
+            "git_sha":    self.git_sha,
+            "coverage":   self.coverage,
+            "reproduce_binary": str(self.reproduce_binary) if self.reproduce_binary else None,
+            "env":        self.env,
+            "pack":       self.pack,
+            "pack_workers": self.pack_workers,
+            "wrapper":    self.wrapper,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> JobSpec:
+        return cls(
+            job_id=d["job_id"],
+            binary=Path(d["binary"]),
+            args=d["args"],
+            output_dir=Path(d["output_dir"]),
+            test_name=d["test"],
+            seed=d["seed"],
+            resources=d["resources"],
+            job_wall_timeout_s=d["job_wall_timeout_s"],
+            git_sha=d["git_sha"],
+            coverage=d["coverage"],
+            reproduce_binary=Path(d["reproduce_binary"]) if d["reproduce_binary"] else None,
+            env=d["env"],
+            pack=d["pack"],
+            pack_workers=d["pack_workers"],
+            wrapper=d["wrapper"],
+        )
@@ -0,0 +1,91 @@
+"""Seed pack wrapper: run the jobs of a pack manifest within one backend job.
+
+Usage:
+    python -m campaign.pack PACK.jsonl [--workers N] [--log PATH]
+
+Each line of PACK.jsonl is a JobSpec (JobSpec.to_dict()). Every job runs and is finalised
+exactly as if it had been submitted on its own, into its own run dir, and its status is
+appended to PACK.status for PackingBackend to pick up as soon as it finishes.
+Written by PackingBackend, which submits this module as the command of the backend job.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from campaign.job_spec import JobSpec, JobStatus
+from campaign.run_record import run_job
+
+PACK_SUBDIR = ".pack"   # Within a batch dir: pack manifests, the status logs of their jobs and the run dirs of the pack jobs
+PACK_LOG = "pack.log"   # Within the run dir of a pack job: output of this module
+
+
+def status_log_path(manifest_path: Path) -> Path:
+    return manifest_path.with_suffix(".status")
+
+
+def read_status_log(status_log: Path) -> dict[str, JobStatus]:
+    """Return the statuses recorded so far in the status log of a pack, by job id."""
+    statuses: dict[str, JobStatus] = {}
+    try:
+        text = status_log.read_text()
+    except OSError:
+        return statuses
+    for line in text.splitlines(keepends=True):
+        if line.endswith("\n"):   # a line still being written is picked up by the next read
+            job_id, _, status = line.strip().partition(" ")
+            try:
+                statuses[job_id] = JobStatus(status)
+            except ValueError:
+                pass
+    return statuses
+
+
+def run_pack(manifest_path: Path, workers: int = 1) -> int:
+    """Run every job of the pack manifest, workers at a time. Returns 0 if they all passed."""
+    with open(manifest_path) as f:
+        specs = [JobSpec.from_dict(json.loads(line)) for line in f if line.strip()]
+
+    # One "<job id> <status>" line per finished job, such that polling a pack reads a single file
+    log_lock = threading.Lock()
+    with open(status_log_path(manifest_path), "w") as status_log:
+
+        def run_member(spec: JobSpec) -> JobStatus:
+            try:
+                status = run_job(spec)
+            except OSError as exc:
+                print(f"{spec.job_id}: {exc}", file=sys.stderr)
+                status = JobStatus.ERROR
+            with log_lock:
+                status_log.write(f"{spec.job_id} {status.value}\n")
+                status_log.flush()
+            return status
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            statuses = list(executor.map(run_member, specs))
+    return 0 if all(s.is_success for s in statuses) else 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the jobs of a seed pack")
+    parser.add_argument("manifest", type=Path, help="Pack manifest written by PackingBackend")
+    parser.add_argument("--workers", type=int, default=1, help="Jobs run in parallel")
+    parser.add_argument("--log", type=Path, default=None, help="Write the output of this module to this file rather than stdout/stderr")
+    args = parser.parse_args(argv)
+    if args.log is not None:
+        # The backend finalising the pack job drops its stderr, its run dir existing
+        log = open(args.log, "a")
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(log.fileno(), sys.stdout.fileno())
+        os.dup2(log.fileno(), sys.stderr.fileno())
+    return run_pack(args.manifest, max(1, args.workers))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
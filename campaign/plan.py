@@ -32,6 +32,8 @@ class RunEntry(BaseModel):
     max_time_ps:    int | None  = None  # None → inherits Plan.max_time_ps
     job_wall_timeout_s: int | None  = Field(None, gt=0)  # None → inherits Plan.job_wall_timeout_s
     extra_args:     list[str]   = Field(default_factory=list)
+    pack:           int         = Field(1, gt=0)  # seeds run by each Slurm job, for short tests whose per-job overhead dominates
+    pack_workers:   int         = Field(1, gt=0)  # seeds of a pack run in parallel, each with the entry's resources
 
     @field_validator("seeds", mode="before")
     @classmethod
@@ -62,8 +64,10 @@ class BinaryEntry(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     binary:       Path
+    reproduce_binary: Path | None = None  # None → reproduce.sh reruns 'binary', e.g. a release binary with its asan build here
     heartbeat_ms: int | None     = None   # None → omit --progress.heartbeat-ms=
     coverage:     bool           = False  # enable --coverage for every run under this binary
+    env:          dict[str, str] = Field(default_factory=dict)  # extra environment of every run; '{run_dir}' expands to its output dir
     runs:         list[RunEntry] = Field(min_length=1)
 
 
@@ -125,6 +129,11 @@ def check_runtime(plan: Plan) -> list[str]:
             )
         elif not os.access(b.binary, os.X_OK):
             errors.append(f"binary not executable: {b.binary.resolve()}")
+        if b.reproduce_binary is not None and not b.reproduce_binary.is_file():
+            errors.append(
+                f"reproduce_binary not found: {b.reproduce_binary}\n"
+                f"  Resolved: {b.reproduce_binary.resolve()}"
+            )
 
     output_parent = plan.output_dir if plan.output_dir.exists() else plan.output_dir.parent
     if output_parent.exists() and not os.access(output_parent, os.W_OK):
@@ -0,0 +1,95 @@
+"""Pipelined build and regression: build the Bob tasks producing a plan's binaries and submit
+each binary's jobs to the campaign backend as soon as its task is up to date, such that building
+and simulating overlap instead of the whole build finishing before the first job starts.
+
+Usage (from the project root):
+    python main_cli.py regress --plan regression_plans/nightly.yaml [--variant release] [--backend local|slurm]
+"""
+from __future__ import annotations
+
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from campaign.campaign_runner import (_hung_threshold_s, _make_backend, _new_batch,
+                                      _wait_for_jobs, _write_manifest, _write_summary)
+from campaign.job_spec import JobSpec, JobStatus
+from campaign.plan import Plan, check_warnings, load_plan
+
+
+def map_binaries_to_tasks(bob, plan: Plan) -> tuple[dict[str, list[Path]], list[Path]]:
+    """Return the binaries of plan grouped by the Bob task whose output dir holds them, and the binaries no task produces.
+
+    Binary paths are CWD-relative like in campaign_runner, hence resolved against the project root Bob runs from.
+    """
+    binaries_by_task: dict[str, list[Path]] = {}
+    unmapped: list[Path] = []
+    for binary in dict.fromkeys(b.binary for b in plan.binaries):
+        task_name = bob.get_output_producer(os.path.abspath(binary))
+        if task_name is None:
+            unmapped.append(binary)
+        else:
+            binaries_by_task.setdefault(task_name, []).append(binary)
+    return binaries_by_task, unmapped
+
+
+def run_regression(bob, plan_path: Path, backend_name: str = "local", workers: int | None = None,
+                   poll_interval: float = 5.0, no_tui: bool = False) -> int:
+    """Build the dependency cones of the tasks producing the binaries of plan_path with bob, submitting the jobs of each
+    binary the moment its task finishes, then wait for every job and write summary.json. Returns the exit code."""
+    plan = load_plan(plan_path)
+    binaries_by_task, unmapped = map_binaries_to_tasks(bob, plan)
+    if unmapped:
+        print("Pre-flight checks failed:", file=sys.stderr)
+        for binary in unmapped:
+            print(f"  binary not produced by any task: {binary}\n"
+                  f"  Resolved: {Path(os.path.abspath(binary))} (build root: {bob.get_build_root()})", file=sys.stderr)
+        return 1
+    for w in check_warnings(plan):
+        print(f"  WARN  {w}", file=sys.stderr)
+
+    batch_run_id, batch_dir, specs = _new_batch(plan)
+    specs_by_binary: dict[Path, list[JobSpec]] = {}
+    for spec in specs:
+        specs_by_binary.setdefault(spec.binary, []).append(spec)
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    print(f"Batch: {batch_run_id}")
+    _write_manifest(batch_dir, specs)
+    backend = _make_backend(backend_name, workers)
+
+    pending_tasks = dict(binaries_by_task) # Tasks whose binaries' jobs are not submitted yet
+    submitted: list[JobSpec] = []
+
+    def submit_binaries(task_name: str) -> None:
+        for binary in pending_tasks.pop(task_name, []):
+            if not (binary.is_file() and os.access(binary, os.X_OK)):
+                print(f"Task '{task_name}' is up to date but did not produce an executable {binary}, its jobs are not run.", file=sys.stderr)
+                continue
+            for spec in specs_by_binary.get(binary, []):
+                backend.submit(spec)
+                submitted.append(spec)
+            if hasattr(backend, "flush"):
+                backend.flush() # Start them now rather than on the first poll after the build
+            print(f"Task '{task_name}' is up to date, submitted {len(specs_by_binary.get(binary, []))} job(s) of {binary} (backend={backend_name})")
+
+    try:
+        selected_tasks = [f"^{re.escape(task_name)}$" for task_name in sorted(binaries_by_task)]
+        bob.execute_tasks(False, selected_tasks, on_task_done=submit_binaries)
+        if pending_tasks:
+            print(f"Build of task(s) {', '.join(sorted(pending_tasks))} failed or did not run, their jobs are not run.", file=sys.stderr)
+        statuses = _wait_for_jobs(backend, submitted, batch_run_id, poll_interval, no_tui, _hung_threshold_s(plan)) if submitted else {}
+    except KeyboardInterrupt:
+        print("Interrupted — cancelling ...")
+        backend.cancel([s.job_id for s in submitted])
+        print("Cancelled.")
+        return 130
+
+    # Jobs of binaries which were never built count as errors
+    statuses = {s.job_id: statuses.get(s.job_id, JobStatus.ERROR) for s in specs}
+    finished_at = datetime.now(timezone.utc).isoformat()
+    summary = _write_summary(batch_dir, specs, statuses, batch_run_id, plan_path, started_at, finished_at)
+    c = summary["counts"]
+    return 0 if c["failed"] == 0 and c["error"] == 0 and c["timeout"] == 0 else 1
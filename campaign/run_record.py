@@ -6,7 +6,10 @@ summarise.py (re-derived from existing artefacts post-hoc).
 from __future__ import annotations
 
 import json
+import os
 import re
+import subprocess
+import time
 from pathlib import Path
 
 from campaign.job_spec import JobSpec, JobStatus
@@ -117,6 +120,53 @@ def _write_exit_event(progress_path: Path, returncode: int) -> None:
         pass
 
 
+def run_job(spec: JobSpec) -> JobStatus:
+    """Run spec in this process, enforcing its job_wall_timeout_s, and finalise its run dir.
+
+    The in-process counterpart of LocalBackend._run_job, for the wrappers which
+    run jobs away from the campaign runner (Slurm array tasks, seed packs).
+    """
+    spec.output_dir.parent.mkdir(parents=True, exist_ok=True)
+    err_path = spec.output_dir.parent / f".{spec.job_id}.err"
+    wall_timed_out = False
+    job_start_mono = time.monotonic()
+    with open(err_path, "w") as err_fh:
+        env = {**os.environ, **spec.env} if spec.env else None
+        proc = subprocess.Popen(spec.args, stdout=err_fh, stderr=err_fh, env=env)
+        try:
+            proc.wait(timeout=spec.job_wall_timeout_s)
+        except subprocess.TimeoutExpired:
+            wall_timed_out = True
+            proc.terminate()
+            try:
+                proc.wait(timeout=5)   # grace period — binary may flush buffers
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+    if wall_timed_out and spec.output_dir.exists():
+        elapsed_us = int((time.monotonic() - job_start_mono) * 1_000_000)
+        write_wall_timeout_event(spec.output_dir / "progress.jsonl", spec.job_wall_timeout_s, elapsed_us)
+    status = _finalise(spec, err_path, returncode=proc.returncode)
+    if wall_timed_out and status is JobStatus.ERROR:
+        return JobStatus.TIMEOUT
+    return status
+
+
+def write_job_status(status_path: Path, status: JobStatus) -> None:
+    """Record the terminal status of a job run by a wrapper, atomically for the runner polling it."""
+    tmp_path = status_path.with_suffix(".tmp")
+    tmp_path.write_text(status.value)
+    os.replace(tmp_path, status_path)
+
+
+def read_job_status(status_path: Path) -> JobStatus | None:
+    """Return the status recorded by write_job_status(), or None if there is none yet."""
+    try:
+        return JobStatus(status_path.read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
 def _finalise(spec: JobSpec, err_path: Path, *, returncode: int | None = None) -> JobStatus:
     """Handle post-process cleanup and write reproduce.sh.
 
@@ -136,7 +186,8 @@ def _finalise(spec: JobSpec, err_path: Path, *, returncode: int | None = None) -
             err_path.unlink(missing_ok=True)
         except OSError:
             pass
-        _write_reproduce_script(run_dir, spec)
+        if not spec.wrapper:
+            _write_reproduce_script(run_dir, spec)
         progress_path = run_dir / "progress.jsonl"
         run_end = _read_run_end(str(progress_path))
         if run_end is None:
@@ -169,7 +220,7 @@ def _finalise(spec: JobSpec, err_path: Path, *, returncode: int | None = None) -
 
 def _write_reproduce_script(run_dir: Path, spec: JobSpec) -> None:
     skip_prefixes = ("--output-dir=",)
-    repro_args = [str(spec.binary.resolve())]
+    repro_args = [str((spec.reproduce_binary or spec.binary).resolve())]
     for arg in spec.args[1:]:
         if not any(arg.startswith(p) for p in skip_prefixes):
             repro_args.append(arg)
@@ -200,6 +251,7 @@ def _write_reproduce_script(run_dir: Path, spec: JobSpec) -> None:
         *git_header,
         f"# Reproduce: test={spec.test_name}  seed=0x{spec.seed_hex}",
         f"# Original batch job: {spec.job_id}",
+        *([f"# Batch ran {spec.binary.resolve()}, reproducing with {spec.reproduce_binary.resolve()}"] if spec.reproduce_binary else []),
         "set -euo pipefail",
         *git_guard,
         'script_dir="$(cd "$(dirname "$0")" && pwd)"',
@@ -1,5 +1,10 @@
 from pathlib import Path
 from bob.Bob import Bob
+from bob.BuildWatcher import BuildWatcher
+from bob.TaskLog import parse_since
+from bob.Profiler import Profiler, NULL_PROFILER, PROFILE_MODES, format_phase_table
+from bob.RemoteExecution import REMOTE_BACKENDS
+from campaign.regress import run_regression
 import os
 import sys
 import logging
@@ -47,6 +52,48 @@ def create_parser() -> "argparse.ArgumentParser":
         action="store_true",
         help="Enable verbose logging"
     )
+    common_parser.add_argument(
+        "--variant",
+        choices=list(Bob.BUILD_VARIANTS),
+        default=None,
+        help="Build variant, each with its own output dirs under build/<variant>/ (default: historical flags, output dirs under build/)"
+    )
+
+    # Parent parser for the subparsers which execute tasks
+    remote_parser = argparse.ArgumentParser(add_help=False)
+    remote_parser.add_argument(
+        "--remote-backend",
+        choices=list(REMOTE_BACKENDS),
+        default=None,
+        help="Run the commands of tasks with 'remote: true' as jobs of this campaign backend, outputs being written to the shared project dir (default: run every task locally)"
+    )
+    remote_parser.add_argument(
+        "--remote-slots",
+        type=int,
+        default=Bob.DEFAULT_REMOTE_SLOTS,
+        help=f"Max concurrent remote tasks, on top of the local workers (default: {Bob.DEFAULT_REMOTE_SLOTS})"
+    )
+
+    # Parent parser for the subparsers which write task logs
+    task_log_parser = argparse.ArgumentParser(add_help=False)
+    task_log_parser.add_argument(
+        "--raw-log",
+        action="store_true",
+        default=False,
+        help="Write task subprocess output straight to the task logs, without per-line timestamps"
+    )
+    task_log_parser.add_argument(
+        "--log-compression",
+        choices=["none", "gzip", "zstd"],
+        default="none",
+        help="Compress task logs (zstd falls back to gzip if the zstandard package is not installed)"
+    )
+    task_log_parser.add_argument(
+        "--log-keep",
+        type=int,
+        default=1,
+        help="Number of log generations to keep per task, including the current one (default: 1)"
+    )
 
     # Main parser
     parser = argparse.ArgumentParser(
@@ -55,10 +102,24 @@ def create_parser() -> "argparse.ArgumentParser":
 Examples:
     %(prog)s build all
     %(prog)s build -t task1 task2
+    %(prog)s build --variant release -t tb_dual_port_ram
+    %(prog)s build --plan -a
+    %(prog)s build --remote-backend slurm -a
+    %(prog)s --profile=cprofile build -a
+    %(prog)s pgo --variant release -t tb_dual_port_ram
+    %(prog)s regress --variant release --plan regression_plans/nightly.yaml
+    %(prog)s watch -t task1
+    %(prog)s log task1 --errors
     %(prog)s clean all
         ''',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help="Print the wall-clock time of each build phase and write it to .bob/profile/, with 'cprofile' also the merged cProfile stats of bob and its task workers"
+    )
     subparsers = parser.add_subparsers(dest="mode", required=True, help="Operating mode")
 
     # ListTasks subparser
@@ -85,7 +146,7 @@ Examples:
     # Build subparser
     build_subparser = subparsers.add_parser(
         "build",
-        parents=[common_parser],
+        parents=[common_parser, remote_parser, task_log_parser],
         help="Build defined tasks",
     )
 
@@ -102,6 +163,130 @@ Examples:
         nargs="+",
         help="Specific task names to build, regex pattern enabled"
     )
+    build_subparser.add_argument(
+        "--plan",
+        action="store_true",
+        default=False,
+        help="Print the tasks that would run, why, their estimated durations and the critical path, without building anything"
+    )
+
+    # Watch subparser
+    watch_subparser = subparsers.add_parser(
+        "watch",
+        parents=[common_parser, remote_parser, task_log_parser],
+        help="Build defined tasks, then stay resident and rebuild affected tasks whenever their source files change",
+    )
+
+    # In watch subparser, 'all' and '-t' are mutually exclusive
+    watch_subparser_exclusive_group = watch_subparser.add_mutually_exclusive_group(required=True)
+    watch_subparser_exclusive_group.add_argument(
+        "-a", "--all",
+        action="store_true",
+        default=False,
+        help="Watch all tasks"
+    )
+    watch_subparser_exclusive_group.add_argument(
+        "-t", "--tasks",
+        nargs="+",
+        help="Specific task names to watch, regex pattern enabled"
+    )
+    watch_subparser.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        help="Seconds between checks when inotify is unavailable (default: 0.5)"
+    )
+    watch_subparser.add_argument(
+        "--poll",
+        action="store_true",
+        default=False,
+        help="Force polling instead of inotify"
+    )
+
+    # PGO subparser
+    pgo_subparser = subparsers.add_parser(
+        "pgo",
+        parents=[common_parser, remote_parser],
+        help="Train the profile-guided optimisation profile of tasks with a 'pgo' field, then build them with it",
+    )
+
+    # In pgo subparser, 'all' and '-t' are mutually exclusive
+    pgo_subparser_exclusive_group = pgo_subparser.add_mutually_exclusive_group(required=True)
+    pgo_subparser_exclusive_group.add_argument(
+        "-a", "--all",
+        action="store_true",
+        default=False,
+        help="Train all tasks with a 'pgo' field"
+    )
+    pgo_subparser_exclusive_group.add_argument(
+        "-t", "--tasks",
+        nargs="+",
+        help="Specific task names to train, regex pattern enabled"
+    )
+
+    # Regress subparser
+    regress_subparser = subparsers.add_parser(
+        "regress",
+        parents=[common_parser, remote_parser],
+        help="Build the tasks producing the binaries of a campaign plan, submitting each binary's jobs as soon as its task is built",
+    )
+    regress_subparser.add_argument(
+        "--plan",
+        required=True,
+        type=Path,
+        help="Campaign plan YAML, e.g. regression_plans/nightly.yaml"
+    )
+    regress_subparser.add_argument(
+        "--backend",
+        choices=["local", "slurm"],
+        default="local",
+        help="Campaign execution backend (default: local)"
+    )
+    regress_subparser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Max concurrent jobs of the local backend (default: cpu_count)"
+    )
+    regress_subparser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between status polls of the backend (default: 5)"
+    )
+    regress_subparser.add_argument(
+        "--no-tui",
+        action="store_true",
+        default=False,
+        help="Disable the live terminal UI of the campaign"
+    )
+
+    # Log subparser
+    log_subparser = subparsers.add_parser(
+        "log",
+        parents=[common_parser],
+        help="Show the build log of a task",
+    )
+    log_subparser.add_argument(
+        "task",
+        help="Task name whose log to show"
+    )
+    log_subparser.add_argument(
+        "--errors",
+        action="store_true",
+        default=False,
+        help="Only show error lines"
+    )
+    log_subparser.add_argument(
+        "--since",
+        help="Only show output written since a time, e.g. '15m', '2h', 'HH:MM:SS' or 'YYYY-MM-DD HH:MM:SS'"
+    )
+    log_subparser.add_argument(
+        "-g", "--generation",
+        type=int,
+        default=0,
+        help="Log generation to show, 0 being the latest build (default: 0)"
+    )
 
     # Clean subparser
     clean_subparser = subparsers.add_parser(
@@ -124,32 +309,31 @@ Examples:
     return parser
 
 
-def main() -> int:
-    logger = logging.getLogger(__name__)
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(ColorFormatter(LOG_FORMAT, datefmt=DATE_FORMAT))
-    logger.addHandler(console_handler)
+def setup_bob(logger: logging.Logger, build_variant: str | None = None, profiler: Profiler = NULL_PROFILER) -> Bob:
+    """Instantiate Bob, load tool/ip configs, discover and parse all tasks"""
+    # Set up PROJ_ROOT first, which bob will use as proj_root
+    cwd = os.getcwd()
+    os.environ["PROJ_ROOT"] = str(cwd)
 
-    parser = create_parser()
-    args = parser.parse_args()
-    print(args)
-    try:
-        # Set up PROJ_ROOT first, which bob will use as proj_root
-        cwd = os.getcwd()
-        os.environ["PROJ_ROOT"] = str(cwd)
-
-        # Instantiate Bob object
-        bob = Bob(logger)
-        print(f"proj_root = {bob.get_proj_root()}")
+    # Instantiate Bob object
+    bob = Bob(logger)
+    bob.profiler = profiler
+    print(f"proj_root = {bob.get_proj_root()}")
 
-        # Load tool_config.yaml and set up tool paths
+    # Load tool_config.yaml and set up tool paths
+    with profiler.phase("tool config"):
         bob.instantiate_and_associate_tool_config_parser()
 
-        # Load ip_config.yaml and build unfiltered dependency_graph
+    # Select the build variant before output dirs are assigned to tasks
+    bob.set_build_variant(build_variant)
+
+    # Load ip_config.yaml and build unfiltered dependency_graph
+    with profiler.phase("ip config"):
         bob.instantiate_and_associate_ip_config_parser()
         bob.setup_with_ip_config_parser()
 
-        # Discover tasks and populate bob.task_configs
+    # Discover tasks and populate bob.task_configs
+    with profiler.phase("discovery"):
         bob.discover_tasks()
         print(bob.task_configs)
 
@@ -162,24 +346,82 @@ def main() -> int:
         # Ensure that the dotbob dir exists, and checksum.yaml exists
         bob.ensure_dotbob_dir_at_proj_root()
 
+    with profiler.phase("parse"):
         # Instantiate TaskConfigParser to parse all the tasks
         bob.instantiate_and_associate_task_config_parser()
         # Parse existing task_configs from Bob to TaskConfigParser
         bob.task_config_parser.inherit_task_configs(bob.task_configs)
         # Parse all tasks with task_config_parser's parse_all_tasks_in_task_configs()
         bob.task_config_parser.parse_all_tasks_in_task_configs()
+    return bob
+
+
+def apply_build_options(bob: Bob, args: argparse.Namespace) -> Bob:
+    """Apply the build/watch options controlling task logs and remote execution to a Bob instance"""
+    bob.raw_task_logs = getattr(args, "raw_log", False)
+    bob.task_log_compression = getattr(args, "log_compression", "none")
+    bob.task_log_generations = getattr(args, "log_keep", 1)
+    bob.remote_backend = getattr(args, "remote_backend", None)
+    bob.remote_slots = getattr(args, "remote_slots", Bob.DEFAULT_REMOTE_SLOTS)
+    return bob
+
+
+def main() -> int:
+    logger = logging.getLogger(__name__)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(ColorFormatter(LOG_FORMAT, datefmt=DATE_FORMAT))
+    logger.addHandler(console_handler)
+
+    parser = create_parser()
+    args = parser.parse_args()
+    print(args)
+    profiler = Profiler(args.profile, Path(os.getcwd()) / ".bob" / "profile") if args.profile else NULL_PROFILER
+    if profiler.enabled:
+        profiler.start()
+    try:
+        bob = apply_build_options(setup_bob(logger, args.variant, profiler), args)
         print(args)
         if args.mode == "list-task":
             if args.all:
                 bob.list_tasks(True, [])
             else:
                 bob.list_tasks(False, args.tasks)
+        elif args.mode == "build" and args.plan:
+            with profiler.phase("plan"):
+                plan = bob.plan_build(args.all, args.tasks or [])
+            if plan is None:
+                return 1
+            bob.print_build_plan(plan)
         elif args.mode == "build":
-            if args.all:
-                # Execute build for all tasks
-                bob.execute_tasks(True, [])
-            else:
-                bob.execute_tasks(False, args.tasks)
+            with profiler.phase("execution"):
+                if args.all:
+                    # Execute build for all tasks
+                    bob.execute_tasks(True, [])
+                else:
+                    bob.execute_tasks(False, args.tasks)
+        elif args.mode == "pgo":
+            # Instrumented build, training campaign and profile merge, then an optimised build of each selected task
+            with profiler.phase("execution"):
+                bob.execute_pgo_tasks(args.all, args.tasks or [])
+        elif args.mode == "regress":
+            # Campaign jobs of each binary start as soon as the task producing it is built
+            with profiler.phase("execution"):
+                return run_regression(bob, args.plan, args.backend, args.workers, args.poll_interval, args.no_tui)
+        elif args.mode == "watch":
+            # Initial build, then stay resident with task_configs, dependency graph and tools kept in memory
+            with profiler.phase("execution"):
+                bob.execute_tasks(args.all, args.tasks or [])
+            watcher = BuildWatcher(
+                bob, logger, args.all, args.tasks or [],
+                reconfigure=lambda: apply_build_options(setup_bob(logger, args.variant, profiler), args),
+                poll_interval=args.interval,
+                use_inotify=not args.poll,
+            )
+            return watcher.run()
+        elif args.mode == "log":
+            since = parse_since(args.since) if args.since else None
+            if not bob.show_task_log(args.task, args.errors, since, args.generation):
+                return 1
         elif args.mode == "clean":
             if args.all:
                 bob.remove_build_dir()
@@ -188,10 +430,22 @@ def main() -> int:
         else:
             raise ValueError(f"Unknown mode = {args.mode}.")
 
+    except KeyboardInterrupt:
+        print("Interrupted.", file=sys.stderr)
+        return 130
+
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
 
+    finally:
+        if profiler.enabled:
+            summary = profiler.stop()
+            print(format_phase_table(summary))
+            print(f"Profile written to {profiler.output_dir}")
+            if "combined_profile" in summary:
+                print(f"Merged cProfile stats of bob and its task workers: python -m pstats {summary['combined_profile']}")
+
     # try:
     #     # Set up PROJ_ROOT first, which bob will use as proj_root
     #     cwd = os.getcwd()
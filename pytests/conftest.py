@@ -0,0 +1,54 @@
+import json
+import pytest
+from pathlib import Path
+from networkx import DiGraph
+from unittest.mock import MagicMock
+from bob.Bob import Bob
+
+# Stand-in for a tb binary: creates its run dir and passes
+FAKE_TB = '#!/bin/sh\nfor arg; do case "$arg" in --output-dir=*) mkdir -p "${arg#--output-dir=}";; esac; done\n'
+
+@pytest.fixture
+def mock_bob() -> Bob:
+    """Fixture to create a Bob instance with a mock logger, whose calls the tests assert on"""
+    return Bob(MagicMock())
+
+@pytest.fixture
+def make_bob_with_built_tasks(mock_bob: Bob, tmp_path: Path):
+    """Fixture returning a factory of a Bob with a c_compile task per node of the given dependency edges, all built and clean, within tmp_path.
+
+    Building a task writes its executable '<task>.out', a FAKE_TB, and fails if the task is in 'failing'.
+    'tools' is what ToolConfigParser.describe() returns for the tools the tasks are fingerprinted with.
+    """
+    def make_bob(edges: list[tuple[str, str]], failing: set[str] = frozenset(), tools: dict | None = None) -> Bob:
+        bob_instance = mock_bob
+        bob_instance.proj_root = str(tmp_path)
+        bob_instance.dotbob_dir = tmp_path / ".bob"
+        bob_instance.dotbob_checksum_file = tmp_path / ".bob" / "checksum.json"
+        bob_instance.dotbob_events_file = tmp_path / ".bob" / "events.jsonl"
+        bob_instance.dotbob_dir.mkdir()
+        bob_instance.tool_config_parser = MagicMock()
+        bob_instance.tool_config_parser.describe.return_value = tools or {}
+        bob_instance.dependency_graph = DiGraph(edges)
+        for task_name in bob_instance.dependency_graph.nodes:
+            (tmp_path / task_name).mkdir()
+            src = tmp_path / task_name / f"{task_name}.c"
+            src.write_text("int x;\n")
+            (tmp_path / task_name / "task_config.yaml").write_text(f"task_name: {task_name}\n")
+            bob_instance.task_configs[task_name] = {"task_config_dict": {"task_type": "c_compile"}, "internal_src_files": [str(src)], "input_src_files": [str(src)],
+                                                    "task_config_file_path": tmp_path / task_name / "task_config.yaml", "output_dir": tmp_path / "build" / task_name}
+        bob_instance.dotbob_checksum_file.write_text(json.dumps({task_name: {"hash_sha256": "", "dirty": True} for task_name in bob_instance.task_configs}))
+
+        def fake_c_compile(task_name: str) -> bool:
+            output_dir = bob_instance.task_configs[task_name]["output_dir"]
+            output_dir.mkdir(parents=True, exist_ok=True)
+            executable = output_dir / f"{task_name}.out"
+            executable.write_text(FAKE_TB)
+            executable.chmod(0o755)
+            return task_name not in failing
+        bob_instance.execute_c_compile = fake_c_compile
+        for task_name in bob_instance.task_configs:
+            fake_c_compile(task_name)
+            bob_instance.mark_task_as_clean_in_dotbob_checksum_file(task_name)
+        return bob_instance
+    return make_bob
@@ -1,6 +1,10 @@
+import io
 import os
 import shutil
+import signal
+import subprocess
 import sys
+import threading
 from unittest import mock
 from networkx import DiGraph
 from io import StringIO
@@ -11,6 +15,8 @@ import hashlib
 from typing import Generator
 from pathlib import Path
 from bob.Bob import Bob
+from bob.FsSnapshot import FsSnapshot
+from bob.RemoteExecution import make_remote_backend, remote_job_resources, REMOTE_DEFAULT_MEM_MB_PER_CPU, REMOTE_DEFAULT_TIME_LIMIT_MIN
 from unittest.mock import MagicMock, patch, mock_open
 
 @pytest.fixture
@@ -382,9 +388,10 @@ def test_remove_task_output_dir_non_existent_task(mock_is_dir):
     assert result == False
     bob_instance.logger.warning.assert_any_call(f"Task {task_name} does not exist in task_configs, so its output dir cannot be deleted.")
 
-@patch("shutil.rmtree")
+@patch("bob.Bob.empty_trash_in_background")
+@patch("bob.Bob.move_to_trash")
 @patch("pathlib.Path.is_dir", return_value = True) # build dir does exist, and task output dir exists too
-def test_remove_task_output_dir_valid_task(mock_is_dir, mock_rmtree):
+def test_remove_task_output_dir_valid_task(mock_is_dir, mock_move_to_trash, mock_empty_trash):
     """Test that attempting to remove a particular task's output dir would return True when it is a valid task_name"""
     logger = MagicMock()
     bob_instance = Bob(logger)
@@ -395,11 +402,13 @@ def test_remove_task_output_dir_valid_task(mock_is_dir, mock_rmtree):
     task_name = "task1"
     result = bob_instance.remove_task_output_dir(task_name)
     assert result == True
-    assert mock_rmtree.call_count == 1
+    assert mock_move_to_trash.call_count == 1
+    mock_empty_trash.assert_called_once()
     bob_instance.mark_task_as_dirty_in_dotbob_checksum_file.assert_called_once()
 
-@patch("shutil.rmtree")
-def test_remove_output_dirs_multiple_tasks(mock_rmtree):
+@patch("bob.Bob.empty_trash_in_background")
+@patch("bob.Bob.move_to_trash")
+def test_remove_output_dirs_multiple_tasks(mock_rmtree, mock_empty_trash):
     """Test that multiple task output dirs have been removed"""
     # Create a mock Bob instance and logger
     logger = MagicMock()
@@ -407,6 +416,7 @@ def test_remove_output_dirs_multiple_tasks(mock_rmtree):
     bob_instance.proj_root = "/mock/proj_root"
     bob_instance.task_configs = {"task1":"", "task2":""}
     bob_instance.mark_task_as_dirty_in_dotbob_checksum_file = MagicMock()
+    bob_instance.mark_tasks_as_dirty_in_dotbob_checksum_file = MagicMock()
 
     # Mock self.dotbob_dir as a Path and patch is_dir to return True
     mock_dotbob_dir = MagicMock(spec=Path)
@@ -419,22 +429,31 @@ def test_remove_output_dirs_multiple_tasks(mock_rmtree):
         deleted_count = bob_instance.remove_task_output_dirs(["task1", "task2", "task3"])
         assert deleted_count == 2  # task1 and task2 should be deleted
         assert mock_rmtree.call_count == 2
-        bob_instance.mark_task_as_dirty_in_dotbob_checksum_file.call_count == 2
-
-@patch("pathlib.Path.is_dir", return_value = True) # build dir and dotbob dir both exist
-@patch("shutil.rmtree")
-def test_remove_build_dir(mock_rmtree, mock_is_dir):
-    """Test that the entire build directory has been removed"""
+        # The tasks are marked dirty in a single checksum.json write, and the trash is emptied once
+        bob_instance.mark_task_as_dirty_in_dotbob_checksum_file.assert_not_called()
+        bob_instance.mark_tasks_as_dirty_in_dotbob_checksum_file.assert_called_once_with(["task1", "task2"])
+        mock_empty_trash.assert_called_once()
+
+@patch("bob.Bob.empty_trash_in_background")
+def test_remove_build_dir(mock_empty_trash, tmp_path: Path):
+    """Test that the entire build directory and the content of .bob are moved into .bob/trash, which is emptied in the background"""
     logger = MagicMock()
     bob_instance = Bob(logger)
-    bob_instance.proj_root = "/mock/proj_root"
-    bob_instance.dotbob_dir = "/mock/proj_root/.bob"
+    bob_instance.proj_root = str(tmp_path)
+    bob_instance.dotbob_dir = tmp_path / ".bob"
+    bob_instance.dotbob_trash_dir = tmp_path / ".bob" / "trash"
     bob_instance.task_configs = {"task1":"", "task2":""}
+    (tmp_path / "build" / "task1").mkdir(parents=True)
+    bob_instance.dotbob_dir.mkdir()
+    (bob_instance.dotbob_dir / "checksum.json").write_text("{}")
 
     build_dir = Path(bob_instance.proj_root) / "build"
     result = bob_instance.remove_build_dir()
     assert result
-    assert mock_rmtree.call_count == 2 # Verify that both the build dir and .bob dir has been removed
+    assert not build_dir.exists()
+    assert [path.name for path in bob_instance.dotbob_dir.iterdir()] == ["trash"]
+    assert len(list(bob_instance.dotbob_trash_dir.iterdir())) == 2
+    mock_empty_trash.assert_called_once_with(bob_instance.dotbob_trash_dir)
     bob_instance.logger.info.assert_any_call(f"Deleted build directory: {str(build_dir)}")
     bob_instance.logger.info.assert_any_call(f"Deleted .bob directory.")
 
@@ -508,7 +527,7 @@ def test_append_task_env_var_val_is_path_and_key_doesnt_exist():
     env_key = "NEW_VAR"
     env_val = Path("/new/path/to/set")
     # Mock the existence of Path
-    with patch.object(Path, "exists") as mock_exists:
+    with patch.object(FsSnapshot, "exists") as mock_exists:
         mock_exists.return_value = True
         bob_instance.append_task_env_var_val(task_name, env_key, env_val)
 
@@ -529,7 +548,7 @@ def test_append_task_env_var_val_is_path_and_key_exists():
     env_val = Path("/new/path/to/append")
 
     # Mock the existence of Path
-    with patch.object(Path, "exists") as mock_exists:
+    with patch.object(FsSnapshot, "exists") as mock_exists:
         mock_exists.return_value = True
         bob_instance.append_task_env_var_val(task_name, env_key, env_val)
 
@@ -607,7 +626,7 @@ def test_append_task_env_var_val_invalid_task_name():
     bob_instance.append_task_env_var_val(task_name, env_key, env_val)
     bob_instance.logger.critical.assert_called_once_with(f"Unexpected error during append_task_env_var_val(): 'non_existent_task'", exc_info=True)
 
-@patch.object(Path, "exists", return_value=True)
+@patch.object(FsSnapshot, "exists", return_value=True)
 def test_append_task_src_files_single_valid_file(mock_exists):
     """Test adding a single valid file to 'src_files' within task_configs for a task"""
     mock_logger = MagicMock()
@@ -623,7 +642,7 @@ def test_append_task_src_files_single_valid_file(mock_exists):
     assert "src_files" in bob_instance.task_configs["existing_task"]
     assert bob_instance.task_configs["existing_task"]["src_files"] == [test_file]
 
-@patch.object(Path, "exists", side_effect=[True, True, False])  # Simulate the first 2 files exists, and the last one missing
+@patch.object(FsSnapshot, "exists", side_effect=[True, True, False])  # Simulate the first 2 files exists, and the last one missing
 def test_append_task_src_files_multiple_files_with_missing(mock_exists):
     """Test adding multiple files to 'src_files' list, with one missing."""
     mock_logger = MagicMock()
@@ -640,7 +659,7 @@ def test_append_task_src_files_multiple_files_with_missing(mock_exists):
     assert bob_instance.task_configs["existing_task"]["src_files"] == files[:2]  # Check that only valid ones are added
     bob_instance.logger.error.assert_called_once_with(f"For existing_task, the following paths do not exist and will be ignored: {{PosixPath('/missing/file3.sv')}}")
 
-@patch.object(Path, "exists", return_value=True)
+@patch.object(FsSnapshot, "exists", return_value=True)
 def test_append_task_src_files_duplicate_files(mock_exists):
     """Test that duplicate files are not added multiple times."""
     mock_logger = MagicMock()
@@ -835,45 +854,36 @@ def test_compute_task_input_src_files_hash_sha256_missing_task_config_file_path(
     assert result is None
     bob_instance.logger.error.assert_called_once_with(f"Task '{task_name}' does not contain a 'task_config_file_path' attribute within task_configs[{task_name}].")
 
-def test_compute_task_input_src_files_hash_sha256_task_valid_files():
+def test_compute_task_input_src_files_hash_sha256_task_valid_files(tmp_path: Path):
     """Test the function of compute the hash_sha256 of a task with 2 files"""
     mock_logger = MagicMock()
     bob_instance = Bob(mock_logger)
 
-    mock_file_1 = MagicMock(spec=Path)
-    mock_file_1.exists.return_value = True
-    mock_file_1.is_file.return_value = True
-    mock_file_1.open.return_value.__enter__.return_value.read.side_effect = [b"data1", b""]
-    mock_file_1.as_posix.return_value = "/fake/path/file1" # Mocking as_posix()
-
-    mock_file_2 = MagicMock(spec=Path)
-    mock_file_2.exists.return_value = True
-    mock_file_2.is_file.return_value = True
-    mock_file_2.open.return_value.__enter__.return_value.read.side_effect = [b"data2", b""]
-    mock_file_2.as_posix.return_value = "/fake/path/file2" # Mocking as_posix()
-
-    task_config_file_path = MagicMock(spec=Path)
-    task_config_file_path.exists.return_value = True
-    task_config_file_path.is_file.return_value = True
-    task_config_file_path.open.return_value.__enter__.return_value.read.side_effect = [b"data3", b""]
-    task_config_file_path.as_posix.return_value = "/fake/path/task_config.yaml"
+    file_1, file_2, task_config_file_path = tmp_path / "file1", tmp_path / "file2", tmp_path / "task_config.yaml"
+    for path, data in [(file_1, b"data1"), (file_2, b"data2"), (task_config_file_path, b"data3")]:
+        path.write_bytes(data)
 
     bob_instance.task_configs = {
         "task1" : {
             "task_config_file_path": task_config_file_path,
-            "input_src_files": [str(mock_file_1), str(mock_file_2)]
+            "input_src_files": [str(file_1), str(file_2)]
         }
     }
 
+    # The fingerprint hashes the digest of each file, in the order of the sorted file paths
     expected_hash_sha256 = hashlib.sha256()
     for data in [b"data1", b"data2", b"data3"]:  # Order must be consistent
-        expected_hash_sha256.update(data)
+        expected_hash_sha256.update(f"{hashlib.sha256(data).hexdigest()}\n".encode())
     expected_hash_sha256 = expected_hash_sha256.hexdigest()
 
-    with patch("builtins.map", return_value=[mock_file_1, mock_file_2, task_config_file_path]):
-        result = bob_instance._compute_task_input_src_files_hash_sha256("task1")
+    file_hashes = {}
+    result = bob_instance._compute_task_input_src_files_hash_sha256("task1", file_hashes)
 
     assert result == expected_hash_sha256
+    assert file_hashes[str(file_2)] == hashlib.sha256(b"data2").hexdigest()
+
+    bob_instance.set_fingerprint_hash("blake2b")
+    assert bob_instance._compute_task_input_src_files_hash_sha256("task1") not in (None, expected_hash_sha256)
 
 @patch("pathlib.Path.open", new_callable=mock_open, read_data=json.dumps({
     "task1" : {"hash_sha256": "", "dirty": False},
@@ -1210,8 +1220,9 @@ def test_mark_task_as_clean_in_dotbob_checksum_file_valid_task(mock_path_open, m
     handle = mock_path_open() # Retrieve the actual written data
     written_data = "".join(call.args[0] for call in handle.write.call_args_list)
 
+    # Per-file input hashes and tool commands are recorded for 'build --plan'
     expected_data = {
-        "task1" : {"hash_sha256": expected_hash_sha256, "dirty": False},
+        "task1" : {"hash_sha256": expected_hash_sha256, "dirty": False, "inputs": {}, "tools": {}, "hash_algorithm": "sha256"},
         "task2" : {"hash_sha256": "def4567", "dirty": True},
 
     }
@@ -1283,7 +1294,7 @@ def test_ensure_src_files_existence_all_existing_files(monkeypatch):
         "external_src_files": ["/tmp/existing2.v"],
         "output_src_files": ["/tmp/existing3.v"]
     }
-    monkeypatch.setattr(os.path, "isfile", lambda path: path in ["/tmp/existing1.v", "/tmp/existing2.v", "/tmp/existing3.v"])
+    monkeypatch.setattr(FsSnapshot, "is_file", lambda self, path: path in ["/tmp/existing1.v", "/tmp/existing2.v", "/tmp/existing3.v"])
 
     assert bob_instance.ensure_src_files_existence("test_task") is True
 
@@ -1296,7 +1307,7 @@ def test_ensure_src_files_existence_missing_files(monkeypatch):
         "external_src_files": ["/tmp/missing2.v"],
         "output_src_files": ["/tmp/existing3.v"]
     }
-    monkeypatch.setattr(os.path, "isfile", lambda path: path == "/tmp/existing3.v")
+    monkeypatch.setattr(FsSnapshot, "is_file", lambda self, path: path == "/tmp/existing3.v")
 
     assert bob_instance.ensure_src_files_existence("test_task") is False
     bob_instance.logger.error.assert_any_call(f" - /tmp/missing1.v")
@@ -1342,7 +1353,7 @@ def test_filter_tasks_to_rebuild_no_rebuild_required(bob_with_graph):
 
 def test_filter_tasks_to_rebuild_single_task_rebuild(bob_with_graph):
     """Only 'arith_c_compile' requires rebuilding, but since 'hello_world_c_compile' depends on it, it also needs rebuilding"""
-    with patch.object(bob_with_graph, "should_rebuild_task", side_effect=lambda task: task == "arith_c_compile"):
+    with patch.object(bob_with_graph, "should_rebuild_task", side_effect=lambda task, reasons=None: task == "arith_c_compile"):
         result_graph = bob_with_graph.filter_tasks_to_rebuild(bob_with_graph.dependency_graph)
         assert set(result_graph.nodes) == {"arith_c_compile", "hello_world_c_compile"}, "Only arith_c_compile and its dependent should be rebuilt"
 
@@ -1354,14 +1365,14 @@ def test_filter_tasks_to_rebuild_all_tasks_required(bob_with_graph):
 
 def test_filter_tasks_to_rebuild_deep_dependency_rebuild(bob_with_graph):
     """A deeply ensted dependency should cause all downstream tasks to rebuild"""
-    with patch.object(bob_with_graph, "should_rebuild_task", side_effect=lambda task: task == "hello_world_4"):
+    with patch.object(bob_with_graph, "should_rebuild_task", side_effect=lambda task, reasons=None: task == "hello_world_4"):
         result_graph = bob_with_graph.filter_tasks_to_rebuild(bob_with_graph.dependency_graph)
         expected_rebuild_tasks = {"hello_world_4", "hello_world_3", "hello_world_2"}
         assert set(result_graph.nodes) == expected_rebuild_tasks, "All dependent tasks should be marked for rebuild"
 
 def test_filter_tasks_to_rebuild_branching_dependency(bob_with_graph):
     """If a task with multiple dependecies is affected, ensure all upstream dependencies are correctly handled"""
-    with patch.object(bob_with_graph, "should_rebuild_task", side_effect=lambda task: task in ["hello_world_5", "hello_world_6"]):
+    with patch.object(bob_with_graph, "should_rebuild_task", side_effect=lambda task, reasons=None: task in ["hello_world_5", "hello_world_6"]):
         result_graph = bob_with_graph.filter_tasks_to_rebuild(bob_with_graph.dependency_graph)
         expected_rebuild_tasks = {"hello_world_5", "hello_world_3", "hello_world_2", "hello_world_6"}
         assert set(result_graph.nodes) == expected_rebuild_tasks, "Tasks dependent on multiple rebuild sources must also rebuild"
@@ -1385,19 +1396,19 @@ def bob_with_complex_graph(bob_with_graph):
 
 def test_filter_tasks_to_rebuild_deep_dependency_chain(bob_with_complex_graph):
     """Tests if rebuild correctly propagates through long chains A → B → C."""
-    with patch.object(bob_with_complex_graph, "should_rebuild_task", side_effect=lambda task: task == "A"):
+    with patch.object(bob_with_complex_graph, "should_rebuild_task", side_effect=lambda task, reasons=None: task == "A"):
         result_graph = bob_with_complex_graph.filter_tasks_to_rebuild(bob_with_complex_graph.dependency_graph)
         assert set(result_graph.nodes) == {"A", "B", "C"}, "C should be rebuilt due to dependency on A."
 
 def test_filter_tasks_to_rebuild_multiple_independent_chains(bob_with_complex_graph):
     """Ensure independent chains do not trigger unnecessary rebuilds."""
-    with patch.object(bob_with_complex_graph, "should_rebuild_task", side_effect=lambda task: task == "F"):
+    with patch.object(bob_with_complex_graph, "should_rebuild_task", side_effect=lambda task, reasons=None: task == "F"):
         result_graph = bob_with_complex_graph.filter_tasks_to_rebuild(bob_with_complex_graph.dependency_graph)
         assert set(result_graph.nodes) == {"F", "G"}, "Only F and G should be rebuilt."
 
 def test_filter_tasks_to_rebuild_diamond_dependency_structure(bob_with_complex_graph):
     """Tests if rebuild propagates correctly in a diamond structure."""
-    with patch.object(bob_with_complex_graph, "should_rebuild_task", side_effect=lambda task: task == "D"):
+    with patch.object(bob_with_complex_graph, "should_rebuild_task", side_effect=lambda task, reasons=None: task == "D"):
         result_graph = bob_with_complex_graph.filter_tasks_to_rebuild(bob_with_complex_graph.dependency_graph)
         assert set(result_graph.nodes) == {"D", "E", "C"}, "C should rebuild since E depends on D."
 
@@ -1412,7 +1423,7 @@ def test_filter_tasks_to_rebuild_cyclic_dependency_handling(bob_with_complex_gra
 
 def test_filter_tasks_to_rebuild_mixed_rebuild_scenarios(bob_with_complex_graph):
     """Complex case where different nodes need rebuilding selectively."""
-    with patch.object(bob_with_complex_graph, "should_rebuild_task", side_effect=lambda task: task in ["B", "D"]):
+    with patch.object(bob_with_complex_graph, "should_rebuild_task", side_effect=lambda task, reasons=None: task in ["B", "D"]):
         result_graph = bob_with_complex_graph.filter_tasks_to_rebuild(bob_with_complex_graph.dependency_graph)
         assert set(result_graph.nodes) == {"B", "C", "D", "E"}, "C and E should be rebuilt due to dependencies on B and D."
 
@@ -1534,7 +1545,7 @@ def test_run_subprocess_success(mock_is_dir, mock_popen):
     mock_log_file = MagicMock()
 
     mock_process = MagicMock()
-    mock_process.stdout = ["hello\n", "world\n"]
+    mock_process.stdout = io.BytesIO(b"hello\nworld\n")
     mock_process.wait.return_value = None
     mock_process.returncode = 0
     mock_popen.return_value.__enter__.return_value = mock_process
@@ -1548,9 +1559,128 @@ def test_run_subprocess_success(mock_is_dir, mock_popen):
     )
 
     assert result is True
-    assert mock_log_file.write.call_count == 2
-    for call_arg in mock_log_file.write.call_args_list:
-        assert "[20" in call_arg.args[0]  # timestamp check
+    written = b"".join(call_arg.args[0] for call_arg in mock_log_file.write.call_args_list)
+    lines = written.decode().splitlines()
+    assert len(lines) == 2
+    for line, expected in zip(lines, ["hello", "world"]):
+        assert line.startswith("[20")  # timestamp check
+        assert line.endswith(f"] {expected}")
+    mock_log_file.flush.assert_called()
+
+def test_capture_subprocess_output_prefixes_lines_across_chunks():
+    """Test that lines split across read() chunks get exactly one timestamp, and a final partial line is terminated"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.LOG_CAPTURE_CHUNK_SIZE = 4
+    log_file = io.BytesIO()
+    bob_instance.capture_subprocess_output(io.BytesIO(b"compiling foo.c\n\nlinking\nno newline"), log_file)
+
+    lines = log_file.getvalue().decode().split("\n")
+    assert lines[-1] == ""
+    assert [line.split("] ", 1)[1] if "] " in line else line for line in lines[:-1]] == ["compiling foo.c", "", "linking", "no newline"]
+    for line in lines[:-1]:
+        assert line.startswith("[20")
+
+def test_run_subprocess_writes_timestamped_log(tmp_path: Path):
+    """Test a real subprocess writing into a task log opened by setup_task_logger()"""
+    bob_instance = Bob(MagicMock())
+    log_file_path = tmp_path / "out" / "task.log"
+    log_file = bob_instance.setup_task_logger(log_file_path)
+    result = bob_instance.run_subprocess("task", [sys.executable, "-c", "print('a'); print('b')"], os.environ.copy(), log_file, str(tmp_path))
+    log_file.close()
+
+    assert result is True
+    lines = log_file_path.read_text().splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith("[20") and lines[0].endswith("] a")
+
+def test_run_subprocess_raw_mode_passes_output_through(tmp_path: Path):
+    """Test that raw mode hands the log file descriptor to the child, leaving its output untouched"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.raw_task_logs = True
+    log_file_path = tmp_path / "task.log"
+    log_file = bob_instance.setup_task_logger(log_file_path)
+    log_file.write(b"header\n")
+    result = bob_instance.run_subprocess("task", [sys.executable, "-c", "print('a'); print('b')"], os.environ.copy(), log_file, str(tmp_path))
+    log_file.close()
+
+    assert result is True
+    assert log_file_path.read_text() == "header\na\nb\n"
+
+def test_raw_task_log_is_read_back_by_show_task_log(tmp_path: Path, capsys):
+    """Test that the output a raw mode task writes straight into its log is indexed, such that 'bob log' and 'bob log --errors' show it"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.raw_task_logs = True
+    output_dir = tmp_path / "build" / "task"
+    bob_instance.task_configs["task"] = {"output_dir": output_dir}
+    log_file = bob_instance.setup_task_logger(output_dir / "task.log")
+    result = bob_instance.run_subprocess("task", ["/bin/sh", "-c", "echo hello; echo 'main.c:1: error: boom'"], os.environ.copy(), log_file, str(tmp_path))
+    log_file.close()
+
+    assert result is True
+    assert bob_instance.show_task_log("task")
+    assert capsys.readouterr().out == "hello\nmain.c:1: error: boom\n"
+    assert bob_instance.show_task_log("task", errors_only=True)
+    assert capsys.readouterr().out == "main.c:1: error: boom\n"
+
+def test_run_subprocess_of_remote_task_runs_on_remote_backend(tmp_path: Path):
+    """Test that the commands of a 'remote: true' task run as jobs of the remote backend, in their cwd, with their output and exit status"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.remote_backend = "local"
+    output_dir = tmp_path / "build" / "task"
+    output_dir.mkdir(parents=True)
+    bob_instance.task_configs = {"task": {"remote": True, "output_dir": output_dir}, "local_task": {"remote": False, "output_dir": output_dir}}
+    assert bob_instance.is_remote_task("task") and not bob_instance.is_remote_task("local_task")
+    log_file_path = output_dir / "task.log"
+    log_file = bob_instance.setup_task_logger(log_file_path)
+    env = dict(os.environ, GREETING="hello")
+    ok = bob_instance.run_subprocess("task", [sys.executable, "-c", "import os; print(os.environ['GREETING'], os.getcwd())"], env, log_file, str(tmp_path))
+    failed = bob_instance.run_subprocess("task", [sys.executable, "-c", "import sys; print('oops'); sys.exit(3)"], env, log_file, str(tmp_path))
+    log_file.close()
+    bob_instance.remote_job_backend._executor.shutdown(wait=True)   # no thread left for the tests forking task processes
+
+    assert ok is True and failed is False
+    assert bob_instance.last_subprocess_returncode == 3
+    lines = log_file_path.read_text().splitlines()
+    assert lines[0].endswith(f"] hello {tmp_path}") and lines[1].endswith("] oops")
+    # The run dirs of the jobs are removed once their output is in the task log
+    assert not (output_dir / ".remote").exists()
+
+def test_remote_job_resources_come_from_task_config_or_make_jobs():
+    """Test that remote jobs get the task's 'remote_resources', by default one CPU per make job, and are killed at their time limit"""
+    assert remote_job_resources(["make", "-j", "8", "-C", "build"]) == {"cpus": 8, "mem_mb": 8 * REMOTE_DEFAULT_MEM_MB_PER_CPU, "time_limit_min": REMOTE_DEFAULT_TIME_LIMIT_MIN}
+    assert remote_job_resources(["make", "-j4"])["cpus"] == 4 and remote_job_resources(["make", "--jobs=2"])["cpus"] == 2
+    assert remote_job_resources(["gcc", "-j", "8"])["cpus"] == 1
+    assert remote_job_resources(["make", "-j", "8"], {"mem_mb": 4096, "time_limit_min": 120}) == {"cpus": 8, "mem_mb": 4096, "time_limit_min": 120}
+
+def test_remote_job_is_cancelled_when_task_process_is_terminated(tmp_path: Path):
+    """Test that SIGTERM of a task process waiting for its remote job cancels the job, then terminates the process as before"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.remote_backend = "local"
+    output_dir = tmp_path / "build" / "task"
+    output_dir.mkdir(parents=True)
+    bob_instance.task_configs = {"task": {"remote": True, "output_dir": output_dir, "remote_resources": {"time_limit_min": 5}}}
+    log_file = bob_instance.setup_task_logger(output_dir / "task.log")
+    submitted, cancelled, received = [], [], []
+    backend = make_remote_backend("local")
+    backend_submit, backend_cancel = backend.submit, backend.cancel
+    backend.submit = lambda spec: submitted.append(spec) or backend_submit(spec)
+    backend.cancel = lambda job_ids: cancelled.extend(job_ids) or backend_cancel(job_ids)
+    bob_instance.remote_job_backend = backend
+    previous_handler = signal.signal(signal.SIGTERM, lambda signum, frame: received.append(signum))
+    timer = threading.Timer(0.5, os.kill, (os.getpid(), signal.SIGTERM))
+    try:
+        timer.start()
+        result = bob_instance.run_subprocess("task", [sys.executable, "-c", "import time; time.sleep(30)"], os.environ.copy(), log_file, str(tmp_path))
+    finally:
+        timer.cancel()
+        signal.signal(signal.SIGTERM, previous_handler)
+        backend._executor.shutdown(wait=True)   # no thread left for the tests forking task processes
+    log_file.close()
+
+    assert result is False
+    assert cancelled == [submitted[0].job_id]
+    assert submitted[0].job_wall_timeout_s == 5 * 60 and submitted[0].resources["time_limit_min"] == 5
+    assert received == [signal.SIGTERM]
 
 @patch("pathlib.Path.is_dir", return_value=True)
 def test_run_subprocess_missing_cmd(mock_is_dir):
@@ -1619,7 +1749,7 @@ def test_run_subprocess_uses_cwd(mock_is_dir, mock_popen):
     mock_log_file = MagicMock()
 
     mock_process = MagicMock()
-    mock_process.stdout = ["output\n"]
+    mock_process.stdout = io.BytesIO(b"output\n")
     mock_process.wait.return_value = None
     mock_process.returncode = 0
     mock_popen.return_value.__enter__.return_value = mock_process
@@ -1650,7 +1780,7 @@ def test_build_command_generates_output_file(mock_is_dir, mock_popen):
 
     # Simulate the build process output
     mock_process = MagicMock()
-    mock_process.stdout = ["Compiling...\n", "Done.\n"]
+    mock_process.stdout = io.BytesIO(b"Compiling...\nDone.\n")
     mock_process.wait.return_value = None
     mock_process.returncode = 0
     mock_popen.return_value.__enter__.return_value = mock_process
@@ -1838,3 +1968,67 @@ def test_list_tasks_empty_regex_list(sample_bob_instance_for_task_names_regex_fi
 
     # Output should include "Tasks:" header but no task names
     assert output.startswith("No matched tasks with regex task name patterns: [].")
+
+def test_generate_unity_sources_batches_and_preserves_mtime(tmp_path: Path):
+    """Test that unity sources include every .cpp in batches, are not rewritten when unchanged and stale ones are removed"""
+    bob_instance = Bob(MagicMock())
+    cpp_src_files = [str(tmp_path / f"src_{i}.cpp") for i in range(5)]
+
+    unity_src_files = bob_instance.generate_unity_sources("task", cpp_src_files, tmp_path, 2)
+    assert [Path(p).name for p in unity_src_files] == ["task_unity_0.cpp", "task_unity_1.cpp", "task_unity_2.cpp"]
+    included = [line for p in unity_src_files for line in Path(p).read_text().splitlines() if line.startswith("#include")]
+    assert included == [f'#include "{src}"' for src in cpp_src_files]
+
+    mtime_ns = Path(unity_src_files[0]).stat().st_mtime_ns
+    os.utime(unity_src_files[0], ns=(mtime_ns - 10**9, mtime_ns - 10**9))
+    unity_src_files = bob_instance.generate_unity_sources("task", cpp_src_files, tmp_path, None)
+    assert [Path(p).name for p in unity_src_files] == ["task_unity_0.cpp"]
+    assert not (tmp_path / "unity" / "task_unity_1.cpp").exists()
+    # Content changed from 2 to 5 files, so it has been rewritten
+    assert Path(unity_src_files[0]).stat().st_mtime_ns != mtime_ns - 10**9
+
+    mtime_ns = Path(unity_src_files[0]).stat().st_mtime_ns
+    bob_instance.generate_unity_sources("task", cpp_src_files, tmp_path, None)
+    assert Path(unity_src_files[0]).stat().st_mtime_ns == mtime_ns
+
+def test_set_build_variant_separates_outputs(create_valid_task_config: Path, bob_instance: Bob):
+    """Test that a build variant has its own output dirs and checksum file, and that unknown variants are rejected"""
+    bob_instance.proj_root = str(create_valid_task_config.parent)
+    bob_instance.set_build_variant("asan")
+    assert bob_instance.dotbob_checksum_file.name == "checksum.asan.json"
+    bob_instance.discover_tasks()
+    assert bob_instance.task_configs["test_task"]["output_dir"] == Path(bob_instance.proj_root) / "build" / "asan" / "test_task"
+
+    bob_instance.set_build_variant(None)
+    assert bob_instance.dotbob_checksum_file.name == "checksum.json"
+    assert bob_instance.get_build_root() == Path(bob_instance.proj_root) / "build"
+    with pytest.raises(ValueError):
+        bob_instance.set_build_variant("fast")
+
+@pytest.mark.skipif(any(shutil.which(tool) is None for tool in ["g++", "gcc-ar"]), reason="g++ or gcc-ar is not available")
+def test_execute_cpp_compile_lto_thin_archive(tmp_path: Path):
+    """Test that an 'lto' library is a thin archive of -flto objects, which an executable linking it inlines, and that turning thin_archive off rewrites it"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.tool_config_parser = MagicMock()
+    bob_instance.tool_config_parser.get_command.side_effect = lambda tool: [shutil.which(tool)] + (["-O2"] if tool == "g++" else [])
+    lib_src, main_src = tmp_path / "lib.cpp", tmp_path / "main.cpp"
+    lib_src.write_text("int lib_value() { return 42; }\n")
+    main_src.write_text("int lib_value();\nint main() { return lib_value() == 42 ? 0 : 1; }\n")
+    lib_dir, exe_dir = tmp_path / "build" / "lib", tmp_path / "build" / "exe"
+    lib_dir.mkdir(parents=True)
+    exe_dir.mkdir(parents=True)
+    bob_instance.task_configs["lib"] = {"task_config_dict": {"task_type": "cpp_compile", "lib_type": "static", "lib_name": "liblib.a"},
+                                        "task_env": dict(os.environ), "output_dir": lib_dir, "internal_src_files": [str(lib_src)], "lto": True, "thin_archive": True}
+    bob_instance.task_configs["exe"] = {"task_config_dict": {"task_type": "cpp_compile", "executable_name": "exe.exe"}, "task_env": dict(os.environ),
+                                        "output_dir": exe_dir, "internal_src_files": [str(main_src)], "external_objects": [str(lib_dir / "liblib.a")], "lto_link": True}
+
+    assert bob_instance.execute_cpp_compile("lib")
+    assert bob_instance.is_thin_archive(lib_dir / "liblib.a")
+    assert bob_instance.execute_cpp_compile("exe")
+    assert subprocess.run([str(exe_dir / "exe.exe")]).returncode == 0
+    # lib_value() has been inlined into main() by the link-time optimiser, hence no longer emitted as a call
+    assert "lib_value" not in subprocess.run(["nm", "-C", str(exe_dir / "exe.exe")], capture_output=True, text=True).stdout
+
+    bob_instance.task_configs["lib"]["thin_archive"] = False
+    assert bob_instance.execute_cpp_compile("lib")
+    assert not bob_instance.is_thin_archive(lib_dir / "liblib.a")
@@ -0,0 +1,78 @@
+import os
+import sys
+import json
+import multiprocessing
+import pytest
+from pathlib import Path
+from networkx import DiGraph
+from unittest.mock import MagicMock, patch
+from bob.Bob import Bob
+from bob.BuildEvents import BuildEventLog, read_build_events, merge_rusage
+
+def test_build_event_log_appends_json_lines(tmp_path: Path):
+    """Test that events are appended as one JSON object per line, tagged with the build id and pid"""
+    path = tmp_path / "events.jsonl"
+    BuildEventLog(path, "build_a").emit("build_start")
+    BuildEventLog(path, "build_b").emit("task_start", task="t")
+
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["event"] for line in lines] == ["build_start", "task_start"]
+    events = read_build_events(path, "build_b")
+    assert len(events) == 1
+    assert events[0]["task"] == "t" and events[0]["pid"] == os.getpid()
+
+def _emit_many(path: Path, worker: int) -> None:
+    event_log = BuildEventLog(path, "b")
+    for i in range(200):
+        event_log.emit("compile_unit_end", task=f"task_{worker}", src="x" * 100, i=i)
+
+def test_build_event_log_concurrent_writers_do_not_interleave(tmp_path: Path):
+    """Test that events written concurrently by several processes each stay on their own, valid line"""
+    path = tmp_path / "events.jsonl"
+    processes = [multiprocessing.Process(target=_emit_many, args=(path, worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(events) == 800
+
+def test_merge_rusage():
+    """Test that CPU times add up and the peak RSS is the maximum"""
+    total = merge_rusage(None, {"user_s": 1.0, "sys_s": 0.5, "max_rss_kb": 100})
+    total = merge_rusage(total, None)
+    total = merge_rusage(total, {"user_s": 2.0, "sys_s": 0.25, "max_rss_kb": 50})
+    assert total == {"user_s": 3.0, "sys_s": 0.75, "max_rss_kb": 100}
+
+def test_run_subprocess_records_exit_status_and_rusage(tmp_path: Path):
+    """Test that run_subprocess() reaps the child with os.wait4() and accumulates its rusage for the task"""
+    bob_instance = Bob(MagicMock())
+    log_file = bob_instance.setup_task_logger(tmp_path / "task.log")
+    assert bob_instance.run_subprocess("task", [sys.executable, "-c", "print('ok')"], os.environ.copy(), log_file, str(tmp_path))
+    first = bob_instance.task_rusage
+    assert bob_instance.last_subprocess_returncode == 0
+    assert first is not None and first["max_rss_kb"] > 0
+
+    assert not bob_instance.run_subprocess("task", [sys.executable, "-c", "import sys; sys.exit(3)"], os.environ.copy(), log_file, str(tmp_path))
+    assert bob_instance.last_subprocess_returncode == 3
+    assert bob_instance.task_rusage["user_s"] >= first["user_s"]
+
+def test_emit_event_is_a_no_op_outside_a_build(tmp_path: Path):
+    """Test that executors called outside execute_tasks() do not write events"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.dotbob_events_file = tmp_path / "events.jsonl"
+    bob_instance.emit_event("task_start", task="t")
+    assert not bob_instance.dotbob_events_file.exists()
+
+@patch.object(Bob, "should_rebuild_task", side_effect=lambda task, reasons=None: task == "b")
+def test_filter_tasks_to_rebuild_emits_cache_hits(mock_should_rebuild_task, tmp_path: Path):
+    """Test that tasks not needing a rebuild are reported as cache hits"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.event_log = BuildEventLog(tmp_path / "events.jsonl", "b")
+    graph = DiGraph()
+    graph.add_edges_from([("a", "b"), ("b", "c")])
+
+    rebuild_graph = bob_instance.filter_tasks_to_rebuild(graph)
+    assert set(rebuild_graph.nodes) == {"b", "c"}
+    events = read_build_events(tmp_path / "events.jsonl")
+    assert [(e["event"], e["task"]) for e in events] == [("cache_hit", "a")]
@@ -0,0 +1,89 @@
+import json
+import pytest
+from pathlib import Path
+from networkx import DiGraph
+from unittest.mock import MagicMock
+from bob.Bob import Bob
+from bob.BuildPlan import estimate_task_durations, critical_path, simulate_schedule, format_duration
+
+def test_estimate_task_durations_prefers_same_variant():
+    """Test that estimates are medians of successful runs, of builds of the same variant when there are any"""
+    events = [
+        {"event": "build_start", "build_id": "a", "variant": None},
+        {"event": "build_start", "build_id": "b", "variant": "release"},
+        {"event": "task_end", "build_id": "a", "task": "lib", "success": True, "duration_s": 10.0},
+        {"event": "task_end", "build_id": "a", "task": "tb", "success": True, "duration_s": 4.0},
+        {"event": "task_end", "build_id": "b", "task": "tb", "success": True, "duration_s": 1.0},
+        {"event": "task_end", "build_id": "b", "task": "tb", "success": True, "duration_s": 3.0},
+        {"event": "task_end", "build_id": "b", "task": "tb", "success": False, "duration_s": 100.0},
+    ]
+    assert estimate_task_durations(events, "release") == {"lib": 10.0, "tb": 2.0}
+    assert estimate_task_durations(events, None) == {"lib": 10.0, "tb": 4.0}
+
+def test_critical_path_and_simulated_schedule():
+    """Test that the critical path is the longest chain, and that the wall-clock estimate is bounded by the workers"""
+    graph = DiGraph([("lib", "tb_a"), ("lib", "tb_b"), ("verilate", "tb_b")])
+    durations = {"lib": 2.0, "verilate": 5.0, "tb_a": 4.0, "tb_b": 3.0}
+    assert critical_path(graph, durations) == (["verilate", "tb_b"], 8.0)
+    assert simulate_schedule(graph, durations, 4) == 8.0
+    assert simulate_schedule(graph, durations, 1) == sum(durations.values())
+    assert critical_path(DiGraph(), durations) == ([], 0.0)
+    assert format_duration(None) == "n/a" and format_duration(75) == "1m15s"
+
+@pytest.fixture
+def bob_with_built_tasks(make_bob_with_built_tasks) -> Bob:
+    """Fixture to create a Bob whose tasks 'lib' and 'exe', depending on it, are built and clean, fingerprinted with gcc -O2"""
+    return make_bob_with_built_tasks([("lib", "exe")], tools={"gcc": {"command": ["/usr/bin/gcc", "-O2"], "version": "gcc 12.2.0"}})
+
+def test_plan_build_reports_reasons_without_side_effects(bob_with_built_tasks: Bob, tmp_path: Path):
+    """Test that the plan lists changed files, changed tool flags and upstream changes, and leaves checksum.json untouched"""
+    bob_instance = bob_with_built_tasks
+    assert bob_instance.plan_build(True, [])["tasks"] == []
+
+    (tmp_path / "lib" / "lib.c").write_text("int y;\n")
+    bob_instance.tool_config_parser.describe.return_value = {"gcc": {"command": ["/usr/bin/gcc", "-O3"], "version": "gcc 12.2.0"}}
+    checksum_before = bob_instance.dotbob_checksum_file.read_text()
+    plan = bob_instance.plan_build(False, ["exe"])
+    assert bob_instance.dotbob_checksum_file.read_text() == checksum_before
+
+    assert [entry["task"] for entry in plan["tasks"]] == ["lib", "exe"]
+    assert plan["tasks"][0]["reasons"] == ["changed tool flags: gcc", "changed file: lib/lib.c"]
+    assert plan["tasks"][1]["reasons"] == ["changed tool flags: gcc", "upstream change: lib"]
+    assert plan["critical_path"] == ["lib", "exe"] and plan["tasks_without_history"] == ["lib", "exe"]
+
+    bob_instance.tool_config_parser.describe.return_value = {"gcc": {"command": ["/usr/bin/gcc", "-O2"], "version": "gcc 13.3.0"}}
+    assert bob_instance.explain_rebuild("exe") == ["changed tool version: gcc"]
+
+def test_explain_rebuild_never_built_and_dirty(bob_with_built_tasks: Bob, tmp_path: Path):
+    """Test that tasks without a recorded build, or whose last build did not complete, say so"""
+    bob_instance = bob_with_built_tasks
+    bob_instance.mark_task_as_dirty_in_dotbob_checksum_file("lib")
+    assert bob_instance.explain_rebuild("lib") == ["dirty flag, its last build did not complete"]
+    checksums = json.loads(bob_instance.dotbob_checksum_file.read_text())
+    checksums["exe"]["hash_sha256"] = ""
+    bob_instance.dotbob_checksum_file.write_text(json.dumps(checksums))
+    assert bob_instance.explain_rebuild("exe") == ["never built"]
+
+def test_plan_build_fingerprints_each_task_once(bob_with_built_tasks: Bob, tmp_path: Path):
+    """Test that the reasons of a task are explained from the fingerprint deciding to rebuild it, rather than from a second one"""
+    bob_instance = bob_with_built_tasks
+    (tmp_path / "lib" / "lib.c").write_text("int y;\n")
+    compute_hash = bob_instance._compute_task_input_src_files_hash_sha256
+    computed = []
+    bob_instance._compute_task_input_src_files_hash_sha256 = lambda task_name, file_hashes=None: computed.append(task_name) or compute_hash(task_name, file_hashes)
+    plan = bob_instance.plan_build(True, [])
+    assert [entry["task"] for entry in plan["tasks"]] == ["lib", "exe"]
+    assert plan["tasks"][0]["reasons"] == ["changed file: lib/lib.c"]
+    assert sorted(computed) == ["exe", "lib"]
+
+def test_gcc_ar_is_a_tool_of_lto_tasks_only(mock_bob: Bob):
+    """Test that the fingerprint of a cpp_compile task records gcc-ar only if the task archives with it, i.e. is built with LTO"""
+    bob_instance = mock_bob
+    bob_instance.tool_config_parser = MagicMock()
+    bob_instance.tool_config_parser.describe.return_value = {}
+    bob_instance.task_configs = {"lib": {"task_config_dict": {"task_type": "cpp_compile"}},
+                                 "lto_lib": {"task_config_dict": {"task_type": "cpp_compile"}, "lto": True}}
+    bob_instance.get_task_tool_commands("lib")
+    bob_instance.tool_config_parser.describe.assert_called_with(["g++", "ar"])
+    bob_instance.get_task_tool_commands("lto_lib")
+    bob_instance.tool_config_parser.describe.assert_called_with(["g++", "ar", "gcc-ar"])
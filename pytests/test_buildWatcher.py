@@ -0,0 +1,121 @@
+import os
+import pytest
+from pathlib import Path
+from networkx import DiGraph
+from unittest.mock import MagicMock, patch
+from bob.Bob import Bob
+from bob.BuildWatcher import BuildWatcher, PollingWaiter
+
+@pytest.fixture
+def bob_with_sources(tmp_path: Path):
+    """Creates a Bob instance with three tasks lib → app → tb, each owning one source file"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.proj_root = str(tmp_path)
+    graph = DiGraph()
+    graph.add_edges_from([("lib", "app"), ("app", "tb")])
+    graph.add_node("other")
+    bob_instance.dependency_graph = graph
+    for task_name in ["lib", "app", "tb", "other"]:
+        task_dir = tmp_path / task_name
+        task_dir.mkdir()
+        src = task_dir / f"{task_name}.cpp"
+        src.write_text("int main() {}\n")
+        task_config_file_path = task_dir / "task_config.yaml"
+        task_config_file_path.write_text(f"task_name: {task_name}\n")
+        bob_instance.task_configs[task_name] = {
+            "input_src_files": [str(src)],
+            "task_config_file_path": task_config_file_path,
+        }
+    return bob_instance
+
+def test_resolve_watched_tasks_includes_dependencies(bob_with_sources):
+    """Test that watching a task also watches its dependencies, in topological order"""
+    watcher = BuildWatcher(bob_with_sources, MagicMock(), False, ["^app$"])
+    assert watcher.resolve_watched_tasks() == ["lib", "app"]
+
+def test_detect_changes_and_affected_tasks(bob_with_sources, tmp_path: Path):
+    """Test that a changed source file rebuilds its owner and the watched tasks downstream of it only"""
+    watcher = BuildWatcher(bob_with_sources, MagicMock(), True, [], use_inotify=False)
+    watcher._setup_watch()
+    assert isinstance(watcher.waiter, PollingWaiter)
+    assert watcher.detect_changes() == set()
+
+    src = tmp_path / "lib" / "lib.cpp"
+    src.write_text("int main() { return 1; }\n")
+    changed = watcher.detect_changes()
+    assert changed == {str(src)}
+    assert watcher.affected_tasks(changed) == ["lib", "app", "tb"]
+
+def test_detect_changes_ignores_unchanged_content(bob_with_sources, tmp_path: Path):
+    """Test that a source file touched or rewritten with the same content is not a change"""
+    watcher = BuildWatcher(bob_with_sources, MagicMock(), True, [], use_inotify=False)
+    watcher._setup_watch()
+    src = tmp_path / "app" / "app.cpp"
+    os.utime(src, ns=(0, 0))
+    src.write_text(src.read_text())
+    assert watcher.detect_changes() == set()
+
+def test_collect_watched_files_excludes_task_output_dirs(bob_with_sources, tmp_path: Path):
+    """Test that inputs within the output dir of a task, i.e. generated by the build, are not watched"""
+    generated = tmp_path / "build" / "lib" / "lib_gen.cpp"
+    bob_with_sources.task_configs["lib"]["output_dir"] = tmp_path / "build" / "lib"
+    bob_with_sources.task_configs["app"]["input_src_files"].append(str(generated))
+    watcher = BuildWatcher(bob_with_sources, MagicMock(), True, [])
+    file_owners = watcher.collect_watched_files(["lib", "app"])
+    assert str(tmp_path / "app" / "app.cpp") in file_owners
+    assert str(generated) not in file_owners
+
+def test_rebuild_anchors_task_names(bob_with_sources):
+    """Test that rebuild() passes anchored, escaped task names to execute_tasks()"""
+    watcher = BuildWatcher(bob_with_sources, MagicMock(), True, [])
+    with patch.object(bob_with_sources, "execute_tasks") as mock_execute_tasks:
+        watcher.rebuild(["lib", "app"])
+    mock_execute_tasks.assert_called_once_with(False, ["^lib$", "^app$"])
+
+def test_run_rebuilds_on_change(bob_with_sources, tmp_path: Path):
+    """Test that run() rebuilds the affected tasks after a source file changes"""
+    watcher = BuildWatcher(bob_with_sources, MagicMock(), False, ["^tb$"], poll_interval=0, debounce_s=0, use_inotify=False)
+    src = tmp_path / "app" / "app.cpp"
+
+    def edit_source(timeout):
+        src.write_text("int main() { return 2; }\n")
+        return True
+
+    with patch.object(PollingWaiter, "wait", side_effect=edit_source), \
+         patch.object(bob_with_sources, "execute_tasks") as mock_execute_tasks:
+        assert watcher.run(max_cycles=1) == 0
+    mock_execute_tasks.assert_called_once_with(False, ["^app$", "^tb$"])
+
+def test_run_reconfigures_on_task_config_change(bob_with_sources, tmp_path: Path):
+    """Test that a change to a task_config.yaml triggers the reconfigure callback and a full rebuild of the selection"""
+    reconfigure = MagicMock(return_value=bob_with_sources)
+    watcher = BuildWatcher(bob_with_sources, MagicMock(), False, ["^app$"], reconfigure=reconfigure, poll_interval=0, debounce_s=0, use_inotify=False)
+    task_config_file_path = tmp_path / "lib" / "task_config.yaml"
+
+    def edit_task_config(timeout):
+        task_config_file_path.write_text("task_name: lib\ndescription: changed\n")
+        return True
+
+    with patch.object(PollingWaiter, "wait", side_effect=edit_task_config), \
+         patch.object(bob_with_sources, "execute_tasks") as mock_execute_tasks:
+        watcher.run(max_cycles=1)
+    reconfigure.assert_called_once()
+    mock_execute_tasks.assert_called_once_with(False, ["^app$"])
+
+def test_run_reconfigures_on_new_file_in_task_dir(bob_with_sources, tmp_path: Path):
+    """Test that a file added to a watched task's directory triggers the reconfigure callback, while hidden files such as editor swap files do not"""
+    reconfigure = MagicMock(return_value=bob_with_sources)
+    watcher = BuildWatcher(bob_with_sources, MagicMock(), False, ["^app$"], reconfigure=reconfigure, poll_interval=0, debounce_s=0, use_inotify=False)
+    new_files = iter([tmp_path / "app" / ".app.cpp.swp", tmp_path / "other" / "other2.cpp", tmp_path / "lib" / "lib2.cpp"])
+
+    def add_file(timeout):
+        next(new_files).write_text("int f() { return 0; }\n")
+        return True
+
+    with patch.object(PollingWaiter, "wait", side_effect=add_file), \
+         patch.object(bob_with_sources, "execute_tasks") as mock_execute_tasks:
+        watcher.run(max_cycles=2)
+        reconfigure.assert_not_called()
+        watcher.run(max_cycles=1)
+    reconfigure.assert_called_once()
+    mock_execute_tasks.assert_called_once_with(False, ["^app$"])
@@ -0,0 +1,58 @@
+import hashlib
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from bob.Bob import Bob
+from bob import FileHash
+from bob.FileHash import hash_factory, available_hash_algorithms, file_digest
+
+def test_file_digest_small_and_memory_mapped(tmp_path: Path):
+    """Test that small files and large, memory mapped, files give the digest of their content"""
+    small, large, empty = tmp_path / "small.sv", tmp_path / "large.sv", tmp_path / "empty.sv"
+    small.write_bytes(b"module top; endmodule\n")
+    large.write_bytes(b"x" * 4096)
+    empty.write_bytes(b"")
+    with patch.object(FileHash, "MMAP_THRESHOLD", 1024):
+        assert file_digest(large, hashlib.sha256) == hashlib.sha256(b"x" * 4096).hexdigest()
+        assert file_digest(small, hashlib.blake2b) == hashlib.blake2b(b"module top; endmodule\n").hexdigest()
+        assert file_digest(empty, hashlib.sha256) == hashlib.sha256(b"").hexdigest()
+
+def test_hash_factory():
+    """Test that unknown hashes are rejected, and that the hashlib ones are always available"""
+    with pytest.raises(ValueError):
+        hash_factory("md5")
+    assert {"sha256", "blake2b"} <= set(available_hash_algorithms())
+
+def test_switching_fingerprint_hash_rebuilds_once(tmp_path: Path):
+    """Test that entries recorded with another hash, or without one, trigger a rebuild explained by the hash change"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.proj_root = str(tmp_path)
+    bob_instance.dotbob_checksum_file = tmp_path / "checksum.json"
+    bob_instance.tool_config_parser = MagicMock()
+    bob_instance.tool_config_parser.describe.return_value = {"gcc": {"command": ["/usr/bin/gcc"], "version": "gcc 12.2.0"}}
+    src = tmp_path / "top.c"
+    src.write_text("int x;\n")
+    (tmp_path / "task_config.yaml").write_text("task_name: lib\n")
+    bob_instance.task_configs["lib"] = {"task_config_dict": {"task_type": "c_compile"}, "internal_src_files": [str(src)], "input_src_files": [str(src)],
+                                        "task_config_file_path": tmp_path / "task_config.yaml", "output_dir": tmp_path / "build" / "lib"}
+    bob_instance.dotbob_checksum_file.write_text(json.dumps({"lib": {"hash_sha256": "", "dirty": True}}))
+    bob_instance.mark_task_as_clean_in_dotbob_checksum_file("lib")
+    assert not bob_instance.should_rebuild_task("lib")
+
+    bob_instance.set_fingerprint_hash("blake2b")
+    assert bob_instance.should_rebuild_task("lib")
+    assert bob_instance.explain_rebuild("lib") == ["changed fingerprint hash: sha256 -> blake2b"]
+    bob_instance.mark_task_as_clean_in_dotbob_checksum_file("lib")
+    assert not bob_instance.should_rebuild_task("lib")
+    assert json.loads(bob_instance.dotbob_checksum_file.read_text())["lib"]["hash_algorithm"] == "blake2b"
+
+def test_unavailable_fingerprint_hash_falls_back(monkeypatch):
+    """Test that a hash whose package is missing falls back to sha256 with a warning"""
+    def missing():
+        raise ImportError("No module named 'blake3'")
+    monkeypatch.setitem(FileHash.HASH_ALGORITHMS, "blake3", missing)
+    bob_instance = Bob(MagicMock())
+    bob_instance.set_fingerprint_hash("blake3")
+    assert bob_instance.fingerprint_hash == "sha256"
+    bob_instance.logger.warning.assert_called_once()
@@ -0,0 +1,38 @@
+import os
+from pathlib import Path
+from bob.FsSnapshot import FsSnapshot
+
+def test_queries_are_served_from_one_scandir_per_dir(tmp_path: Path):
+    """Test that existence, type and stat queries of the files of a dir cost a single scandir, and match the filesystem"""
+    (tmp_path / "src").mkdir()
+    for name in ["a.cpp", "b.cpp"]:
+        (tmp_path / "src" / name).write_text(name)
+    os.symlink(tmp_path / "src" / "a.cpp", tmp_path / "src" / "link.cpp")
+    os.symlink(tmp_path / "missing.cpp", tmp_path / "src" / "dangling.cpp")
+    snapshot = FsSnapshot()
+
+    assert snapshot.is_file(tmp_path / "src" / "a.cpp") and snapshot.exists(str(tmp_path / "src" / "b.cpp"))
+    assert snapshot.is_file(tmp_path / "src" / "link.cpp") and not snapshot.is_dir(tmp_path / "src" / "a.cpp")
+    assert not snapshot.exists(tmp_path / "src" / "dangling.cpp") and not snapshot.is_file(tmp_path / "src" / "c.cpp")
+    assert snapshot.stat(tmp_path / "src" / "a.cpp").st_size == 5
+    assert sorted(snapshot.listdir(tmp_path / "src")) == ["a.cpp", "b.cpp", "dangling.cpp", "link.cpp"]
+    assert snapshot.scandir_count == 1
+    assert snapshot.is_dir(tmp_path / "src") and not snapshot.exists(tmp_path / "nowhere" / "a.cpp")
+    assert snapshot.scandir_count == 3
+    assert snapshot.resolve(tmp_path / "src" / "link.cpp") == (tmp_path / "src" / "a.cpp").resolve()
+
+def test_invalidate_output_dir(tmp_path: Path):
+    """Test that files written into an invalidated dir are seen, while other dirs stay cached"""
+    (tmp_path / "build" / "task").mkdir(parents=True)
+    (tmp_path / "src").mkdir()
+    snapshot = FsSnapshot()
+    assert not snapshot.exists(tmp_path / "build" / "task" / "a.o")
+    assert not snapshot.exists(tmp_path / "src" / "a.cpp")
+
+    (tmp_path / "build" / "task" / "a.o").write_text("o")
+    (tmp_path / "src" / "a.cpp").write_text("c")
+    snapshot.invalidate(tmp_path / "build")
+    assert snapshot.exists(tmp_path / "build" / "task" / "a.o")
+    assert not snapshot.exists(tmp_path / "src" / "a.cpp")
+    snapshot.clear()
+    assert snapshot.exists(tmp_path / "src" / "a.cpp")
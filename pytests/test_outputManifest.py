@@ -0,0 +1,80 @@
+import hashlib
+import os
+import pytest
+from pathlib import Path
+from bob.Bob import Bob
+from bob.OutputManifest import OUTPUT_MANIFEST_FILE, build_output_manifest, write_output_manifest, load_output_manifest, manifest_entries, verilator_output_files
+
+def test_build_output_manifest_reuses_unchanged_hashes(tmp_path: Path):
+    """Test that files are listed relative to the output dir with size and hash, and that the hash of an unchanged file is reused"""
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.o").write_bytes(b"a")
+    (tmp_path / "sub" / "b.o").write_bytes(b"bb")
+    manifest = build_output_manifest(tmp_path, [tmp_path / "a.o", tmp_path / "sub" / "b.o", tmp_path.parent / "outside.o"])
+    assert sorted(manifest["files"]) == ["a.o", os.path.join("sub", "b.o")]
+    assert manifest["files"]["a.o"]["size"] == 1
+
+    assert manifest["hash_algorithm"] == "sha256" and manifest["files"]["a.o"]["hash"] == hashlib.sha256(b"a").hexdigest()
+
+    manifest["files"]["a.o"]["hash"] = "reused"
+    assert build_output_manifest(tmp_path, [tmp_path / "a.o"], manifest)["files"]["a.o"]["hash"] == "reused"
+    # Hashes of another algorithm are not reused
+    blake2b_manifest = build_output_manifest(tmp_path, [tmp_path / "a.o"], manifest, "blake2b")
+    assert blake2b_manifest == {"hash_algorithm": "blake2b", "files": {"a.o": dict(manifest["files"]["a.o"], hash=hashlib.blake2b(b"a").hexdigest())}}
+    (tmp_path / "a.o").write_bytes(b"aa")
+    assert build_output_manifest(tmp_path, [tmp_path / "a.o"], manifest)["files"]["a.o"]["hash"] != "reused"
+
+    write_output_manifest(tmp_path, manifest)
+    assert load_output_manifest(tmp_path) == manifest
+    assert sorted(manifest_entries(tmp_path, manifest, tmp_path / "sub")) == [str(tmp_path / "sub" / "b.o")]
+    assert manifest_entries(tmp_path, manifest, tmp_path / "stale.o") == {}
+
+def test_verilator_output_files(tmp_path: Path):
+    """Test that only the target lines of V<top>__verFiles.dat are outputs"""
+    ver_files_dat = tmp_path / "Vtop__verFiles.dat"
+    ver_files_dat.write_text('# DESCRIPTION: Verilator output\nC "--cc top.sv"\nS      1234  5678  1700000000  0  "/rtl/top.sv"\n'
+                             f'T      2034  9012  1700000000  0  "{tmp_path}/Vtop.cpp"\nT       512  9013  1700000000  0  "Vtop.h"\n')
+    assert verilator_output_files(ver_files_dat) == [ver_files_dat, tmp_path / "Vtop.cpp", tmp_path / "Vtop.h"]
+
+@pytest.fixture
+def bob_with_upstream_task(mock_bob: Bob, tmp_path: Path) -> tuple[Bob, Path]:
+    """Fixture to create a Bob whose task 'downstream' consumes the output dir of task 'upstream', returning it with that output dir"""
+    bob_instance = mock_bob
+    upstream_dir = tmp_path / "build" / "upstream"
+    upstream_dir.mkdir(parents=True)
+    for name in ["a.o", "stale.o", "upstream.log"]:
+        (upstream_dir / name).write_text(name)
+    task_config_file = tmp_path / "task_config.yaml"
+    task_config_file.write_text("task_name: downstream\n")
+    bob_instance.task_configs["upstream"] = {"output_dir": upstream_dir}
+    bob_instance.task_configs["downstream"] = {"output_dir": tmp_path / "build" / "downstream", "output_src_files": [str(upstream_dir)],
+                                               "input_src_files": [str(task_config_file)], "task_config_file_path": task_config_file}
+    return bob_instance, upstream_dir
+
+def test_resolve_output_src_files_from_manifest(bob_with_upstream_task: tuple[Bob, Path]):
+    """Test that only files listed by the upstream manifest are resolved, that resolution can be repeated, and that unlisted files are rejected"""
+    bob_instance, upstream_dir = bob_with_upstream_task
+    assert bob_instance.resolve_task_configs_output_src_files("downstream") == [str(upstream_dir / "a.o"), str(upstream_dir / "stale.o"), str(upstream_dir / "upstream.log")]
+    bob_instance.logger.warning.assert_called_once()
+
+    bob_instance.record_task_outputs([upstream_dir / "a.o"])
+    assert bob_instance.write_task_output_manifest("upstream")
+    assert bob_instance.resolve_task_configs_output_src_files("downstream") == [str(upstream_dir / "a.o")]
+    assert bob_instance.resolve_task_configs_output_src_files("downstream") == [str(upstream_dir / "a.o")]
+
+    bob_instance.task_configs["downstream"]["output_src_refs"] = [str(upstream_dir / "stale.o")]
+    assert bob_instance.resolve_task_configs_output_src_files("downstream") is None
+    bob_instance.logger.error.assert_called_once()
+
+def test_upstream_manifest_is_fingerprinted(bob_with_upstream_task: tuple[Bob, Path]):
+    """Test that a task's hash changes when an upstream output it consumes changes, and that the upstream logs are not listed"""
+    bob_instance, upstream_dir = bob_with_upstream_task
+    assert bob_instance.write_task_output_manifest("upstream")
+    assert sorted(load_output_manifest(upstream_dir)["files"]) == ["a.o", "stale.o"]
+    hash_sha256 = bob_instance._compute_task_input_src_files_hash_sha256("downstream")
+    assert hash_sha256 == bob_instance._compute_task_input_src_files_hash_sha256("downstream")
+
+    (upstream_dir / "a.o").write_text("rebuilt")
+    assert bob_instance.write_task_output_manifest("upstream")
+    assert bob_instance._compute_task_input_src_files_hash_sha256("downstream") != hash_sha256
+    assert OUTPUT_MANIFEST_FILE not in load_output_manifest(upstream_dir)["files"]
@@ -0,0 +1,56 @@
+from pathlib import Path
+from campaign.backends.local import LocalBackend
+from campaign.backends.packing import PackingBackend
+from campaign.job_spec import JobSpec, JobStatus
+
+def make_spec(batch_dir: Path, seed: int, exit_code: int = 0, pack: int = 1, pack_workers: int = 1) -> JobSpec:
+    """Return a JobSpec whose command creates its run dir and exits with exit_code, like a binary without progress events"""
+    output_dir = batch_dir / f"tb_{seed:016x}"
+    return JobSpec(job_id=f"batch_tb_{seed:016x}", binary=Path("tb.out"),
+                   args=["/bin/sh", "-c", 'mkdir -p "$0"; exit "$1"', str(output_dir), str(exit_code)],
+                   output_dir=output_dir, test_name=None, seed=seed,
+                   resources={"cpus": 1, "mem_mb": 256, "time_limit_min": 5}, job_wall_timeout_s=30,
+                   pack=pack, pack_workers=pack_workers)
+
+def wait_for_jobs(backend: PackingBackend, job_ids: list[str]) -> dict[str, JobStatus]:
+    while True:
+        statuses = backend.poll(job_ids)
+        if all(status.is_terminal for status in statuses.values()):
+            return statuses
+        backend.wait_for_change(timeout=0.1)
+
+def test_packed_jobs_run_as_one_backend_job_per_pack(tmp_path: Path, monkeypatch):
+    """Test that the seeds of a run entry are submitted pack at a time, while each keeps its own status and run dir"""
+    submitted = []
+    inner = LocalBackend(max_workers=2)
+    inner_submit = inner.submit
+    monkeypatch.setattr(inner, "submit", lambda spec: submitted.append(spec.job_id) or inner_submit(spec))
+    backend = PackingBackend(inner)
+    specs = [make_spec(tmp_path / "batch", seed, exit_code=int(seed == 3), pack=2, pack_workers=2) for seed in range(5)]
+    for spec in specs:
+        backend.submit(spec)
+    assert len(submitted) == 2   # the last seed waits for the next flush or poll
+
+    statuses = wait_for_jobs(backend, [spec.job_id for spec in specs])
+    assert submitted == [f"{specs[0].job_id}_pack2", f"{specs[2].job_id}_pack2", f"{specs[4].job_id}_pack1"]
+    assert statuses == {spec.job_id: JobStatus.FAILED if spec.seed == 3 else JobStatus.PASSED for spec in specs}
+    assert all((spec.output_dir / "reproduce.sh").exists() and (spec.output_dir / "progress.jsonl").exists() for spec in specs)
+    # Each pack job is finalised in a run dir of its own, rather than as a crashed run of the binary
+    # (its jobs record their statuses before campaign.pack exits)
+    pack_statuses = inner.poll(submitted)
+    while not all(status.is_terminal for status in pack_statuses.values()):
+        inner.wait_for_change(timeout=0.1)
+        pack_statuses = inner.poll(submitted)
+    assert pack_statuses == {submitted[0]: JobStatus.PASSED, submitted[1]: JobStatus.FAILED, submitted[2]: JobStatus.PASSED}
+    assert all((tmp_path / "batch" / ".pack" / pack_id / "pack.log").exists() for pack_id in submitted)
+    # campaign.pack is not a run of the binary to reproduce: only its jobs have a reproduce.sh
+    assert not any((tmp_path / "batch" / ".pack" / pack_id / "reproduce.sh").exists() for pack_id in submitted)
+    assert not (tmp_path / "batch" / "tb_crash.log").exists()
+
+def test_unpacked_jobs_are_submitted_to_the_wrapped_backend(tmp_path: Path):
+    """Test that jobs of run entries without pack go straight through to the wrapped backend"""
+    backend = PackingBackend(LocalBackend(max_workers=1))
+    spec = make_spec(tmp_path / "batch", 7)
+    assert backend.submit(spec) == spec.job_id
+    assert wait_for_jobs(backend, [spec.job_id]) == {spec.job_id: JobStatus.PASSED}
+    assert not (tmp_path / "batch" / ".pack").exists()
@@ -0,0 +1,87 @@
+import os
+import json
+import shutil
+import subprocess
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+from bob.Bob import Bob
+from bob.PrecompiledHeader import relevant_pch_flags, pch_fingerprint_mismatch, pch_stub_path, pch_gch_path, load_pch_fingerprint
+from taskConfigParser.TaskConfigParser import TaskConfigParser
+from toolConfigParser.ToolConfigParser import ToolConfigParser
+
+requires_gpp = pytest.mark.skipif(shutil.which("g++") is None, reason="g++ is not available")
+
+def test_relevant_pch_flags_ignore_warnings_and_include_dirs():
+    """Test that only flags affecting a precompiled header take part in its fingerprint"""
+    flags = ["-Wall", "-Wextra", "-std=c++20", "-fsanitize=address,undefined", "-pg", "-I", "/inc", "-O2", "-std=c++20"]
+    assert relevant_pch_flags(flags) == ["-O2", "-fsanitize=address,undefined", "-pg", "-std=c++20"]
+
+def test_pch_fingerprint_mismatch():
+    """Test that compiler identity and flag differences are reported"""
+    produced = {"compiler": {"path": "/usr/bin/g++", "version": "13.3.0", "machine": "x86_64-linux-gnu"}, "flags": ["-std=c++20"]}
+    assert pch_fingerprint_mismatch(produced, produced) == []
+    consumed = {"compiler": {"path": "/usr/bin/g++", "version": "12.2.0", "machine": "x86_64-linux-gnu"}, "flags": ["-O2", "-std=c++20"]}
+    differences = pch_fingerprint_mismatch(produced, consumed)
+    assert len(differences) == 2
+    assert "version" in differences[0] and "-O2" in differences[1]
+
+@requires_gpp
+def test_build_and_consume_precompiled_header(tmp_path: Path):
+    """Test that a producing task builds a usable .gch, and that consumers only use it with a matching fingerprint"""
+    bob_instance = Bob(MagicMock())
+    (tmp_path / "tool_config.yaml").write_text("g++:\n  path: g++\n  default_flags:\n    common: []\n")
+    bob_instance.tool_config_parser = ToolConfigParser(MagicMock(), str(tmp_path))
+    header = tmp_path / "heavy.h"
+    header.write_text("#ifndef HEAVY_H\n#define HEAVY_H\n#include <vector>\ninline int heavy() { return 42; }\n#endif\n")
+    output_dir = tmp_path / "build" / "producer"
+    output_dir.mkdir(parents=True)
+    bob_instance.task_configs["producer"] = {"precompiled_header_flags": []}
+    log_file = bob_instance.setup_task_logger(output_dir / "producer.log")
+
+    gpp_cmd_prefix = ["g++", "-Wall", "-std=c++17"]
+    assert bob_instance.build_precompiled_header("producer", [str(header)], gpp_cmd_prefix, [], os.environ.copy(), log_file, output_dir)
+    stub_path = pch_stub_path(output_dir, "producer")
+    assert pch_gch_path(stub_path).is_file()
+    assert load_pch_fingerprint(stub_path)["flags"] == ["-std=c++17"]
+
+    bob_instance.task_configs["consumer"] = {"consumed_precompiled_header": str(stub_path)}
+    pch_flags = bob_instance.get_consumed_precompiled_header_flags("consumer", ["g++", "-Wextra", "-std=c++17"])
+    assert pch_flags == ["-include", str(stub_path)]
+
+    # GCC accepts the precompiled header, -Winvalid-pch with -Werror would fail the compilation otherwise
+    src = tmp_path / "main.cpp"
+    src.write_text('#include "heavy.h"\nint main() { return heavy() == 42 ? 0 : 1; }\n')
+    subprocess.run(["g++", "-std=c++17", "-Winvalid-pch", "-Werror", *pch_flags, "-I", str(tmp_path), "-c", str(src), "-o", str(tmp_path / "main.o")], check=True)
+
+    assert bob_instance.get_consumed_precompiled_header_flags("consumer", ["g++", "-std=c++17", "-O2"]) == []
+    bob_instance.logger.warning.assert_called_once()
+    # The compiler identity comes from ToolConfigParser.describe(), probed once and cached in .bob/tool_cache.json
+    compiler = load_pch_fingerprint(stub_path)["compiler"]
+    assert compiler == {"path": shutil.which("g++"), "version": compiler["version"], "machine": subprocess.check_output(["g++", "-dumpmachine"], text=True).strip()}
+    assert json.loads((tmp_path / ".bob" / ToolConfigParser.TOOL_CACHE_FILE).read_text())["tools"]["g++"]["machine"] == compiler["machine"]
+
+def test_parse_precompiled_headers_produce_and_consume(tmp_path: Path):
+    """Test that direct references are headers to precompile and an output reference is a consumed precompiled header"""
+    task_config_parser = TaskConfigParser(MagicMock(), str(tmp_path))
+    task_config_parser.task_configs["producer"] = {"task_config_dict": {"precompiled_headers": ["core/a.h", "core/b.h"]}}
+    task_config_parser.task_configs["consumer"] = {"task_config_dict": {"precompiled_headers": "{@output:producer:producer_pch.h.gch}"}}
+    task_config_parser.resolve_reference = MagicMock(side_effect=[
+        ("/p/core/a.h", "direct"),
+        ("/p/core/b.h", "direct"),
+        ("/build/producer/producer_pch.h.gch", "output"),
+    ])
+
+    task_config_parser.parse_precompiled_headers("producer")
+    task_config_parser.parse_precompiled_headers("consumer", allow_produce=False)
+    assert task_config_parser.task_configs["producer"]["precompiled_headers"] == ["/p/core/a.h", "/p/core/b.h"]
+    assert task_config_parser.task_configs["producer"]["consumed_precompiled_header"] is None
+    assert task_config_parser.task_configs["consumer"]["consumed_precompiled_header"] == "/build/producer/producer_pch.h"
+
+def test_parse_precompiled_headers_consumer_cannot_produce(tmp_path: Path):
+    """Test that verilator_tb_compile tasks can only consume a precompiled header"""
+    task_config_parser = TaskConfigParser(MagicMock(), str(tmp_path))
+    task_config_parser.task_configs["tb"] = {"task_config_dict": {"precompiled_headers": ["core/a.h"]}}
+    task_config_parser.resolve_reference = MagicMock(return_value=("/p/core/a.h", "direct"))
+    with pytest.raises(ValueError):
+        task_config_parser.parse_precompiled_headers("tb", allow_produce=False)
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+from bob.Bob import Bob
+from bob.ProcessGroup import start_process_group, become_child_subreaper, signal_process_group
+
+def _run_compiler_like_task(pid_file: str, ignore_sigterm: bool):
+    """Stand-in for a task worker: a shell, like make, with a background child, like gcc, both in the worker's group"""
+    trap = "trap '' TERM; " if ignore_sigterm else ""
+    subprocess.run(["sh", "-c", f"{trap}sleep 60 & echo $! > {pid_file}; wait"])
+
+def _wait_for_pid(pid_file: Path) -> int:
+    for _ in range(200):
+        if pid_file.exists() and pid_file.read_text().strip():
+            return int(pid_file.read_text())
+        time.sleep(0.01)
+    raise TimeoutError(f"{pid_file} was not written")
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+def test_terminate_task_processes_reaps_whole_group(tmp_path: Path):
+    """Test that the grandchildren of a task worker are in its process group, and are terminated and reaped with it"""
+    pid_file = tmp_path / "sleep.pid"
+    become_child_subreaper() # As execute_tasks() does before spawning workers
+    worker = start_process_group(_run_compiler_like_task, (str(pid_file), False))
+    sleep_pid = _wait_for_pid(pid_file)
+    assert os.getpgid(sleep_pid) == worker.pid != os.getpgid(0)
+
+    bob_instance = Bob(MagicMock())
+    assert bob_instance.terminate_task_processes([("task", worker)])
+    assert not worker.is_alive() and not _pid_alive(sleep_pid)
+    assert not signal_process_group(worker.pid, 0)
+    bob_instance.logger.warning.assert_not_called()
+
+def test_terminate_task_processes_kills_after_grace_period(tmp_path: Path):
+    """Test that a group ignoring SIGTERM is killed once the grace period has elapsed"""
+    pid_file = tmp_path / "sleep.pid"
+    become_child_subreaper() # As execute_tasks() does before spawning workers
+    worker = start_process_group(_run_compiler_like_task, (str(pid_file), True))
+    sleep_pid = _wait_for_pid(pid_file)
+
+    bob_instance = Bob(MagicMock())
+    bob_instance.TERMINATE_GRACE_PERIOD_S = 0.2
+    assert bob_instance.terminate_task_processes([("task", worker)])
+    assert not _pid_alive(sleep_pid)
+    bob_instance.logger.warning.assert_called_once()
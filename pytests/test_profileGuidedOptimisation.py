@@ -0,0 +1,161 @@
+import os
+import shutil
+import subprocess
+import pytest
+import yaml
+from pathlib import Path
+from unittest.mock import MagicMock
+from bob.Bob import Bob
+from bob.ProfileGuidedOptimisation import pgo_fingerprint, pgo_key, gcov_prefix_strip, write_training_plan, find_gcov_data_dirs, load_pgo_profile, pgo_profile_id
+from taskConfigParser.TaskConfigParser import TaskConfigParser
+
+requires_pgo_tools = pytest.mark.skipif(any(shutil.which(tool) is None for tool in ["make", "g++", "ar", "gcov-tool"]), reason="make, g++, ar or gcov-tool is not available")
+VERILATOR_MK_PATH = Path(__file__).resolve().parent.parent / "build_scripts" / "verilator.mk"
+
+def test_pgo_key_depends_on_sources_and_flags(tmp_path: Path):
+    """Test that the profile key changes with the source content and the flags, but not with the source order"""
+    rtl, tb = tmp_path / "top.sv", tmp_path / "tb.cpp"
+    rtl.write_text("module top; endmodule\n")
+    tb.write_text("int main() { return 0; }\n")
+    key = pgo_key(pgo_fingerprint([str(rtl), str(tb)], ["-O3"]))
+    assert key == pgo_key(pgo_fingerprint([str(tb), str(rtl), str(tb)], ["-O3"]))
+    assert key != pgo_key(pgo_fingerprint([str(rtl), str(tb)], ["-O2"]))
+    tb.write_text("int main() { return 1; }\n")
+    assert key != pgo_key(pgo_fingerprint([str(rtl), str(tb)], ["-O3"]))
+
+def test_write_training_plan_runs_instrumented_binary(tmp_path: Path):
+    """Test that the training plan only keeps the task's binary, replaced by the instrumented one writing .gcda files per run"""
+    plan = tmp_path / "plan.yaml"
+    plan.write_text(yaml.safe_dump({"batch_id": "train", "output_dir": "runs", "binaries": [
+        {"binary": "./build/release/tb/tb.out", "reproduce_binary": "./build/asan/tb/tb.out", "coverage": True, "runs": [{"seeds": [1]}]},
+        {"binary": "./build/release/other/other.out", "runs": [{"seeds": [2]}]},
+    ]}))
+    profile_dir = tmp_path / "pgo" / "profile"
+    out_path = tmp_path / "pgo" / "training_plan.yaml"
+    assert write_training_plan(plan, "tb.out", tmp_path / "pgo" / "instrumented" / "tb.out", profile_dir, tmp_path / "pgo" / "runs", out_path) == 1
+    training_plan = yaml.safe_load(out_path.read_text())
+    assert training_plan["output_dir"] == str(tmp_path / "pgo" / "runs")
+    [binary] = training_plan["binaries"]
+    assert binary["binary"] == str(tmp_path / "pgo" / "instrumented" / "tb.out")
+    assert "reproduce_binary" not in binary and binary["coverage"] is False
+    assert binary["env"] == {"GCOV_PREFIX": "{run_dir}/gcda", "GCOV_PREFIX_STRIP": str(gcov_prefix_strip(profile_dir))}
+
+@pytest.fixture
+def bob_with_pgo_task(mock_bob: Bob, tmp_path: Path) -> tuple[Bob, dict, Path]:
+    """Fixture to create a Bob with a 'pgo' task 'tb' and its training plan, returning it with the task's env and output dir"""
+    bob_instance = mock_bob
+    bob_instance.proj_root = str(tmp_path)
+    bob_instance.dotbob_pgo_dir = tmp_path / ".bob" / "pgo"
+    bob_instance.tool_config_parser = MagicMock()
+    bob_instance.tool_config_parser.get_command.return_value = ["gcov-tool"]
+    plan = tmp_path / "plan.yaml"
+    plan.write_text(yaml.safe_dump({"binaries": [{"binary": "./build/tb/tb.out", "runs": [{"count": 3}]}]}))
+    bob_instance.task_configs["tb"] = {"pgo": {"training_plan": str(plan)}}
+    task_env = {"OUTPUT_EXECUTABLE": "tb.out"}
+    return bob_instance, task_env, tmp_path / "build" / "tb"
+
+def test_train_pgo_profile_merges_every_run(bob_with_pgo_task: tuple[Bob, dict, Path]):
+    """Test that the instrumented build, training campaign and pairwise gcov-tool merges run in order, and that the profile is stored with its key"""
+    bob_instance, task_env, output_dir = bob_with_pgo_task
+    fingerprint = {"src_sha256": "abc", "config": ["-O3"]}
+
+    def fake_run_subprocess(task_name, cmd, env, log_file, cwd):
+        if cmd[0] == "make":
+            assert env["PGO_MODE"] == "generate" and env["MODEL_DIR"] == ""
+        elif cmd[0] == "gcov-tool":
+            Path(cmd[-1]).mkdir()
+            (Path(cmd[-1]) / "tb.gcda").write_text("".join(Path(d, "tb.gcda").read_text() for d in cmd[2:4]))
+        else:
+            runs_dir = Path(yaml.safe_load(Path(cmd[cmd.index("--plan") + 1]).read_text())["output_dir"])
+            for job in range(3):
+                (runs_dir / "batch" / f"job{job}" / "gcda").mkdir(parents=True)
+                (runs_dir / "batch" / f"job{job}" / "gcda" / "tb.gcda").write_text(str(job))
+        return True
+    bob_instance.run_subprocess = MagicMock(side_effect=fake_run_subprocess)
+
+    assert bob_instance.train_pgo_profile("tb", task_env, MagicMock(), output_dir, None, fingerprint)
+    assert [call.args[1][0] for call in bob_instance.run_subprocess.call_args_list][-2:] == ["gcov-tool", "gcov-tool"]
+    store_dir = bob_instance.get_pgo_profile_store_dir("tb")
+    assert (store_dir / "tb.gcda").read_text() == "012"
+    assert load_pgo_profile(store_dir)["runs"] == 3
+    assert not (output_dir / "pgo").exists()
+
+    assert bob_instance.get_fresh_pgo_profile_dir("tb", fingerprint) == store_dir
+    assert bob_instance.get_fresh_pgo_profile_dir("tb", dict(fingerprint, src_sha256="def")) is None
+    bob_instance.logger.warning.assert_called_once()
+
+def test_train_pgo_profile_without_gcda_fails(bob_with_pgo_task: tuple[Bob, dict, Path]):
+    """Test that training fails if the campaign wrote no profile, keeping any previous profile"""
+    bob_instance, task_env, output_dir = bob_with_pgo_task
+    bob_instance.run_subprocess = MagicMock(return_value=True)
+    assert not bob_instance.train_pgo_profile("tb", task_env, MagicMock(), output_dir, None, {"src_sha256": "abc", "config": []})
+    bob_instance.logger.error.assert_called_once()
+    assert load_pgo_profile(bob_instance.get_pgo_profile_store_dir("tb")) is None
+
+def test_parse_pgo(tmp_path: Path):
+    """Test that the training plan is relative to proj_root and must run the task's executable"""
+    (tmp_path / "plans").mkdir()
+    (tmp_path / "plans" / "train.yaml").write_text(yaml.safe_dump({"binaries": [{"binary": "./build/tb/tb.out", "runs": [{"count": 1}]}]}))
+    task_config_parser = TaskConfigParser(MagicMock(), str(tmp_path))
+    task_config_parser.task_configs["tb"] = {"task_config_dict": {"output_executable": "tb.out", "pgo": {"training_plan": "plans/train.yaml"}}}
+    task_config_parser.parse_pgo("tb")
+    assert task_config_parser.task_configs["tb"]["pgo"] == {"training_plan": str(tmp_path / "plans" / "train.yaml")}
+
+    task_config_parser.task_configs["tb"]["task_config_dict"]["output_executable"] = "other.out"
+    with pytest.raises(ValueError):
+        task_config_parser.parse_pgo("tb")
+
+@requires_pgo_tools
+def test_verilator_mk_pgo_generate_then_use(tmp_path: Path):
+    """Test that a profile trained by an instrumented build in one dir is used by the optimised build in another dir"""
+    # A stand-in for a verilated model, such that verilator is not needed
+    model = tmp_path / "model"
+    model.mkdir()
+    (model / "Vtop.h").write_text("#pragma once\nint vtop_eval(int cycle);\n")
+    (model / "Vtop_classes.mk").write_text("VM_COVERAGE = 0\nVM_SC = 0\nVM_TRACE = 1\nVM_TRACE_FST = 0\nVM_TRACE_VCD = 1\n")
+    (model / "vtop.cpp").write_text("int vtop_eval(int cycle) { return cycle & 1; }\n")
+    (model / "verilated.cpp").write_text("int verilated_runtime() { return 0; }\n")
+    for src, archive in [("vtop.cpp", "Vtop__ALL.a"), ("verilated.cpp", "libverilated.a")]:
+        subprocess.run(["g++", "-c", src, "-o", f"{src}.o"], cwd=model, check=True)
+        subprocess.run(["ar", "rcs", archive, f"{src}.o"], cwd=model, check=True)
+    fake_verilator = tmp_path / "verilator"
+    fake_verilator.write_text(f"#!/bin/sh\necho {tmp_path / 'verilator_root'}\n")
+    fake_verilator.chmod(0o755)
+    tb_src = tmp_path / "tb.cpp"
+    tb_src.write_text('#include "Vtop.h"\nint main() { int s = 0; for (int i = 0; i < 1000; i++) s += vtop_eval(i) ? i : -i; return s > 0 ? 0 : 1; }\n')
+    profile_dir = tmp_path / "profile"
+
+    def make_tb(outdir: Path, **env_overrides):
+        outdir.mkdir(parents=True, exist_ok=True)
+        env = dict(os.environ, VERILATOR_BIN_PATH=str(fake_verilator), TASK_OUTDIR=str(outdir), TOP_MODULE="top", OUTPUT_EXECUTABLE="tb.out",
+                   TB_CPP_SRC_FILES=str(tb_src), MODEL_DIR=str(model), RTL_SRC_FILES=str(tmp_path / "top.sv"), PROFILE_BUILD="0", SANITIZE_BUILD="0", **env_overrides)
+        subprocess.run(["make", "-s", "-C", str(outdir), "-f", str(VERILATOR_MK_PATH)], env=env, check=True, stdout=subprocess.DEVNULL)
+
+    instrumented = tmp_path / "build" / "tb" / "pgo" / "instrumented"
+    make_tb(instrumented, PGO_MODE="generate", PGO_PROFILE_DIR=str(profile_dir))
+    for job in range(2):
+        run_env = dict(os.environ, GCOV_PREFIX=str(tmp_path / "runs" / "batch" / f"job{job}" / "gcda"), GCOV_PREFIX_STRIP=str(gcov_prefix_strip(profile_dir)))
+        subprocess.run([str(instrumented / "tb.out")], env=run_env, check=True)
+    gcov_data_dirs = find_gcov_data_dirs(tmp_path / "runs")
+    assert len(gcov_data_dirs) == 2
+    subprocess.run(["gcov-tool", "merge", *map(str, gcov_data_dirs), "-o", str(profile_dir)], check=True)
+
+    # A missing profile of the tb object is an error, hence this build must find the merged one
+    optimised = tmp_path / "build" / "tb"
+    make_tb(optimised, PGO_MODE="use", PGO_PROFILE_DIR=str(profile_dir), PGO_PROFILE_ID="first", PGO_USE_WARNINGS="-Werror=missing-profile")
+    assert subprocess.run([str(optimised / "tb.out")]).returncode == 0
+    assert "-fprofile-use" in (optimised / "flags.stamp").read_text()
+
+    # A profile trained again into the same dir recompiles the tb, an unchanged one does not
+    executable_mtime = (optimised / "tb.out").stat().st_mtime_ns
+    make_tb(optimised, PGO_MODE="use", PGO_PROFILE_DIR=str(profile_dir), PGO_PROFILE_ID="first", PGO_USE_WARNINGS="-Werror=missing-profile")
+    assert (optimised / "tb.out").stat().st_mtime_ns == executable_mtime
+    make_tb(optimised, PGO_MODE="use", PGO_PROFILE_DIR=str(profile_dir), PGO_PROFILE_ID="second", PGO_USE_WARNINGS="-Werror=missing-profile")
+    assert (optimised / "tb.out").stat().st_mtime_ns != executable_mtime
+    assert "second" in (optimised / "flags.stamp").read_text()
+
+def test_pgo_profile_id_changes_when_trained_again():
+    """Test that a profile trained again with an unchanged key gets another id, such that builds using it are recompiled"""
+    metadata = {"key": "0123456789abcdef", "runs": 2, "trained_at": "2025-01-01T00:00:00+00:00"}
+    assert pgo_profile_id(metadata) == pgo_profile_id(dict(metadata))
+    assert pgo_profile_id(metadata) != pgo_profile_id(dict(metadata, trained_at="2025-01-02T00:00:00+00:00"))
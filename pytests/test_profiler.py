@@ -0,0 +1,48 @@
+import json
+import multiprocessing
+import pstats
+
+from bob.Profiler import Profiler, NULL_PROFILER, WORKER_PHASE, format_phase_table
+
+
+def _work(out_path, profiler):
+    with profiler.phase("checksum updates"):
+        out_path.write_text("done")
+
+
+def test_null_profiler_does_not_wrap():
+    def target():
+        pass
+    assert NULL_PROFILER.worker(target) is target
+    with NULL_PROFILER.phase("parse"):
+        pass
+
+
+def test_phases_nest_and_accumulate(tmp_path):
+    profiler = Profiler("wall", tmp_path / "profile")
+    profiler.start()
+    with profiler.phase("execution"):
+        for _ in range(2):
+            with profiler.phase("rebuild analysis"):
+                pass
+    summary = profiler.stop()
+    assert list(summary["phases"]) == ["execution", "execution/rebuild analysis"]
+    assert summary["phases"]["execution"] >= summary["phases"]["execution/rebuild analysis"]
+    assert json.loads((tmp_path / "profile" / "phases.json").read_text())["mode"] == "wall"
+    table = format_phase_table(summary)
+    assert "\n  rebuild analysis" in table
+
+
+def test_cprofile_merges_worker_processes(tmp_path):
+    profiler = Profiler("cprofile", tmp_path / "profile")
+    profiler.start()
+    process = multiprocessing.get_context("fork").Process(target=profiler.worker(_work), args=(tmp_path / "out.txt", profiler))
+    process.start()
+    process.join()
+    summary = profiler.stop()
+
+    assert (tmp_path / "out.txt").read_text() == "done"
+    assert summary["workers"] == 1
+    assert list(summary["worker_phases"]) == [WORKER_PHASE, f"{WORKER_PHASE}/checksum updates"]
+    stats = pstats.Stats(summary["combined_profile"])
+    assert any(func[2] == "_work" for func in stats.stats)
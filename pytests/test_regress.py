@@ -0,0 +1,57 @@
+import json
+import yaml
+from pathlib import Path
+from bob.Bob import Bob
+from campaign.plan import Plan
+from campaign.regress import map_binaries_to_tasks, run_regression
+
+def test_execute_tasks_reports_up_to_date_and_built_tasks(make_bob_with_built_tasks, tmp_path: Path):
+    """Test that on_task_done is called for selected tasks which are up to date when scheduled, and for every task once it is built"""
+    bob_instance = make_bob_with_built_tasks([("lib", "tb_a"), ("lib", "tb_b")])
+    (tmp_path / "lib" / "lib.c").write_text("int y;\n")
+    (tmp_path / "tb_b" / "tb_b.c").write_text("int y;\n")
+    done = []
+    bob_instance.execute_tasks(False, ["^tb_b$"], on_task_done=done.append)
+    assert done == ["lib", "tb_b"]
+
+    done = []
+    bob_instance.execute_tasks(False, ["^tb_a$", "^tb_b$"], on_task_done=done.append)
+    assert sorted(done) == ["tb_a", "tb_b"]
+    bob_instance.logger.error.assert_not_called()
+
+def test_run_regression_reports_jobs_of_failed_builds_as_errors(make_bob_with_built_tasks, tmp_path: Path, monkeypatch):
+    """Test that the jobs of a binary whose task failed to build are not run and are errors in summary.json, while the others run"""
+    monkeypatch.chdir(tmp_path)
+    bob_instance = make_bob_with_built_tasks([("lib", "tb_ok"), ("lib", "tb_fail")], failing={"tb_fail"})
+    (tmp_path / "tb_fail" / "tb_fail.c").write_text("int y;\n")
+    plan_path = tmp_path / "plan.yaml"
+    plan_path.write_text(yaml.safe_dump({"batch_id": "regress", "output_dir": "runs", "binaries": [
+        {"binary": "build/tb_ok/tb_ok.out", "runs": [{"seeds": [1]}]},
+        {"binary": "build/tb_fail/tb_fail.out", "runs": [{"seeds": [2, 3]}]},
+    ]}))
+
+    assert run_regression(bob_instance, plan_path, no_tui=True, poll_interval=0.1) == 1
+    summary = json.loads(next((tmp_path / "runs").glob("regress_*/summary.json")).read_text())
+    assert summary["counts"]["passed"] == 1 and summary["counts"]["error"] == 2
+    assert {run["seed"]: run["status"] for run in summary["runs"]} == {f"0x{1:016x}": "passed", f"0x{2:016x}": "error", f"0x{3:016x}": "error"}
+
+def test_map_binaries_to_tasks(mock_bob: Bob, tmp_path: Path, monkeypatch):
+    """Test that each plan binary is mapped to the task whose output dir holds it, relative to the project root"""
+    monkeypatch.chdir(tmp_path)
+    bob_instance = mock_bob
+    bob_instance.task_configs = {
+        "tb_dual_port_ram": {"output_dir": tmp_path / "build" / "release" / "tb_dual_port_ram"},
+        "tb_coroutine_sim_test": {"output_dir": tmp_path / "build" / "release" / "tb_coroutine_sim_test"},
+    }
+    plan = Plan.model_validate({"binaries": [
+        {"binary": "./build/release/tb_dual_port_ram/tb_dual_port_ram.out", "runs": [{"seeds": [1]}]},
+        {"binary": "build/release/tb_dual_port_ram/tb_dual_port_ram.out", "runs": [{"test": "directed", "seeds": [2]}]},
+        {"binary": "./build/release/tb_coroutine_sim_test/../tb_coroutine_sim_test/tb.out", "runs": [{"seeds": [3]}]},
+        {"binary": "./build/asan/tb_dual_port_ram/tb_dual_port_ram.out", "runs": [{"seeds": [4]}]},
+    ]})
+    binaries_by_task, unmapped = map_binaries_to_tasks(bob_instance, plan)
+    assert binaries_by_task == {
+        "tb_dual_port_ram": [Path("build/release/tb_dual_port_ram/tb_dual_port_ram.out")],
+        "tb_coroutine_sim_test": [Path("build/release/tb_coroutine_sim_test/../tb_coroutine_sim_test/tb.out")],
+    }
+    assert unmapped == [Path("build/asan/tb_dual_port_ram/tb_dual_port_ram.out")]
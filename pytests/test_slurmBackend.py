@@ -0,0 +1,141 @@
+import json
+import os
+import sys
+from pathlib import Path
+from campaign.backends.slurm import SlurmBackend
+from campaign.job_spec import JobSpec, JobStatus
+
+# Stands in for sbatch, squeue, sacct and scancel, by the name it is called with. Every call is
+# logged to calls.jsonl and the state of every array task is kept in jobs.json, within $FAKE_SLURM_DIR.
+# sbatch runs the array tasks straight away, unless $FAKE_SLURM_QUEUE is set, which leaves them pending.
+# squeue fails like Slurm's once the arrays it is asked about are purged, if $FAKE_SLURM_PURGE is set.
+FAKE_SLURM = '''
+import json, os, subprocess, sys
+from pathlib import Path
+state_dir = Path(os.environ["FAKE_SLURM_DIR"])
+jobs_path = state_dir / "jobs.json"
+jobs = json.loads(jobs_path.read_text()) if jobs_path.exists() else {}
+command = Path(sys.argv[0]).name
+args = sys.argv[1:]
+with open(state_dir / "calls.jsonl", "a") as f:
+    f.write(json.dumps([command, *args]) + "\\n")
+opts = dict(arg[2:].split("=", 1) for arg in args if arg.startswith("--") and "=" in arg)
+if command == "sbatch":
+    array_job_id = str(1000 + len({sid.split("_")[0] for sid in jobs}))
+    last = int(opts["array"].split("-")[1])
+    for index in range(last + 1):
+        sid = f"{array_job_id}_{index}"
+        if os.environ.get("FAKE_SLURM_QUEUE"):
+            jobs[sid] = "PENDING"
+        else:
+            proc = subprocess.run([args[-1]], env={**os.environ, "SLURM_ARRAY_TASK_ID": str(index)}, cwd=opts["chdir"])
+            jobs[sid] = "COMPLETED" if proc.returncode == 0 else "FAILED"
+    print(f"{array_job_id};cluster")
+elif command == "squeue":
+    array_ids = opts["jobs"].split(",")
+    # With $FAKE_SLURM_PURGE set, arrays without queued tasks are purged, as slurmctld does after MinJobAge
+    queued_array_ids = {sid.split("_")[0] for sid, state in jobs.items() if state in ("PENDING", "RUNNING")}
+    if os.environ.get("FAKE_SLURM_PURGE") and not queued_array_ids & set(array_ids):
+        print("slurm_load_jobs error: Invalid job id specified", file=sys.stderr)
+        sys.exit(1)
+    for sid, state in jobs.items():
+        if sid.split("_")[0] in array_ids and state in ("PENDING", "RUNNING"):
+            print(f"{sid}|{state}")
+elif command == "sacct":
+    for sid in opts["jobs"].split(","):
+        if sid in jobs:
+            print(f"{sid}|{jobs[sid]}")
+elif command == "scancel":
+    for sid in args:
+        jobs[sid] = "CANCELLED by 0"
+jobs_path.write_text(json.dumps(jobs))
+'''
+
+
+def fake_slurm(tmp_path: Path, monkeypatch) -> Path:
+    """Put the fake Slurm commands first on PATH, return the dir holding their state"""
+    bin_dir = tmp_path / "fake_bin"
+    bin_dir.mkdir()
+    script = bin_dir / "fake_slurm.py"
+    script.write_text(f"#!{sys.executable}\n{FAKE_SLURM}")
+    script.chmod(0o755)
+    for command in ("sbatch", "squeue", "sacct", "scancel"):
+        (bin_dir / command).symlink_to(script)
+    state_dir = tmp_path / "fake_slurm"
+    state_dir.mkdir()
+    monkeypatch.setenv("FAKE_SLURM_DIR", str(state_dir))
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return state_dir
+
+
+def read_calls(state_dir: Path) -> list[list[str]]:
+    calls_path = state_dir / "calls.jsonl"
+    return [json.loads(line) for line in calls_path.read_text().splitlines()] if calls_path.exists() else []
+
+
+def make_spec(batch_dir: Path, binary: str, seed: int, exit_code: int = 0) -> JobSpec:
+    """Return a JobSpec whose command creates its run dir and exits with exit_code, like a binary without progress events"""
+    output_dir = batch_dir / f"{binary}_{seed:016x}"
+    return JobSpec(job_id=f"batch_{binary}_{seed:016x}", binary=Path(f"{binary}.out"),
+                   args=["/bin/sh", "-c", 'mkdir -p "$0"; exit "$1"', str(output_dir), str(exit_code)],
+                   output_dir=output_dir, test_name=None, seed=seed,
+                   resources={"cpus": 2, "mem_mb": 512, "time_limit_min": 5}, job_wall_timeout_s=90)
+
+
+def test_jobs_are_submitted_as_one_array_job_per_group(tmp_path: Path, monkeypatch):
+    """Test that the jobs of each binary are submitted as array jobs of at most max_array_size, and polled with a single squeue call"""
+    state_dir = fake_slurm(tmp_path, monkeypatch)
+    monkeypatch.chdir(tmp_path)
+    batch_dir = tmp_path / "batch"
+    specs = [make_spec(batch_dir, "tb_a", seed, exit_code=seed % 2) for seed in range(3)] + [make_spec(batch_dir, "tb_b", seed) for seed in range(2)]
+    backend = SlurmBackend(max_array_size=2)
+    for spec in specs:
+        backend.submit(spec)
+    assert read_calls(state_dir) == []
+
+    statuses = backend.poll([spec.job_id for spec in specs])
+    calls = read_calls(state_dir)
+    assert [call[0] for call in calls] == ["sbatch", "sbatch", "sbatch", "squeue"]
+    assert [next(arg for arg in call if arg.startswith("--array=")) for call in calls[:3]] == ["--array=0-1", "--array=0-0", "--array=0-1"]
+    assert {"--parsable", "--cpus-per-task=2", "--mem=512M", "--time=3", f"--chdir={tmp_path}"} <= set(calls[0])
+    assert statuses == {
+        specs[0].job_id: JobStatus.PASSED, specs[1].job_id: JobStatus.FAILED, specs[2].job_id: JobStatus.PASSED,
+        specs[3].job_id: JobStatus.PASSED, specs[4].job_id: JobStatus.PASSED,
+    }
+    assert all((spec.output_dir / "reproduce.sh").exists() for spec in specs)
+
+
+def test_queued_jobs_are_pending_and_killed_jobs_are_looked_up_with_sacct(tmp_path: Path, monkeypatch):
+    """Test that jobs in the queue are pending, and that jobs which left it without recording a status get theirs from sacct"""
+    state_dir = fake_slurm(tmp_path, monkeypatch)
+    monkeypatch.setenv("FAKE_SLURM_QUEUE", "1")
+    monkeypatch.chdir(tmp_path)
+    specs = [make_spec(tmp_path / "batch", "tb_a", seed) for seed in range(2)]
+    backend = SlurmBackend()
+    for spec in specs:
+        backend.submit(spec)
+    job_ids = [spec.job_id for spec in specs]
+    assert backend.poll(job_ids) == {job_id: JobStatus.PENDING for job_id in job_ids}
+
+    jobs_path = state_dir / "jobs.json"
+    jobs_path.write_text(json.dumps({"1000_0": "TIMEOUT", "1000_1": "RUNNING"}))
+    assert backend.poll(job_ids) == {job_ids[0]: JobStatus.TIMEOUT, job_ids[1]: JobStatus.RUNNING}
+    assert [call[0] for call in read_calls(state_dir)] == ["sbatch", "squeue", "squeue", "sacct"]
+
+    backend.cancel(job_ids)
+    assert read_calls(state_dir)[-1] == ["scancel", "1000_1"]
+    assert backend.poll(job_ids) == {job_ids[0]: JobStatus.TIMEOUT, job_ids[1]: JobStatus.ERROR}
+
+
+def test_purged_arrays_are_not_in_the_queue(tmp_path: Path, monkeypatch):
+    """Test that squeue failing with "Invalid job id specified", once every polled array is purged, means none of their jobs is queued"""
+    state_dir = fake_slurm(tmp_path, monkeypatch)
+    monkeypatch.setenv("FAKE_SLURM_PURGE", "1")
+    monkeypatch.chdir(tmp_path)
+    specs = [make_spec(tmp_path / "batch", "tb_a", seed, exit_code=seed) for seed in range(2)]
+    backend = SlurmBackend()
+    for spec in specs:
+        backend.submit(spec)
+
+    assert backend.poll([spec.job_id for spec in specs]) == {specs[0].job_id: JobStatus.PASSED, specs[1].job_id: JobStatus.FAILED}
+    assert [call[0] for call in read_calls(state_dir)] == ["sbatch", "squeue"]
@@ -2,6 +2,7 @@ import os
 import pytest
 from pathlib import Path
 from taskConfigParser.TaskConfigParser import TaskConfigParser
+from bob.FsSnapshot import FsSnapshot
 from unittest.mock import MagicMock, patch, mock_open
 
 def test_load_task_config_file_non_existent_file_path(tmp_path: Path):
@@ -532,34 +533,19 @@ def test_resolve_reference_input_reference_with_list_of_files(tmp_path: Path):
     assert resolved_type == "input"
     assert resolved_paths == expected_output
 
-@patch.object(Path, "is_dir", return_value=True) # Mock resolved_path.is_dir()
-@patch.object(Path, "exists", return_value=True) # Mock resolved_path.exists()
-@patch("pathlib.Path.iterdir", return_value=[
-        Path("/mock/path/task_2/file1.v"),
-        Path("/mock/path/task_2/file2.sv"),
-        Path("/mock/path/task_2/file3.txt")
-])
-def test_resolve_reference_input_reference_every_files(mock_iterdir, mock_exists, mock_is_dir, tmp_path: Path):
+def test_resolve_reference_input_reference_every_files(tmp_path: Path):
     """Test whether an input reference like "{@input:task_2:*}" can be succesfully resolved to a list of file paths in str"""
     task_name = "task_1"
     referenced_task_name = "task_2"
     files_spec = "*"
     value = f"{{@input:{referenced_task_name}:{files_spec}}}"
 
-
-    task_1_dir = MagicMock(spec=Path)
-    task_1_dir.__str__.return_value = "/path/to/task_1"
-    task_1_dir.as_posix.return_value = "/path/to/task_1"
-    task_1_dir.exists.return_value = True
-
-    task_2_dir = MagicMock(spec=Path)
-    task_2_dir.__str__.return_value = "/path/to/task_2/"
-    task_2_dir.as_posix.return_value = "/path/to/task_2/"
-    task_2_dir.exists.return_value = True
-
-    # Mock __truediv__ to return a new Path object that correctly joins paths
-    task_1_dir.__truediv__.side_effect = lambda p: Path(task_1_dir.__str__.return_value) / p
-    task_2_dir.__truediv__.side_effect = lambda p: Path(task_2_dir.__str__.return_value) / p
+    task_1_dir = tmp_path / "task_1"
+    task_2_dir = tmp_path / "task_2"
+    for task_dir in [task_1_dir, task_2_dir]:
+        task_dir.mkdir()
+    for name in ["file1.v", "file2.sv", "file3.txt"]:
+        (task_2_dir / name).write_text(name)
 
     mock_logger = MagicMock()
     task_config_parser = TaskConfigParser(mock_logger, str(tmp_path))
@@ -573,15 +559,18 @@ def test_resolve_reference_input_reference_every_files(mock_iterdir, mock_exists
     }
     resolved_value, resolved_type = task_config_parser.resolve_reference(task_name, value)
     # Check that the returned value matches the expected list of file paths
-    expected_files = [str(f.resolve()) for f in mock_iterdir.return_value]
+    expected_files = [str(task_2_dir.resolve() / name) for name in ["file1.v", "file2.sv", "file3.txt"]]
     assert resolved_type == "input"
-    assert resolved_value == expected_files
-
-@patch("pathlib.Path.resolve", return_value=Path("/mock/path"))
-@patch("pathlib.Path.is_dir", return_value=True)
-@patch("pathlib.Path.iterdir")
+    assert sorted(resolved_value) == expected_files
+    # Resolving again is served from the snapshot of tmp_path and task_2_dir
+    scandir_count = task_config_parser.fs_snapshot.scandir_count
+    assert task_config_parser.resolve_reference(task_name, value) == (resolved_value, resolved_type)
+    assert task_config_parser.fs_snapshot.scandir_count == scandir_count
+
+@patch.object(FsSnapshot, "is_dir", return_value=True)
+@patch.object(FsSnapshot, "listdir")
 @patch.object(TaskConfigParser, "_resolve_input_reference")  # Mock the method
-def test_resolve_reference_input_reference_every_files_exclusion_list(mock_resolve_input_reference, mock_iterdir, mock_is_dir, mock_resolve, tmp_path: Path):
+def test_resolve_reference_input_reference_every_files_exclusion_list(mock_resolve_input_reference, mock_listdir, mock_is_dir, tmp_path: Path):
     """Test whether an input reference like "{@input:task_2:*}" can be succesfully resolved, but the task_config.yaml within the task dir should be excluded."""
     task_name = "task_1"
     referenced_task_name = "task_2"
@@ -603,21 +592,7 @@ def test_resolve_reference_input_reference_every_files_exclusion_list(mock_resol
     mock_resolve_input_reference.return_value = str(task_config_parser.task_configs[referenced_task_name]["task_dir"])
 
     # Mock directory contents, including "task_config.yaml"
-    mock_file1 = MagicMock(spec=Path)
-    mock_file1.name = "file1.txt"
-    mock_file1.__str__.return_value = "/mock/referenced_task/file1.txt"
-
-    mock_task_config = MagicMock(spec=Path)
-    mock_task_config.name = "task_config.yaml"  # Explicitly set correct name
-    mock_task_config.__str__.return_value = "/mock/referenced_task/task_config.yaml"
-
-    mock_file2 = MagicMock(spec=Path)
-    mock_file2.name = "file2.log"
-    mock_file2.__str__.return_value = "/mock/referenced_task/file2.log"
-
-    # Set return value of iterdir() to include "task_config.yaml"
-    mock_iterdir.return_value = [mock_file1, mock_task_config, mock_file2]
-
+    mock_listdir.return_value = ["file1.txt", "task_config.yaml", "file2.log"]
 
     resolved_value, resolved_type = task_config_parser.resolve_reference(task_name, value)
     # Expected filtered result (excluding "task_config.yaml")
@@ -1263,3 +1238,92 @@ def test_parse_all_tasks_in_task_configs_valid(tmp_path: Path):
 
     task_config_parser._load_task_config_file.assert_called_once_with("/path/to/task_b/task_config.yaml")
     task_config_parser.parse_task_config_dict.assert_called_once_with("task_b")
+
+@pytest.mark.parametrize("unity_fields, expected", [
+    ({}, (False, None)),
+    ({"unity_build": True}, (True, None)),
+    ({"unity_build": True, "unity_batch_size": 4}, (True, 4)),
+])
+def test_parse_cpp_compile_unity_build(unity_fields, expected, tmp_path: Path):
+    """Test that the optional 'unity_build' and 'unity_batch_size' fields are stored in task_configs"""
+    task_config_parser = TaskConfigParser(MagicMock(), str(tmp_path))
+    task_config_parser.task_configs["task"] = {
+        "task_config_dict": {"task_name": "task", "task_type": "cpp_compile", "src_files": ["a.cpp"], **unity_fields},
+        "task_config_file_path": tmp_path / "task_config.yaml",
+    }
+    task_config_parser.resolve_src_files = MagicMock(return_value={"internal_src_files": ["/a.cpp"], "external_src_files": [], "output_src_files": []})
+    task_config_parser.parse_cpp_compile("task")
+
+    task_config = task_config_parser.task_configs["task"]
+    assert (task_config["unity_build"], task_config["unity_batch_size"]) == expected
+
+@pytest.mark.parametrize("unity_fields", [
+    {"unity_build": "yes"},
+    {"unity_build": True, "unity_batch_size": 0},
+    {"unity_build": True, "unity_batch_size": "4"},
+])
+def test_parse_cpp_compile_invalid_unity_build(unity_fields, tmp_path: Path):
+    """Test that invalid unity build fields are rejected"""
+    mock_logger = MagicMock()
+    task_config_parser = TaskConfigParser(mock_logger, str(tmp_path))
+    task_config_parser.task_configs["task"] = {
+        "task_config_dict": {"task_name": "task", "task_type": "cpp_compile", "src_files": ["a.cpp"], **unity_fields},
+        "task_config_file_path": tmp_path / "task_config.yaml",
+    }
+    task_config_parser.parse_cpp_compile("task")
+
+    mock_logger.error.assert_called_once()
+    assert "unity" in mock_logger.error.call_args[0][0]
+
+@pytest.mark.parametrize("lib_fields, expected", [
+    ({}, (False, False)),
+    ({"lto": True, "thin_archive": True}, (True, True)),
+    ({"lto": True, "thin_archive": True, "executable_name": "lib.exe"}, (True, False)),
+])
+def test_parse_cpp_compile_lto_and_thin_archive(lib_fields, expected, tmp_path: Path):
+    """Test that 'lto' and 'thin_archive' are stored, thin_archive only for static libraries, and that consumers of an 'lto' library link with LTO"""
+    task_config_parser = TaskConfigParser(MagicMock(), str(tmp_path))
+    task_config_parser.task_configs["lib"] = {
+        "task_config_dict": {"task_name": "lib", "task_type": "cpp_compile", "src_files": ["a.cpp"], "lib_type": "static", "lib_name": "liblib.a", **lib_fields},
+        "task_config_file_path": tmp_path / "lib" / "task_config.yaml",
+    }
+    task_config_parser.resolve_src_files = MagicMock(return_value={"internal_src_files": ["/a.cpp"], "external_src_files": [], "output_src_files": []})
+    task_config_parser.parse_cpp_compile("lib")
+
+    task_config = task_config_parser.task_configs["lib"]
+    assert (task_config["lto"], task_config["thin_archive"]) == expected
+    assert task_config_parser._external_objects_use_lto(["{@output:lib:liblib.a}"]) == expected[0]
+    assert not task_config_parser._external_objects_use_lto(["{@output:other:libother.a}"])
+
+def test_parse_cpp_compile_invalid_lto(tmp_path: Path):
+    """Test that a non-bool 'lto' field is rejected"""
+    mock_logger = MagicMock()
+    task_config_parser = TaskConfigParser(mock_logger, str(tmp_path))
+    task_config_parser.task_configs["task"] = {
+        "task_config_dict": {"task_name": "task", "task_type": "cpp_compile", "src_files": ["a.cpp"], "lto": "yes"},
+        "task_config_file_path": tmp_path / "task_config.yaml",
+    }
+    task_config_parser.parse_cpp_compile("task")
+
+    mock_logger.error.assert_called_once()
+    assert "'lto'" in mock_logger.error.call_args[0][0]
+
+@pytest.mark.parametrize("remote_resources, valid", [
+    ({"cpus": 8, "mem_mb": 16384, "time_limit_min": 120}, True),
+    ({"cpus": 0}, False),
+    ({"gpus": 1}, False),
+    ("8 cpus", False),
+])
+def test_parse_remote_resources(remote_resources, valid, tmp_path: Path):
+    """Test that 'remote_resources' takes positive 'cpus', 'mem_mb' and 'time_limit_min' only"""
+    task_config_parser = TaskConfigParser(MagicMock(), str(tmp_path))
+    task_config_parser.task_configs["task"] = {
+        "task_config_dict": {"task_name": "task", "remote": True, "remote_resources": remote_resources},
+        "task_config_file_path": tmp_path / "task_config.yaml",
+    }
+    if valid:
+        task_config_parser.parse_remote("task")
+        assert task_config_parser.task_configs["task"]["remote_resources"] == remote_resources
+    else:
+        with pytest.raises((TypeError, ValueError)):
+            task_config_parser.parse_remote("task")
@@ -0,0 +1,75 @@
+import pytest
+from networkx import DiGraph, ancestors, descendants, topological_sort
+from bob.TaskDagIndex import TaskDagIndex
+
+@pytest.fixture
+def sample_dependency_graph():
+    """Creates a sample dependency graph for testing"""
+    # A → B → C
+    # D → E → C
+    # F → G
+    graph = DiGraph()
+    graph.add_edges_from([
+        ("A", "B"), ("B", "C"),
+        ("D", "E"), ("E", "C"),
+        ("F", "G")
+    ])
+    return graph
+
+def test_task_dag_index_topological_order(sample_dependency_graph):
+    """Test that every edge goes from a lower to a higher id, i.e. ids follow a valid topological order"""
+    index = TaskDagIndex(sample_dependency_graph)
+    assert len(index) == 7
+    for u, v in sample_dependency_graph.edges:
+        assert index.ids[u] < index.ids[v]
+    assert index.topological_order() == list(topological_sort(sample_dependency_graph))
+
+def test_task_dag_index_ancestors_and_descendants_match_networkx(sample_dependency_graph):
+    """Test that bitset reachability agrees with networkx ancestors() and descendants()"""
+    index = TaskDagIndex(sample_dependency_graph)
+    for task in sample_dependency_graph.nodes:
+        assert set(index.ancestors(task)) == ancestors(sample_dependency_graph, task)
+        assert set(index.descendants(task)) == descendants(sample_dependency_graph, task)
+    assert index.ancestors("C") == index.order_tasks({"A", "B", "D", "E"})
+
+def test_task_dag_index_cyclic_graph_raises(sample_dependency_graph):
+    """Test that a cyclic graph cannot be indexed"""
+    sample_dependency_graph.add_edge("C", "A")
+    with pytest.raises(ValueError):
+        TaskDagIndex(sample_dependency_graph)
+
+def test_task_dag_index_subgraph_of_closure(sample_dependency_graph):
+    """Test that the closure of selected tasks and its subgraph contain only the selected tasks and their ancestors"""
+    index = TaskDagIndex(sample_dependency_graph)
+    mask = index.closure_mask(["B", "G", "not_a_task"])
+    assert set(index.names_of(mask)) == {"A", "B", "F", "G"}
+    subgraph = index.subgraph(mask)
+    assert set(subgraph.nodes) == {"A", "B", "F", "G"}
+    assert set(subgraph.edges) == {("A", "B"), ("F", "G")}
+
+def test_task_dag_index_is_stale_for(sample_dependency_graph):
+    """Test that the index is reported stale when the source graph is replaced or modified"""
+    index = TaskDagIndex(sample_dependency_graph)
+    assert not index.is_stale_for(sample_dependency_graph)
+    assert index.is_stale_for(sample_dependency_graph.copy())
+    sample_dependency_graph.add_edge("G", "H")
+    assert index.is_stale_for(sample_dependency_graph)
+
+def test_task_dag_index_is_stale_for_rewired_edge(sample_dependency_graph):
+    """Test that the index is reported stale when an edge is rewired, keeping the node and edge counts"""
+    index = TaskDagIndex(sample_dependency_graph)
+    sample_dependency_graph.remove_edge("F", "G")
+    sample_dependency_graph.add_edge("F", "C")
+    assert index.is_stale_for(sample_dependency_graph)
+
+def test_task_ready_set_releases_tasks_once_dependencies_complete(sample_dependency_graph):
+    """Test that the ready set releases a task only after all of its in-mask dependencies have completed"""
+    index = TaskDagIndex(sample_dependency_graph)
+    ready_set = index.ready_set(index.closure_mask(["C"]))
+    assert len(ready_set) == 5 and ready_set.task_names() == index.ancestors("C") + ["C"]
+    assert set(ready_set.pop_ready()) == {"A", "D"}
+    assert ready_set.complete("A") == ["B"]
+    assert ready_set.complete("B") == []
+    assert ready_set.complete("D") == ["E"]
+    assert ready_set.complete("E") == ["C"]
+    assert ready_set.pop_ready() == ["B", "E", "C"]
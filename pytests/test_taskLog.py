@@ -0,0 +1,113 @@
+import gzip
+import os
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+from bob.Bob import Bob
+from bob.TaskLog import (TaskLogWriter, TaskLogReader, rotate_task_logs, log_generation_path, find_log_generation,
+                         index_path_of, parse_since, resolve_log_compression)
+
+def make_lines(start: int, count: int, timestamp: str = "2025-01-01 12:00:00") -> bytes:
+    return b"".join(f"[{timestamp}] line {i}\n".encode() for i in range(start, start + count))
+
+def test_gzip_log_is_a_regular_gzip_file_with_independent_frames(tmp_path: Path):
+    """Test that a framed gzip log decompresses as a whole, and that each indexed frame decompresses on its own"""
+    log_path = tmp_path / "task.log.gz"
+    data = make_lines(0, 200) + b"[2025-01-01 12:00:01] main.c:3: error: boom\n" + make_lines(200, 200)
+    with TaskLogWriter(log_path, "gzip", frame_size=1024) as writer:
+        writer.write(data)
+
+    assert gzip.decompress(log_path.read_bytes()) == data
+    reader = TaskLogReader(log_path)
+    assert len(reader.frames) > 1
+    assert b"".join(reader.read_frame(frame) for frame in reader.frames) == data
+    # Frames are cut at line boundaries
+    assert all(reader.read_frame(frame).endswith(b"\n") for frame in reader.frames)
+
+def test_error_lines_only_decompress_frames_with_errors(tmp_path: Path):
+    """Test that --errors reads the error lines through the index, touching only frames which hold one"""
+    log_path = tmp_path / "task.log.gz"
+    with TaskLogWriter(log_path, "gzip", frame_size=512) as writer:
+        writer.write(make_lines(0, 100))
+        writer.write(b"[2025-01-01 12:00:01] main.c:3:1: error: expected ';'\n")
+        writer.write(make_lines(100, 100))
+        writer.write(b"[2025-01-01 12:00:02] g++ -Werror -c main.cpp\n")
+
+    reader = TaskLogReader(log_path)
+    assert sum(1 for frame in reader.frames if frame["errors"]) == 1
+    reader.read_frame = MagicMock(wraps=reader.read_frame)
+    assert reader.error_lines() == [b"[2025-01-01 12:00:01] main.c:3:1: error: expected ';'"]
+    assert reader.read_frame.call_count == 1
+
+def test_read_since_skips_older_frames_and_lines(tmp_path: Path):
+    """Test that --since returns output from the first line at or after the given time"""
+    log_path = tmp_path / "task.log"
+    with TaskLogWriter(log_path, "none", frame_size=256) as writer:
+        writer.write(make_lines(0, 20, "2025-01-01 12:00:00"))
+        writer.write(make_lines(20, 5, "2025-01-01 12:05:00"))
+
+    since = time.mktime(time.strptime("2025-01-01 12:05:00", "%Y-%m-%d %H:%M:%S"))
+    output = TaskLogReader(log_path).read_since(since)
+    assert output == make_lines(20, 5, "2025-01-01 12:05:00")
+
+def test_read_since_selects_raw_output_by_frame_time(tmp_path: Path):
+    """Test that --since on untimestamped raw mode output keeps whole frames written at or after the given time"""
+    log_path = tmp_path / "task.log"
+    before = time.time() - 1
+    with TaskLogWriter(log_path, "none") as writer:
+        os.write(writer.fileno(), b"raw line 0\nraw line 1\n")
+
+    assert TaskLogReader(log_path).read_since(before) == b"raw line 0\nraw line 1\n"
+    assert TaskLogReader(log_path).read_since(time.time() + 60) == b""
+
+def test_rotate_task_logs_keeps_n_generations(tmp_path: Path):
+    """Test that rotation shifts logs and their indexes up by one generation and drops the oldest"""
+    base = tmp_path / "task.log"
+    for generation in range(3):
+        path = log_generation_path(base, "gzip", generation)
+        path.write_bytes(gzip.compress(f"gen {generation}\n".encode()))
+        index_path_of(path).write_text("{}")
+
+    rotate_task_logs(base, 3)
+    assert find_log_generation(base, 0) is None
+    assert gzip.decompress(find_log_generation(base, 1).read_bytes()) == b"gen 0\n"
+    assert gzip.decompress(find_log_generation(base, 2).read_bytes()) == b"gen 1\n"
+    assert index_path_of(find_log_generation(base, 2)).exists()
+    assert not log_generation_path(base, "gzip", 3).exists()
+
+def test_parse_since():
+    """Test relative and absolute --since values"""
+    assert parse_since("15m", now=10_000.0) == 10_000.0 - 900
+    assert parse_since("2h", now=10_000.0) == 10_000.0 - 7200
+    assert parse_since("2025-01-01 12:00:00") == time.mktime(time.strptime("2025-01-01 12:00:00", "%Y-%m-%d %H:%M:%S"))
+    with pytest.raises(ValueError):
+        parse_since("yesterday")
+
+def test_resolve_log_compression():
+    """Test that unknown compressions are rejected"""
+    assert resolve_log_compression(None) == "none"
+    assert resolve_log_compression("zstd") in ("zstd", "gzip")
+    with pytest.raises(ValueError):
+        resolve_log_compression("bz2")
+
+def test_bob_compressed_task_log_round_trip(tmp_path: Path, capsys):
+    """Test that Bob writes compressed, rotated task logs and shows their errors through show_task_log()"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.task_log_compression = "gzip"
+    bob_instance.task_log_generations = 2
+    output_dir = tmp_path / "build" / "task"
+    bob_instance.task_configs["task"] = {"output_dir": output_dir}
+
+    for message in ("first build", "main.c:1: error: second build"):
+        log_file = bob_instance.setup_task_logger(output_dir / "task.log")
+        log_file.write(f"[2025-01-01 12:00:00] {message}\n".encode())
+        log_file.close()
+
+    assert (output_dir / "task.log.gz").exists()
+    assert (output_dir / "task.log.1.gz").exists()
+    assert bob_instance.show_task_log("task", errors_only=True)
+    assert capsys.readouterr().out == "[2025-01-01 12:00:00] main.c:1: error: second build\n"
+    assert bob_instance.show_task_log("task", generation=1)
+    assert capsys.readouterr().out == "[2025-01-01 12:00:00] first build\n"
+    assert not bob_instance.show_task_log("task", generation=2)
@@ -164,3 +164,88 @@ def test_has_tool_absent(mock_yaml_loader):
         tool_config_parser = ToolConfigParser(mock_logger, "/mock/project")
         assert tool_config_parser.has_tool("ghosttool") is False
 
+
+def test_set_build_variant_replaces_os_flags(mock_yaml_loader):
+    """Test that a build variant's flags replace the OS specific flags, and that deselecting it restores them"""
+    m, mock_yaml = mock_yaml_loader
+    mock_yaml.return_value = {"g++": {"path": "/usr/bin/g++", "default_flags": {"common": ["-Wall"], "linux": ["-O2"], "variants": {"debug": ["-O0", "-g"]}}}}
+
+    with patch("pathlib.Path.exists", return_value=True), \
+        patch("shutil.which", return_value="/usr/bin/g++"), \
+        patch("sys.platform", "linux"):
+        mock_logger = MagicMock()
+        tool_config_parser = ToolConfigParser(mock_logger, "/mock/project")
+        assert tool_config_parser.get_tool_flags("g++") == ["-Wall", "-O2"]
+        tool_config_parser.set_build_variant("debug")
+        assert tool_config_parser.get_tool_flags("g++") == ["-Wall", "-O0", "-g"]
+        tool_config_parser.set_build_variant("release")
+        assert tool_config_parser.get_tool_flags("g++") == ["-Wall", "-O2"]
+        tool_config_parser.set_build_variant(None)
+        assert tool_config_parser.get_tool_flags("g++") == ["-Wall", "-O2"]
+
+def _make_project_with_fake_tool(tmp_path: Path, monkeypatch) -> Path:
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake_gcc = bin_dir / "fake-gcc"
+    fake_gcc.write_text("#!/bin/sh\necho 'fake-gcc 1.0'\necho 'Copyright'\n")
+    fake_gcc.chmod(0o755)
+    (tmp_path / "tool_config.yaml").write_text("gcc:\n  path: fake-gcc\n  default_flags:\n    common: [\"-O2\"]\n")
+    monkeypatch.setenv("PATH", str(bin_dir))
+    return fake_gcc
+
+def test_describe_resolves_and_probes_once(tmp_path: Path, monkeypatch):
+    """Test that describe() reports path, flags and version, and that a later invocation reuses the cached resolution and version"""
+    fake_gcc = _make_project_with_fake_tool(tmp_path, monkeypatch)
+    tool_config_parser = ToolConfigParser(MagicMock(), str(tmp_path))
+    assert tool_config_parser.describe() == {"gcc": {"path": str(fake_gcc), "flags": ["-O2"], "command": [str(fake_gcc), "-O2"], "version": "fake-gcc 1.0"}}
+    assert tool_config_parser.describe(["gcc", "not-a-tool"]).keys() == {"gcc"}
+    assert (tmp_path / ".bob" / ToolConfigParser.TOOL_CACHE_FILE).is_file()
+
+    with patch("shutil.which") as mock_which, patch("subprocess.run") as mock_run:
+        assert ToolConfigParser(MagicMock(), str(tmp_path)).describe()["gcc"]["version"] == "fake-gcc 1.0"
+    mock_which.assert_not_called()
+    mock_run.assert_not_called()
+
+def test_tool_cache_invalidation(tmp_path: Path, monkeypatch):
+    """Test that a changed binary is probed again, and that a changed PATH discards the cache"""
+    fake_gcc = _make_project_with_fake_tool(tmp_path, monkeypatch)
+    ToolConfigParser(MagicMock(), str(tmp_path)).describe()
+
+    fake_gcc.write_text("#!/bin/sh\necho 'fake-gcc 2.0'\n")
+    os.utime(fake_gcc, ns=(0, 10**18))
+    assert ToolConfigParser(MagicMock(), str(tmp_path)).describe()["gcc"]["version"] == "fake-gcc 2.0"
+
+    monkeypatch.setenv("PATH", f"{tmp_path / 'bin'}{os.pathsep}{tmp_path}")
+    with patch("shutil.which", wraps=__import__("shutil").which) as mock_which:
+        ToolConfigParser(MagicMock(), str(tmp_path))
+    mock_which.assert_called_once_with("fake-gcc")
+
+def test_optional_tools_are_resolved_lazily_and_missing_tools_all_reported(tmp_path: Path, monkeypatch):
+    """Test that a missing optional tool is not an error until a build needs it, and that every missing required tool is reported"""
+    fake_gcc = _make_project_with_fake_tool(tmp_path, monkeypatch)
+    (tmp_path / "tool_config.yaml").write_text("gcc:\n  path: fake-gcc\n  default_flags:\n    common: []\n"
+                                              "g++:\n  path: missing-g++\n  default_flags:\n    common: []\n"
+                                              "ar: missing-ar\n"
+                                              "gcov-tool:\n  path: missing-gcov-tool\n  optional: true\n  default_flags:\n    common: []\n")
+    mock_logger = MagicMock()
+    tool_config_parser = ToolConfigParser(mock_logger, str(tmp_path))
+    assert [call.args[0] for call in mock_logger.error.call_args_list] == ["FileNotFoundError: Tool 'g++' path 'missing-g++' not found in PATH.",
+                                                                           "FileNotFoundError: Tool 'ar' specified as 'missing-ar' not found in PATH."]
+    assert tool_config_parser.get_tool_path("gcc") == str(fake_gcc)
+    assert not tool_config_parser.has_tool("gcov-tool") and tool_config_parser.describe(["gcov-tool"]) == {}
+    assert len(mock_logger.error.call_args_list) == 2
+
+    # Installed later, the optional tool is found by the next invocation
+    fake_gcov_tool = tmp_path / "bin" / "missing-gcov-tool"
+    fake_gcov_tool.write_text("#!/bin/sh\necho 'gcov-tool 1.0'\n")
+    fake_gcov_tool.chmod(0o755)
+    assert ToolConfigParser(MagicMock(), str(tmp_path)).get_command("gcov-tool") == [str(fake_gcov_tool)]
+
+def test_describe_probes_requested_fields_once(tmp_path: Path, monkeypatch):
+    """Test that describe() adds the requested PROBE_ARGS fields, cached like the version"""
+    fake_gcc = _make_project_with_fake_tool(tmp_path, monkeypatch)
+    fake_gcc.write_text("#!/bin/sh\nif [ \"$1\" = -dumpmachine ]; then echo x86_64-fake; else echo 'fake-gcc 1.0'; fi\n")
+    assert ToolConfigParser(MagicMock(), str(tmp_path)).describe(["gcc"], ("machine",))["gcc"]["machine"] == "x86_64-fake"
+    with patch("subprocess.run") as mock_run:
+        assert ToolConfigParser(MagicMock(), str(tmp_path)).describe(["gcc"], ("machine",))["gcc"]["machine"] == "x86_64-fake"
+    mock_run.assert_not_called()
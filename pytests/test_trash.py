@@ -0,0 +1,61 @@
+import errno
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from bob.Bob import Bob
+from bob.Trash import move_to_trash, empty_trash, empty_trash_in_background
+
+def _make_tree(root: Path, num_dirs: int = 3, num_files: int = 5) -> None:
+    for d in range(num_dirs):
+        (root / f"dir{d}").mkdir(parents=True)
+        for f in range(num_files):
+            (root / f"dir{d}" / f"file{f}.cpp").write_text("x")
+    (root / "top.h").write_text("x")
+
+def test_move_to_trash_then_empty(tmp_path: Path):
+    """Test that a dir is renamed into the trash under a unique name, and that emptying the trash removes everything"""
+    trash_dir = tmp_path / ".bob" / "trash"
+    for _ in range(2):
+        _make_tree(tmp_path / "build" / "task")
+        trashed_path = move_to_trash(tmp_path / "build" / "task", trash_dir)
+        assert trashed_path.parent == trash_dir and (trashed_path / "top.h").is_file()
+        assert not (tmp_path / "build" / "task").exists()
+    assert len(list(trash_dir.iterdir())) == 2
+    empty_trash(trash_dir, max_workers=4)
+    assert not trash_dir.exists()
+    empty_trash(trash_dir)
+
+def test_move_to_trash_across_filesystems(tmp_path: Path):
+    """Test that a dir on another filesystem than the trash is deleted in place"""
+    _make_tree(tmp_path / "task")
+    with patch("os.rename", side_effect=OSError(errno.EXDEV, "Invalid cross-device link")):
+        assert move_to_trash(tmp_path / "task", tmp_path / "trash") is None
+    assert not (tmp_path / "task").exists()
+
+def test_empty_trash_in_background(tmp_path: Path):
+    """Test that the detached process empties the trash"""
+    _make_tree(tmp_path / "trash" / "task.0")
+    empty_trash_in_background(tmp_path / "trash").wait(timeout=30)
+    assert not (tmp_path / "trash").exists()
+
+def test_remove_task_output_dirs_marks_dirty_in_one_write(tmp_path: Path):
+    """Test that the removed tasks are marked dirty in a single checksum.json write"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.proj_root = str(tmp_path)
+    bob_instance.dotbob_dir = tmp_path / ".bob"
+    bob_instance.dotbob_trash_dir = tmp_path / ".bob" / "trash"
+    bob_instance.dotbob_checksum_file = tmp_path / ".bob" / "checksum.json"
+    bob_instance.dotbob_dir.mkdir()
+    bob_instance.task_configs = {name: {} for name in ["lib", "tb", "other"]}
+    bob_instance.dotbob_checksum_file.write_text(json.dumps({name: {"hash_sha256": "abc", "dirty": False} for name in bob_instance.task_configs}))
+    for name in ["lib", "tb"]:
+        _make_tree(tmp_path / "build" / name)
+
+    with patch.object(bob_instance, "_save_dotbob_checksum_file", wraps=bob_instance._save_dotbob_checksum_file) as mock_save, \
+         patch("bob.Bob.empty_trash_in_background") as mock_empty_trash:
+        assert bob_instance.remove_task_output_dirs(["lib", "tb", "other"]) == 2
+    mock_save.assert_called_once()
+    mock_empty_trash.assert_called_once()
+    checksums = json.loads(bob_instance.dotbob_checksum_file.read_text())
+    assert [name for name, entry in checksums.items() if entry["dirty"]] == ["lib", "tb"]
+    assert list((tmp_path / "build").iterdir()) == []
@@ -0,0 +1,123 @@
+import os
+import shutil
+import subprocess
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+from bob.Bob import Bob
+from bob.VerilatedModel import model_fingerprint, model_key, model_dir, model_archives, is_model_built, save_model_fingerprint, prune_models
+from taskConfigParser.TaskConfigParser import TaskConfigParser
+
+requires_make_gpp = pytest.mark.skipif(shutil.which("make") is None or shutil.which("g++") is None or shutil.which("ar") is None, reason="make, g++ or ar is not available")
+VERILATOR_MK_PATH = Path(__file__).resolve().parent.parent / "build_scripts" / "verilator.mk"
+
+def test_model_key_depends_on_rtl_content_and_flags(tmp_path: Path):
+    """Test that the model key changes with the RTL content and with the verilator/C++ flags, but not with the RTL file order"""
+    a, b = tmp_path / "a.sv", tmp_path / "b.sv"
+    a.write_text("module a; endmodule\n")
+    b.write_text("module b; endmodule\n")
+    verilator = {"path": "/usr/bin/verilator", "version": "Verilator 5.030"}
+    key = model_key(model_fingerprint([str(a), str(b)], "a", verilator, ["--trace"]))
+    assert key == model_key(model_fingerprint([str(b), str(a)], "a", verilator, ["--trace"]))
+    assert key != model_key(model_fingerprint([str(a), str(b)], "a", verilator, ["--trace-fst"]))
+    b.write_text("module b; wire w; endmodule\n")
+    assert key != model_key(model_fingerprint([str(a), str(b)], "a", verilator, ["--trace"]))
+
+def test_prune_models_keeps_most_recently_used(tmp_path: Path):
+    """Test that only the most recently used model dirs of a verilate task are kept"""
+    for idx in range(3):
+        path = model_dir(tmp_path, f"key{idx}")
+        path.mkdir(parents=True)
+        save_model_fingerprint(path, {"idx": idx})
+        os.utime(path / "model.json", ns=(idx, idx))
+    removed = prune_models(tmp_path, keep=2)
+    assert removed == [model_dir(tmp_path, "key0")]
+    assert sorted(p.name for p in (tmp_path / "model").iterdir()) == ["key1", "key2"]
+
+@pytest.fixture
+def bob_with_verilate_task(mock_bob: Bob, tmp_path: Path) -> tuple[Bob, Path]:
+    """Fixture to create a Bob with a mock verilator and a verilate task 'top_verilate', returning it with the task's output dir"""
+    bob_instance = mock_bob
+    bob_instance.tool_config_parser = MagicMock()
+    bob_instance.tool_config_parser.get_command.return_value = ["verilator"]
+    bob_instance.tool_config_parser.describe.return_value = {"verilator": {"path": "/usr/bin/verilator", "version": "Verilator 5.030"}}
+    bob_instance.task_config_parser = MagicMock()
+    rtl = tmp_path / "top.sv"
+    rtl.write_text("module top; endmodule\n")
+    output_dir = tmp_path / "build" / "top_verilate"
+    output_dir.mkdir(parents=True)
+    bob_instance.task_configs["top_verilate"] = {"task_config_dict": {"top_module": "top"}, "internal_src_files": [str(rtl)], "output_dir": output_dir}
+    return bob_instance, output_dir
+
+def test_build_verilated_model_is_reused(bob_with_verilate_task: tuple[Bob, Path], tmp_path: Path):
+    """Test that a model is only built once per RTL hash and flags, and that a tb with the same flags finds it"""
+    bob_instance, output_dir = bob_with_verilate_task
+    bob_instance.query_verilator_mk_config = MagicMock(return_value=["--trace", "-CFLAGS", "-O2"])
+    def fake_make(task_name, cmd, env, log_file, cwd):
+        model_dir_path = Path(bob_instance.task_config_parser.update_task_env.call_args.args[2])
+        model_dir_path.mkdir(parents=True)
+        for archive in model_archives(model_dir_path, "top"):
+            archive.write_bytes(b"!<arch>\n")
+        return True
+    bob_instance.run_subprocess = MagicMock(side_effect=fake_make)
+    rtl_src_files = bob_instance.get_verilated_model_src_files("top_verilate")
+
+    assert bob_instance.build_verilated_model("top_verilate", rtl_src_files, "top", {}, MagicMock(), output_dir)
+    assert bob_instance.build_verilated_model("top_verilate", rtl_src_files, "top", {}, MagicMock(), output_dir)
+    bob_instance.run_subprocess.assert_called_once()
+    assert bob_instance.run_subprocess.call_args.args[1][-1] == "model"
+
+    tb_env = {"RTL_SRC_FILES": " ".join(rtl_src_files)}
+    tb_model_dir = bob_instance.get_verilated_model_dir("tb", "top_verilate", tb_env, tmp_path)
+    assert is_model_built(tb_model_dir, "top")
+    # A tb with other RTL sources than the model's verilates them itself
+    extra_rtl = tmp_path / "extra.sv"
+    extra_rtl.write_text("module extra; endmodule\n")
+    assert bob_instance.get_verilated_model_dir("tb", "top_verilate", {"RTL_SRC_FILES": f"{rtl_src_files[0]} {extra_rtl}"}, tmp_path) is None
+    bob_instance.query_verilator_mk_config.return_value = ["--trace-fst", "-CFLAGS", "-O2"]
+    assert not is_model_built(bob_instance.get_verilated_model_dir("tb", "top_verilate", tb_env, tmp_path), "top")
+
+@pytest.mark.parametrize("model_task_config_dict", [
+    {"task_type": "verilator_verilate", "top_module": "top"},
+    {"task_type": "verilator_verilate", "top_module": "other", "build_model": True},
+    {"task_type": "cpp_compile", "top_module": "top", "build_model": True},
+])
+def test_parse_verilated_model_invalid(model_task_config_dict, tmp_path: Path):
+    """Test that verilated_model must refer to a verilate task building a model of the same top module"""
+    task_config_parser = TaskConfigParser(MagicMock(), str(tmp_path))
+    task_config_parser.build_scripts_dir = tmp_path
+    (tmp_path / "verilator.mk").touch()
+    task_config_parser.task_configs["top_verilate"] = {"task_config_dict": model_task_config_dict}
+    task_config_parser.task_configs["tb"] = {"task_env": {}, "output_dir": tmp_path, "task_config_dict": {
+        "rtl_src_files": [], "tb_cpp_src_files": [], "top_module": "top", "output_executable": "tb.out", "verilated_model": "top_verilate"}}
+    task_config_parser.resolve_src_files = MagicMock(return_value={"internal_src_files": [], "external_src_files": [], "output_src_files": []})
+
+    task_config_parser.parse_verilator_tb_compile("tb")
+    task_config_parser.logger.error.assert_called_once()
+    assert task_config_parser.task_configs["tb"]["verilated_model"] is None
+
+@requires_make_gpp
+def test_verilator_mk_links_prebuilt_model(tmp_path: Path):
+    """Test that verilator.mk compiles tb sources against MODEL_DIR and links its archives, without running verilator"""
+    # A stand-in for a verilated model: V<top>.h, the VM_* defines of V<top>_classes.mk and the two archives
+    model = tmp_path / "model"
+    model.mkdir()
+    (model / "Vtop.h").write_text("#pragma once\nint vtop_eval();\n")
+    (model / "Vtop_classes.mk").write_text("VM_COVERAGE = 0\nVM_SC = 0\nVM_TRACE = 1\nVM_TRACE_FST = 0\nVM_TRACE_VCD = 1\n")
+    (model / "vtop.cpp").write_text("int vtop_eval() { return VM_TRACE_DEFINED; }\n")
+    (model / "verilated.cpp").write_text("int verilated_runtime() { return 0; }\n")
+    for src, archive in [("vtop.cpp", "Vtop__ALL.a"), ("verilated.cpp", "libverilated.a")]:
+        subprocess.run(["g++", "-DVM_TRACE_DEFINED=0", "-c", src, "-o", f"{src}.o"], cwd=model, check=True)
+        subprocess.run(["ar", "rcs", archive, f"{src}.o"], cwd=model, check=True)
+    fake_verilator = tmp_path / "verilator"
+    fake_verilator.write_text(f"#!/bin/sh\necho {tmp_path / 'verilator_root'}\n")
+    fake_verilator.chmod(0o755)
+    tb_src = tmp_path / "tb.cpp"
+    tb_src.write_text('#include "Vtop.h"\nstatic_assert(VM_TRACE == 1);\nint main() { return vtop_eval(); }\n')
+
+    outdir = tmp_path / "build" / "tb"
+    outdir.mkdir(parents=True)
+    env = dict(os.environ, VERILATOR_BIN_PATH=str(fake_verilator), TASK_OUTDIR=str(outdir), TOP_MODULE="top", OUTPUT_EXECUTABLE="tb.out",
+               TB_CPP_SRC_FILES=str(tb_src), MODEL_DIR=str(model), RTL_SRC_FILES=str(tmp_path / "top.sv"), PROFILE_BUILD="0")
+    subprocess.run(["make", "-s", "-C", str(outdir), "-f", str(VERILATOR_MK_PATH)], env=env, check=True, stdout=subprocess.DEVNULL)
+    assert subprocess.run([str(outdir / "tb.out")]).returncode == 0
@@ -0,0 +1,94 @@
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+from bob.Bob import Bob
+from bob.VerilatorTuning import default_thread_candidates, resolve_build_jobs, read_sim_rate, pick_best_threads, load_tuning, save_tuning
+from taskConfigParser.TaskConfigParser import TaskConfigParser
+
+def test_default_thread_candidates_and_build_jobs():
+    """Test that candidates are powers of two up to the CPU count and that 'auto' build jobs is the CPU count"""
+    assert default_thread_candidates(1) == [1]
+    assert default_thread_candidates(6) == [1, 2, 4]
+    assert default_thread_candidates(128) == [1, 2, 4, 8, 16]
+    assert resolve_build_jobs("auto", 12) == 12
+    assert resolve_build_jobs(3, 12) == 3
+    assert resolve_build_jobs(None, 12) is None
+
+def test_read_sim_rate_and_pick_best(tmp_path: Path):
+    """Test that the rate comes from the last event with both timestamps, and that ties pick the fewest threads"""
+    progress = tmp_path / "progress.jsonl"
+    progress.write_text("\n".join(json.dumps(e) for e in [
+        {"t": "heartbeat", "ts_wall_us": 100, "ts_sim_ps": 1000},
+        {"t": "run_end", "ts_wall_us": 400, "ts_sim_ps": 8000, "status": "completed"},
+        {"t": "run_end", "ts_wall_us": None, "ts_sim_ps": None},
+    ]) + "\n")
+    assert read_sim_rate(progress) == 20.0
+    assert read_sim_rate(tmp_path / "missing.jsonl") is None
+    assert pick_best_threads({1: 10.0, 2: 30.0, 4: 30.0, 8: None}) == 2
+    assert pick_best_threads({1: None}) is None
+
+def test_save_and_load_tuning(tmp_path: Path):
+    """Test that tunings of several tasks are kept and that a different key is not reused"""
+    tuning_file = tmp_path / ".bob" / "verilator_tuning.json"
+    save_tuning(tuning_file, "tb_a", {"key": "k1", "verilator_threads": 4})
+    save_tuning(tuning_file, "tb_b", {"key": "k2", "verilator_threads": 2})
+    assert load_tuning(tuning_file, "tb_a", "k1")["verilator_threads"] == 4
+    assert load_tuning(tuning_file, "tb_b", "k2")["verilator_threads"] == 2
+    assert load_tuning(tuning_file, "tb_a", "k2") is None
+
+def test_tune_verilator_threads_benchmarks_and_persists(tmp_path: Path):
+    """Test that each candidate is built and run, the fastest persisted in .bob/, and reused on the next build"""
+    bob_instance = Bob(MagicMock())
+    bob_instance.dotbob_tuning_file = tmp_path / ".bob" / "verilator_tuning.json"
+    bob_instance.tool_config_parser = MagicMock()
+    bob_instance.tool_config_parser.get_command.return_value = ["verilator"]
+    bob_instance.tool_config_parser.describe.return_value = {"verilator": {"path": "/usr/bin/verilator", "version": "Verilator 5.030"}}
+    rtl = tmp_path / "top.sv"
+    rtl.write_text("module top; endmodule\n")
+    bob_instance.task_configs["tb"] = {"verilator_threads": "auto", "verilator_threads_tuning": {"candidates": [1, 2, 4], "max_time_ps": 1000, "args": []}}
+    task_env = {"RTL_SRC_FILES": str(rtl), "TOP_MODULE": "top", "OUTPUT_EXECUTABLE": "tb.out"}
+    sim_ps_per_wall_us = {"1": 10, "2": 25, "4": 20}
+
+    def fake_run_subprocess(task_name, cmd, env, log_file, cwd):
+        if cmd[0] == "make":
+            assert env["VERILATOR_THREADS"] == Path(cwd).name.split("_")[1]
+            return True
+        run_dir = Path(next(arg.split("=", 1)[1] for arg in cmd if arg.startswith("--output-dir=")))
+        run_dir.mkdir(parents=True)
+        (run_dir / "progress.jsonl").write_text(json.dumps({"t": "run_end", "ts_wall_us": 100, "ts_sim_ps": 100 * sim_ps_per_wall_us[Path(cwd).name.split("_")[1]]}) + "\n")
+        return True
+    bob_instance.run_subprocess = MagicMock(side_effect=fake_run_subprocess)
+
+    assert bob_instance.tune_verilator_threads("tb", task_env, MagicMock(), tmp_path / "build" / "tb") == 2
+    assert bob_instance.run_subprocess.call_count == 6
+    assert not (tmp_path / "build" / "tb" / "tune").exists()
+    assert json.loads(bob_instance.dotbob_tuning_file.read_text())["tb"]["verilator_threads"] == 2
+
+    bob_instance.run_subprocess.reset_mock()
+    assert bob_instance.tune_verilator_threads("tb", task_env, MagicMock(), tmp_path / "build" / "tb") == 2
+    bob_instance.run_subprocess.assert_not_called()
+
+@pytest.mark.parametrize("fields", [
+    {"verilator_threads": 0},
+    {"verilator_threads": "many"},
+    {"build_jobs": True},
+    {"verilator_threads": "auto", "verilator_threads_tuning": {"candidates": []}},
+    {"verilator_threads": "auto", "verilator_threads_tuning": {"repeat": 3}},
+])
+def test_parse_verilator_parallelism_invalid(fields, tmp_path: Path):
+    """Test that invalid verilator_threads, build_jobs and verilator_threads_tuning values are rejected"""
+    task_config_parser = TaskConfigParser(MagicMock(), str(tmp_path))
+    task_config_parser.task_configs["tb"] = {"task_config_dict": fields}
+    with pytest.raises(ValueError):
+        task_config_parser.parse_verilator_parallelism("tb")
+
+def test_parse_verilator_parallelism_valid(tmp_path: Path):
+    """Test that valid knobs are stored, and that 'auto' threads is rejected where there is no tb to benchmark"""
+    task_config_parser = TaskConfigParser(MagicMock(), str(tmp_path))
+    task_config_parser.task_configs["tb"] = {"task_config_dict": {"verilator_threads": "auto", "build_jobs": 8, "verilator_threads_tuning": {"candidates": [4, 1, 4], "args": "--tb.test=smoke"}}}
+    task_config_parser.parse_verilator_parallelism("tb")
+    assert task_config_parser.task_configs["tb"]["build_jobs"] == 8
+    assert task_config_parser.task_configs["tb"]["verilator_threads_tuning"] == {"candidates": [1, 4], "max_time_ps": None, "args": ["--tb.test=smoke"]}
+    with pytest.raises(ValueError):
+        task_config_parser.parse_verilator_parallelism("tb", allow_auto_threads=False)
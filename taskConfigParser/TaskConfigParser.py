@@ -1,4 +1,5 @@
 from pathlib import Path
+from bob.FsSnapshot import FsSnapshot
 import logging
 import yaml
 import re
@@ -7,10 +8,11 @@ import os
 class TaskConfigParser:
     # Pattern which indicate that it is a function
     FUNC_PATTERN = re.compile(r'\$\((\w+)\(([^)]*)\)\)')
-    def __init__(self, logger: logging.Logger, proj_root: str) -> None:
+    def __init__(self, logger: logging.Logger, proj_root: str, fs_snapshot: FsSnapshot | None = None) -> None:
         self.task_configs = {}
         self.logger = logger
         self.proj_root = proj_root
+        self.fs_snapshot = fs_snapshot if fs_snapshot is not None else FsSnapshot() # Shared with Bob, see Bob.fs_snapshot
         self.build_scripts_dir = Path(self.proj_root) / "build_scripts"
         self.function_registry = {
             "get_task_dir": self.get_task_dir,
@@ -70,6 +72,30 @@ class TaskConfigParser:
         except Exception as e:
             self.logger.critical(f"Unexpected error during _load_task_config_file() : {e}", exc_info=True)
 
+    def _peek_task_config_dict(self, task_name: str) -> dict | None:
+        """Return the task_config_dict of another task, reading its task_config.yaml without registering it if it has not been loaded yet"""
+        task_entry = self.task_configs.get(task_name, None)
+        if task_entry is None:
+            return None
+        if "task_config_dict" in task_entry:
+            return task_entry["task_config_dict"]
+        task_config_file_path = task_entry.get("task_config_file_path", None)
+        if task_config_file_path is None or not Path(task_config_file_path).is_file():
+            return None
+        with Path(task_config_file_path).open("r") as f:
+            return yaml.safe_load(f)
+
+    def _external_objects_use_lto(self, unresolved_external_objects: list[str]) -> bool:
+        """Return True if any external object is the output of a task with 'lto: true', such that the link must run the link-time optimiser"""
+        for unresolved_external_object in unresolved_external_objects:
+            match = re.search(r"\{@output:([^:\[\]]+):", unresolved_external_object)
+            if match is None:
+                continue
+            producer_task_config_dict = self._peek_task_config_dict(match.group(1)) or {}
+            if producer_task_config_dict.get("lto", False) is True:
+                return True
+        return False
+
     def get_task_dir(self, task_name: str) -> str:
         """Retrieve task directory for a given task name."""
         task = self.task_configs.get(task_name)
@@ -248,7 +274,7 @@ class TaskConfigParser:
                 resolved_value = task_dir_path / value  # Join task_dir and value
 
                 # Return the absolute path
-                resolved_value = resolved_value.resolve()
+                resolved_value = self.fs_snapshot.resolve(resolved_value)
 
                 # Convert to string before returning
                 resolved_value = str(resolved_value)
@@ -259,22 +285,20 @@ class TaskConfigParser:
             self.logger.debug(f"resolved_value={resolved_value}")
 
             if isinstance(resolved_value, str):
-                resolved_path = Path(resolved_value).resolve()
-                self.logger.debug(f"type(resolved_path)={type(resolved_path)}")
-                self.logger.debug(f"resolved_path.is_dir()={resolved_path.is_dir()}")
+                resolved_path = self.fs_snapshot.resolve(resolved_value)
                 exclusion_list = {"task_config.yaml"}
-                if resolved_path.is_dir() and resolved_type == "input":
+                if resolved_type == "input" and self.fs_snapshot.is_dir(resolved_path):
                     resolved_filepaths = []
-                    for p in resolved_path.iterdir():
-                        self.logger.debug(f"p={p}, p.name={p.name}")
-                        if p.name not in exclusion_list:
-                            resolved_filepaths.append(str(p))
+                    for name in self.fs_snapshot.listdir(resolved_path):
+                        self.logger.debug(f"p={resolved_path / name}, p.name={name}")
+                        if name not in exclusion_list:
+                            resolved_filepaths.append(str(resolved_path / name))
                     return resolved_filepaths, resolved_type
                 else:
                     return str(resolved_path), resolved_type
 
             if isinstance(resolved_value, list):
-                return [str(Path(p).resolve()) for p in resolved_value], resolved_type
+                return [str(self.fs_snapshot.resolve(p)) for p in resolved_value], resolved_type
 
             raise TypeError(f"Unexpected resolved_value: {resolved_value}, resolved_type: {resolved_type}")
 
@@ -347,6 +371,7 @@ class TaskConfigParser:
 
             task_config_dict = self.task_configs[task_name].get("task_config_dict", None)
             task_type = task_config_dict.get("task_type", None)
+            self.parse_remote(task_name)
             match task_type:
                 case "c_compile":
                     self.parse_c_compile(task_name)
@@ -449,7 +474,7 @@ class TaskConfigParser:
                         resolved_src_files["internal_src_files"].extend(resolved_reference)
                     elif resolved_type == "input":
                         resolved_src_files["external_src_files"].extend(resolved_reference)
-                    elif resolved_reference == "output":
+                    elif resolved_type == "output":
                         resolved_src_files["output_src_files"].extend(resolved_reference)
                 else:
                     self.logger.warning(f"Resolved reference='{resolved_reference}' is neither of type str or list. type({resolved_reference})={type(resolved_reference)}. Skip appending to resolved_src_files dict.")
@@ -460,6 +485,145 @@ class TaskConfigParser:
             self.logger.critical(f"Unexpected error during resolve_src_files() for task_name = '{task_name}' : {e}", exc_info=True)
             return None
 
+    def parse_precompiled_headers(self, task_name: str, allow_produce: bool = True) -> None:
+        """Parse the optional 'precompiled_headers' field. Direct/input references are headers this task precompiles,
+        an output reference is the precompiled header of another task consumed by this one."""
+        task_config_dict = self.task_configs[task_name].get("task_config_dict", {})
+        task_config_file_path = self.task_configs[task_name].get("task_config_file_path", None)
+        unresolved_precompiled_headers = task_config_dict.get("precompiled_headers", [])
+        if isinstance(unresolved_precompiled_headers, str):
+            unresolved_precompiled_headers = [unresolved_precompiled_headers]
+        if not isinstance(unresolved_precompiled_headers, list):
+            raise TypeError(f"{task_config_file_path} field 'precompiled_headers' should be either a str or a list. Current type = {type(unresolved_precompiled_headers)}.")
+
+        precompiled_headers = []
+        consumed_precompiled_headers = []
+        for unresolved_precompiled_header in unresolved_precompiled_headers:
+            resolved_reference, resolved_type = self.resolve_reference(task_name, unresolved_precompiled_header)
+            self.logger.debug(f"task_name='{task_name}', unresolved_precompiled_header='{unresolved_precompiled_header}', resolved_reference='{resolved_reference}', resolved_type='{resolved_type}'.")
+            resolved_references = resolved_reference if isinstance(resolved_reference, list) else [resolved_reference]
+            if resolved_type == "output":
+                # Refer to the precompiled header by its header name, GCC looks for '<header>.gch' next to it
+                consumed_precompiled_headers.extend(r[:-len(".gch")] if r.endswith(".gch") else r for r in resolved_references)
+            else:
+                precompiled_headers.extend(resolved_references)
+
+        if precompiled_headers and not allow_produce:
+            raise ValueError(f"{task_config_file_path} field 'precompiled_headers' can only consume precompiled headers of other tasks through '{{@output:...}}' references. Offending headers: {precompiled_headers}.")
+        if len(consumed_precompiled_headers) > 1:
+            raise ValueError(f"{task_config_file_path} field 'precompiled_headers' consumes {len(consumed_precompiled_headers)} precompiled headers, but GCC can only use one per translation unit.")
+        if precompiled_headers and consumed_precompiled_headers:
+            raise ValueError(f"{task_config_file_path} field 'precompiled_headers' cannot both produce and consume a precompiled header.")
+
+        precompiled_header_flags = task_config_dict.get("precompiled_header_flags", [])
+        if isinstance(precompiled_header_flags, str):
+            precompiled_header_flags = [precompiled_header_flags]
+        if not isinstance(precompiled_header_flags, list):
+            raise TypeError(f"{task_config_file_path} field 'precompiled_header_flags' should be either a str or a list. Current type = {type(precompiled_header_flags)}.")
+
+        self.task_configs[task_name]["precompiled_headers"] = precompiled_headers
+        self.task_configs[task_name]["precompiled_header_flags"] = [str(flag) for flag in precompiled_header_flags]
+        self.task_configs[task_name]["consumed_precompiled_header"] = consumed_precompiled_headers[0] if consumed_precompiled_headers else None
+
+    def parse_verilator_parallelism(self, task_name: str, allow_auto_threads: bool = True) -> None:
+        """Parse the optional 'verilator_threads', 'build_jobs' and 'verilator_threads_tuning' fields of a verilator task"""
+        task_config_dict = self.task_configs[task_name].get("task_config_dict", None)
+        task_config_file_path = self.task_configs[task_name].get("task_config_file_path", None)
+
+        def is_positive_int(value) -> bool:
+            return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+        # 'verilator_threads' is the --threads of the verilated model. 'auto' benchmarks candidate thread counts with the built tb and keeps the fastest
+        verilator_threads = task_config_dict.get("verilator_threads", None)
+        if verilator_threads is not None and not is_positive_int(verilator_threads) and verilator_threads != "auto":
+            raise ValueError(f"{task_config_file_path} optional field 'verilator_threads' should be a positive int or 'auto'. Current value = {verilator_threads!r}.")
+        if verilator_threads == "auto" and not allow_auto_threads:
+            raise ValueError(f"{task_config_file_path} sets 'verilator_threads: auto' which is only supported by 'verilator_tb_compile' tasks building their own model.")
+        self.task_configs[task_name]["verilator_threads"] = verilator_threads
+
+        # 'build_jobs' is the number of parallel jobs compiling the verilated C++. 'auto' uses the CPU count
+        build_jobs = task_config_dict.get("build_jobs", None)
+        if build_jobs is not None and not is_positive_int(build_jobs) and build_jobs != "auto":
+            raise ValueError(f"{task_config_file_path} optional field 'build_jobs' should be a positive int or 'auto'. Current value = {build_jobs!r}.")
+        self.task_configs[task_name]["build_jobs"] = build_jobs
+
+        # 'verilator_threads_tuning' configures the benchmark of 'verilator_threads: auto'
+        tuning = task_config_dict.get("verilator_threads_tuning", {}) or {}
+        if not isinstance(tuning, dict):
+            raise TypeError(f"{task_config_file_path} optional field 'verilator_threads_tuning' should be a dict. Current type = {type(tuning)}.")
+        unknown_keys = set(tuning) - {"candidates", "max_time_ps", "args"}
+        if unknown_keys:
+            raise ValueError(f"{task_config_file_path} field 'verilator_threads_tuning' has unknown keys {sorted(unknown_keys)}. Supported keys are 'candidates', 'max_time_ps' and 'args'.")
+        candidates = tuning.get("candidates", None)
+        if candidates is not None and (not isinstance(candidates, list) or not candidates or not all(is_positive_int(c) for c in candidates)):
+            raise ValueError(f"{task_config_file_path} field 'verilator_threads_tuning.candidates' should be a non-empty list of positive ints. Current value = {candidates!r}.")
+        max_time_ps = tuning.get("max_time_ps", None)
+        if max_time_ps is not None and not is_positive_int(max_time_ps):
+            raise ValueError(f"{task_config_file_path} field 'verilator_threads_tuning.max_time_ps' should be a positive int. Current value = {max_time_ps!r}.")
+        tuning_args = tuning.get("args", [])
+        tuning_args = [tuning_args] if isinstance(tuning_args, str) else tuning_args
+        if not isinstance(tuning_args, list):
+            raise TypeError(f"{task_config_file_path} field 'verilator_threads_tuning.args' should be a str or a list. Current type = {type(tuning_args)}.")
+        if tuning and verilator_threads != "auto":
+            self.logger.warning(f"{task_config_file_path} sets 'verilator_threads_tuning' without 'verilator_threads: auto'. It has no effect.")
+        self.task_configs[task_name]["verilator_threads_tuning"] = {
+            "candidates": sorted(set(candidates)) if candidates else None,
+            "max_time_ps": max_time_ps,
+            "args": [str(arg) for arg in tuning_args],
+        }
+
+    def parse_remote(self, task_name: str) -> None:
+        """Parse the optional 'remote' and 'remote_resources' fields, a task with 'remote: true' runs its commands on the remote backend of 'build --remote-backend'"""
+        task_config_dict = self.task_configs[task_name].get("task_config_dict", None)
+        task_config_file_path = self.task_configs[task_name].get("task_config_file_path", None)
+        remote = task_config_dict.get("remote", False)
+        if not isinstance(remote, bool):
+            raise TypeError(f"{task_config_file_path} optional field 'remote' should be a bool. Current type = {type(remote)}.")
+        self.task_configs[task_name]["remote"] = remote
+
+        # 'remote_resources' sizes the job running each command: 'cpus', 'mem_mb' and 'time_limit_min', by default derived from 'make -j'
+        remote_resources = task_config_dict.get("remote_resources", {}) or {}
+        if not isinstance(remote_resources, dict):
+            raise TypeError(f"{task_config_file_path} optional field 'remote_resources' should be a dict. Current type = {type(remote_resources)}.")
+        unknown_keys = set(remote_resources) - {"cpus", "mem_mb", "time_limit_min"}
+        if unknown_keys:
+            raise ValueError(f"{task_config_file_path} field 'remote_resources' has unknown keys {sorted(unknown_keys)}. Supported keys are 'cpus', 'mem_mb' and 'time_limit_min'.")
+        for key, value in remote_resources.items():
+            if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+                raise ValueError(f"{task_config_file_path} field 'remote_resources.{key}' should be a positive int. Current value = {value!r}.")
+        if remote_resources and not remote:
+            self.logger.warning(f"{task_config_file_path} sets 'remote_resources' without 'remote: true'. It has no effect.")
+        self.task_configs[task_name]["remote_resources"] = dict(remote_resources)
+
+    def parse_pgo(self, task_name: str) -> None:
+        """Parse the optional 'pgo' field of a verilator_tb_compile task, whose training plan is run by 'bob pgo'"""
+        task_config_dict = self.task_configs[task_name].get("task_config_dict", None)
+        task_config_file_path = self.task_configs[task_name].get("task_config_file_path", None)
+        self.task_configs[task_name]["pgo"] = None
+
+        pgo = task_config_dict.get("pgo", None)
+        if pgo is None:
+            return
+        if not isinstance(pgo, dict):
+            raise TypeError(f"{task_config_file_path} optional field 'pgo' should be a dict. Current type = {type(pgo)}.")
+        unknown_keys = set(pgo) - {"training_plan"}
+        if unknown_keys:
+            raise ValueError(f"{task_config_file_path} field 'pgo' has unknown keys {sorted(unknown_keys)}. Supported keys are 'training_plan'.")
+        training_plan = pgo.get("training_plan", None)
+        if not isinstance(training_plan, str):
+            raise KeyError(f"{task_config_file_path} field 'pgo' does not contain a mandatory field 'training_plan', the campaign plan relative to proj_root.")
+
+        # Like campaign plans, the training plan is relative to proj_root. It must run the executable of this task
+        training_plan_path = Path(training_plan) if Path(training_plan).is_absolute() else Path(self.proj_root) / training_plan
+        if not training_plan_path.is_file():
+            raise FileNotFoundError(f"{task_config_file_path} field 'pgo.training_plan' refers to '{training_plan_path}' which does not exist.")
+        with training_plan_path.open("r") as f:
+            plan = yaml.safe_load(f) or {}
+        output_executable = str(task_config_dict.get("output_executable", ""))
+        if not any(Path(str(entry.get("binary", ""))).name == output_executable for entry in plan.get("binaries", None) or []):
+            raise ValueError(f"{task_config_file_path} field 'pgo.training_plan' refers to '{training_plan_path}' which has no binary named '{output_executable}'.")
+        self.task_configs[task_name]["pgo"] = {"training_plan": str(training_plan_path)}
+
     def parse_c_compile(self, task_name: str):
         """Set up the task_env for a C compilation task"""
         try:
@@ -500,7 +664,7 @@ class TaskConfigParser:
                     self.logger.debug(f"unresolved_header_dir={unresolved_header_dir}")
                     resolved_reference, resolved_type = self.resolve_reference(task_name, unresolved_header_dir)
                     self.logger.debug(f"task_name='{task_name}', unresolved_header_dir='{unresolved_header_dir}', resolved_reference='{resolved_reference}', resolved_type='{resolved_type}'.")
-                    if not Path(resolved_reference).is_dir():
+                    if not self.fs_snapshot.is_dir(resolved_reference):
                         self.logger.error(f"unresolved_header_dir={unresolved_header_dir} in task_config.yaml of task '{task_name}' is not a directory. resolve_reference = {resolved_reference}, resolved_type = {resolved_type}.")
                         raise ValueError(f"unresolved_header_dir={unresolved_header_dir} in task_config.yaml of task '{task_name}' is not a directory. resolve_reference = {resolved_reference}, resolved_type = {resolved_type}.")
                     include_header_dirs.append(resolved_reference)
@@ -586,6 +750,8 @@ class TaskConfigParser:
                 if resolved_type != "output":
                     raise ValueError(f"external object must have resolved_type=output.")
                 external_objects.append(resolved_reference)
+            # Linking a library of an 'lto' task must also run the link-time optimiser, otherwise its functions are not inlined
+            self.task_configs[task_name]["lto_link"] = self._external_objects_use_lto(unresolved_external_objects)
 
             # Fetch 'include_header_dirs' if it exists. If it does, add them to the -I option during GCC compilation
             include_header_directories = task_config_dict.get("include_header_dirs", [])
@@ -600,7 +766,7 @@ class TaskConfigParser:
                     self.logger.debug(f"unresolved_header_dir={unresolved_header_dir}")
                     resolved_reference, resolved_type = self.resolve_reference(task_name, unresolved_header_dir)
                     self.logger.debug(f"task_name='{task_name}', unresolved_header_dir='{unresolved_header_dir}', resolved_reference='{resolved_reference}', resolved_type='{resolved_type}'.")
-                    if not Path(resolved_reference).is_dir():
+                    if not self.fs_snapshot.is_dir(resolved_reference):
                         self.logger.error(f"unresolved_header_dir={unresolved_header_dir} in task_config.yaml of task '{task_name}' is not a directory. resolve_reference = {resolved_reference}, resolved_type = {resolved_type}.")
                         raise ValueError(f"unresolved_header_dir={unresolved_header_dir} in task_config.yaml of task '{task_name}' is not a directory. resolve_reference = {resolved_reference}, resolved_type = {resolved_type}.")
                     include_header_dirs.append(resolved_reference)
@@ -641,6 +807,38 @@ class TaskConfigParser:
                 else:
                     self.logger.debug(f"Task '{task_name}' will generate a static library called '{lib_name}'.")
 
+            # Fetch 'unity_build' if it exists. If it is true, .cpp files are amalgamated into unity translation units before compilation
+            unity_build = task_config_dict.get("unity_build", False)
+            if not isinstance(unity_build, bool):
+                raise TypeError(f"{task_config_file_path} field 'unity_build' is not of type bool. Current type = {type(unity_build)}. Please ensure that it is either true or false.")
+            unity_batch_size = task_config_dict.get("unity_batch_size", None)
+            if unity_batch_size is not None:
+                if isinstance(unity_batch_size, bool) or not isinstance(unity_batch_size, int):
+                    raise TypeError(f"{task_config_file_path} field 'unity_batch_size' is not of type int. Current type = {type(unity_batch_size)}.")
+                if unity_batch_size < 1:
+                    raise ValueError(f"{task_config_file_path} field 'unity_batch_size' must be at least 1. Currently, unity_batch_size={unity_batch_size}.")
+                if not unity_build:
+                    self.logger.warning(f"Task '{task_name}' defines 'unity_batch_size' in '{task_config_file_path}' but 'unity_build' is not true. It will be ignored.")
+            self.task_configs[task_name]["unity_build"] = unity_build
+            self.task_configs[task_name]["unity_batch_size"] = unity_batch_size
+
+            # Fetch 'lto' and 'thin_archive' if they exist. With 'lto' true, objects are compiled with -flto such that their functions can be inlined across translation units at link time.
+            # With 'thin_archive' true, the static library only references its objects in place instead of copying them
+            lto = task_config_dict.get("lto", False)
+            if not isinstance(lto, bool):
+                raise TypeError(f"{task_config_file_path} field 'lto' is not of type bool. Current type = {type(lto)}. Please ensure that it is either true or false.")
+            thin_archive = task_config_dict.get("thin_archive", False)
+            if not isinstance(thin_archive, bool):
+                raise TypeError(f"{task_config_file_path} field 'thin_archive' is not of type bool. Current type = {type(thin_archive)}. Please ensure that it is either true or false.")
+            if thin_archive and (executable_name or lib_type != "static"):
+                self.logger.warning(f"Task '{task_name}' defines 'thin_archive' in '{task_config_file_path}' but does not generate a static library. It will be ignored.")
+                thin_archive = False
+            self.task_configs[task_name]["lto"] = lto
+            self.task_configs[task_name]["thin_archive"] = thin_archive
+
+            # Fetch 'precompiled_headers' if it exists, either headers to precompile or another task's precompiled header to use
+            self.parse_precompiled_headers(task_name)
+
             # Fetch mandatory key 'src_files'
             unresolved_src_files = task_config_dict.get("src_files", None)
             if unresolved_src_files is None:
@@ -671,6 +869,10 @@ class TaskConfigParser:
 
             # input_src_files consists of internal_src_files and external_src_files
             self.task_configs[task_name].setdefault("input_src_files", internal_src_files + external_src_files)
+            # Headers to precompile must also trigger a rebuild when they change
+            for precompiled_header in self.task_configs[task_name]["precompiled_headers"]:
+                if precompiled_header not in self.task_configs[task_name]["input_src_files"]:
+                    self.task_configs[task_name]["input_src_files"].append(precompiled_header)
 
         except TypeError as te:
             self.logger.error(f"TypeError: {te}")
@@ -721,6 +923,17 @@ class TaskConfigParser:
             external_src_files.extend(resolved_src_files["external_src_files"])
             output_src_files.extend(resolved_src_files["output_src_files"])
 
+            # Fetch optional key 'build_model'. If true, the verilated model is compiled into archives which verilator_tb_compile tasks can link
+            build_model = task_config_dict.get("build_model", False)
+            if not isinstance(build_model, bool):
+                raise TypeError(f"{task_config_file_path} optional field 'build_model' should be a bool. Current type = {type(build_model)}.")
+            if build_model and not task_config_dict.get("top_module", None):
+                raise KeyError(f"{task_config_file_path} sets 'build_model' which requires the field 'top_module'.")
+            self.task_configs[task_name]["build_model"] = build_model
+
+            # Fetch optional keys 'verilator_threads' and 'build_jobs', used when building the model
+            self.parse_verilator_parallelism(task_name, allow_auto_threads=False)
+
             # input_src_files consists of internal_src_files and external_src_files
             self.task_configs[task_name].setdefault("input_src_files", internal_src_files + external_src_files)
 
@@ -852,7 +1065,7 @@ class TaskConfigParser:
                     self.logger.debug(f"unresolved_header_dir={unresolved_header_dir}")
                     resolved_reference, resolved_type = self.resolve_reference(task_name, unresolved_header_dir)
                     self.logger.debug(f"task_name='{task_name}', unresolved_header_dir='{unresolved_header_dir}', resolved_reference='{resolved_reference}', resolved_type='{resolved_type}'.")
-                    if not Path(resolved_reference).is_dir():
+                    if not self.fs_snapshot.is_dir(resolved_reference):
                         self.logger.error(f"unresolved_header_dir={unresolved_header_dir} in task_config.yaml of task '{task_name}' is not a directory. resolve_reference = {resolved_reference}, resolved_type = {resolved_type}.")
                         raise ValueError(f"unresolved_header_dir={unresolved_header_dir} in task_config.yaml of task '{task_name}' is not a directory. resolve_reference = {resolved_reference}, resolved_type = {resolved_type}.")
                     include_header_dirs.append(resolved_reference)
@@ -878,6 +1091,35 @@ class TaskConfigParser:
                     raise ValueError(f"external object must have resolved_type=output.")
                 external_objects.append(resolved_reference)
             self.update_task_env(task_name, "EXTERNAL_OBJECTS", external_objects, True, " ")
+            # Linking a library of an 'lto' task must also run the link-time optimiser, otherwise its functions are not inlined
+            self.task_configs[task_name]["lto_link"] = self._external_objects_use_lto(unresolved_external_objects)
+            self.update_task_env(task_name, "LTO_BUILD", "1" if self.task_configs[task_name]["lto_link"] else "0", True)
+
+            # Fetch 'precompiled_headers' if it exists. A verilator_tb_compile task can only consume another task's precompiled header
+            self.parse_precompiled_headers(task_name, allow_produce=False)
+
+            # Fetch optional key 'verilated_model', the verilator_verilate task whose prebuilt model of the same top module is linked instead of verilating the RTL again
+            self.task_configs[task_name]["verilated_model"] = None
+            verilated_model = task_config_dict.get("verilated_model", None)
+            if verilated_model is not None:
+                if not isinstance(verilated_model, str):
+                    raise TypeError(f"{task_config_file_path} optional field 'verilated_model' should be a task name. Current type = {type(verilated_model)}.")
+                model_task_config_dict = self._peek_task_config_dict(verilated_model)
+                if model_task_config_dict is None:
+                    raise ValueError(f"{task_config_file_path} field 'verilated_model' refers to task '{verilated_model}' which is not found in task_configs.")
+                if model_task_config_dict.get("task_type", None) != "verilator_verilate" or model_task_config_dict.get("build_model", False) is not True:
+                    raise ValueError(f"{task_config_file_path} field 'verilated_model' must refer to a 'verilator_verilate' task with 'build_model: true', '{verilated_model}' is not.")
+                if str(model_task_config_dict.get("top_module", None)) != str(top_module):
+                    raise ValueError(f"{task_config_file_path} has top_module '{top_module}' but its verilated_model '{verilated_model}' has top_module '{model_task_config_dict.get('top_module', None)}'.")
+                self.task_configs[task_name]["verilated_model"] = verilated_model
+
+            # Fetch optional keys 'verilator_threads', 'build_jobs' and 'verilator_threads_tuning'
+            self.parse_verilator_parallelism(task_name)
+            if self.task_configs[task_name]["verilated_model"] and self.task_configs[task_name]["verilator_threads"] is not None:
+                raise ValueError(f"{task_config_file_path} sets both 'verilated_model' and 'verilator_threads'. The threads of a linked model are set on its verilator_verilate task '{verilated_model}'.")
+
+            # Fetch optional key 'pgo', training a profile-guided optimised build of this tb with 'bob pgo'
+            self.parse_pgo(task_name)
 
             # Assign output_dir to task env var 'TASK_OUTDIR'
             output_dir = self.task_configs[task_name].get("output_dir", None)
@@ -1,10 +1,18 @@
 import yaml
 import sys
+import os
+import json
+import subprocess
 from pathlib import Path
 from logging import Logger
 import shutil
 
 class ToolConfigParser:
+    TOOL_CACHE_FILE = "tool_cache.json" # Within .bob, resolved tool paths and probed versions
+    VERSION_PROBE_TIMEOUT_S = 10
+    # Arguments printing each field describe() can probe, e.g. 'machine' is the target of gcc/g++ which precompiled headers must match
+    PROBE_ARGS = {"version": ["--version"], "machine": ["-dumpmachine"]}
+
     def __init__(self, logger: Logger, proj_root: str):
         self.proj_root: Path = Path(proj_root).resolve()
         self.bob_root: Path = Path(__file__).resolve().parent.parent # Specifies the root which contains Bob implementation and its helper classes
@@ -12,8 +20,94 @@ class ToolConfigParser:
         self.tool_config_path = self.proj_root / "tool_config.yaml"
         self.tool_paths: dict[str, str] = {}
         self.tool_flags: dict[str, list[str]] = {}
+        self.tool_common_flags: dict[str, list[str]] = {}
+        self.tool_os_flags: dict[str, list[str]] = {}
+        self.tool_variant_flags: dict[str, dict[str, list[str]]] = {}
+        self.build_variant: str | None = None
         self.validated_tools: dict[str, str] = {}
+        self.tool_specs: dict[str, str] = {} # Path or name of each tool as written in tool_config.yaml
+        self.tool_cache_path: Path = self.proj_root / ".bob" / self.TOOL_CACHE_FILE
+        self._tool_cache: dict = {"key": None, "tools": {}}
+        self._tool_cache_dirty = False
+        self._tool_cache_owner_pid = os.getpid() # Task workers share the cache read-only, only the process which loaded it writes it
+        self._not_found: set[str] = set()
+        self._load_tool_cache()
         self._load_and_validate_tool_config()
+        self._save_tool_cache()
+
+    def _tool_cache_key(self) -> dict:
+        try:
+            tool_config_mtime_ns = os.stat(self.tool_config_path).st_mtime_ns
+        except OSError:
+            tool_config_mtime_ns = None
+        return {"PATH": os.environ.get("PATH", ""), "tool_config_mtime_ns": tool_config_mtime_ns}
+
+    def _load_tool_cache(self) -> None:
+        """Load .bob/tool_cache.json, discarding it if PATH or tool_config.yaml have changed since it was written"""
+        key = self._tool_cache_key()
+        try:
+            with open(self.tool_cache_path, "r") as f:
+                tool_cache = json.load(f)
+        except (OSError, ValueError):
+            tool_cache = None
+        if not isinstance(tool_cache, dict) or tool_cache.get("key") != key or not isinstance(tool_cache.get("tools"), dict):
+            tool_cache = {"key": key, "tools": {}}
+            self._tool_cache_dirty = True
+        self._tool_cache = tool_cache
+
+    def _save_tool_cache(self) -> None:
+        if not self._tool_cache_dirty or os.getpid() != self._tool_cache_owner_pid:
+            return
+        try:
+            self.tool_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.tool_cache_path.with_name(f"{self.tool_cache_path.name}.tmp.{os.getpid()}")
+            with open(tmp_path, "w") as f:
+                json.dump(self._tool_cache, f, indent=2)
+            os.replace(tmp_path, self.tool_cache_path)
+            self._tool_cache_dirty = False
+        except OSError as oe:
+            self.logger.debug(f"Could not write the tool cache {self.tool_cache_path}: {oe}")
+
+    def _which(self, spec: str) -> str | None:
+        """shutil.which() of a tool path or name, served from the tool cache while the resolved binary's mtime is unchanged"""
+        entry = self._tool_cache["tools"].get(spec)
+        if entry:
+            try:
+                if os.stat(entry["path"]).st_mtime_ns == entry.get("mtime_ns"):
+                    return entry["path"]
+            except OSError:
+                pass
+        if spec in self._not_found:
+            return None
+        resolved = shutil.which(spec)
+        if not resolved:
+            # Only remembered by this invocation, a tool installed later is found by the next one
+            self._not_found.add(spec)
+            return None
+        try:
+            mtime_ns = os.stat(resolved).st_mtime_ns
+        except OSError:
+            return resolved
+        self._tool_cache["tools"][spec] = {"path": resolved, "mtime_ns": mtime_ns}
+        self._tool_cache_dirty = True
+        return resolved
+
+    def _probe(self, spec: str, path: str, field: str = "version") -> str | None:
+        """Return the first line printed by the tool run with the PROBE_ARGS of 'field', cached with the tool's resolved path"""
+        entry = self._tool_cache["tools"].get(spec)
+        if entry is not None and field in entry:
+            return entry[field]
+        try:
+            completed = subprocess.run([path, *self.PROBE_ARGS[field]], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                       text=True, errors="replace", timeout=self.VERSION_PROBE_TIMEOUT_S, check=False)
+            value = next((line.strip() for line in completed.stdout.splitlines() if line.strip()), None)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.logger.warning(f"Could not probe the {field} of '{path}': {e}")
+            value = None
+        if entry is not None:
+            entry[field] = value
+            self._tool_cache_dirty = True
+        return value
 
     def _load_and_validate_tool_config(self):
         """Load the 'tool_config.yaml' from project root and and validate tool paths and default flags."""
@@ -29,17 +123,25 @@ class ToolConfigParser:
 
             for tool, tool_entry in tool_config.items():
                 if isinstance(tool_entry, str): # If a tool is only specified with legacy format which is  {tool} : {tool_path}
-                    resolved = shutil.which(tool_entry)
+                    resolved = self._which(tool_entry)
                     if not resolved:
-                        raise FileNotFoundError(f"Tool '{tool}' specified as '{tool_entry}' not found in PATH.")
+                        self.logger.error(f"FileNotFoundError: Tool '{tool}' specified as '{tool_entry}' not found in PATH.")
+                        continue
+                    self.tool_specs[tool] = tool_entry
                     self.tool_paths[tool] = resolved
                     self.tool_flags[tool] = []
                 elif isinstance(tool_entry, dict):
                     path = tool_entry.get("path", "")
                     flags_dict = tool_entry.get("default_flags", {})
-                    resolved = shutil.which(path)
-                    if not resolved:
-                        raise FileNotFoundError(f"Tool '{tool}' path '{path}' not found in PATH.")
+                    optional = tool_entry.get("optional", False)
+                    if not isinstance(optional, bool):
+                        raise ValueError(f"Tool '{tool}': 'optional' must be a bool.")
+                    # An optional tool is resolved lazily by get_tool_path(), a missing one is only an error for the builds needing it
+                    resolved = None if optional else self._which(path)
+                    if not resolved and not optional:
+                        # Report every missing tool rather than only the first one
+                        self.logger.error(f"FileNotFoundError: Tool '{tool}' path '{path}' not found in PATH.")
+                        continue
                     if not isinstance(flags_dict, dict):
                         raise ValueError(f"Tool '{tool}': 'default_flags' must be a dictionary.")
                     if not "common" in flags_dict:
@@ -47,11 +149,22 @@ class ToolConfigParser:
                     flags = []
                     flags.extend(flags_dict["common"])
                     # OS specific flags
+                    os_flags = []
                     if "linux" in flags_dict and sys.platform == "linux":
-                        flags.extend(flags_dict["linux"])
-                    self.tool_paths[tool] = resolved
+                        os_flags.extend(flags_dict["linux"])
+                    flags.extend(os_flags)
+                    # Build variant specific flags, which replace the OS specific flags when that variant is selected
+                    variant_flags = flags_dict.get("variants", {}) or {}
+                    if not isinstance(variant_flags, dict) or not all(isinstance(v, list) for v in variant_flags.values()):
+                        raise ValueError(f"Tool '{tool}': 'default_flags.variants' must map each build variant to a list of flags.")
+                    self.tool_specs[tool] = path
+                    if resolved:
+                        self.tool_paths[tool] = resolved
 
                     self.tool_flags[tool] = flags
+                    self.tool_common_flags[tool] = list(flags_dict["common"])
+                    self.tool_os_flags[tool] = os_flags
+                    self.tool_variant_flags[tool] = variant_flags
                 else:
                     raise ValueError(f"Tool '{tool}' entry must be either a string or a dict.")
 
@@ -69,7 +182,7 @@ class ToolConfigParser:
     def get_tool_path(self, tool_name: str) -> str:
         """Return the absolute path of the tool."""
         try:
-            return self.tool_paths.get(tool_name) or shutil.which(tool_name) or self._raise_tool_not_found(tool_name)
+            return self.tool_paths.get(tool_name) or self._which(self.tool_specs.get(tool_name, tool_name)) or self._raise_tool_not_found(tool_name)
 
         except Exception as e:
             self.logger.critical(f"Unexpected error in get_tool_path(): {e}", exc_info=True)
@@ -82,6 +195,21 @@ class ToolConfigParser:
         except Exception as e:
             self.logger.critical(f"Unexpected error in get_tool_flags(): {e}", exc_info=True)
 
+    def set_build_variant(self, build_variant: str | None) -> None:
+        """Select a build variant: tools defining flags for it use them in place of their OS specific flags"""
+        try:
+            self.build_variant = build_variant
+            for tool, common_flags in self.tool_common_flags.items():
+                variant_flags = self.tool_variant_flags.get(tool, {})
+                if build_variant is not None and build_variant in variant_flags:
+                    self.tool_flags[tool] = common_flags + list(variant_flags[build_variant])
+                else:
+                    self.tool_flags[tool] = common_flags + self.tool_os_flags.get(tool, [])
+            self.logger.debug(f"Build variant set to '{build_variant}'. Tool flags = {self.tool_flags}")
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during set_build_variant(): {e}", exc_info=True)
+
     def get_command(self, tool_name: str, extra_flags: list[str] = None) -> list[str]:
         """
         Returns the full command to run the tool, including path and default flags.
@@ -97,13 +225,39 @@ class ToolConfigParser:
     def has_tool(self, tool_name: str) -> bool:
         """Returns True if the tool is valid and available."""
         try:
-            return tool_name in self.tool_paths or shutil.which(tool_name) is not None
+            return tool_name in self.tool_paths or self._which(self.tool_specs.get(tool_name, tool_name)) is not None
 
         except Exception as e:
             self.logger.critical(f"Unexpected error during has_tool(): {e}", exc_info=True)
 
+    def describe(self, tool_names: list[str] | None = None, probes: tuple[str, ...] = ()) -> dict[str, dict]:
+        """
+        Return the resolved path, default flags, full command and probed version of each tool, all configured tools by default,
+        plus the extra fields of PROBE_ARGS named in 'probes'. Unavailable tools are left out.
+        This is the single source of tool identities for fingerprints: task fingerprints record the 'command' and 'version' of the tools
+        a task is built with, verilated models and precompiled headers the 'path', 'version' and probed fields of their tool.
+        """
+        try:
+            description = {}
+            for tool_name in (list(self.tool_specs) if tool_names is None else tool_names):
+                spec = self.tool_specs.get(tool_name, tool_name)
+                path = self.tool_paths.get(tool_name) or self._which(spec)
+                if not path:
+                    continue
+                flags = list(self.get_tool_flags(tool_name))
+                description[tool_name] = {"path": path, "flags": flags, "command": [path] + flags, "version": self._probe(spec, path),
+                                          **{field: self._probe(spec, path, field) for field in probes}}
+            self._save_tool_cache()
+            return description
+
+        except Exception as e:
+            self.logger.critical(f"Unexpected error during describe(): {e}", exc_info=True)
+            return {}
+
     def _raise_tool_not_found(self, tool_name: str):
         try:
+            if tool_name in self.tool_specs:
+                raise FileNotFoundError(f"Tool '{tool_name}' path '{self.tool_specs[tool_name]}' not found in PATH.")
             raise FileNotFoundError(f"Tool '{tool_name}' not specified in tool_config.yaml and not found in system PATH.")
 
         except FileNotFoundError as fnfe: